@@ -0,0 +1,38 @@
+"""Add webhook subscriptions table
+
+Revision ID: 005_add_webhook_subscriptions
+Revises: 004_add_finscribe_pipeline_tables
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_add_webhook_subscriptions'
+down_revision = '004_add_finscribe_pipeline_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'webhook_subscriptions',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('secret', sa.String(), nullable=False),
+        sa.Column('tenant_id', sa.String(), nullable=True),
+        sa.Column('job_id', sa.String(), nullable=True),
+        sa.Column('events', sa.JSON(), nullable=True),
+        sa.Column('is_active', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_webhook_subscriptions_tenant_id', 'webhook_subscriptions', ['tenant_id'])
+    op.create_index('ix_webhook_subscriptions_job_id', 'webhook_subscriptions', ['job_id'])
+
+
+def downgrade():
+    op.drop_index('ix_webhook_subscriptions_job_id', table_name='webhook_subscriptions')
+    op.drop_index('ix_webhook_subscriptions_tenant_id', table_name='webhook_subscriptions')
+    op.drop_table('webhook_subscriptions')
@@ -0,0 +1,27 @@
+"""Add owner tenant to webhook subscriptions
+
+Revision ID: 006_add_webhook_subscription_owner
+Revises: 005_add_webhook_subscriptions
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_add_webhook_subscription_owner'
+down_revision = '005_add_webhook_subscriptions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('webhook_subscriptions', sa.Column('owner_tenant_id', sa.String(), nullable=True))
+    # Existing subscriptions belong to the tenant they subscribe to
+    op.execute("UPDATE webhook_subscriptions SET owner_tenant_id = tenant_id WHERE tenant_id IS NOT NULL")
+    op.create_index('ix_webhook_subscriptions_owner_tenant_id', 'webhook_subscriptions', ['owner_tenant_id'])
+
+
+def downgrade():
+    op.drop_index('ix_webhook_subscriptions_owner_tenant_id', table_name='webhook_subscriptions')
+    op.drop_column('webhook_subscriptions', 'owner_tenant_id')
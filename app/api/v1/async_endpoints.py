@@ -11,12 +11,15 @@ This module demonstrates the proper async pattern:
 import logging
 import uuid
 from typing import Optional
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, UploadFile, File, HTTPException, Header, Query, Response, status
 from fastapi.responses import JSONResponse
 
 from ...core.schemas import JobResponse, JobStatusResponse, JobStatus
+from ...core.deadline import DEFAULT_JOB_DEADLINE_SECONDS, Deadline
 from ...core.tasks import process_document_task
+from ...core.claim_check import get_claim_check
 from ...core.job_manager import job_manager, JobStage
+from .conditional import MAX_WAIT_SECONDS, etag_matches, job_state_etag, wait_for_change
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -79,13 +82,15 @@ async def analyze_document_async(
     # Note: create_job returns a new job_id, but we're using our own
     # In production, you might want to use the returned job_id
     
-    # Enqueue Celery task
+    # Enqueue Celery task; the document bytes go to storage, the message carries a reference
     try:
         process_document_task.delay(
             job_id=job_id,
-            file_content=file_content,
+            file_content=get_claim_check().check_in(file_content, holder=job_id),
             filename=file.filename,
-            model_type=model_type
+            model_type=model_type,
+            # Counted from upload, so time spent waiting in the broker counts against it
+            deadline_at=Deadline(DEFAULT_JOB_DEADLINE_SECONDS).expires_at
         )
         logger.info(f"Enqueued document processing task for job {job_id}")
     except Exception as e:
@@ -111,10 +116,19 @@ async def analyze_document_async(
 
 
 @router.get("/jobs/{job_id}", response_model=JobStatusResponse)
-async def get_job_status(job_id: str):
+async def get_job_status(
+    job_id: str,
+    response: Response,
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS),
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Get job status and progress.
     
+    Supports conditional GET (ETag / If-None-Match -> 304) and long polling:
+    with ``wait`` and a current If-None-Match, the request is held until the
+    job changes or ``wait`` seconds pass.
+    
     Example:
         GET /api/v1/jobs/550e8400-e29b-41d4-a716-446655440000
         Response: {
@@ -126,13 +140,29 @@ async def get_job_status(job_id: str):
             "error": null
         }
     """
-    if job_id not in job_manager.jobs:
+    job_state = job_manager.get_job(job_id)
+    if job_state is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Job {job_id} not found"
         )
     
-    job_state = job_manager.jobs[job_id]
+    etag = job_state_etag(job_state)
+    if etag_matches(if_none_match, etag):
+        if wait > 0:
+            async def read_job():
+                return job_manager.get_job(job_id)
+            
+            job_state = await wait_for_change(
+                job_id, etag, read_job, job_state_etag, wait, events=job_manager.events
+            )
+        else:
+            job_state = None
+        if job_state is None:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        etag = job_state_etag(job_state)
+    response.headers["ETag"] = etag
+    
     job_progress = job_state.to_progress()
     
     return JobStatusResponse(
@@ -0,0 +1,81 @@
+"""
+Conditional GET and long-poll helpers for job status endpoints.
+
+Job status endpoints tag each response with a weak ETag computed from the
+job's state fields (never from the serialized body, so a 304 costs no
+serialization). A client that sends the ETag back in If-None-Match gets
+``304 Not Modified`` while the job is unchanged; with ``wait=<seconds>`` the
+request is held until the job changes or the wait runs out. Waiting is
+driven by the job event bus: the request sleeps on its subscription and
+re-reads the job only when an event arrives, plus a coarse re-check (every
+WAIT_RECHECK_SECONDS) for changes made by processes that do not share the
+bus.
+"""
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from ...core.job_events import JobEventBus, get_job_event_bus
+
+# Longest wait a client may ask for, and how often a waiting request re-reads the job anyway
+MAX_WAIT_SECONDS = 60
+WAIT_RECHECK_SECONDS = 5.0
+
+T = TypeVar("T")
+
+
+def job_etag(*state: Any) -> str:
+    """Weak ETag over the job fields that make up a status response."""
+    digest = hashlib.sha1("|".join(str(part) for part in state).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def job_state_etag(job_state) -> str:
+    """ETag of a JobManager JobState."""
+    return job_etag(job_state.job_id, job_state.status.value, job_state.current_stage, job_state.progress,
+                    job_state.result_id, job_state.error, job_state.updated_at)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value matches ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    bare = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+async def wait_for_change(
+    job_id: str,
+    etag: str,
+    read: Callable[[], Awaitable[Optional[T]]],
+    etag_of: Callable[[T], str],
+    wait: float,
+    events: Optional[JobEventBus] = None
+) -> Optional[T]:
+    """
+    Hold until the job's ETag differs from ``etag`` or ``wait`` seconds pass.
+
+    ``read`` loads the job (None if it disappeared). Returns the changed job,
+    or None if it was still unchanged at the deadline. ``events`` is the bus
+    the job's changes are published on (default: the process-wide bus).
+    """
+    deadline = time.monotonic() + min(wait, MAX_WAIT_SECONDS)
+    events = events if events is not None else get_job_event_bus()
+    async with events.subscribe(job_id) as subscription:
+        # Re-read once after subscribing: a change between the caller's read and now is not lost
+        while True:
+            job = await read()
+            if job is None or etag_of(job) != etag:
+                return job
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            await subscription.get(timeout=min(remaining, WAIT_RECHECK_SECONDS))
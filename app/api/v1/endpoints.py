@@ -10,6 +10,7 @@ This module:
 Main endpoints:
 - POST /analyze: Upload document for analysis (returns job_id)
 - GET /jobs/{job_id}: Get job status and progress
+- POST /jobs/{job_id}/cancel: Cancel a queued or running job
 - GET /results/{result_id}: Retrieve structured extraction results
 - POST /results/{id}/corrections: Submit corrections for active learning
 
@@ -19,13 +20,23 @@ import os
 import json
 import hashlib
 import logging
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Query, Depends
+from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks, Query, Depends, Header, Request
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 import uuid
 
 from ...db import get_db
+from ...core.schemas.trusted import ValidatedModel
 from ...core.job_service import JobService
+from ...core.admission import AdmissionQueueFull, get_admission_controller
+from ...core.cancellation import cancel_running
+from ...core.job_manager import job_manager
+from ...core.content_store import get_content_store
+from ...core.cost_estimator import job_features
+from ...core.deadline import DEFAULT_JOB_DEADLINE_SECONDS, Deadline
+from .schemas import validated_response
+from .conditional import MAX_WAIT_SECONDS, etag_matches, job_etag, wait_for_change
 from ...metrics.metrics import get_metrics_collector
 from sqlalchemy.orm import Session
 
@@ -59,13 +70,13 @@ class JobResponse(BaseModel):
 class JobStatus(BaseModel):
     """Job status response with progress tracking"""
     job_id: str
-    status: str  # queued, processing, completed, failed
+    status: str  # queued, processing, completed, failed, cancelled
     progress: int = Field(ge=0, le=100)
     stage: Optional[str] = None
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
-class ResultResponse(BaseModel):
+class ResultResponse(ValidatedModel):
     """Final result response"""
     result_id: str
     job_id: str
@@ -84,6 +95,23 @@ MIN_UPLOAD_BYTES = 100  # Minimum file size (100 bytes)
 ALLOWED_TYPES = {"application/pdf", "image/png", "image/jpeg", "image/jpg", "image/tiff"}
 ALLOWED_EXTENSIONS = {".pdf", ".png", ".jpg", ".jpeg", ".tiff", ".tif"}
 
+
+def _tenant_tier(request: Request, db: Session, tenant_id: Optional[str]) -> Optional[str]:
+    """Plan tier of the calling tenant, used for fair scheduling (None without a tenant)."""
+    if not tenant_id:
+        return None
+    tenant_info = getattr(request.state, "tenant_info", None) or {}
+    if tenant_info.get("subscription_tier"):
+        return tenant_info["subscription_tier"]
+    from ...db.saas_models import Tenant
+    try:
+        tenant = db.get(Tenant, tenant_id)
+    except Exception as e:
+        logger.warning(f"Could not look up plan tier of tenant {tenant_id}: {e}")
+        return None
+    return tenant.subscription_tier if tenant else None
+
+
 # --- Core Endpoints ---
 
 @router.get("/health")
@@ -97,13 +125,19 @@ async def get_health_status():
 
 @router.post("/analyze", response_model=JobResponse)
 async def analyze_document(
-    background_tasks: BackgroundTasks,
+    request: Request,
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
     """
     Analyzes an uploaded document using the AI pipeline (OCR + Semantic Parsing).
     Returns job_id and poll_url for async processing.
+    
+    Jobs go through the admission queue; when it is full the request is
+    rejected with 429 and a Retry-After header before a job is created.
+    A document analysed before (by upload or email ingestion, same pipeline
+    and model versions) is answered from the content store: the job is
+    created already completed.
     """
     try:
         # Validate filename
@@ -166,6 +200,51 @@ async def analyze_document(
                 detail="Failed to process file. Please try again."
             )
         
+        # The tenant lets tenant-wide webhook subscriptions find the job; the
+        # deadline (counted from upload, so it includes the queue wait) is
+        # carried through processing
+        tenant_id = getattr(request.state, "tenant_id", None)
+        job_metadata = {"deadline_at": Deadline(DEFAULT_JOB_DEADLINE_SECONDS).expires_at}
+        if tenant_id:
+            job_metadata["tenant_id"] = tenant_id
+        
+        # Documents analysed before are answered from the content store, without queueing
+        store = get_content_store()
+        cached = store.get(checksum) if store else None
+        if cached is not None:
+            job_service = JobService(db)
+            job = job_service.create_job(
+                filename=file.filename,
+                file_content=contents,
+                file_size=file_size,
+                checksum=checksum,
+                source_type="upload",
+                metadata=job_metadata
+            )
+            job_service.create_result(
+                job_id=job.id,
+                data=cached.get("data", {}),
+                validation=cached.get("validation"),
+                models_used=cached.get("metadata", {}).get("models_used"),
+                raw_ocr_output=cached.get("raw_ocr_output")
+            )
+            metrics.record_job_submitted("analyze")
+            metrics.record_job_completed("analyze", "reused")
+            return JobResponse(job_id=job.id, poll_url=f"/api/v1/jobs/{job.id}", status="completed")
+        
+        # Reserve a place in the tenant's admission queue before creating the job;
+        # the document's features let the queue run short documents first
+        try:
+            reservation = get_admission_controller().reserve(
+                tenant_id, _tenant_tier(request, db, tenant_id), job_features(contents, file.filename)
+            )
+        except AdmissionQueueFull as e:
+            raise HTTPException(
+                status_code=429,
+                detail="Too many documents are being processed. Please retry later.",
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        
         # Create job in database
         job_service = JobService(db)
         try:
@@ -174,10 +253,12 @@ async def analyze_document(
                 file_content=contents,
                 file_size=file_size,
                 checksum=checksum,
-                source_type="upload"
+                source_type="upload",
+                metadata=job_metadata
             )
             job_id = job.id
         except Exception as e:
+            reservation.cancel()
             logger.error(f"Error creating job: {str(e)}", exc_info=True)
             raise HTTPException(
                 status_code=500,
@@ -189,8 +270,10 @@ async def analyze_document(
         
         # Queue background processing
         try:
-            background_tasks.add_task(process_job, job_id, contents, file.filename, "analyze")
+            reservation.key = job_id
+            reservation.submit(process_job, job_id, contents, file.filename, "analyze")
         except Exception as e:
+            reservation.cancel()
             logger.error(f"Error queueing background task: {str(e)}")
             # Mark job as failed
             job_service.update_job_status(job_id, status="failed", error=str(e))
@@ -470,9 +553,25 @@ async def compare_models(
             detail="An unexpected error occurred while processing your request."
         )
 
+def _job_status_etag(job) -> str:
+    return job_etag(job.id, job.status, job.progress, job.stage, job.error, job.updated_at)
+
+
 @router.get("/jobs/{job_id}", response_model=JobStatus)
-async def get_job_status_endpoint(job_id: str, db: Session = Depends(get_db)):
-    """Retrieves the current status and result of a background job."""
+async def get_job_status_endpoint(
+    job_id: str,
+    response: Response,
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS, description="Seconds to hold the request until the job changes"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieves the current status and result of a background job.
+    
+    Responses carry an ETag. If-None-Match with the current ETag returns 304
+    without building the body; adding ``wait`` holds the request until the
+    job changes (200 with the new status) or the wait runs out (304).
+    """
     try:
         # Validate job_id format (basic UUID validation)
         try:
@@ -493,6 +592,27 @@ async def get_job_status_endpoint(job_id: str, db: Session = Depends(get_db)):
                 detail=f"Job with ID {job_id} not found. It may have expired or never existed."
             )
         
+        etag = _job_status_etag(job)
+        if etag_matches(if_none_match, etag):
+            if wait > 0:
+                # Don't hold a pooled connection while waiting
+                db.close()
+                
+                async def read_job():
+                    try:
+                        return job_service.get_job(job_id)
+                    finally:
+                        # Ends the read: the next one loads the row afresh instead of the identity map copy
+                        db.close()
+                
+                job = await wait_for_change(job_id, etag, read_job, _job_status_etag, wait)
+            else:
+                job = None
+            if job is None:
+                return Response(status_code=304, headers={"ETag": etag})
+            etag = _job_status_etag(job)
+        response.headers["ETag"] = etag
+        
         # Get result if job is completed
         result = None
         if job.status == "completed":
@@ -521,6 +641,62 @@ async def get_job_status_endpoint(job_id: str, db: Session = Depends(get_db)):
             detail="An error occurred while retrieving job status."
         )
 
+@router.post("/jobs/{job_id}/cancel", response_model=JobStatus)
+async def cancel_job_endpoint(job_id: str, db: Session = Depends(get_db)):
+    """
+    Cancels a job that has not finished.
+    
+    A queued job is taken out of the admission queue and never runs. A
+    running job is stopped: OCR/VLM calls in flight are aborted, the stages
+    left are skipped and its worker slot goes to the next job. Jobs tracked
+    by the job manager (Celery stage pipeline) are cancelled in the job
+    store, where their stages look for it. Finished jobs answer 409.
+    """
+    try:
+        uuid.UUID(job_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid job ID format: {job_id}")
+    
+    job_service = JobService(db)
+    job = job_service.get_job(job_id)
+    if not job and job_id in job_manager.jobs:
+        if not job_manager.mark_cancelled(job_id):
+            raise HTTPException(status_code=409, detail=f"Job {job_id} is already finished")
+        cancel_running(job_id)
+        metrics.record_job_cancelled("processing")
+        state = job_manager.get_job(job_id)
+        return JobStatus(
+            job_id=job_id,
+            status=state.status.value,
+            progress=state.progress,
+            stage=state.current_stage.value if state.current_stage else None,
+            error=state.error["message"]
+        )
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job with ID {job_id} not found. It may have expired or never existed."
+        )
+    if job.status in ("completed", "failed", "cancelled"):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is already {job.status}")
+    
+    # Marked first, so a worker picking the job up right now sees it
+    job = job_service.update_job_status(job_id, status="cancelled", error="Job cancelled by client")
+    if get_admission_controller().cancel(job_id):
+        metrics.record_job_cancelled("queued")
+    else:
+        cancel_running(job_id)
+        metrics.record_job_cancelled("processing")
+    logger.info(f"Job {job_id} cancelled by client")
+    
+    return JobStatus(
+        job_id=job.id,
+        status=job.status,
+        progress=int(job.progress or "0"),
+        stage=job.stage,
+        error=job.error
+    )
+
 @router.get("/results/{result_id}", response_model=ResultResponse)
 async def get_result(result_id: str, db: Session = Depends(get_db)):
     """Retrieves the final result of a completed job."""
@@ -560,15 +736,16 @@ async def get_result(result_id: str, db: Session = Depends(get_db)):
                 output_formats.append("markdown")
             metadata.update(result_obj.data.get("metadata", {}))
         
-        return ResultResponse(
-            result_id=result_obj.id,
-            job_id=result_obj.job_id,
-            data=result_obj.data,
-            validation=result_obj.validation or {"is_valid": True},
-            metadata=metadata,
-            markdown_output=markdown_output,
-            output_formats=output_formats
-        )
+        # Stored results were validated when they were written
+        return validated_response(ResultResponse.trusted({
+            "result_id": result_obj.id,
+            "job_id": result_obj.job_id,
+            "data": result_obj.data,
+            "validation": result_obj.validation or {"is_valid": True},
+            "metadata": metadata,
+            "markdown_output": markdown_output,
+            "output_formats": output_formats,
+        }))
     except HTTPException:
         raise
     except Exception as e:
@@ -579,7 +756,7 @@ async def get_result(result_id: str, db: Session = Depends(get_db)):
         )
 
 @router.get("/results/{result_id}/download")
-async def download_result(result_id: str, format: str = "json"):
+async def download_result(result_id: str, format: str = "json", db: Session = Depends(get_db)):
     """
     Download result in specified format (json or markdown).
     Returns the structured output in the requested format for easy export.
@@ -603,17 +780,8 @@ async def download_result(result_id: str, format: str = "json"):
                 detail=f"Unsupported format: {format}. Supported formats: json, markdown"
             )
         
-        # Find the job with this result
-        result_data = None
-        for job_id, job_data in JOB_STATUS.items():
-            try:
-                result = job_data.get("result")
-                if result and result.get("document_id") == result_id:
-                    result_data = result
-                    break
-            except Exception as e:
-                logger.warning(f"Error processing job {job_id} for download: {str(e)}")
-                continue
+        # Result registry lookup, falling back to the database
+        result_data = JobService(db).get_result_record(result_id)
         
         if not result_data:
             raise HTTPException(
@@ -623,7 +791,7 @@ async def download_result(result_id: str, format: str = "json"):
         
         # Generate file content based on format
         if format == "json":
-            json_data = result_data.get("data", {})
+            json_data = result_data.get("data") or {}
             content = json.dumps(json_data, indent=2, ensure_ascii=False)
             return Response(
                 content=content,
@@ -633,16 +801,16 @@ async def download_result(result_id: str, format: str = "json"):
                 }
             )
         elif format == "markdown":
-            markdown_content = result_data.get("markdown_output", "")
+            markdown_content = result_data.get("markdown_output") or ""
             if not markdown_content:
                 # Fallback: generate markdown from JSON data if not available
                 from app.core.post_processing import FinancialDocumentPostProcessor
                 post_processor = FinancialDocumentPostProcessor()
                 structured_data = {
                     "success": True,
-                    "data": result_data.get("data", {}),
-                    "validation": result_data.get("validation", {}),
-                    "metadata": result_data.get("metadata", {})
+                    "data": result_data.get("data") or {},
+                    "validation": result_data.get("validation") or {},
+                    "metadata": result_data.get("metadata") or {}
                 }
                 markdown_content = post_processor.generate_markdown(structured_data)
             
@@ -663,7 +831,7 @@ async def download_result(result_id: str, format: str = "json"):
         )
 
 @router.post("/results/{result_id}/corrections")
-async def submit_corrections(result_id: str, corrections: Dict[str, Any]):
+async def submit_corrections(result_id: str, corrections: Dict[str, Any], db: Session = Depends(get_db)):
     """
     Accepts human corrections for active learning.
     Stores correction data for future model training.
@@ -693,23 +861,15 @@ async def submit_corrections(result_id: str, corrections: Dict[str, Any]):
                 detail="Corrections cannot be empty"
             )
         
-        # Find the job with this result
-        job_id = None
-        for jid, job_data in JOB_STATUS.items():
-            try:
-                result = job_data.get("result")
-                if result and result.get("document_id") == result_id:
-                    job_id = jid
-                    break
-            except Exception as e:
-                logger.warning(f"Error processing job {jid} for corrections: {str(e)}")
-                continue
+        # Find the job with this result (result registry, falling back to the database)
+        result_data = JobService(db).get_result_record(result_id)
         
-        if not job_id:
+        if not result_data:
             raise HTTPException(
                 status_code=404,
                 detail=f"Result with ID {result_id} not found. Please ensure the job is completed."
             )
+        job_id = result_data["job_id"]
         
         # Log to active learning file
         try:
@@ -717,8 +877,8 @@ async def submit_corrections(result_id: str, corrections: Dict[str, Any]):
                 "job_id": job_id,
                 "result_id": result_id,
                 "model_version": "PaddleOCR-VL-0.9B",
-                "ocr_payload": JOB_STATUS[job_id].get("result", {}).get("raw_ocr_output", {}),
-                "model_output": JOB_STATUS[job_id].get("result", {}).get("data", {}),
+                "ocr_payload": result_data.get("raw_ocr_output") or {},
+                "model_output": result_data.get("data") or {},
                 "user_correction": corrections,
                 "timestamp": datetime.datetime.utcnow().isoformat(),
             }
@@ -10,31 +10,34 @@ from datetime import datetime
 from typing import List, Dict, Any, Optional
 from fastapi import (
     APIRouter, UploadFile, File, HTTPException, BackgroundTasks,
-    Query, Form, Depends
+    Query, Form, Depends, Header, Response
 )
 from fastapi.responses import StreamingResponse, JSONResponse
 from fastapi.websockets import WebSocket
+import asyncio
+
+logger = logging.getLogger(__name__)
+
 try:
     from sse_starlette.sse import EventSourceResponse
     SSE_AVAILABLE = True
 except ImportError:
     SSE_AVAILABLE = False
     logger.warning("sse-starlette not available. SSE streaming disabled.")
-import asyncio
 
 from .schemas import (
     AnalyzeRequest, CompareRequest, JobResponse, JobStatusResponse,
-    ResultResponse, CompareResponse, StreamEvent, JobStage
+    ResultResponse, CompareResponse, StreamEvent, JobStage, JobStatus, validated_response
 )
-from ..core.job_manager import job_manager, JobState
+from ...core.job_manager import job_manager, JobState
+from .conditional import MAX_WAIT_SECONDS, etag_matches, job_state_etag, wait_for_change
 from ...core.worker import process_job
-from ..core.etl.adapters import ETLAdapterFactory
-from ..core.preprocessing import DocumentPreprocessor
-from ..core.document_processor import FinancialDocumentProcessor
-from ..core.result_storage import result_storage
-from ..config.settings import load_config
+from ...core.etl.adapters import ETLAdapterFactory
+from ...core.preprocessing import DocumentPreprocessor
+from ...core.document_processor import FinancialDocumentProcessor
+from ...core.result_storage import result_storage
+from ...config.settings import load_config
 
-logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Configuration
@@ -275,18 +278,39 @@ async def _process_files_async(
 # ============================================================================
 
 @router.get("/jobs/{job_id}", response_model=JobStatusResponse)
-async def get_job_status(job_id: str):
-    """Get job status with progress and logs."""
+async def get_job_status(
+    job_id: str,
+    response: Response,
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Get job status with progress and logs (ETag / If-None-Match and ``wait`` long polling)."""
     try:
         uuid.UUID(job_id)  # Validate UUID format
     except ValueError:
         raise HTTPException(status_code=400, detail=f"Invalid job ID format: {job_id}")
     
-    progress = job_manager.get_job_progress(job_id)
-    if not progress:
+    job = job_manager.get_job(job_id)
+    if not job:
         raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
     
-    return progress
+    etag = job_state_etag(job)
+    if etag_matches(if_none_match, etag):
+        if wait > 0:
+            async def read_job():
+                return job_manager.get_job(job_id)
+            
+            job = await wait_for_change(
+                job_id, etag, read_job, job_state_etag, wait, events=job_manager.events
+            )
+        else:
+            job = None
+        if job is None:
+            return Response(status_code=304, headers={"ETag": etag})
+        etag = job_state_etag(job)
+    response.headers["ETag"] = etag
+    
+    return job.to_progress()
 
 
 # ============================================================================
@@ -305,7 +329,8 @@ async def get_result(result_id: str):
     if not result:
         raise HTTPException(status_code=404, detail=f"Result {result_id} not found")
     
-    return result
+    # Validated when read from storage; send it without another pass against response_model
+    return validated_response(result)
 
 
 # ============================================================================
@@ -416,100 +441,121 @@ async def _process_comparison_async(
 # Streaming Endpoints
 # ============================================================================
 
+# Closing event sent to streaming clients once a job reaches a final status
+_FINAL_EVENTS = {
+    JobStatus.COMPLETED.value: "complete",
+    JobStatus.FAILED.value: "error",
+    JobStatus.CANCELLED.value: "cancelled",
+}
+
+
+def _stream_event(job_id: str, event: Dict[str, Any]) -> StreamEvent:
+    """Progress message sent to streaming clients for a job event."""
+    return StreamEvent(
+        job_id=job_id,
+        step=JobStage(event["step"]) if event.get("step") else JobStage.RECEIVED,
+        progress=event["progress"],
+        message=f"Progress: {event['progress']}%"
+    )
+
+
+def _final_payload(job_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+    """Full job progress for the closing message (the event itself if the job lives on another replica)."""
+    progress = job_manager.get_job_progress(job_id)
+    return progress.model_dump(mode="json") if progress else event
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
 @router.get("/stream/jobs/{job_id}")
 async def stream_job_progress(job_id: str):
-    """SSE endpoint for streaming job progress."""
+    """SSE endpoint for streaming job progress (pushed from the job event bus)."""
     if not SSE_AVAILABLE:
         raise HTTPException(status_code=501, detail="SSE streaming not available. Install sse-starlette.")
     
     async def event_generator():
         """Generate SSE events for job progress."""
-        last_progress = -1
-        last_stage = None
-        
-        while True:
-            progress = job_manager.get_job_progress(job_id)
-            
-            if not progress:
+        # Subscribe before reading the current state so no change is missed in between
+        async with job_manager.events.subscribe(job_id) as subscription:
+            job = job_manager.get_job(job_id)
+            if job is None:
                 yield {
                     "event": "error",
                     "data": json.dumps({"error": "Job not found"})
                 }
-                break
+                return
             
-            # Emit event on progress change
-            if progress.progress != last_progress or progress.current_step != last_stage:
-                event = StreamEvent(
-                    job_id=job_id,
-                    step=progress.current_step or JobStage.RECEIVED,
-                    progress=progress.progress,
-                    message=f"Progress: {progress.progress}%"
-                )
+            event = job.to_event()
+            last = None
+            while True:
+                # Emit event on progress change
+                if (event["progress"], event["step"]) != last:
+                    yield {
+                        "event": "progress",
+                        "data": _stream_event(job_id, event).model_dump_json()
+                    }
+                    last = (event["progress"], event["step"])
                 
-                yield {
-                    "event": "progress",
-                    "data": event.model_dump_json()
-                }
+                # Check if completed, failed or cancelled
+                if event["status"] in _FINAL_EVENTS:
+                    yield {
+                        "event": _FINAL_EVENTS[event["status"]],
+                        "data": json.dumps(_final_payload(job_id, event), default=str)
+                    }
+                    return
                 
-                last_progress = progress.progress
-                last_stage = progress.current_step
-            
-            # Check if completed or failed
-            if progress.status.value in ["completed", "failed"]:
-                yield {
-                    "event": "complete" if progress.status.value == "completed" else "error",
-                    "data": progress.model_dump_json()
-                }
-                break
-            
-            await asyncio.sleep(1)  # Poll every second
+                event = await subscription.get()
     
     return EventSourceResponse(event_generator())
 
 
 @router.websocket("/ws/jobs/{job_id}")
 async def websocket_job_progress(websocket: WebSocket, job_id: str):
-    """WebSocket endpoint for streaming job progress."""
+    """WebSocket endpoint for streaming job progress (pushed from the job event bus)."""
     await websocket.accept()
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(websocket))
     
     try:
-        last_progress = -1
-        last_stage = None
-        
-        while True:
-            progress = job_manager.get_job_progress(job_id)
-            
-            if not progress:
+        async with job_manager.events.subscribe(job_id) as subscription:
+            job = job_manager.get_job(job_id)
+            if job is None:
                 await websocket.send_json({"error": "Job not found"})
-                break
+                await websocket.close()
+                return
             
-            # Send update on change
-            if progress.progress != last_progress or progress.current_step != last_stage:
-                event = StreamEvent(
-                    job_id=job_id,
-                    step=progress.current_step or JobStage.RECEIVED,
-                    progress=progress.progress,
-                    message=f"Progress: {progress.progress}%"
-                )
+            event = job.to_event()
+            last = None
+            while True:
+                # Send update on change
+                if (event["progress"], event["step"]) != last:
+                    await websocket.send_json(_stream_event(job_id, event).model_dump(mode="json"))
+                    last = (event["progress"], event["step"])
                 
-                await websocket.send_json(event.model_dump())
+                # Check if completed, failed or cancelled
+                if event["status"] in _FINAL_EVENTS:
+                    await websocket.send_json({
+                        "event": _FINAL_EVENTS[event["status"]],
+                        "data": _final_payload(job_id, event)
+                    })
+                    await websocket.close()
+                    return
                 
-                last_progress = progress.progress
-                last_stage = progress.current_step
-            
-            # Check if completed
-            if progress.status.value in ["completed", "failed"]:
-                await websocket.send_json({
-                    "event": "complete" if progress.status.value == "completed" else "error",
-                    "data": progress.model_dump()
-                })
-                break
-            
-            await asyncio.sleep(1)
+                next_event = asyncio.ensure_future(subscription.get())
+                await asyncio.wait({next_event, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if not next_event.done():
+                    # Client went away while the job was idle
+                    next_event.cancel()
+                    return
+                event = next_event.result()
             
     except Exception as e:
         logger.error(f"WebSocket error for job {job_id}: {str(e)}")
         await websocket.close()
+    finally:
+        disconnected.cancel()
 
 
 # ============================================================================
@@ -2,11 +2,25 @@
 Strict Pydantic schemas for API contracts.
 Implements canonical result schema with versioning and lineage.
 """
+from fastapi.responses import Response
 from pydantic import BaseModel, Field, HttpUrl
 from typing import List, Dict, Any, Optional, Literal
 from datetime import datetime
 from enum import Enum
 
+from ...core.schemas.trusted import TrustedModel, ValidatedModel
+
+
+def validated_response(model: ValidatedModel) -> Response:
+    """
+    JSON response for a validated model.
+
+    Returning the model itself would make FastAPI dump and revalidate it
+    against response_model; the marker says that already happened.
+    """
+    model = type(model).ensure(model)
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
 
 # ============================================================================
 # Job Lifecycle & Progress Models
@@ -33,6 +47,7 @@ class JobStatus(str, Enum):
     PROCESSING = "processing"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
 
 
 class StageInfo(BaseModel):
@@ -115,7 +130,7 @@ class JobStatusResponse(BaseModel):
 # Result Schema with Versioning & Lineage
 # ============================================================================
 
-class ModelInfo(BaseModel):
+class ModelInfo(TrustedModel):
     """Information about a model used in processing."""
     name: str
     version: str
@@ -123,7 +138,7 @@ class ModelInfo(BaseModel):
     latency_ms: Optional[int] = None
 
 
-class Provenance(BaseModel):
+class Provenance(TrustedModel):
     """Provenance information for extracted data."""
     source_type: str  # multipart, s3, imap, local
     source_id: Optional[str] = None
@@ -134,7 +149,7 @@ class Provenance(BaseModel):
     tags: Optional[List[str]] = None
 
 
-class FieldExtraction(BaseModel):
+class FieldExtraction(TrustedModel):
     """Extracted field with confidence and provenance."""
     field_name: str
     value: Any
@@ -145,7 +160,7 @@ class FieldExtraction(BaseModel):
     page: Optional[int] = None
 
 
-class FinancialSummary(BaseModel):
+class FinancialSummary(TrustedModel):
     """Financial summary from document."""
     subtotal: Optional[float] = None
     tax: Optional[float] = None
@@ -155,7 +170,7 @@ class FinancialSummary(BaseModel):
     line_items_count: Optional[int] = None
 
 
-class ValidationResult(BaseModel):
+class ValidationResult(TrustedModel):
     """Validation results."""
     is_valid: bool
     math_ok: bool
@@ -165,7 +180,7 @@ class ValidationResult(BaseModel):
     needs_review: bool = False
 
 
-class ResultResponse(BaseModel):
+class ResultResponse(ValidatedModel):
     """Structured result response with schema versioning."""
     schema_version: str = Field(default="1.0")
     result_id: str
@@ -0,0 +1,153 @@
+"""
+Webhook subscription endpoints.
+
+- POST /webhooks: subscribe a URL to one of the caller's jobs (job_id) or to
+  every job of the caller's tenant; the signing secret is returned once, in
+  this response only
+- GET /webhooks: list the caller's subscriptions (without secrets)
+- DELETE /webhooks/{subscription_id}: unsubscribe
+- GET /webhooks/dead-letters: the caller's deliveries that exhausted their retries
+- POST /webhooks/dead-letters/{delivery_id}/retry: redeliver one of them
+
+The tenant is always the one the API key identifies (request.state);
+subscriptions and their dead-lettered deliveries are visible to, and
+removable or redeliverable by, that tenant only. URLs that
+point at internal addresses are rejected. Payloads are signed as described
+in app.core.webhooks.
+"""
+import logging
+import secrets
+from typing import List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from ...core.job_manager import job_manager
+from ...core.webhooks import JOB_EVENTS, WebhookDestinationError, check_destination_url, get_webhook_dispatcher
+from ...db import get_db
+from ...db.models import Job, WebhookSubscription
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["webhooks"])
+
+
+class WebhookSubscriptionCreate(BaseModel):
+    url: str = Field(..., description="HTTPS endpoint that receives the payloads")
+    job_id: Optional[str] = Field(None, description="One of the caller's jobs; every job of the tenant if omitted")
+    events: Optional[List[str]] = Field(None, description=f"Subset of {', '.join(JOB_EVENTS)}; all if omitted")
+    secret: Optional[str] = Field(None, description="Signing secret; generated if omitted")
+
+
+class WebhookSubscriptionResponse(BaseModel):
+    id: str
+    url: str
+    job_id: Optional[str] = None
+    tenant_id: Optional[str] = None
+    events: Optional[List[str]] = None
+    secret: Optional[str] = None
+
+
+def _to_response(subscription: WebhookSubscription, include_secret: bool = False) -> WebhookSubscriptionResponse:
+    return WebhookSubscriptionResponse(
+        id=subscription.id,
+        url=subscription.url,
+        job_id=subscription.job_id,
+        tenant_id=subscription.tenant_id,
+        events=subscription.events,
+        secret=subscription.secret if include_secret else None
+    )
+
+
+def _caller_tenant(request: Request) -> Optional[str]:
+    return getattr(request.state, "tenant_id", None)
+
+
+def _job_tenant(job_id: str, db: Session) -> Tuple[bool, Optional[str]]:
+    """(found, tenant_id) of a job in the database or the job store."""
+    job = db.get(Job, job_id)
+    if job is not None:
+        return True, (job.job_metadata or {}).get("tenant_id")
+    job_state = job_manager.get_job(job_id)
+    if job_state is not None:
+        return True, (job_state.metadata or {}).get("tenant_id")
+    return False, None
+
+
+def _owned_by(query, tenant_id: Optional[str]):
+    owner = WebhookSubscription.owner_tenant_id
+    return query.filter(owner == tenant_id if tenant_id else owner.is_(None))
+
+
+@router.post("/webhooks", response_model=WebhookSubscriptionResponse, status_code=201)
+async def create_webhook(body: WebhookSubscriptionCreate, request: Request, db: Session = Depends(get_db)):
+    """Subscribe a URL to job completion events."""
+    try:
+        check_destination_url(body.url)
+    except WebhookDestinationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    unknown = set(body.events or ()) - set(JOB_EVENTS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown events: {', '.join(sorted(unknown))}")
+    tenant_id = _caller_tenant(request)
+    if body.job_id:
+        found, job_tenant = _job_tenant(body.job_id, db)
+        if not found or job_tenant != tenant_id:
+            raise HTTPException(status_code=404, detail=f"Job {body.job_id} not found")
+    elif not tenant_id:
+        raise HTTPException(status_code=400, detail="A webhook needs a job_id or an API key identifying the tenant")
+
+    subscription = WebhookSubscription(
+        url=body.url,
+        secret=body.secret or secrets.token_hex(32),
+        job_id=body.job_id,
+        tenant_id=None if body.job_id else tenant_id,
+        owner_tenant_id=tenant_id,
+        events=body.events
+    )
+    db.add(subscription)
+    db.commit()
+    db.refresh(subscription)
+    logger.info(f"Created webhook subscription {subscription.id} for "
+                f"{'job ' + body.job_id if body.job_id else 'tenant ' + tenant_id}")
+    return _to_response(subscription, include_secret=True)
+
+
+@router.get("/webhooks", response_model=List[WebhookSubscriptionResponse])
+async def list_webhooks(request: Request, job_id: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    """List the caller's active subscriptions, optionally for one job."""
+    query = _owned_by(db.query(WebhookSubscription), _caller_tenant(request))
+    query = query.filter(WebhookSubscription.is_active == "true")
+    if job_id:
+        query = query.filter(WebhookSubscription.job_id == job_id)
+    return [_to_response(subscription) for subscription in query.all()]
+
+
+@router.delete("/webhooks/{subscription_id}")
+async def delete_webhook(subscription_id: str, request: Request, db: Session = Depends(get_db)):
+    """Remove one of the caller's subscriptions; deliveries already queued still go out."""
+    query = _owned_by(db.query(WebhookSubscription), _caller_tenant(request))
+    subscription = query.filter(WebhookSubscription.id == subscription_id).first()
+    if subscription is None:
+        raise HTTPException(status_code=404, detail="Webhook subscription not found")
+    db.delete(subscription)
+    db.commit()
+    return {"deleted": subscription_id}
+
+
+@router.get("/webhooks/dead-letters")
+async def list_dead_letters(request: Request):
+    """The caller's deliveries that failed every attempt."""
+    tenant_id = _caller_tenant(request)
+    return [delivery.to_dict(include_secret=False) for delivery in get_webhook_dispatcher().dead_letters()
+            if delivery.owner_tenant_id == tenant_id]
+
+
+@router.post("/webhooks/dead-letters/{delivery_id}/retry", status_code=202)
+async def retry_dead_letter(delivery_id: str, request: Request):
+    """Queue one of the caller's dead-lettered deliveries again."""
+    dispatcher = get_webhook_dispatcher()
+    delivery = dispatcher.dead_letter(delivery_id)
+    if delivery is None or delivery.owner_tenant_id != _caller_tenant(request) or not dispatcher.redeliver(delivery_id):
+        raise HTTPException(status_code=404, detail="Dead-lettered delivery not found")
+    return {"delivery_id": delivery_id, "status": "queued"}
@@ -35,7 +35,9 @@ def load_config() -> Dict[str, Any]:
             "check_arithmetic": True,
             "validate_dates": True,
             "min_confidence_threshold": float(os.getenv("MIN_CONFIDENCE", "0.7")),
-            "arithmetic_tolerance": float(os.getenv("ARITHMETIC_TOLERANCE", "0.01"))
+            "arithmetic_tolerance": float(os.getenv("ARITHMETIC_TOLERANCE", "0.01")),
+            "duplicate_detection": os.getenv("DUPLICATE_DETECTION", "false").lower() == "true",
+            "duplicate_index_path": os.getenv("DUPLICATE_INDEX_PATH", "/tmp/finscribe_metadata/duplicate_index.db")
         },
         "storage": {
             "upload_dir": os.getenv("UPLOAD_DIR", "/tmp/finscribe_uploads"),
@@ -45,5 +47,9 @@ def load_config() -> Dict[str, Any]:
         "active_learning": {
             "enabled": os.getenv("ACTIVE_LEARNING_ENABLED", "true").lower() == "true",
             "file_path": os.getenv("ACTIVE_LEARNING_FILE", "data/active_learning.jsonl")
+        },
+        "worker": {
+            "fast_lane_enabled": os.getenv("FAST_LANE_ENABLED", "true").lower() == "true",
+            "fast_lane_max_kb": int(os.getenv("FAST_LANE_MAX_KB", "512"))
         }
     }
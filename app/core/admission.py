@@ -0,0 +1,299 @@
+"""
+Admission control for background jobs run inside the API process.
+
+FastAPI BackgroundTasks start every accepted upload immediately, so a burst
+of uploads turns into unbounded concurrent OCR work in the web server.
+AdmissionController puts a bounded queue in front of a fixed pool of job
+threads:
+
+- at most ``max_concurrent`` jobs run at once (ADMISSION_MAX_CONCURRENT,
+  defaults to WORKER_CONCURRENCY so job threads match the worker runtime);
+- at most ``max_queue`` further jobs wait (ADMISSION_MAX_QUEUE, default 32),
+  and one tenant holds at most ``tenant_queue_share`` of those places
+  (ADMISSION_TENANT_QUEUE_SHARE, default 0.5);
+- beyond that reserve() raises AdmissionQueueFull carrying a Retry-After
+  estimate, which the API turns into a 429.
+
+Requests reserve a place before any work is done for them (job row, storage)
+and submit the job once it exists; a reservation that is not submitted must
+be cancelled. Waiting jobs are held in a FairQueue, which orders them fairly
+between tenants and by expected processing time (CostEstimator) within one.
+Queue depth, running jobs, wait time and rejections are exported as
+Prometheus metrics.
+"""
+import logging
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .cost_estimator import CostEstimator, JobFeatures, get_cost_estimator
+from .fair_queue import ANONYMOUS_TENANT, FairQueue
+from ..metrics.metrics import get_metrics_collector
+
+logger = logging.getLogger(__name__)
+metrics = get_metrics_collector()
+
+DEFAULT_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", os.getenv("WORKER_CONCURRENCY", "4")))
+DEFAULT_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+DEFAULT_TENANT_QUEUE_SHARE = float(os.getenv("ADMISSION_TENANT_QUEUE_SHARE", "0.5"))
+# Shortest expected job first within a tenant, forgiving AGING_RATE seconds of cost per second waited
+DEFAULT_SHORTEST_FIRST = os.getenv("ADMISSION_SHORTEST_FIRST", "true").lower() == "true"
+DEFAULT_AGING_RATE = float(os.getenv("ADMISSION_AGING_RATE", "0.5"))
+
+# Retry-After bounds (seconds) and the service time assumed before any job finished
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 120
+INITIAL_SERVICE_SECONDS = 5.0
+# Weight of the latest job in the moving average of service time
+SERVICE_TIME_ALPHA = 0.2
+
+
+class AdmissionQueueFull(Exception):
+    """Raised when the admission queue has no room; ``retry_after`` is in seconds."""
+
+    def __init__(self, retry_after: int, queue_depth: int):
+        super().__init__(f"Job queue is full ({queue_depth} waiting), retry after {retry_after}s")
+        self.retry_after = retry_after
+        self.queue_depth = queue_depth
+
+
+class Reservation:
+    """A place in the admission queue held for one job."""
+
+    def __init__(self, controller: "AdmissionController", tenant_id: Optional[str] = None,
+                 tier: Optional[str] = None, features: Optional[JobFeatures] = None):
+        self._controller = controller
+        self.tenant_id = tenant_id
+        self.tier = tier
+        self.features = features
+        self.key: Optional[str] = None  # set before submit() to make the job cancellable by key
+        self._open = True
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """Queue ``fn(*args, **kwargs)`` in the reserved place."""
+        if not self._open:
+            raise RuntimeError("Reservation already used")
+        self._open = False
+        self._controller._enqueue(self, fn, args, kwargs)
+
+    def cancel(self) -> None:
+        """Give the place back without running anything (no-op after submit)."""
+        if self._open:
+            self._open = False
+            self._controller._release_reservation(self.tenant_id)
+
+
+class AdmissionController:
+    """Bounded, per-tenant fair queue in front of a fixed number of job threads."""
+
+    def __init__(
+        self,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        name: str = "analyze",
+        queue: Optional[FairQueue] = None,
+        tenant_queue_share: float = DEFAULT_TENANT_QUEUE_SHARE,
+        estimator: Optional[CostEstimator] = None
+    ):
+        if max_concurrent < 1 or max_queue < 0:
+            raise ValueError("max_concurrent must be >= 1 and max_queue >= 0")
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.name = name
+        self.tenant_queue_limit = max(1, int(max_queue * tenant_queue_share))
+        self._cond = threading.Condition()
+        # Items are (fn, args, kwargs, enqueued_at, features, expected_seconds, key)
+        if queue is None:
+            queue = FairQueue(shortest_first=DEFAULT_SHORTEST_FIRST, aging_rate=DEFAULT_AGING_RATE)
+        self._queue = queue
+        self.estimator = estimator if estimator is not None else get_cost_estimator()
+        self._reserved = 0
+        self._tenant_reserved: Dict[str, int] = {}
+        self._running = 0
+        self._running_keys: set = set()
+        self._cancelled_keys: set = set()  # running jobs cancelled by key
+        self._service_seconds = INITIAL_SERVICE_SECONDS
+        self._stopping = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"admission-{name}-{n}", daemon=True)
+            for n in range(max_concurrent)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting for a thread, including reserved places not submitted yet."""
+        with self._cond:
+            return len(self._queue) + self._reserved
+
+    @property
+    def running(self) -> int:
+        with self._cond:
+            return self._running
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "queue_depth": len(self._queue) + self._reserved,
+                "running": self._running,
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "avg_service_seconds": round(self._service_seconds, 3),
+            }
+
+    def retry_after(self) -> int:
+        """Seconds until the jobs waiting now are likely to have started."""
+        with self._cond:
+            return self._retry_after_locked()
+
+    def _retry_after_locked(self) -> int:
+        waiting = len(self._queue) + self._reserved
+        estimate = (waiting + 1) / self.max_concurrent * self._service_seconds
+        return int(min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, math.ceil(estimate))))
+
+    def tenant_depth(self, tenant_id: Optional[str]) -> int:
+        """Jobs of ``tenant_id`` waiting, including its reserved places."""
+        with self._cond:
+            return self._tenant_depth_locked(tenant_id or ANONYMOUS_TENANT)
+
+    def _tenant_depth_locked(self, tenant: str) -> int:
+        return self._queue.depth(tenant) + self._tenant_reserved.get(tenant, 0)
+
+    def reserve(self, tenant_id: Optional[str] = None, tier: Optional[str] = None,
+                features: Optional[JobFeatures] = None) -> Reservation:
+        """
+        Reserve a queue place for a job of ``tenant_id`` (plan ``tier``), or raise AdmissionQueueFull.
+
+        ``features`` describe the document, for ordering by expected processing time.
+        """
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError(f"Admission controller {self.name} is shut down")
+            depth = len(self._queue) + self._reserved
+            tenant = tenant_id or ANONYMOUS_TENANT
+            # Jobs that find a free thread start right away; the rest need a queue place
+            full = self._running + depth >= self.max_concurrent + self.max_queue
+            if not full and tenant_id and self._running + depth >= self.max_concurrent:
+                full = self._tenant_depth_locked(tenant) >= self.tenant_queue_limit
+            if full:
+                retry_after = self._retry_after_locked()
+                metrics.record_admission_rejected(self.name)
+                logger.warning(f"Admission queue {self.name} full ({depth} waiting) for tenant {tenant}, rejecting job")
+                raise AdmissionQueueFull(retry_after, depth)
+            self._reserved += 1
+            self._tenant_reserved[tenant] = self._tenant_reserved.get(tenant, 0) + 1
+            self._publish_locked(tenant)
+        return Reservation(self, tenant_id, tier, features)
+
+    def _unreserve_locked(self, tenant: str) -> None:
+        self._reserved -= 1
+        self._tenant_reserved[tenant] -= 1
+        if not self._tenant_reserved[tenant]:
+            del self._tenant_reserved[tenant]
+
+    def _release_reservation(self, tenant_id: Optional[str]) -> None:
+        tenant = tenant_id or ANONYMOUS_TENANT
+        with self._cond:
+            self._unreserve_locked(tenant)
+            self._publish_locked(tenant)
+
+    def _enqueue(self, reservation: Reservation, fn: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> None:
+        tenant = reservation.tenant_id or ANONYMOUS_TENANT
+        features = reservation.features
+        expected = self.estimator.predict(features)
+        with self._cond:
+            self._unreserve_locked(tenant)
+            if self._stopping:
+                # The job threads exit once the queue drains; a job queued now might never run
+                self._publish_locked(tenant)
+                raise RuntimeError(f"Admission controller {self.name} is shut down")
+            self._queue.push(tenant, (fn, args, kwargs, time.monotonic(), features, expected, reservation.key),
+                             tier=reservation.tier, cost=expected)
+            self._publish_locked(tenant)
+            self._cond.notify()
+
+    def cancel(self, key: str) -> bool:
+        """
+        Drop the queued job submitted under ``key``; False if there is none.
+
+        A job with that key that is running already is left running (the
+        caller stops it) but will not calibrate the estimator.
+        """
+        with self._cond:
+            removed = self._queue.remove(lambda item: item[6] == key)
+            for tenant, _ in removed:
+                self._publish_locked(tenant)
+            if not removed and key in self._running_keys:
+                self._cancelled_keys.add(key)
+        if removed:
+            logger.info(f"Cancelled queued job {key} in {self.name} queue")
+        return bool(removed)
+
+    def _publish_locked(self, tenant: Optional[str] = None) -> None:
+        metrics.update_queue_size(f"admission_{self.name}", len(self._queue) + self._reserved)
+        metrics.update_admission_running(self.name, self._running)
+        if tenant is not None:
+            metrics.update_tenant_queue_depth(self.name, tenant, self._tenant_depth_locked(tenant))
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    entry = self._queue.pop()
+                    if entry is not None or (self._stopping and not len(self._queue)):
+                        break
+                    # Nothing queued, or every queued tenant is at its concurrency cap
+                    self._cond.wait()
+                if entry is None:
+                    return
+                tenant, (fn, args, kwargs, enqueued_at, features, expected, key) = entry
+                self._running += 1
+                if key is not None:
+                    self._running_keys.add(key)
+                self._publish_locked(tenant)
+            started = time.monotonic()
+            metrics.record_admission_wait(self.name, started - enqueued_at)
+            metrics.record_tenant_wait(self.name, tenant, started - enqueued_at)
+            try:
+                fn(*args, **kwargs)
+                with self._cond:
+                    cancelled = key in self._cancelled_keys
+                if not cancelled:
+                    self.estimator.observe(features, time.monotonic() - started, expected)
+            except Exception as e:
+                logger.error(f"Admitted job failed in {self.name} queue: {str(e)}", exc_info=True)
+            finally:
+                elapsed = time.monotonic() - started
+                with self._cond:
+                    self._running -= 1
+                    self._running_keys.discard(key)
+                    self._cancelled_keys.discard(key)
+                    self._queue.done(tenant)
+                    self._service_seconds += SERVICE_TIME_ALPHA * (elapsed - self._service_seconds)
+                    self._publish_locked(tenant)
+                    # A tenant that was at its cap may have an eligible job now
+                    self._cond.notify_all()
+
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting jobs, run the ones already queued, and join the job threads."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Process-wide controller for /analyze jobs, created on first use."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController()
+        return _controller
@@ -0,0 +1,173 @@
+"""
+Cooperative cancellation of running jobs.
+
+POST /api/v1/jobs/{job_id}/cancel takes a job that is still queued out of
+the admission queue, so it never runs. A job that is already running has a
+CancellationToken, registered under its id (token_for()) while the worker
+runs it. Cancelling the token:
+
+- cancels the asyncio tasks running the job's pipeline (run_cancellable()),
+  which aborts an in-flight OCR or VLM HTTP call at once rather than when
+  it returns; the pipeline sees JobCancelled instead of a result;
+- makes check_cancelled() raise JobCancelled, so stages that are not
+  awaiting anything (post-processing, validation, storing the result) are
+  skipped as well.
+
+The job thread then returns right away, which frees its admission slot for
+the next job. Tokens are per process. Celery stages run in other processes,
+so the cancel is recorded in the job store (JobManager.mark_cancelled), and
+run_cancellable() polls the store while a stage runs (``poll``).
+"""
+import asyncio
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of an external cancel flag (run_cancellable ``poll``)
+CANCEL_POLL_SECONDS = float(os.getenv("CANCEL_POLL_SECONDS", "0.5"))
+
+
+class JobCancelled(Exception):
+    """Raised in a job's pipeline once the job has been cancelled."""
+
+    def __init__(self, job_id: Optional[str] = None, stage: Optional[str] = None):
+        super().__init__(f"Job {job_id} cancelled" + (f" before {stage}" if stage else ""))
+        self.job_id = job_id
+        self.stage = stage
+
+
+class CancellationToken:
+    """Cancel flag of one job, plus the asyncio tasks to interrupt when it is set."""
+
+    def __init__(self, job_id: Optional[str] = None):
+        self.job_id = job_id
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._tasks: List[Tuple[asyncio.AbstractEventLoop, asyncio.Task]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> bool:
+        """Set the flag and interrupt the attached tasks; False if it was set already."""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self._event.set()
+            tasks = list(self._tasks)
+        for loop, task in tasks:
+            loop.call_soon_threadsafe(task.cancel)
+        logger.info(f"Job {self.job_id} cancelled ({len(tasks)} running task(s) interrupted)")
+        return True
+
+    def raise_if_cancelled(self, stage: Optional[str] = None) -> None:
+        if self._event.is_set():
+            raise JobCancelled(self.job_id, stage)
+
+    def _attach(self, task: asyncio.Task) -> None:
+        with self._lock:
+            self._tasks.append((task.get_loop(), task))
+            cancelled = self._event.is_set()
+        if cancelled:
+            task.cancel()
+
+    def _detach(self, task: asyncio.Task) -> None:
+        with self._lock:
+            self._tasks = [(loop, t) for loop, t in self._tasks if t is not task]
+
+
+_current: ContextVar[Optional[CancellationToken]] = ContextVar("finscribe_cancellation", default=None)
+_tokens: Dict[str, CancellationToken] = {}
+_tokens_lock = threading.Lock()
+
+
+def current_token() -> Optional[CancellationToken]:
+    return _current.get()
+
+
+@contextmanager
+def cancellation_scope(token: Optional[CancellationToken]) -> Iterator[Optional[CancellationToken]]:
+    """Make ``token`` the current cancellation token for the code in the block."""
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+def check_cancelled(stage: Optional[str] = None) -> None:
+    """Raise JobCancelled if the current job has been cancelled (no-op without a token)."""
+    token = _current.get()
+    if token is not None:
+        token.raise_if_cancelled(stage)
+
+
+async def _watch(token: CancellationToken, poll: Callable[[], bool], interval: float) -> None:
+    while not token.cancelled:
+        await asyncio.sleep(interval)
+        try:
+            if poll():
+                token.cancel()
+        except Exception as e:
+            logger.warning(f"Cancellation check for job {token.job_id} failed: {str(e)}")
+
+
+async def run_cancellable(
+    token: Optional[CancellationToken],
+    awaitable: Awaitable[Any],
+    poll: Optional[Callable[[], bool]] = None,
+    interval: float = CANCEL_POLL_SECONDS
+) -> Any:
+    """
+    Await ``awaitable`` so that cancelling ``token`` interrupts it with JobCancelled.
+
+    ``poll`` is called every ``interval`` seconds and cancels the token when
+    it returns True (for cancels recorded by another process).
+    """
+    if token is None:
+        return await awaitable
+    task = asyncio.current_task()
+    watcher = asyncio.ensure_future(_watch(token, poll, interval)) if poll is not None else None
+    token._attach(task)
+    try:
+        with cancellation_scope(token):
+            return await awaitable
+    except asyncio.CancelledError:
+        if not token.cancelled:
+            raise
+        # The cancel is handled here; don't leave it pending on the task (3.11+,
+        # earlier versions keep no cancel count)
+        if hasattr(task, "uncancel"):
+            task.uncancel()
+        raise JobCancelled(token.job_id)
+    finally:
+        token._detach(task)
+        if watcher is not None:
+            watcher.cancel()
+
+
+def token_for(job_id: str) -> CancellationToken:
+    """The token of a job running in this process, registered until release_token()."""
+    with _tokens_lock:
+        token = _tokens.get(job_id)
+        if token is None:
+            token = _tokens[job_id] = CancellationToken(job_id)
+        return token
+
+
+def release_token(job_id: str) -> None:
+    with _tokens_lock:
+        _tokens.pop(job_id, None)
+
+
+def cancel_running(job_id: str) -> bool:
+    """Cancel a job running in this process; False if it is not running here."""
+    with _tokens_lock:
+        token = _tokens.get(job_id)
+    return token.cancel() if token is not None else False
@@ -5,6 +5,9 @@ from celery import Celery
 # Redis broker URL
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+# Seconds between claim check sweeps (celery beat)
+CLAIM_SWEEP_SECONDS = int(os.getenv("CLAIM_CHECK_SWEEP_SECONDS", "3600"))
+
 # Create Celery app
 celery_app = Celery(
     "finscribe",
@@ -39,6 +42,10 @@ celery_app.conf.update(
     task_default_queue="cpu",
     task_default_exchange="tasks",
     task_default_routing_key="default",
+    beat_schedule={
+        # Frees claim-checked payloads of jobs that died mid-pipeline
+        "sweep-claims": {"task": "sweep_claims", "schedule": float(CLAIM_SWEEP_SECONDS)},
+    },
 )
 
 
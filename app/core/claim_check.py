@@ -0,0 +1,203 @@
+"""
+Claim-check storage for large Celery task payloads.
+
+Task arguments travel through the broker as JSON, so document bytes (and the
+OCR/parse context built up by the pipeline stages) would sit base64-encoded
+in Redis for every hop. ClaimCheck keeps only a small reference in the
+message instead:
+
+- payloads larger than ``threshold`` bytes (CLAIM_CHECK_THRESHOLD_BYTES,
+  default 256) are written to the configured storage backend under
+  ``claims/<sha256>/data`` and replaced by
+  ``{"__claim__": <sha256>, "kind": "bytes" | "json", "size": n}``;
+- identical payloads share one stored object (content addressing);
+- fetch() resolves a reference on the worker that needs the payload, and
+  passes anything that is not a reference through unchanged.
+
+Stored objects are reference counted per holder (normally the job id): each
+check_in() writes a holder marker next to the object, release() removes it
+and deletes the object once no holder is left. Deletion fails closed: if the
+holders can't be listed the object stays, and if a holder checks the same
+content in while it is being deleted the object is written back. Markers
+carry their creation time, and sweep() (the ``sweep_claims`` beat task, every
+CLAIM_CHECK_SWEEP_SECONDS) drops markers older than CLAIM_CHECK_TTL_SECONDS
+(default one day) so that claims of jobs that died mid-pipeline are
+eventually freed.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from kombu.utils.json import dumps, loads
+
+from ..storage import get_storage
+from ..storage.base import StorageInterface
+
+logger = logging.getLogger(__name__)
+
+CLAIM_PREFIX = "claims/"
+DEFAULT_THRESHOLD = int(os.getenv("CLAIM_CHECK_THRESHOLD_BYTES", "256"))
+DEFAULT_TTL_SECONDS = int(os.getenv("CLAIM_CHECK_TTL_SECONDS", "86400"))
+
+
+def is_claim(value: Any) -> bool:
+    """True if ``value`` is a claim reference produced by ClaimCheck.check_in."""
+    return isinstance(value, dict) and "__claim__" in value
+
+
+class ClaimCheck:
+    """Content-addressed, reference-counted payload store on a StorageInterface."""
+
+    def __init__(
+        self,
+        storage: Optional[StorageInterface] = None,
+        threshold: int = DEFAULT_THRESHOLD,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS
+    ):
+        self._storage = storage
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+
+    @property
+    def storage(self) -> StorageInterface:
+        if self._storage is None:
+            self._storage = get_storage()
+        return self._storage
+
+    @staticmethod
+    def _data_key(digest: str) -> str:
+        return f"{CLAIM_PREFIX}{digest}/data"
+
+    @staticmethod
+    def _holders_prefix(digest: str) -> str:
+        return f"{CLAIM_PREFIX}{digest}/holders/"
+
+    def check_in(self, payload: Any, holder: str) -> Any:
+        """
+        Store ``payload`` if it is over the threshold and return a reference to it.
+
+        Bytes are stored as-is; anything else is serialized with the same JSON
+        encoder the broker uses (so nested bytes and datetimes survive).
+        Payloads at or under the threshold are returned unchanged.
+        """
+        if is_claim(payload):
+            self.hold(payload, holder)
+            return payload
+        if isinstance(payload, (bytes, bytearray)):
+            kind, content = "bytes", bytes(payload)
+        else:
+            kind, content = "json", dumps(payload).encode("utf-8")
+        if len(content) <= self.threshold:
+            return payload
+
+        digest = hashlib.sha256(content).hexdigest()
+        reference = {"__claim__": digest, "kind": kind, "size": len(content)}
+        # Marker first, then the object: a concurrent release() of the last
+        # other holder then either sees this marker and keeps the object, or
+        # sees it after deleting and writes the object back
+        self.hold(reference, holder)
+        self.storage.put_bytes(self._data_key(digest), content)
+        logger.debug(f"Checked in {len(content)} byte {kind} claim {digest[:12]} for {holder}")
+        return reference
+
+    def hold(self, reference: Dict[str, Any], holder: str) -> None:
+        """Add ``holder`` to the holders of an already stored claim."""
+        key = self._holders_prefix(reference["__claim__"]) + holder
+        self.storage.put_bytes(key, str(time.time()).encode("utf-8"))
+
+    def fetch(self, value: Any) -> Any:
+        """Resolve a claim reference to its payload; other values are returned as-is."""
+        if not is_claim(value):
+            return value
+        digest = value["__claim__"]
+        content = self.storage.get_bytes(self._data_key(digest))
+        if content is None:
+            raise KeyError(f"Claim {digest} is not in storage (released or expired)")
+        if value.get("kind") == "bytes":
+            return content
+        return loads(content.decode("utf-8"))
+
+    def release(self, value: Any, holder: str) -> bool:
+        """
+        Drop ``holder``'s hold on a claim; delete the object when nobody holds it.
+
+        Returns True if the stored object was deleted. Non-reference values
+        are ignored. If the remaining holders can't be listed, the object is
+        kept (sweep() frees it later).
+        """
+        if not is_claim(value):
+            return False
+        digest = value["__claim__"]
+        self.storage.delete(self._holders_prefix(digest) + holder)
+        deleted = self._delete_unheld(digest)
+        if deleted:
+            logger.debug(f"Released last hold on claim {digest[:12]}")
+        return deleted
+
+    def _held(self, digest: str) -> bool:
+        """True if the claim has a holder, or if that can't be told (fail closed)."""
+        try:
+            return bool(self.storage.list_prefix(self._holders_prefix(digest)))
+        except Exception as e:
+            logger.warning(f"Could not list holders of claim {digest[:12]}, keeping it: {e}")
+            return True
+
+    def _delete_unheld(self, digest: str) -> bool:
+        """Delete a claim's object if nobody holds it; put it back if a holder showed up meanwhile."""
+        if self._held(digest):
+            return False
+        key = self._data_key(digest)
+        content = self.storage.get_bytes(key)
+        if content is None or not self.storage.delete(key):
+            return False
+        if self._held(digest):
+            # Checked in again between the listing and the delete
+            self.storage.put_bytes(key, content)
+            logger.info(f"Claim {digest[:12]} was checked in while being released; kept it")
+            return False
+        return True
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Expire holder markers older than the TTL and delete unheld objects; returns objects deleted."""
+        now = time.time() if now is None else now
+        holders: Dict[str, int] = {}
+        data_keys = []
+        for key in self.storage.list_prefix(CLAIM_PREFIX):
+            parts = key[len(CLAIM_PREFIX):].split("/")
+            if len(parts) == 2 and parts[1] == "data":
+                data_keys.append((parts[0], key))
+            elif len(parts) == 3 and parts[1] == "holders":
+                holders.setdefault(parts[0], 0)
+                stamp = self.storage.get_bytes(key)
+                try:
+                    expired = stamp is None or now - float(stamp) > self.ttl_seconds
+                except ValueError:
+                    expired = True
+                if expired:
+                    self.storage.delete(key)
+                else:
+                    holders[parts[0]] += 1
+
+        deleted = 0
+        for digest, key in data_keys:
+            if not holders.get(digest) and self._delete_unheld(digest):
+                deleted += 1
+        if deleted:
+            logger.info(f"Claim sweep deleted {deleted} unheld payloads")
+        return deleted
+
+
+_claim_check: Optional[ClaimCheck] = None
+_claim_check_lock = threading.Lock()
+
+
+def get_claim_check() -> ClaimCheck:
+    """Process-wide ClaimCheck on the configured storage backend."""
+    global _claim_check
+    with _claim_check_lock:
+        if _claim_check is None:
+            _claim_check = ClaimCheck()
+        return _claim_check
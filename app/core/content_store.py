@@ -0,0 +1,157 @@
+"""
+Content-addressed store of processing results shared by the API and ETL paths.
+
+The same document often arrives twice, e.g. by email (IMAPAdapter through
+ETLPipeline) and as a manual upload to /api/v1/analyze. Both paths check
+ContentStore before doing any work and fill it afterwards:
+
+- ``ocr`` records hold the raw PaddleOCR-VL output of a document. Every
+  path that runs OCR (FinancialDocumentProcessor.run_ocr, used by the API
+  worker and the Celery stage tasks, and ETLPipeline) reuses them;
+- ``analysis`` records hold the complete /analyze result, so an upload of
+  a document that was analysed before is answered without queueing a job.
+
+Keys are ``content/<kind>/<pipeline version>/<model fingerprint>/<sha256>.json``.
+The pipeline version (CONTENT_STORE_PIPELINE_VERSION) is bumped when the
+processing code changes, and the model fingerprint is derived from the
+model configuration the kind depends on (model mode, OCR model, and for
+``analysis`` also the VLM model), so upgrading a model makes old entries
+unreachable without any explicit invalidation. Records live in the
+configured storage backend (shared between processes and hosts) behind an
+in-process LRU of ``max_entries`` records, so repeated hits cost a dict
+lookup. Lookups are counted per kind and outcome in Prometheus.
+"""
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from ..config.settings import load_config
+from ..metrics.metrics import get_metrics_collector
+from ..storage import get_storage
+from ..storage.base import StorageInterface
+
+logger = logging.getLogger(__name__)
+metrics = get_metrics_collector()
+
+CONTENT_PREFIX = "content/"
+PIPELINE_VERSION = os.getenv("CONTENT_STORE_PIPELINE_VERSION", "1")
+DEFAULT_MAX_ENTRIES = int(os.getenv("CONTENT_STORE_MAX_ENTRIES", "1000"))
+CONTENT_STORE_ENABLED = os.getenv("CONTENT_STORE_ENABLED", "true").lower() == "true"
+
+OCR = "ocr"
+ANALYSIS = "analysis"
+
+# Configuration entries each kind of record depends on
+MODEL_SETTINGS = {
+    OCR: [("paddleocr_vl", "model_name")],
+    ANALYSIS: [("paddleocr_vl", "model_name"), ("ernie_vl", "model_name"), ("ernie_vl", "model_version")],
+}
+
+
+def model_version(config: Dict[str, Any], kind: str) -> str:
+    """Readable model version string of ``kind`` records under ``config``."""
+    parts = [config.get("model_mode", "mock")]
+    for section, name in MODEL_SETTINGS[kind]:
+        parts.append(str(config.get(section, {}).get(name, "")))
+    return "|".join(parts)
+
+
+def content_checksum(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class ContentStore:
+    """Versioned, content-addressed result records with an in-memory LRU in front of storage."""
+
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        storage: Optional[StorageInterface] = None,
+        pipeline_version: str = PIPELINE_VERSION,
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        config = config if config is not None else load_config()
+        self.pipeline_version = pipeline_version
+        self.max_entries = max_entries
+        self.model_versions = {kind: model_version(config, kind) for kind in MODEL_SETTINGS}
+        self._fingerprints = {
+            kind: hashlib.sha256(version.encode("utf-8")).hexdigest()[:16]
+            for kind, version in self.model_versions.items()
+        }
+        self._storage = storage
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def storage(self) -> StorageInterface:
+        if self._storage is None:
+            self._storage = get_storage()
+        return self._storage
+
+    def key(self, checksum: str, kind: str) -> str:
+        return f"{CONTENT_PREFIX}{kind}/{self.pipeline_version}/{self._fingerprints[kind]}/{checksum}.json"
+
+    def get(self, checksum: str, kind: str = ANALYSIS) -> Optional[Dict[str, Any]]:
+        """The ``kind`` record for a document checksum under the current versions, or None."""
+        key = self.key(checksum, kind)
+        with self._lock:
+            record = self._memory.get(key)
+            if record is not None:
+                self._memory.move_to_end(key)
+        if record is not None:
+            metrics.record_content_store_lookup(kind, "memory")
+            return record["value"]
+        try:
+            record = self.storage.get_json(key)
+        except Exception as e:
+            logger.warning(f"Content store lookup {key} failed: {str(e)}")
+            record = None
+        if record is None:
+            metrics.record_content_store_lookup(kind, "miss")
+            return None
+        self._remember(key, record)
+        metrics.record_content_store_lookup(kind, "storage")
+        return record["value"]
+
+    def put(self, checksum: str, value: Dict[str, Any], kind: str = ANALYSIS) -> None:
+        """Store ``value`` as the ``kind`` record of a document; failures are logged, not raised."""
+        key = self.key(checksum, kind)
+        record = {
+            "checksum": checksum,
+            "kind": kind,
+            "pipeline_version": self.pipeline_version,
+            "model_version": self.model_versions[kind],
+            "created_at": datetime.utcnow().isoformat(),
+            "value": value,
+        }
+        self._remember(key, record)
+        try:
+            self.storage.put_json(key, record)
+        except Exception as e:
+            logger.warning(f"Failed to store content record {key}: {str(e)}")
+
+    def _remember(self, key: str, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._memory[key] = record
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+
+_store: Optional[ContentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_content_store() -> Optional[ContentStore]:
+    """Process-wide content store, or None when CONTENT_STORE_ENABLED is false."""
+    global _store
+    if not CONTENT_STORE_ENABLED:
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = ContentStore()
+        return _store
@@ -0,0 +1,185 @@
+"""
+Job deadlines carried through the processing pipeline.
+
+A job gets a Deadline when it is admitted (JOB_DEADLINE_SECONDS, default 900,
+covering queue wait and processing; stored in the job metadata as
+``deadline_at`` and in the Celery stage context), and the worker caps it at
+its processing timeout. While the job runs the deadline is the current
+deadline of its task (a contextvar, set with run_within() or
+deadline_scope()), so every layer can ask how much time is left:
+
+- backend clients cap each call's timeout at the remaining time
+  (call_timeout) and give up retrying when the backoff plus a typical call
+  no longer fits (backoff);
+- the pipeline skips optional stages (VLM enrichment, Markdown, duplicate
+  check, active learning) and refuses to start OCR when less than the stage
+  usually takes is left (within_budget, check_deadline).
+
+"Usually takes" is a moving average of measured stage and call durations
+(observe_stage), starting from STAGE_DEFAULT_SECONDS. Every skip is counted
+per stage in Prometheus together with the seconds of work it saved
+(the stage's expected duration).
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+from ..metrics.metrics import get_metrics_collector
+
+logger = logging.getLogger(__name__)
+metrics = get_metrics_collector()
+
+DEFAULT_JOB_DEADLINE_SECONDS = float(os.getenv("JOB_DEADLINE_SECONDS", "900"))
+# Calls with less time than this left are not started
+MIN_CALL_SECONDS = float(os.getenv("DEADLINE_MIN_CALL_SECONDS", "1.0"))
+
+# Expected durations before any were measured; stages not listed expect 1 s
+STAGE_DEFAULT_SECONDS = {
+    "ocr": 10.0,
+    "ocr_call": 10.0,
+    "vlm_enrichment": 20.0,
+    "vlm_call": 20.0,
+    "markdown": 0.5,
+    "duplicate_check": 0.2,
+    "active_learning": 0.2,
+    "combined_output": 1.0,
+}
+# Weight of the latest measurement in the moving averages
+STAGE_TIME_ALPHA = 0.2
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a stage or call does not fit in the time left for the job."""
+
+    def __init__(self, stage: str, remaining: float):
+        super().__init__(f"Job deadline too close to run {stage} ({remaining:.1f}s left)")
+        self.stage = stage
+        self.remaining = remaining
+
+
+class Deadline:
+    """
+    Point in (wall-clock) time by which a job should be finished.
+
+    Wall-clock time so the deadline means the same in every process a
+    job's stages run in.
+    """
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.expires_at = clock() + seconds
+
+    @classmethod
+    def at(cls, expires_at: float, clock: Callable[[], float] = time.time) -> "Deadline":
+        deadline = cls(0, clock)
+        deadline.expires_at = expires_at
+        return deadline
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self.clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def within(self, seconds: float) -> "Deadline":
+        """This deadline, or ``seconds`` from now if that is earlier."""
+        return Deadline.at(min(self.expires_at, self.clock() + seconds), self.clock)
+
+    def allows(self, seconds: float) -> bool:
+        return self.remaining() >= seconds
+
+
+_current: ContextVar[Optional[Deadline]] = ContextVar("finscribe_deadline", default=None)
+_expected: Dict[str, float] = dict(STAGE_DEFAULT_SECONDS)
+_expected_lock = threading.Lock()
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """Make ``deadline`` the current deadline for the code in the block."""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+async def run_within(deadline: Optional[Deadline], awaitable: Awaitable[Any]) -> Any:
+    """Await ``awaitable`` with ``deadline`` as the current deadline (use for coroutines run on another loop)."""
+    with deadline_scope(deadline):
+        return await awaitable
+
+
+def expected_seconds(stage: str) -> float:
+    with _expected_lock:
+        return _expected.get(stage, 1.0)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    """Feed a measured stage or call duration into its moving average."""
+    with _expected_lock:
+        current = _expected.get(stage, 1.0)
+        _expected[stage] = current + STAGE_TIME_ALPHA * (seconds - current)
+
+
+def _skip(stage: str, saved_seconds: float, remaining: float) -> None:
+    metrics.record_deadline_skip(stage, saved_seconds)
+    logger.warning(f"Skipping {stage}: {remaining:.1f}s left before the job deadline, "
+                   f"{saved_seconds:.1f}s of work saved")
+
+
+def within_budget(stage: str) -> bool:
+    """Whether an optional stage fits in the current deadline (always, without one); a skip is recorded."""
+    deadline = _current.get()
+    if deadline is None:
+        return True
+    expected = expected_seconds(stage)
+    if deadline.allows(expected):
+        return True
+    _skip(stage, expected, deadline.remaining())
+    return False
+
+
+def check_deadline(stage: str) -> None:
+    """Raise DeadlineExceeded (recording the skip) if a required stage does not fit in the current deadline."""
+    if not within_budget(stage):
+        raise DeadlineExceeded(stage, _current.get().remaining())
+
+
+def call_timeout(default: float, stage: str) -> float:
+    """Timeout for one backend call: ``default`` capped at the time left; DeadlineExceeded if too little is left."""
+    deadline = _current.get()
+    if deadline is None:
+        return default
+    remaining = deadline.remaining()
+    if remaining < MIN_CALL_SECONDS:
+        _skip(stage, expected_seconds(stage), remaining)
+        raise DeadlineExceeded(stage, remaining)
+    return min(default, remaining)
+
+
+async def backoff(seconds: float, stage: str) -> None:
+    """Sleep before a retry, unless the sleep plus a typical call would overrun the deadline."""
+    deadline = _current.get()
+    if deadline is not None and not deadline.allows(seconds + max(MIN_CALL_SECONDS, expected_seconds(stage))):
+        remaining = deadline.remaining()
+        _skip(f"{stage}_retry", seconds + expected_seconds(stage), remaining)
+        raise DeadlineExceeded(f"{stage} retry", remaining)
+    await asyncio.sleep(seconds)
+
+
+def job_deadline(metadata: Optional[Dict[str, Any]], cap_seconds: Optional[float] = None) -> Deadline:
+    """Deadline stored in a job's metadata (``deadline_at``), or a fresh one, capped ``cap_seconds`` from now."""
+    expires_at = (metadata or {}).get("deadline_at")
+    deadline = Deadline.at(float(expires_at)) if expires_at else Deadline(DEFAULT_JOB_DEADLINE_SECONDS)
+    return deadline.within(cap_seconds) if cap_seconds is not None else deadline
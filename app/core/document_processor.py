@@ -1,9 +1,10 @@
 import os
+import time
 import uuid
 import json
 import asyncio
 import aiofiles
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable, Optional
 from datetime import datetime
 from PIL import Image
 from io import BytesIO
@@ -12,6 +13,10 @@ import logging
 from .models.paddleocr_vl_service import PaddleOCRVLService
 from .models.ernie_vlm_service import ErnieVLMService
 from .validation.financial_validator import FinancialValidator
+from .validation.duplicate_index import DuplicateInvoiceIndex
+from .cancellation import JobCancelled, check_cancelled
+from .content_store import OCR, content_checksum, get_content_store
+from .deadline import DeadlineExceeded, check_deadline, observe_stage, within_budget
 # Import from the module file, not the package directory
 import sys
 import os
@@ -31,6 +36,31 @@ from finscribe.receipts.processor import ReceiptProcessor
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Called with (stage name, elapsed ms) each time a pipeline stage completes
+StageCallback = Callable[[str, float], None]
+
+
+class _StageClock:
+    """Wall-clock time per pipeline stage, reported to an optional callback and the deadline estimates."""
+
+    def __init__(self, on_stage: Optional[StageCallback] = None):
+        self.on_stage = on_stage
+        self.timings_ms: Dict[str, float] = {}
+        self._last = time.perf_counter()
+
+    def done(self, stage: str, observe: bool = True) -> None:
+        now = time.perf_counter()
+        elapsed_ms = round((now - self._last) * 1000, 3)
+        self._last = now
+        self.timings_ms[stage] = self.timings_ms.get(stage, 0.0) + elapsed_ms
+        if observe:
+            observe_stage(stage, elapsed_ms / 1000)
+        if self.on_stage is not None:
+            try:
+                self.on_stage(stage, elapsed_ms)
+            except Exception as e:
+                logger.warning(f"Stage callback failed for stage {stage}: {str(e)}")
+
 
 class FinancialDocumentProcessor:
     """
@@ -59,6 +89,16 @@ class FinancialDocumentProcessor:
             tolerance=self.config.get("validation", {}).get("arithmetic_tolerance", 0.01)
         )
         
+        # Duplicate-invoice index (checked and updated for every processed document)
+        validation_config = self.config.get("validation", {})
+        self.duplicate_index = None
+        if validation_config.get("duplicate_detection", False):
+            self.duplicate_index = DuplicateInvoiceIndex(
+                validation_config.get("duplicate_index_path", "/tmp/finscribe_metadata/duplicate_index.db"),
+                amount_tolerance=validation_config.get("duplicate_amount_tolerance", 0.01),
+                date_tolerance_days=validation_config.get("duplicate_date_tolerance_days", 3),
+            )
+        
         # Initialize post-processing intelligence layer (Phase 3)
         post_processing_config = self.config.get("post_processing", {})
         self.post_processor = FinancialDocumentPostProcessor(
@@ -82,13 +122,34 @@ class FinancialDocumentProcessor:
         al_config = self.config.get("active_learning", {})
         self.active_learning_enabled = al_config.get("enabled", True)
         self.active_learning_file = al_config.get("file_path", "./active_learning.jsonl")
+        
+        # OCR output shared with other processes and the ETL pipeline, by document checksum
+        self.content_store = get_content_store()
     
-    async def process_document(self, file_content: bytes, filename: str, model_type: str = "fine_tuned") -> Dict[str, Any]:
+    async def process_document(
+        self,
+        file_content: bytes,
+        filename: str,
+        model_type: str = "fine_tuned",
+        on_stage: Optional[StageCallback] = None,
+        fast_lane: bool = False
+    ) -> Dict[str, Any]:
         """
         Complete pipeline: Parse document layout and apply financial reasoning.
+        
+        Args:
+            file_content: Document file bytes
+            filename: Original filename
+            model_type: Model type to use ("fine_tuned" or "baseline")
+            on_stage: Optional callback invoked with (stage, elapsed_ms) as each stage completes
+            fast_lane: Skip non-essential stages (Markdown generation) for small documents
+        
+        Per-stage wall-clock times are returned in metadata["stage_timings_ms"].
+        The individual stages are also run as separate Celery tasks (app/core/tasks.py).
         """
         document_id = str(uuid.uuid4())
         start_time = datetime.utcnow()
+        clock = _StageClock(on_stage)
         
         logger.info(f"Processing document: {filename} (ID: {document_id})")
         
@@ -112,218 +173,67 @@ class FinancialDocumentProcessor:
         
         try:
             # Step 1: Parse document layout with PaddleOCR-VL
-            logger.info("Step 1: Running PaddleOCR-VL for document layout parsing...")
-            try:
-                ocr_results = await self.ocr_service.parse_document(file_content)
-                
-                # Validate OCR results
-                if not ocr_results or not isinstance(ocr_results, dict):
-                    raise ValueError("OCR service returned invalid results")
-                
-                if ocr_results.get("status") == "partial":
-                    logger.warning("OCR returned partial results - continuing with available data")
-                
-            except Exception as ocr_error:
-                logger.error(f"OCR processing failed: {str(ocr_error)}", exc_info=True)
-                raise Exception(f"OCR processing failed: {str(ocr_error)}")
+            ocr_results = await self.run_ocr(file_content)
+            clock.done("ocr", observe=False)  # run_ocr observes real OCR runs, not content store hits
             
             # Step 1.4: Detect if document is a receipt and process accordingly
             receipt_data = None
-            is_receipt = False
             if self.receipt_processing_enabled and ocr_results:
-                try:
-                    # Try to detect if this is a receipt
-                    receipt_result = self.receipt_processor.process_receipt_from_ocr(ocr_results)
-                    if receipt_result.get("success"):
-                        is_receipt = True
-                        receipt_data = receipt_result
-                        logger.info(f"Detected receipt type: {receipt_result.get('receipt_type', 'unknown')}")
-                except Exception as receipt_error:
-                    logger.debug(f"Receipt processing attempt failed (may not be a receipt): {str(receipt_error)}")
-                    # Not a receipt, continue with normal processing
+                receipt_data = self.detect_receipt(ocr_results)
+                clock.done("receipt_detection")
+            is_receipt = receipt_data is not None
             
             # Step 1.5: Apply post-processing intelligence (Phase 3) if enabled
             # Skip post-processing for receipts as they have specialized processing
             if self.post_processing_enabled and ocr_results and not is_receipt:
-                logger.info("Step 1.5: Applying post-processing intelligence layer...")
-                try:
-                    post_processed_data = self.post_processor.process_ocr_output(ocr_results)
-                    if post_processed_data.get("success"):
-                        logger.info("Post-processing completed successfully")
-                except Exception as pp_error:
-                    logger.warning(f"Post-processing failed (non-critical): {str(pp_error)}")
-                    # Continue with pipeline even if post-processing fails
+                post_processed_data = self.run_post_processing(ocr_results)
+                clock.done("post_processing")
             
             # Step 1.6: Generate combined JSON + Markdown output if post-processing succeeded
             markdown_output = None
-            if self.post_processing_enabled and post_processed_data and post_processed_data.get("success"):
-                try:
-                    markdown_output = self.post_processor.generate_markdown(post_processed_data)
-                    logger.info("Markdown output generated successfully")
-                except Exception as md_error:
-                    logger.warning(f"Markdown generation failed (non-critical): {str(md_error)}")
+            if self.post_processing_enabled and post_processed_data and post_processed_data.get("success") and not fast_lane \
+                    and within_budget("markdown"):
+                markdown_output = self.generate_markdown(post_processed_data)
+                clock.done("markdown")
             
             # Step 2: Enrich with ERNIE VLM for semantic understanding
             # For receipts, we can still use VLM but with receipt-specific structure
-            if is_receipt and receipt_data:
-                # For receipts, use the receipt data structure
-                enriched_data = {
-                    "structured_data": {
-                        "document_type": "receipt",
-                        "receipt_type": receipt_data.get("receipt_type", "unknown"),
-                        "merchant_info": receipt_data.get("data", {}).get("merchant_info", {}),
-                        "transaction_info": receipt_data.get("data", {}).get("transaction_info", {}),
-                        "line_items": receipt_data.get("data", {}).get("items", []),
-                        "financial_summary": {
-                            "subtotal": receipt_data.get("data", {}).get("totals", {}).get("subtotal", 0),
-                            "tax": receipt_data.get("data", {}).get("totals", {}).get("tax", 0),
-                            "discount": receipt_data.get("data", {}).get("totals", {}).get("discount", 0),
-                            "grand_total": receipt_data.get("data", {}).get("totals", {}).get("total", 0),
-                            "currency": "$"
-                        },
-                        "payment_info": receipt_data.get("data", {}).get("payment_info", {})
-                    },
-                    "status": "completed",
-                    "model_version": "ReceiptProcessor"
-                }
-                logger.info("Using receipt-specific processing pipeline")
+            if is_receipt:
+                enriched_data = self.receipt_enriched_data(receipt_data)
             else:
-                logger.info("Step 2: Enriching with ERNIE VLM for semantic reasoning...")
-                try:
-                    enriched_data = await self.vlm_service.enrich_financial_data(ocr_results, file_content)
-                    
-                    # Validate VLM results
-                    if not enriched_data or not isinstance(enriched_data, dict):
-                        raise ValueError("VLM service returned invalid results")
-                    
-                    if enriched_data.get("status") == "partial":
-                        logger.warning("VLM returned partial results - continuing with available data")
-                    
-                    # Ensure structured_data exists
-                    if "structured_data" not in enriched_data:
-                        enriched_data["structured_data"] = {}
-                        logger.warning("VLM results missing structured_data - using empty structure")
-                    
-                    # Merge post-processed data if available (post-processing can supplement VLM output)
-                    if post_processed_data and post_processed_data.get("success"):
-                        post_structured = post_processed_data.get("data", {})
-                        if post_structured:
-                            # Merge vendor data (post-processing takes precedence if VLM didn't extract it)
-                            if post_structured.get("vendor") and not enriched_data["structured_data"].get("vendor_block"):
-                                enriched_data["structured_data"]["vendor_block"] = post_structured["vendor"]
-                            # Merge client data
-                            if post_structured.get("client"):
-                                if not enriched_data["structured_data"].get("client_info"):
-                                    enriched_data["structured_data"]["client_info"] = post_structured["client"]
-                                else:
-                                    # Merge client fields that might be missing
-                                    client_info = enriched_data["structured_data"]["client_info"]
-                                    post_client = post_structured["client"]
-                                    if not client_info.get("invoice_number") and post_client.get("invoice_number"):
-                                        client_info["invoice_number"] = post_client["invoice_number"]
-                                    if not client_info.get("dates") and post_client.get("dates"):
-                                        client_info["dates"] = post_client["dates"]
-                            # Merge line items (post-processing can supplement)
-                            if post_structured.get("line_items") and not enriched_data["structured_data"].get("line_items"):
-                                enriched_data["structured_data"]["line_items"] = post_structured["line_items"]
-                            # Merge financial summary
-                            if post_structured.get("financial_summary"):
-                                if not enriched_data["structured_data"].get("financial_summary"):
-                                    enriched_data["structured_data"]["financial_summary"] = post_structured["financial_summary"]
-                                else:
-                                    # Merge financial fields
-                                    summary = enriched_data["structured_data"]["financial_summary"]
-                                    post_summary = post_structured["financial_summary"]
-                                    for key in ["subtotal", "grand_total", "currency", "payment_terms"]:
-                                        if not summary.get(key) and post_summary.get(key):
-                                            summary[key] = post_summary.get(key)
-                
-                except Exception as vlm_error:
-                    logger.error(f"VLM enrichment failed: {str(vlm_error)}", exc_info=True)
-                    # Try to continue with OCR results only if VLM fails
-                    logger.warning("Continuing with OCR results only after VLM failure")
-                    enriched_data = {
-                        "structured_data": {},
-                        "status": "partial",
-                        "error": f"VLM enrichment failed: {str(vlm_error)}"
-                    }
+                enriched_data = await self.enrich(ocr_results, file_content)
+                self.merge_post_processed(enriched_data, post_processed_data)
+                clock.done("vlm_enrichment", observe=not enriched_data.get("error"))
             
             # Step 3: Apply business rule validation
-            logger.info("Step 3: Applying business rule validation...")
-            try:
-                if is_receipt and receipt_data:
-                    # Use receipt-specific validation
-                    validation_results = receipt_data.get("validation", {
-                        "is_valid": True,
-                        "errors": [],
-                        "warnings": []
-                    })
-                else:
-                    # Use standard financial document validation
-                    validation_results = self.validator.validate(enriched_data)
-            except Exception as validation_error:
-                logger.error(f"Validation failed: {str(validation_error)}", exc_info=True)
-                # Create a default validation result if validation fails
-                validation_results = {
-                    "is_valid": False,
-                    "math_ok": False,
-                    "dates_ok": False,
-                    "issues": [f"Validation error: {str(validation_error)}"],
-                    "field_confidences": {},
-                    "needs_review": True
-                }
+            check_cancelled("validation")
+            validation_results = self.validate_enriched(enriched_data, receipt_data)
+            clock.done("validation")
             
-            # Build extracted fields for frontend compatibility
-            try:
-                extracted_fields = self._build_extracted_fields(enriched_data, model_type)
-            except Exception as field_error:
-                logger.error(f"Error building extracted fields: {str(field_error)}", exc_info=True)
-                extracted_fields = []
+            # Step 3.5: Duplicate-invoice check (non-critical)
+            if self.duplicate_index is not None and validation_results is not None \
+                    and within_budget("duplicate_check"):
+                self.check_duplicates(document_id, enriched_data, validation_results)
+                clock.done("duplicate_check")
             
             # Step 4: Log to active learning if enabled (non-blocking)
-            if self.active_learning_enabled and model_type == "fine_tuned":
+            if self.active_learning_enabled and model_type == "fine_tuned" and within_budget("active_learning"):
                 try:
                     await self._log_active_learning_data(
                         document_id, filename, enriched_data, validation_results
                     )
                 except Exception as al_error:
                     logger.warning(f"Failed to log active learning data (non-critical): {str(al_error)}")
+                clock.done("active_learning")
             
-            end_time = datetime.utcnow()
-            processing_time_ms = (end_time - start_time).total_seconds() * 1000
-            
-            return {
-                "success": True,
-                "document_id": document_id,
-                "status": "completed",
-                "extracted_data": extracted_fields,
-                "structured_output": enriched_data.get("structured_data", {}),
-                "validation": validation_results,
-                "raw_ocr_output": ocr_results or {},
-                "post_processed_data": post_processed_data if self.post_processing_enabled and not is_receipt else None,
-                "receipt_data": receipt_data if is_receipt else None,  # Include receipt-specific data
-                "markdown_output": markdown_output,  # Human-readable Markdown format
-                "metadata": {
-                    "source_file": filename,
-                    "processing_timestamp": start_time.isoformat(),
-                    "processing_time_ms": processing_time_ms,
-                    "document_type": "receipt" if is_receipt else "invoice",
-                    "receipt_type": receipt_data.get("receipt_type") if is_receipt else None,
-                    "model_versions": {
-                        "paddleocr_vl": ocr_results.get("model_version", "PaddleOCR-VL-0.9B") if ocr_results else "unknown",
-                        "ernie_vl": enriched_data.get("model_version", "ERNIE-5") if enriched_data else "unknown",
-                        "ernie_family": enriched_data.get("model_family", "unknown") if enriched_data else "unknown",
-                        "receipt_processor": "ReceiptProcessor" if is_receipt else None
-                    },
-                    "model_type": model_type,
-                    "partial_results": ocr_results.get("status") == "partial" or enriched_data.get("status") == "partial" if enriched_data else False,
-                    "post_processing_enabled": self.post_processing_enabled and not is_receipt,
-                    "receipt_processing_enabled": is_receipt,
-                    "output_formats": ["json", "markdown"] if markdown_output else ["json"]
-                },
-                "active_learning_ready": validation_results.get("needs_review", False) if validation_results else False
-            }
+            return self.build_result(
+                document_id, filename, model_type, start_time, ocr_results, enriched_data,
+                validation_results, post_processed_data, receipt_data, markdown_output,
+                stage_timings=clock.timings_ms, fast_lane=fast_lane
+            )
             
+        except JobCancelled:
+            raise
         except Exception as e:
             logger.error(f"Error processing document {filename} (ID: {document_id}): {str(e)}", exc_info=True)
             return {
@@ -338,6 +248,287 @@ class FinancialDocumentProcessor:
                 "partial_results": ocr_results is not None or enriched_data is not None
             }
     
+    # --- Pipeline stages (shared by process_document and the Celery stage tasks) ---
+    
+    async def run_ocr(self, file_content: bytes) -> Dict[str, Any]:
+        """Step 1: Parse document layout with PaddleOCR-VL (reused from the content store if done before)."""
+        checksum = content_checksum(file_content) if self.content_store else None
+        if checksum:
+            cached = self.content_store.get(checksum, OCR)
+            if cached is not None:
+                logger.info("Step 1: Reusing PaddleOCR-VL output from the content store")
+                return cached
+        check_cancelled("ocr")
+        check_deadline("ocr")
+        logger.info("Step 1: Running PaddleOCR-VL for document layout parsing...")
+        started = time.perf_counter()
+        try:
+            ocr_results = await self.ocr_service.parse_document(file_content)
+            
+            # Validate OCR results
+            if not ocr_results or not isinstance(ocr_results, dict):
+                raise ValueError("OCR service returned invalid results")
+            
+            if ocr_results.get("status") == "partial":
+                logger.warning("OCR returned partial results - continuing with available data")
+            
+        except (DeadlineExceeded, JobCancelled):
+            raise
+        except Exception as ocr_error:
+            logger.error(f"OCR processing failed: {str(ocr_error)}", exc_info=True)
+            raise Exception(f"OCR processing failed: {str(ocr_error)}")
+        observe_stage("ocr", time.perf_counter() - started)
+        if checksum and ocr_results.get("status") != "partial":
+            self.content_store.put(checksum, ocr_results, OCR)
+        return ocr_results
+    
+    def detect_receipt(self, ocr_results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Step 1.4: Receipt processing result if the document is a receipt, otherwise None."""
+        try:
+            # Try to detect if this is a receipt
+            receipt_result = self.receipt_processor.process_receipt_from_ocr(ocr_results)
+            if receipt_result.get("success"):
+                logger.info(f"Detected receipt type: {receipt_result.get('receipt_type', 'unknown')}")
+                return receipt_result
+        except Exception as receipt_error:
+            logger.debug(f"Receipt processing attempt failed (may not be a receipt): {str(receipt_error)}")
+            # Not a receipt, continue with normal processing
+        return None
+    
+    def run_post_processing(self, ocr_results: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Step 1.5: Post-processing intelligence layer (non-critical, None on failure)."""
+        logger.info("Step 1.5: Applying post-processing intelligence layer...")
+        try:
+            post_processed_data = self.post_processor.process_ocr_output(ocr_results)
+            if post_processed_data.get("success"):
+                logger.info("Post-processing completed successfully")
+            return post_processed_data
+        except Exception as pp_error:
+            logger.warning(f"Post-processing failed (non-critical): {str(pp_error)}")
+            # Continue with pipeline even if post-processing fails
+            return None
+    
+    def generate_markdown(self, post_processed_data: Dict[str, Any]) -> Optional[str]:
+        """Step 1.6: Markdown rendering of post-processed data (non-critical, None on failure)."""
+        try:
+            markdown_output = self.post_processor.generate_markdown(post_processed_data)
+            logger.info("Markdown output generated successfully")
+            return markdown_output
+        except Exception as md_error:
+            logger.warning(f"Markdown generation failed (non-critical): {str(md_error)}")
+            return None
+    
+    def receipt_enriched_data(self, receipt_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Step 2 for receipts: enriched data built from the receipt processor output."""
+        logger.info("Using receipt-specific processing pipeline")
+        return {
+            "structured_data": {
+                "document_type": "receipt",
+                "receipt_type": receipt_data.get("receipt_type", "unknown"),
+                "merchant_info": receipt_data.get("data", {}).get("merchant_info", {}),
+                "transaction_info": receipt_data.get("data", {}).get("transaction_info", {}),
+                "line_items": receipt_data.get("data", {}).get("items", []),
+                "financial_summary": {
+                    "subtotal": receipt_data.get("data", {}).get("totals", {}).get("subtotal", 0),
+                    "tax": receipt_data.get("data", {}).get("totals", {}).get("tax", 0),
+                    "discount": receipt_data.get("data", {}).get("totals", {}).get("discount", 0),
+                    "grand_total": receipt_data.get("data", {}).get("totals", {}).get("total", 0),
+                    "currency": "$"
+                },
+                "payment_info": receipt_data.get("data", {}).get("payment_info", {})
+            },
+            "status": "completed",
+            "model_version": "ReceiptProcessor"
+        }
+    
+    async def enrich(self, ocr_results: Dict[str, Any], file_content: bytes) -> Dict[str, Any]:
+        """Step 2: Enrich with ERNIE VLM; partial result (with "error") if the VLM fails or the deadline is too close."""
+        check_cancelled("vlm_enrichment")
+        if not within_budget("vlm_enrichment"):
+            return {
+                "structured_data": {},
+                "status": "partial",
+                "error": "VLM enrichment skipped: job deadline too close"
+            }
+        logger.info("Step 2: Enriching with ERNIE VLM for semantic reasoning...")
+        try:
+            enriched_data = await self.vlm_service.enrich_financial_data(ocr_results, file_content)
+            
+            # Validate VLM results
+            if not enriched_data or not isinstance(enriched_data, dict):
+                raise ValueError("VLM service returned invalid results")
+            
+            if enriched_data.get("status") == "partial":
+                logger.warning("VLM returned partial results - continuing with available data")
+            
+            # Ensure structured_data exists
+            if "structured_data" not in enriched_data:
+                enriched_data["structured_data"] = {}
+                logger.warning("VLM results missing structured_data - using empty structure")
+            return enriched_data
+        
+        except Exception as vlm_error:
+            logger.error(f"VLM enrichment failed: {str(vlm_error)}", exc_info=True)
+            # Try to continue with OCR results only if VLM fails
+            logger.warning("Continuing with OCR results only after VLM failure")
+            return {
+                "structured_data": {},
+                "status": "partial",
+                "error": f"VLM enrichment failed: {str(vlm_error)}"
+            }
+    
+    def merge_post_processed(
+        self,
+        enriched_data: Dict[str, Any],
+        post_processed_data: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Step 2.5: Fill fields the VLM missed from post-processed data (in place; skipped after VLM failure)."""
+        if enriched_data.get("error") or not post_processed_data or not post_processed_data.get("success"):
+            return enriched_data
+        
+        # Merge post-processed data if available (post-processing can supplement VLM output)
+        post_structured = post_processed_data.get("data", {})
+        if post_structured:
+            # Merge vendor data (post-processing takes precedence if VLM didn't extract it)
+            if post_structured.get("vendor") and not enriched_data["structured_data"].get("vendor_block"):
+                enriched_data["structured_data"]["vendor_block"] = post_structured["vendor"]
+            # Merge client data
+            if post_structured.get("client"):
+                if not enriched_data["structured_data"].get("client_info"):
+                    enriched_data["structured_data"]["client_info"] = post_structured["client"]
+                else:
+                    # Merge client fields that might be missing
+                    client_info = enriched_data["structured_data"]["client_info"]
+                    post_client = post_structured["client"]
+                    if not client_info.get("invoice_number") and post_client.get("invoice_number"):
+                        client_info["invoice_number"] = post_client["invoice_number"]
+                    if not client_info.get("dates") and post_client.get("dates"):
+                        client_info["dates"] = post_client["dates"]
+            # Merge line items (post-processing can supplement)
+            if post_structured.get("line_items") and not enriched_data["structured_data"].get("line_items"):
+                enriched_data["structured_data"]["line_items"] = post_structured["line_items"]
+            # Merge financial summary
+            if post_structured.get("financial_summary"):
+                if not enriched_data["structured_data"].get("financial_summary"):
+                    enriched_data["structured_data"]["financial_summary"] = post_structured["financial_summary"]
+                else:
+                    # Merge financial fields
+                    summary = enriched_data["structured_data"]["financial_summary"]
+                    post_summary = post_structured["financial_summary"]
+                    for key in ["subtotal", "grand_total", "currency", "payment_terms"]:
+                        if not summary.get(key) and post_summary.get(key):
+                            summary[key] = post_summary.get(key)
+        return enriched_data
+    
+    def validate_enriched(
+        self,
+        enriched_data: Dict[str, Any],
+        receipt_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Step 3: Business rule validation (receipt-specific for receipts)."""
+        logger.info("Step 3: Applying business rule validation...")
+        try:
+            if receipt_data:
+                # Use receipt-specific validation
+                return receipt_data.get("validation", {
+                    "is_valid": True,
+                    "errors": [],
+                    "warnings": []
+                })
+            # Use standard financial document validation
+            return self.validator.validate(enriched_data)
+        except Exception as validation_error:
+            logger.error(f"Validation failed: {str(validation_error)}", exc_info=True)
+            # Create a default validation result if validation fails
+            return {
+                "is_valid": False,
+                "math_ok": False,
+                "dates_ok": False,
+                "issues": [f"Validation error: {str(validation_error)}"],
+                "field_confidences": {},
+                "needs_review": True
+            }
+    
+    def check_duplicates(
+        self,
+        document_id: str,
+        enriched_data: Dict[str, Any],
+        validation_results: Dict[str, Any]
+    ) -> None:
+        """Step 3.5: Record possible duplicates in ``validation_results`` (non-critical)."""
+        try:
+            matches = self.duplicate_index.check_and_add(
+                document_id, enriched_data.get("structured_data", {})
+            )
+            validation_results["possible_duplicates"] = [match.document_id for match in matches]
+            if matches:
+                validation_results["needs_review"] = True
+        except Exception as duplicate_error:
+            logger.warning(f"Duplicate check failed (non-critical): {str(duplicate_error)}")
+    
+    def build_result(
+        self,
+        document_id: str,
+        filename: str,
+        model_type: str,
+        start_time: datetime,
+        ocr_results: Dict[str, Any],
+        enriched_data: Dict[str, Any],
+        validation_results: Optional[Dict[str, Any]],
+        post_processed_data: Optional[Dict[str, Any]] = None,
+        receipt_data: Optional[Dict[str, Any]] = None,
+        markdown_output: Optional[str] = None,
+        stage_timings: Optional[Dict[str, float]] = None,
+        fast_lane: bool = False
+    ) -> Dict[str, Any]:
+        """Assemble the pipeline result returned by process_document."""
+        is_receipt = receipt_data is not None
+        
+        # Build extracted fields for frontend compatibility
+        try:
+            extracted_fields = self._build_extracted_fields(enriched_data, model_type)
+        except Exception as field_error:
+            logger.error(f"Error building extracted fields: {str(field_error)}", exc_info=True)
+            extracted_fields = []
+        
+        end_time = datetime.utcnow()
+        processing_time_ms = (end_time - start_time).total_seconds() * 1000
+        
+        return {
+            "success": True,
+            "document_id": document_id,
+            "status": "completed",
+            "extracted_data": extracted_fields,
+            "structured_output": enriched_data.get("structured_data", {}),
+            "validation": validation_results,
+            "raw_ocr_output": ocr_results or {},
+            "post_processed_data": post_processed_data if self.post_processing_enabled and not is_receipt else None,
+            "receipt_data": receipt_data if is_receipt else None,  # Include receipt-specific data
+            "markdown_output": markdown_output,  # Human-readable Markdown format
+            "metadata": {
+                "source_file": filename,
+                "processing_timestamp": start_time.isoformat(),
+                "processing_time_ms": processing_time_ms,
+                "document_type": "receipt" if is_receipt else "invoice",
+                "receipt_type": receipt_data.get("receipt_type") if is_receipt else None,
+                "model_versions": {
+                    "paddleocr_vl": ocr_results.get("model_version", "PaddleOCR-VL-0.9B") if ocr_results else "unknown",
+                    "ernie_vl": enriched_data.get("model_version", "ERNIE-5") if enriched_data else "unknown",
+                    "ernie_family": enriched_data.get("model_family", "unknown") if enriched_data else "unknown",
+                    "receipt_processor": "ReceiptProcessor" if is_receipt else None
+                },
+                "model_type": model_type,
+                "partial_results": ocr_results.get("status") == "partial" or enriched_data.get("status") == "partial" if enriched_data else False,
+                "post_processing_enabled": self.post_processing_enabled and not is_receipt,
+                "receipt_processing_enabled": is_receipt,
+                "output_formats": ["json", "markdown"] if markdown_output else ["json"],
+                "stage_timings_ms": stage_timings or {},
+                "fast_lane": fast_lane
+            },
+            "active_learning_ready": validation_results.get("needs_review", False) if validation_results else False
+        }
+    
+
     def _build_extracted_fields(self, enriched_data: Dict[str, Any], model_type: str) -> List[Dict[str, Any]]:
         """Convert structured data to frontend-compatible extracted fields format."""
         fields = []
@@ -547,7 +738,8 @@ class FinancialDocumentProcessor:
         self, 
         file_content: bytes, 
         filename: str, 
-        model_type: str = "fine_tuned"
+        model_type: str = "fine_tuned",
+        on_stage: Optional[StageCallback] = None
     ) -> Dict[str, Any]:
         """
         Process document and return both JSON and Markdown outputs simultaneously.
@@ -557,29 +749,38 @@ class FinancialDocumentProcessor:
             file_content: Document file bytes
             filename: Original filename
             model_type: Model type to use ("fine_tuned" or "baseline")
+            on_stage: Optional callback invoked with (stage, elapsed_ms) as each stage completes
         
         Returns:
             Dictionary with 'json' and 'markdown' keys containing structured outputs
         """
         # First get standard processing result
-        standard_result = await self.process_document(file_content, filename, model_type)
+        standard_result = await self.process_document(file_content, filename, model_type, on_stage=on_stage)
+        check_cancelled("combined_output")
         
         # If post-processing is enabled and we have OCR results, generate combined output
-        if self.post_processing_enabled and standard_result.get("raw_ocr_output"):
+        if self.post_processing_enabled and standard_result.get("raw_ocr_output") and within_budget("combined_output"):
             try:
+                clock = _StageClock(on_stage)
                 combined = self.post_processor.generate_combined_output(
                     standard_result.get("raw_ocr_output")
                 )
+                clock.done("combined_output")
+                metadata = {
+                    **standard_result.get("metadata", {}),
+                    **combined.get("metadata", {})
+                }
+                metadata["stage_timings_ms"] = {
+                    **standard_result.get("metadata", {}).get("stage_timings_ms", {}),
+                    **clock.timings_ms
+                }
                 return {
                     "success": standard_result.get("success", False),
                     "document_id": standard_result.get("document_id"),
                     "status": standard_result.get("status"),
                     "json": combined.get("json", {}),
                     "markdown": combined.get("markdown", ""),
-                    "metadata": {
-                        **standard_result.get("metadata", {}),
-                        **combined.get("metadata", {})
-                    },
+                    "metadata": metadata,
                     "validation": standard_result.get("validation"),
                     "extracted_data": standard_result.get("extracted_data", [])
                 }
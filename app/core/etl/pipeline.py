@@ -9,6 +9,7 @@ Implements the complete Extract → Transform → Load pattern with:
 - Multi-target loading (OLTP, data lake, feature store, vector store)
 - Metadata tracking and audit trails
 - Metrics and monitoring
+- OCR output shared with the API path through the content store
 """
 import os
 import uuid
@@ -28,6 +29,7 @@ from .transformer import DocumentTransformer
 from .validator import DocumentValidator
 from .loaders import LoaderFactory, LoadTarget
 from .metrics import get_metrics_collector, PipelineMetrics
+from ..content_store import OCR, get_content_store
 
 logger = logging.getLogger(__name__)
 
@@ -154,6 +156,9 @@ class ETLPipeline:
         self.enable_validation = self.config.get("enable_validation", True)
         self.enable_multi_target_load = self.config.get("enable_multi_target_load", True)
         
+        # Content-addressed OCR output, shared with /api/v1/analyze (None when disabled)
+        self.content_store = get_content_store() if self.config.get("enable_content_store", True) else None
+        
         # Metrics collector
         self.metrics_collector = get_metrics_collector()
         
@@ -232,10 +237,18 @@ class ETLPipeline:
             logger.info(f"[{pipeline_id}] Stage 2: Extracting content...")
             metadata.stage = PipelineStage.EXTRACTED
             
-            ocr_results = await ocr_service.parse_document(staged_file.content)
-            
-            if not ocr_results or not isinstance(ocr_results, dict):
-                raise ValueError("OCR service returned invalid results")
+            ocr_results = None
+            if self.content_store and staged_file.checksum:
+                ocr_results = self.content_store.get(staged_file.checksum, OCR)
+                if ocr_results is not None:
+                    logger.info(f"[{pipeline_id}] Reusing OCR output from the content store")
+            if ocr_results is None:
+                ocr_results = await ocr_service.parse_document(staged_file.content)
+                
+                if not ocr_results or not isinstance(ocr_results, dict):
+                    raise ValueError("OCR service returned invalid results")
+                if self.content_store and staged_file.checksum and ocr_results.get("status") != "partial":
+                    self.content_store.put(staged_file.checksum, ocr_results, OCR)
             
             # Extract layout graph if available
             layout_graph = ocr_results.get("semantic_layout") or ocr_results.get("layout")
@@ -265,7 +278,8 @@ class ETLPipeline:
                 validation_results = await self.validator.validate(
                     structured_data,
                     canonical_schema,
-                    ocr_results
+                    ocr_results,
+                    document_id=document_id
                 )
                 
                 metadata.validation_passed = validation_results.get("is_valid", False)
@@ -301,6 +315,8 @@ class ETLPipeline:
                         load_results[target_name] = {"success": False, "error": str(load_error)}
                 
                 metadata.load_targets = list(load_results.keys())
+                if any(r.get("success") for r in load_results.values()):
+                    self.validator.index_document(document_id, canonical_schema)
             
             # Calculate processing time
             end_time = datetime.utcnow()
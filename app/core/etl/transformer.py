@@ -12,7 +12,8 @@ import re
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime
-from decimal import Decimal, InvalidOperation
+
+from finscribe.parsing import DocumentDateParser, parse_amount, parse_amount_float
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +43,9 @@ class DocumentTransformer:
         "notes": Optional[str],
     }
     
+    # Date formats tried by _normalize_date (month-first)
+    DATE_FORMATS = ("%m/%d/%Y", "%m-%d-%Y", "%d/%m/%Y", "%Y-%m-%d")
+    
     def __init__(self, config: Dict[str, Any] = None):
         """
         Initialize transformer.
@@ -220,11 +224,9 @@ class DocumentTransformer:
         for pattern in amount_patterns:
             matches = re.findall(pattern, cleaned_text, re.IGNORECASE)
             for match in matches:
-                try:
-                    amount = float(match.replace(',', ''))
-                    amounts_found.append(amount)
-                except ValueError:
-                    pass
+                amount = parse_amount(match, "en")
+                if amount is not None:
+                    amounts_found.append(float(amount))
         
         if amounts_found:
             # Largest amount is likely the total
@@ -283,16 +285,10 @@ class DocumentTransformer:
         return line_items
     
     def _parse_number(self, text: str) -> float:
-        """Parse number from text, handling currency symbols and commas."""
+        """Parse number from text, handling currency symbols and separators."""
         if not text:
             return 0.0
-        
-        # Remove currency symbols and commas
-        cleaned = re.sub(r'[^\d.]', '', str(text))
-        try:
-            return float(cleaned)
-        except ValueError:
-            return 0.0
+        return parse_amount_float(str(text))
     
     def _map_to_canonical_schema(
         self,
@@ -306,6 +302,7 @@ class DocumentTransformer:
         source document format.
         """
         canonical = {}
+        date_parser = DocumentDateParser(self.DATE_FORMATS)
         
         # Direct mappings
         field_mappings = {
@@ -327,7 +324,7 @@ class DocumentTransformer:
                 # Type conversion and validation
                 if target_key == "date" and value:
                     # Normalize date format
-                    canonical[target_key] = self._normalize_date(value)
+                    canonical[target_key] = self._normalize_date(value, date_parser)
                 elif target_key in ["subtotal", "tax", "total"] and value:
                     canonical[target_key] = float(value)
                 elif target_key == "line_items" and isinstance(value, list):
@@ -345,29 +342,11 @@ class DocumentTransformer:
         
         return canonical
     
-    def _normalize_date(self, date_str: str) -> str:
-        """Normalize date string to ISO format."""
-        # This is simplified - production would handle more formats
-        try:
-            # Try common formats
-            formats = [
-                "%m/%d/%Y",
-                "%m-%d-%Y",
-                "%d/%m/%Y",
-                "%Y-%m-%d",
-            ]
-            
-            for fmt in formats:
-                try:
-                    dt = datetime.strptime(date_str, fmt)
-                    return dt.isoformat()
-                except ValueError:
-                    continue
-            
-            # If no format matches, return as-is
-            return date_str
-        except Exception:
-            return date_str
+    def _normalize_date(self, date_str: str, date_parser: Optional[DocumentDateParser] = None) -> str:
+        """Normalize date string to ISO format (original string if unparsable)."""
+        parser = date_parser or DocumentDateParser(self.DATE_FORMATS)
+        dt = parser.parse(date_str)
+        return dt.isoformat() if dt is not None else date_str
     
     def _calculate_confidence_scores(
         self,
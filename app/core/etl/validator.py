@@ -4,14 +4,30 @@ Document Validator for ETL Pipeline.
 Validates extracted data using:
 - Arithmetic validation (subtotal + tax = total)
 - Logical validation (dates, ranges, consistency)
-- Statistical validation (outlier detection)
+- Statistical validation (per-vendor outlier detection, see vendor_stats.py)
 - Business rule validation
+- Duplicate detection (see validation/duplicate_index.py)
 """
+import atexit
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Sequence
 from datetime import datetime
 from decimal import Decimal, InvalidOperation
 
+import numpy as np
+
+from finscribe.vendors import VendorResolver
+
+from ..validation.duplicate_index import DuplicateInvoiceIndex
+from ..validation.batch import (
+    CENT_SCALE,
+    MAX_SEGMENT_LENGTH,
+    floor_scaled,
+    segment_sums,
+    to_scaled_ints,
+)
+from .vendor_stats import VendorStatisticalValidator, VendorStatsStore
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,12 +52,50 @@ class DocumentValidator:
             "enable_statistical_validation", False
         )
         self.enable_business_rules = self.config.get("enable_business_rules", True)
+        vendor_list_path = self.config.get("vendor_list_path")
+        self.vendor_resolver: Optional[VendorResolver] = (
+            VendorResolver.load(vendor_list_path) if vendor_list_path else None
+        )
+        self.statistical_validator: Optional[VendorStatisticalValidator] = None
+        if self.enable_statistical_validation:
+            store = VendorStatsStore(
+                self.config.get("vendor_stats_path", "/tmp/finscribe_metadata/vendor_stats.db"),
+                flush_every=self.config.get("vendor_stats_flush_every", 1000),
+            )
+            self.statistical_validator = VendorStatisticalValidator(
+                store,
+                z_threshold=self.config.get("statistical_z_threshold", 3.0),
+                min_history=self.config.get("statistical_min_history", 5),
+                vendor_resolver=self.vendor_resolver,
+            )
+        self.duplicate_index: Optional[DuplicateInvoiceIndex] = None
+        if self.config.get("enable_duplicate_detection", False):
+            self.duplicate_index = DuplicateInvoiceIndex(
+                self.config.get("duplicate_index_path", "/tmp/finscribe_metadata/duplicate_index.db"),
+                amount_tolerance=self.config.get("duplicate_amount_tolerance", 0.01),
+                date_tolerance_days=self.config.get("duplicate_date_tolerance_days", 3),
+                vendor_resolver=self.vendor_resolver,
+            )
+        if self.statistical_validator is not None or self.duplicate_index is not None:
+            # Vendor statistics are written behind; don't lose the last batch at exit
+            atexit.register(self.close)
+    
+    def close(self) -> None:
+        """Write pending vendor statistics and close the local stores."""
+        if self.statistical_validator is not None:
+            self.statistical_validator.store.close()
+            self.statistical_validator = None
+            self.enable_statistical_validation = False
+        if self.duplicate_index is not None:
+            self.duplicate_index.close()
+            self.duplicate_index = None
     
     async def validate(
         self,
         structured_data: Dict[str, Any],
         canonical_schema: Dict[str, Any],
-        ocr_results: Optional[Dict[str, Any]] = None
+        ocr_results: Optional[Dict[str, Any]] = None,
+        document_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Validate extracted data.
@@ -50,6 +104,7 @@ class DocumentValidator:
             structured_data: Extracted structured data
             canonical_schema: Canonical schema data
             ocr_results: Optional raw OCR results for context
+            document_id: Id the record is loaded under; it is not reported as its own duplicate
             
         Returns:
             Validation results with:
@@ -86,6 +141,11 @@ class DocumentValidator:
             result["validation_details"]["statistical"] = statistical_result
             result["warnings"].extend(statistical_result["warnings"])
         
+        if self.duplicate_index is not None:
+            duplicate_result = self._validate_duplicates(canonical_schema, document_id)
+            result["validation_details"]["duplicates"] = duplicate_result
+            result["warnings"].extend(duplicate_result["warnings"])
+        
         if self.enable_business_rules:
             business_result = self._validate_business_rules(canonical_schema)
             result["validation_details"]["business_rules"] = business_result
@@ -108,6 +168,9 @@ class DocumentValidator:
         Checks:
         - subtotal + tax ≈ total
         - sum(line_items) ≈ subtotal
+        
+        Differences are computed in exact decimal arithmetic, so amounts that
+        agree to the cent never trip the tolerance through float drift.
         """
         result = {
             "passed": True,
@@ -119,20 +182,21 @@ class DocumentValidator:
         subtotal = self._safe_float(data.get("subtotal"))
         tax = self._safe_float(data.get("tax", 0))
         line_items = data.get("line_items", [])
+        tolerance = self._exact(self.arithmetic_tolerance)
         
         # Check: subtotal + tax ≈ total
         if subtotal is not None:
-            expected_total = subtotal + tax
-            difference = abs(total - expected_total)
+            expected_total = self._exact(subtotal) + self._exact(tax)
+            difference = abs(self._exact(total) - expected_total)
             
-            if difference > self.arithmetic_tolerance:
+            if difference > tolerance:
                 error_msg = (
                     f"Arithmetic mismatch: subtotal ({subtotal}) + tax ({tax}) = "
                     f"{expected_total}, but total is {total} (difference: {difference})"
                 )
                 result["errors"].append(error_msg)
                 result["passed"] = False
-            elif difference > self.arithmetic_tolerance * 0.5:
+            elif difference > tolerance * Decimal("0.5"):
                 # Warning for smaller differences
                 result["warnings"].append(
                     f"Minor arithmetic difference: {difference}"
@@ -141,12 +205,12 @@ class DocumentValidator:
         # Check: sum(line_items) ≈ subtotal
         if line_items and subtotal is not None:
             line_items_sum = sum(
-                self._safe_float(item.get("amount", item.get("total", 0)))
+                self._exact(self._safe_float(item.get("amount", item.get("total", 0))))
                 for item in line_items
             )
             
-            difference = abs(subtotal - line_items_sum)
-            if difference > self.arithmetic_tolerance:
+            difference = abs(self._exact(subtotal) - line_items_sum)
+            if difference > tolerance:
                 error_msg = (
                     f"Line items sum ({line_items_sum}) does not match "
                     f"subtotal ({subtotal}) (difference: {difference})"
@@ -156,6 +220,70 @@ class DocumentValidator:
         
         return result
     
+    def validate_arithmetic_batch(self, records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Arithmetic validation for many canonical records.
+        
+        Returns the same per-record results as _validate_arithmetic(). Records
+        are checked together in integer cents; only those with an error or
+        warning (or values that are not exact in cents) are re-run one by one
+        to build their messages.
+        """
+        records = list(records)
+        n_records = len(records)
+        totals: List[float] = [0.0] * n_records
+        subtotals: List[float] = [0.0] * n_records
+        taxes: List[float] = [0.0] * n_records
+        has_subtotal = np.zeros(n_records, dtype=bool)
+        supported = np.ones(n_records, dtype=bool)
+        amounts: List[float] = []
+        item_counts = np.zeros(n_records, dtype=np.int64)
+        
+        for index, data in enumerate(records):
+            total = self._safe_float(data.get("total", 0))
+            subtotal = self._safe_float(data.get("subtotal"))
+            tax = self._safe_float(data.get("tax", 0))
+            line_items = data.get("line_items") or []
+            if subtotal is None:
+                continue  # nothing to check
+            if total is None or tax is None or len(line_items) > MAX_SEGMENT_LENGTH:
+                supported[index] = False
+                continue
+            item_amounts = [
+                self._safe_float(item.get("amount", item.get("total", 0)))
+                for item in line_items
+            ]
+            if None in item_amounts:
+                supported[index] = False
+                continue
+            totals[index], subtotals[index], taxes[index] = total, subtotal, tax
+            has_subtotal[index] = True
+            amounts.extend(item_amounts)
+            item_counts[index] = len(item_amounts)
+        
+        tolerance = self._exact(self.arithmetic_tolerance)
+        total_cents, total_ok = to_scaled_ints(totals, CENT_SCALE)
+        subtotal_cents, subtotal_ok = to_scaled_ints(subtotals, CENT_SCALE)
+        tax_cents, tax_ok = to_scaled_ints(taxes, CENT_SCALE)
+        amount_cents, amount_ok = to_scaled_ints(amounts, CENT_SCALE)
+        supported &= total_ok & subtotal_ok & tax_ok
+        supported &= segment_sums(~amount_ok, item_counts) == 0
+        
+        total_diff = np.abs(total_cents - subtotal_cents - tax_cents)
+        items_diff = np.abs(subtotal_cents - segment_sums(amount_cents, item_counts))
+        clean = supported & (
+            ~has_subtotal
+            | (
+                (total_diff <= floor_scaled(tolerance * Decimal("0.5"), CENT_SCALE))
+                & ((item_counts == 0) | (items_diff <= floor_scaled(tolerance, CENT_SCALE)))
+            )
+        )
+        
+        return [
+            {"passed": True, "errors": [], "warnings": []} if ok else self._validate_arithmetic(data)
+            for data, ok in zip(records, clean.tolist())
+        ]
+    
     def _validate_logical(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Validate logical constraints.
@@ -237,21 +365,37 @@ class DocumentValidator:
         """
         Statistical validation (outlier detection).
         
-        This would compare against historical data patterns.
-        For now, it's a placeholder.
+        Compares the record's total, line-item count and tax ratio against
+        running aggregates of the same vendor, then adds the record to them.
+        Outliers produce warnings only.
         """
-        result = {
+        if self.statistical_validator is None:
+            return {"passed": True, "warnings": []}
+        return self.statistical_validator.score(data)
+    
+    def _validate_duplicates(self, data: Dict[str, Any], document_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Look the record up in the duplicate-invoice index.
+        
+        Matches are reported as warnings; the record itself is indexed once it
+        has been loaded (see index_document). A re-processed document is not
+        reported as a duplicate of its own earlier load.
+        """
+        matches = self.duplicate_index.find_duplicates(data, exclude_id=document_id)
+        return {
             "passed": True,
-            "warnings": []
+            "warnings": [
+                f"Possible duplicate of document {match.document_id}"
+                + (" (same amount and date)" if match.exact else "")
+                for match in matches
+            ],
+            "duplicate_of": [match.document_id for match in matches],
         }
-        
-        # Placeholder for statistical validation
-        # In production, this would:
-        # 1. Compare amounts against vendor historical data
-        # 2. Detect unusual patterns
-        # 3. Flag outliers for review
-        
-        return result
+    
+    def index_document(self, document_id: str, data: Dict[str, Any]) -> None:
+        """Add a loaded record to the duplicate-invoice index (no-op when disabled)."""
+        if self.duplicate_index is not None:
+            self.duplicate_index.add(document_id, data)
     
     def _validate_business_rules(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -313,6 +457,11 @@ class DocumentValidator:
         
         return None
     
+    @staticmethod
+    def _exact(value: float) -> Decimal:
+        """Decimal with the shortest repr of ``value`` (0.1 -> Decimal("0.1"))."""
+        return Decimal(repr(value))
+    
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """Parse date string to datetime object."""
         if not date_str:
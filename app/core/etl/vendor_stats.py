@@ -0,0 +1,244 @@
+"""
+Streaming per-vendor statistics for ETL anomaly validation.
+
+Each vendor keeps running (Welford) mean and variance of invoice totals,
+line-item counts and tax ratios. A record is scored in O(1) against its
+vendor's aggregates and then folded into them; no history is rescanned.
+
+Aggregates live in a small SQLite file (one row per vendor, looked up by
+primary key). Updated rows are written back in batches of ``flush_every``
+updates, or on flush()/close().
+"""
+import logging
+import math
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from finscribe.vendors import VendorResolver, vendor_key
+
+logger = logging.getLogger(__name__)
+
+METRICS = ("total", "line_items", "tax_ratio")
+
+
+class RunningStats:
+    """Welford's online mean and variance."""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0.0 with fewer than two values)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def zscore(self, value: float, min_std: float = 0.0) -> float:
+        """Standard score of ``value``; the deviation is floored at ``min_std``."""
+        std = max(self.std, min_std)
+        if std == 0.0:
+            return 0.0 if value == self.mean else math.inf
+        return (value - self.mean) / std
+
+
+class VendorProfile:
+    """Running statistics of one vendor, one RunningStats per metric."""
+
+    __slots__ = ("stats",)
+
+    def __init__(self, row: Optional[Tuple[float, ...]] = None):
+        if row is None:
+            self.stats = {metric: RunningStats() for metric in METRICS}
+        else:
+            self.stats = {
+                metric: RunningStats(int(row[3 * i]), row[3 * i + 1], row[3 * i + 2])
+                for i, metric in enumerate(METRICS)
+            }
+
+    def to_row(self) -> Tuple[float, ...]:
+        row: List[float] = []
+        for metric in METRICS:
+            stats = self.stats[metric]
+            row.extend((stats.count, stats.mean, stats.m2))
+        return tuple(row)
+
+
+class VendorStatsStore:
+    """
+    Per-vendor aggregates in a local SQLite file with write-behind batching.
+
+    Profiles are read by primary key on first use and kept in memory; dirty
+    profiles are written in one transaction every ``flush_every`` updates
+    (counted per update, however many vendors they touch).
+    """
+
+    _COLUMNS = ", ".join(f"{m}_count, {m}_mean, {m}_m2" for m in METRICS)
+
+    def __init__(self, path: str = ":memory:", flush_every: int = 1000):
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS vendor_stats (vendor TEXT PRIMARY KEY, "
+            + ", ".join(f"{m}_count INTEGER, {m}_mean REAL, {m}_m2 REAL" for m in METRICS)
+            + ")"
+        )
+        self._conn.commit()
+        self._profiles: Dict[str, VendorProfile] = {}
+        self._dirty: set = set()
+        self._updates = 0
+        self._lock = threading.Lock()
+
+    def get(self, vendor: str) -> VendorProfile:
+        """Profile of ``vendor`` (empty if the vendor has no history)."""
+        with self._lock:
+            return self._get_locked(vendor)
+
+    def _get_locked(self, vendor: str) -> VendorProfile:
+        profile = self._profiles.get(vendor)
+        if profile is None:
+            row = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM vendor_stats WHERE vendor = ?", (vendor,)
+            ).fetchone()
+            profile = VendorProfile(row)
+            self._profiles[vendor] = profile
+        return profile
+
+    def update(self, vendor: str, values: Dict[str, float]) -> None:
+        """Fold one record's metric values into the vendor's profile."""
+        with self._lock:
+            profile = self._get_locked(vendor)
+            for metric, value in values.items():
+                profile.stats[metric].update(value)
+            self._dirty.add(vendor)
+            self._updates += 1
+            if self._updates >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self) -> int:
+        """Write all pending profiles; returns the number of rows written."""
+        with self._lock:
+            return self._flush_locked()
+
+    def _flush_locked(self) -> int:
+        if not self._dirty:
+            return 0
+        rows = [(vendor,) + self._profiles[vendor].to_row() for vendor in self._dirty]
+        placeholders = ", ".join("?" * (1 + 3 * len(METRICS)))
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO vendor_stats (vendor, {self._COLUMNS}) VALUES ({placeholders})",
+                rows,
+            )
+        self._dirty.clear()
+        self._updates = 0
+        return len(rows)
+
+    @property
+    def pending(self) -> int:
+        """Number of updates not yet written."""
+        return self._updates
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+
+class VendorStatisticalValidator:
+    """
+    Flags records whose totals, line-item counts or tax ratios are outliers
+    for their vendor.
+
+    Scoring starts once a vendor has ``min_history`` records. Deviations are
+    floored at ``min_relative_std`` of the mean, so vendors with constant
+    amounts are not flagged for cent-level differences. With a
+    ``vendor_resolver``, OCR variants of a known vendor share its history.
+    """
+
+    def __init__(
+        self,
+        store: VendorStatsStore,
+        z_threshold: float = 3.0,
+        min_history: int = 5,
+        min_relative_std: float = 0.01,
+        vendor_resolver: Optional[VendorResolver] = None,
+    ):
+        self.store = store
+        self.vendor_resolver = vendor_resolver
+        self.z_threshold = z_threshold
+        self.min_history = min_history
+        self.min_relative_std = min_relative_std
+
+    @staticmethod
+    def record_metrics(data: Dict[str, Any]) -> Dict[str, float]:
+        """Metric values of a canonical record (metrics it lacks are omitted)."""
+        values: Dict[str, float] = {}
+        total = _as_float(data.get("total"))
+        if total is not None:
+            values["total"] = total
+        line_items = data.get("line_items")
+        if isinstance(line_items, list):
+            values["line_items"] = float(len(line_items))
+        subtotal = _as_float(data.get("subtotal"))
+        tax = _as_float(data.get("tax"))
+        if subtotal and subtotal > 0 and tax is not None:
+            values["tax_ratio"] = tax / subtotal
+        return values
+
+    def score(self, data: Dict[str, Any], update: bool = True) -> Dict[str, Any]:
+        """
+        Score a record against its vendor's history, then add it to the history.
+
+        Returns:
+            {"passed": True, "warnings": [...], "scores": {metric: z}, "vendor": key}
+        """
+        result: Dict[str, Any] = {"passed": True, "warnings": [], "scores": {}, "vendor": None}
+        vendor = vendor_key(data.get("vendor"), self.vendor_resolver)
+        if vendor is None:
+            return result
+        result["vendor"] = vendor
+
+        values = self.record_metrics(data)
+        profile = self.store.get(vendor)
+        for metric, value in values.items():
+            stats = profile.stats[metric]
+            if stats.count < self.min_history:
+                continue
+            z = stats.zscore(value, self.min_relative_std * abs(stats.mean))
+            result["scores"][metric] = z
+            if abs(z) > self.z_threshold:
+                result["warnings"].append(
+                    f"Unusual {metric.replace('_', ' ')} for vendor '{data.get('vendor')}': "
+                    f"{value:g} (vendor mean {stats.mean:g}, z-score {z:.1f})"
+                )
+
+        if update and values:
+            self.store.update(vendor, values)
+        return result
+
+
+def _as_float(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else None
+    return None
@@ -0,0 +1,176 @@
+"""
+Per-tenant weighted fair queueing.
+
+A single FIFO lets one tenant's bulk upload delay everybody queued behind it.
+FairQueue keeps one queue per tenant and decides which tenant's job runs
+next by start-time fair queueing:
+
+- a tenant's head job gets a virtual start tag, max(virtual time, finish
+  tag of the tenant's previous job), and a finish tag, start + cost / weight;
+- pop() dispatches the head job with the smallest start tag among tenants
+  below their concurrency cap, and advances virtual time to that tag.
+
+A tenant with weight w gets w times the share of a weight-1 tenant while
+both have work queued, and a tenant that was idle starts at the current
+virtual time (idle time is not saved up as credit), so a small tenant's new
+job runs after at most about one job of every other busy tenant, however
+deep their backlog. Weights and per-tenant concurrency caps come from the
+tenant's plan tier (PricingTier.scheduling_weight / max_concurrent_jobs in
+SaaSSubscriptionManager). Jobs without a tenant share one queue of weight 1.
+
+Within a tenant jobs run in arrival order, or, with ``shortest_first``, by
+expected cost with linear aging: a job's priority is its cost minus
+``aging_rate`` times the seconds it has waited, so a long document is
+overtaken by short ones for a while but not forever (it waits at most about
+cost difference / aging_rate extra). Costs are the jobs' expected processing
+seconds (CostEstimator); tenants' fair shares are then shares of processing
+time. Start tags are assigned when a job reaches the head of its tenant's
+queue, so reordering within a tenant does not disturb fairness between
+tenants.
+
+Dispatching costs O(number of tenants with queued work + log of the
+tenant's queue); tenants with nothing queued or running are forgotten.
+"""
+import heapq
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ANONYMOUS_TENANT = "anonymous"
+
+
+@dataclass(frozen=True)
+class TenantPolicy:
+    """Scheduling share and concurrency cap of a tenant."""
+    weight: float = 1.0
+    max_concurrent: Optional[int] = None  # None: no cap beyond the worker pool
+
+
+@dataclass
+class _TenantQueue:
+    policy: TenantPolicy
+    jobs: List[Tuple[float, int, float, Any]] = field(default_factory=list)  # heap of (priority, seq, cost, item)
+    start: float = 0.0  # start tag of the head job
+    last_finish: float = 0.0
+    running: int = 0
+
+
+def tier_policies(manager=None) -> Dict[str, TenantPolicy]:
+    """Policy for every plan tier of ``manager`` (default: SaaSSubscriptionManager())."""
+    if manager is None:
+        from ..pricing.subscription_manager import SaaSSubscriptionManager
+        manager = SaaSSubscriptionManager()
+    return {
+        code: TenantPolicy(weight=tier.scheduling_weight, max_concurrent=tier.max_concurrent_jobs)
+        for code, tier in manager.get_all_tiers().items()
+    }
+
+
+class FairQueue:
+    """
+    Per-tenant queues dispatched by weighted fair queueing.
+
+    Not thread-safe on its own: callers (AdmissionController) hold their
+    lock around every call.
+    """
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, TenantPolicy]] = None,
+        default_policy: TenantPolicy = TenantPolicy(),
+        shortest_first: bool = False,
+        aging_rate: float = 1.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.policies = policies if policies is not None else tier_policies()
+        self.default_policy = default_policy
+        self.shortest_first = shortest_first
+        self.aging_rate = aging_rate
+        self.clock = clock
+        self.virtual_time = 0.0
+        self._tenants: Dict[str, _TenantQueue] = {}
+        self._size = 0
+        self._seq = 0
+
+    def policy_for(self, tier: Optional[str]) -> TenantPolicy:
+        if tier is None:
+            return self.default_policy
+        return self.policies.get(tier.lower(), self.default_policy)
+
+    def push(self, tenant_id: Optional[str], item: Any, tier: Optional[str] = None, cost: float = 1.0) -> None:
+        """Queue ``item`` for ``tenant_id``; ``cost`` is the job's expected processing time."""
+        tenant_id = tenant_id or ANONYMOUS_TENANT
+        queue = self._tenants.get(tenant_id)
+        if queue is None:
+            queue = self._tenants[tenant_id] = _TenantQueue(self.policy_for(tier))
+        if not queue.jobs:
+            queue.start = max(self.virtual_time, queue.last_finish)
+        self._seq += 1
+        # cost - aging_rate * (now - enqueued) orders jobs the same at any time "now"
+        priority = cost + self.aging_rate * self.clock() if self.shortest_first else 0.0
+        heapq.heappush(queue.jobs, (priority, self._seq, cost, item))
+        self._size += 1
+
+    def pop(self) -> Optional[Tuple[str, Any]]:
+        """Next (tenant_id, item) to run, or None if every queued tenant is at its cap."""
+        best_id, best_start = None, None
+        for tenant_id, queue in self._tenants.items():
+            if not queue.jobs:
+                continue
+            cap = queue.policy.max_concurrent
+            if cap is not None and queue.running >= cap:
+                continue
+            if best_start is None or queue.start < best_start:
+                best_id, best_start = tenant_id, queue.start
+        if best_id is None:
+            return None
+        queue = self._tenants[best_id]
+        _, _, cost, item = heapq.heappop(queue.jobs)
+        queue.running += 1
+        queue.last_finish = queue.start = best_start + cost / queue.policy.weight
+        self._size -= 1
+        self.virtual_time = max(self.virtual_time, best_start)
+        return best_id, item
+
+    def remove(self, predicate: Callable[[Any], bool]) -> List[Tuple[str, Any]]:
+        """Take the queued items matching ``predicate`` out; returns them as (tenant_id, item)."""
+        removed = []
+        for tenant_id, queue in list(self._tenants.items()):
+            kept = []
+            for entry in queue.jobs:
+                if predicate(entry[3]):
+                    removed.append((tenant_id, entry[3]))
+                else:
+                    kept.append(entry)
+            if len(kept) == len(queue.jobs):
+                continue
+            heapq.heapify(kept)
+            queue.jobs = kept
+            if not kept and queue.running <= 0:
+                del self._tenants[tenant_id]
+        self._size -= len(removed)
+        return removed
+
+    def done(self, tenant_id: str) -> None:
+        """A job popped for ``tenant_id`` finished."""
+        queue = self._tenants.get(tenant_id)
+        if queue is None:
+            return
+        queue.running -= 1
+        if not queue.jobs and queue.running <= 0:
+            del self._tenants[tenant_id]
+
+    def depth(self, tenant_id: Optional[str]) -> int:
+        queue = self._tenants.get(tenant_id or ANONYMOUS_TENANT)
+        return len(queue.jobs) if queue else 0
+
+    def running(self, tenant_id: Optional[str]) -> int:
+        queue = self._tenants.get(tenant_id or ANONYMOUS_TENANT)
+        return queue.running if queue else 0
+
+    def depths(self) -> Dict[str, int]:
+        """Queued jobs per tenant with work queued or running."""
+        return {tenant_id: len(queue.jobs) for tenant_id, queue in self._tenants.items()}
+
+    def __len__(self) -> int:
+        return self._size
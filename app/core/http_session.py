@@ -0,0 +1,61 @@
+"""
+Shared aiohttp sessions for long-lived event loops.
+
+Opening a ClientSession per request sets up a fresh connection pool each
+time, so every OCR/VLM call pays for a new TCP (and TLS) handshake. On a
+persistent event loop (see worker_runtime) one session can be kept per loop
+and reused by every job that runs on it.
+
+Model services open sessions with ``async with http_session() as session``.
+On a loop that opted in with enable_session_reuse() the shared session is
+yielded and left open; on any other loop (asyncio.run, test loops, the API
+server loop) a private session is created and closed as before, so nothing
+outlives the loop it was created on.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+_reuse_loops: set = set()
+_sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+
+def enable_session_reuse(loop: asyncio.AbstractEventLoop) -> None:
+    """Share one session across requests on ``loop`` until close_http_sessions() runs on it."""
+    _reuse_loops.add(loop)
+
+
+def _shared_session(loop: asyncio.AbstractEventLoop) -> aiohttp.ClientSession:
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession()
+        _sessions[loop] = session
+    return session
+
+
+@asynccontextmanager
+async def http_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """Session for the running loop: shared if the loop reuses sessions, private otherwise."""
+    loop = asyncio.get_running_loop()
+    if loop in _reuse_loops:
+        yield _shared_session(loop)
+        return
+    async with aiohttp.ClientSession() as session:
+        yield session
+
+
+async def close_http_sessions() -> None:
+    """Close the running loop's shared session and stop reusing sessions on it."""
+    loop = asyncio.get_running_loop()
+    _reuse_loops.discard(loop)
+    session: Optional[aiohttp.ClientSession] = _sessions.pop(loop, None)
+    if session is not None and not session.closed:
+        try:
+            await session.close()
+        except Exception as e:
+            logger.warning(f"Error closing shared HTTP session: {str(e)}")
@@ -0,0 +1,199 @@
+"""
+Publish/subscribe bus for job progress events.
+
+JobManager publishes an event every time it saves a job; the SSE and
+WebSocket progress endpoints subscribe to the job they stream instead of
+polling the job store. Delivery is push-based:
+
+- publish() may be called from any thread (pipeline stages run on worker
+  threads and loops); each subscriber gets the event on its own event loop
+  through call_soon_threadsafe, so it arrives within milliseconds;
+- a subscriber waits on an asyncio.Queue, so an idle connection costs no
+  CPU, and jobs nobody watches cost one dict lookup per publish;
+- subscriber queues are bounded; when a slow client falls behind, the oldest
+  event is dropped (events are snapshots, the newest one is what matters).
+
+With JOB_EVENTS_REDIS=true (or enable_redis()), events are also published
+on Redis channel ``finscribe:job-events:<job_id>`` and a listener thread
+delivers events published by other replicas to local subscribers. The
+listener re-subscribes with backoff when the Redis connection drops.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "finscribe:job-events:"
+SUBSCRIBER_QUEUE_SIZE = 64
+# Backoff between attempts to re-subscribe after losing the Redis connection
+RECONNECT_MIN_SECONDS = float(os.getenv("JOB_EVENTS_RECONNECT_MIN_SECONDS", "0.5"))
+RECONNECT_MAX_SECONDS = float(os.getenv("JOB_EVENTS_RECONNECT_MAX_SECONDS", "30"))
+
+
+class Subscription:
+    """Events for one job, delivered to one consumer on its event loop."""
+
+    def __init__(self, job_id: str, loop: asyncio.AbstractEventLoop, maxsize: int = SUBSCRIBER_QUEUE_SIZE):
+        self.job_id = job_id
+        self._loop = loop
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=maxsize)
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        # Runs on the subscriber's loop
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    def push(self, event: Dict[str, Any]) -> None:
+        """Hand ``event`` to the subscriber from any thread."""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._deliver(event)
+        else:
+            try:
+                self._loop.call_soon_threadsafe(self._deliver, event)
+            except RuntimeError:
+                # Subscriber loop already closed; the subscription is going away
+                pass
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next event, or None if ``timeout`` seconds pass without one."""
+        if timeout is None:
+            return await self._queue.get()
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class JobEventBus:
+    """In-process job event fan-out with optional Redis pub/sub between replicas."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._redis = None
+        self._listener: Optional[threading.Thread] = None
+        self._origin = uuid.uuid4().hex
+
+    @asynccontextmanager
+    async def subscribe(self, job_id: str) -> AsyncIterator[Subscription]:
+        """Receive events for ``job_id`` while the context is open."""
+        subscription = Subscription(job_id, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.setdefault(job_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(job_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[job_id]
+
+    def subscriber_count(self, job_id: Optional[str] = None) -> int:
+        with self._lock:
+            if job_id is not None:
+                return len(self._subscribers.get(job_id, ()))
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, job_id: str, event: Dict[str, Any]) -> None:
+        """Send ``event`` to the job's subscribers here and, with Redis, on other replicas."""
+        self._deliver_local(job_id, event)
+        if self._redis is not None:
+            try:
+                self._redis.publish(
+                    f"{CHANNEL_PREFIX}{job_id}",
+                    json.dumps({"origin": self._origin, "event": event}, default=str)
+                )
+            except Exception as e:
+                logger.warning(f"Failed to publish job event for {job_id} to Redis: {e}")
+
+    def _deliver_local(self, job_id: str, event: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(job_id, ()))
+        for subscription in subscribers:
+            subscription.push(event)
+
+    def enable_redis(self, client) -> None:
+        """Fan events out through Redis pub/sub on ``client`` and start the listener thread."""
+        self._redis = client
+        pubsub = self._subscribe_redis()
+        self._listener = threading.Thread(target=self._listen, args=(pubsub,), name="job-events-redis", daemon=True)
+        self._listener.start()
+        logger.info("Job events fan out through Redis pub/sub")
+
+    def _subscribe_redis(self):
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+        return pubsub
+
+    def _listen(self, pubsub) -> None:
+        delay = RECONNECT_MIN_SECONDS
+        while True:
+            try:
+                for message in pubsub.listen():
+                    delay = RECONNECT_MIN_SECONDS
+                    self._receive(message)
+                raise ConnectionError("subscription ended")
+            except Exception as e:
+                logger.warning(f"Lost Redis job event subscription: {e}. Re-subscribing in {delay:.1f}s")
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+            while True:
+                time.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+                try:
+                    pubsub = self._subscribe_redis()
+                    logger.info("Re-subscribed to Redis job events")
+                    break
+                except Exception as e:
+                    logger.warning(f"Redis job event subscription failed: {e}. Retrying in {delay:.1f}s")
+
+    def _receive(self, message: Dict[str, Any]) -> None:
+        try:
+            payload = json.loads(message["data"])
+            if payload.get("origin") == self._origin:
+                return
+            job_id = message["channel"][len(CHANNEL_PREFIX):]
+            if isinstance(job_id, bytes):
+                job_id = job_id.decode("utf-8")
+            self._deliver_local(job_id, payload["event"])
+        except Exception as e:
+            logger.warning(f"Ignoring malformed job event from Redis: {e}")
+
+
+_bus: Optional[JobEventBus] = None
+_bus_lock = threading.Lock()
+
+
+def get_job_event_bus() -> JobEventBus:
+    """Process-wide job event bus; joins Redis pub/sub when JOB_EVENTS_REDIS is set."""
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = JobEventBus()
+            if os.getenv("JOB_EVENTS_REDIS", "false").lower() == "true":
+                try:
+                    import redis
+
+                    client = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                                            decode_responses=True)
+                    client.ping()
+                    _bus.enable_redis(client)
+                except Exception as e:
+                    logger.warning(f"Redis job events not available: {e}. Using in-process events only.")
+        return _bus
@@ -1,20 +1,46 @@
 """
 Job lifecycle management with deterministic state machine.
 Implements stages, progress tracking, retries, and logging.
+
+Job state lives in a JobStore (see job_store): bounded in-memory by default,
+or Redis so that all replicas share it. Every operation loads the job,
+applies the state machine step and saves it back; each save publishes a
+progress event on the job event bus (see job_events) for streaming clients.
 """
+import os
 import uuid
 import logging
-import time
-from typing import Dict, Any, List, Optional
+import functools
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional
 from datetime import datetime
-from enum import Enum
 from dataclasses import dataclass, field
-import json
 
 from ..api.v1.schemas import JobStage, JobStatus, StageInfo, JobProgress
+from .job_events import JobEventBus, get_job_event_bus
+from .job_store import JobConflict, JobStore, create_job_store
+from .webhooks import WebhookDispatcher, get_webhook_dispatcher
 
 logger = logging.getLogger(__name__)
 
+# Most recent log entries kept per job (older entries are dropped)
+JOB_LOG_LIMIT = int(os.getenv("JOB_LOG_LIMIT", "200"))
+# Times a job update is re-applied when another replica saved the job first
+JOB_SAVE_CONFLICT_RETRIES = int(os.getenv("JOB_SAVE_CONFLICT_RETRIES", "5"))
+
+
+def _retry_on_conflict(method):
+    """Re-run a load-mutate-save operation on fresh state when its save hits JobConflict."""
+    @functools.wraps(method)
+    def wrapper(self, job_id: str, *args, **kwargs):
+        for attempt in range(JOB_SAVE_CONFLICT_RETRIES):
+            try:
+                return method(self, job_id, *args, **kwargs)
+            except JobConflict:
+                logger.debug(f"Job {job_id} changed while updating it, retrying (attempt {attempt + 1})")
+        return method(self, job_id, *args, **kwargs)
+    return wrapper
+
 
 @dataclass
 class JobState:
@@ -24,13 +50,68 @@ class JobState:
     current_stage: Optional[JobStage] = None
     progress: int = 0
     stages: Dict[JobStage, StageInfo] = field(default_factory=dict)
-    logs: List[str] = field(default_factory=list)
+    logs: Deque[str] = field(default_factory=lambda: deque(maxlen=JOB_LOG_LIMIT))
     result_id: Optional[str] = None
     error: Optional[Dict[str, Any]] = None
     created_at: datetime = field(default_factory=datetime.utcnow)
     updated_at: datetime = field(default_factory=datetime.utcnow)
     metadata: Dict[str, Any] = field(default_factory=dict)
     artifacts: Dict[str, str] = field(default_factory=dict)  # stage -> artifact_path
+    revision: int = 0  # stored version this state was read at (RedisJobStore compare-and-set)
+    
+    def __post_init__(self):
+        if not isinstance(self.logs, deque) or self.logs.maxlen != JOB_LOG_LIMIT:
+            self.logs = deque(self.logs, maxlen=JOB_LOG_LIMIT)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form, used by stores that keep jobs outside the process."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "current_stage": self.current_stage.value if self.current_stage else None,
+            "progress": self.progress,
+            "stages": [stage_info.model_dump(mode="json") for stage_info in self.stages.values()],
+            "logs": list(self.logs),
+            "result_id": self.result_id,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+            "metadata": self.metadata,
+            "artifacts": self.artifacts,
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "JobState":
+        """Rebuild a JobState from to_dict() output."""
+        stages = [StageInfo.model_validate(stage_info) for stage_info in data.get("stages", [])]
+        return cls(
+            job_id=data["job_id"],
+            status=JobStatus(data["status"]),
+            current_stage=JobStage(data["current_stage"]) if data.get("current_stage") else None,
+            progress=data.get("progress", 0),
+            stages={stage_info.stage: stage_info for stage_info in stages},
+            logs=data.get("logs", []),
+            result_id=data.get("result_id"),
+            error=data.get("error"),
+            created_at=datetime.fromisoformat(data["created_at"]),
+            updated_at=datetime.fromisoformat(data["updated_at"]),
+            metadata=data.get("metadata") or {},
+            artifacts=data.get("artifacts") or {},
+            revision=data.get("revision", 0),
+        )
+    
+    def to_event(self, message: Optional[str] = None) -> Dict[str, Any]:
+        """Progress event published when the job is saved."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status.value,
+            "step": self.current_stage.value if self.current_stage else None,
+            "progress": self.progress,
+            "result_id": self.result_id,
+            "error": self.error,
+            "message": message,
+            "timestamp": self.updated_at.isoformat(),
+        }
     
     def to_progress(self) -> JobProgress:
         """Convert to JobProgress schema."""
@@ -40,7 +121,7 @@ class JobState:
             current_step=self.current_stage,
             progress=self.progress,
             stages=[stage_info for stage_info in self.stages.values()],
-            logs=self.logs.copy(),
+            logs=list(self.logs),
             result_id=self.result_id,
             error=self.error
         )
@@ -83,12 +164,29 @@ class JobManager:
         JobStage.FAILED: 0,
     }
     
-    def __init__(self):
-        """Initialize job manager with in-memory store (use Redis/DB in production)."""
-        self.jobs: Dict[str, JobState] = {}
+    def __init__(
+        self,
+        store: Optional[JobStore] = None,
+        events: Optional[JobEventBus] = None,
+        webhooks: Optional[WebhookDispatcher] = None
+    ):
+        """Initialize job manager on ``store`` (default: selected by JOB_STORE_BACKEND)."""
+        self.store = store if store is not None else create_job_store()
+        self.events = events if events is not None else get_job_event_bus()
+        self.webhooks = webhooks if webhooks is not None else get_webhook_dispatcher()
         self.max_retries = 3
         self.retry_delays = [1, 2, 5]  # Exponential backoff in seconds
     
+    @property
+    def jobs(self) -> JobStore:
+        """Job lookup by id (``job_id in jobs``, ``jobs[job_id]``)."""
+        return self.store
+    
+    def _save(self, job: JobState, message: Optional[str] = None) -> None:
+        """Persist ``job`` and publish its progress to subscribers."""
+        self.store.save(job)
+        self.events.publish(job.job_id, job.to_event(message))
+    
     def create_job(
         self,
         metadata: Optional[Dict[str, Any]] = None,
@@ -113,10 +211,11 @@ class JobManager:
             progress=0
         )
         
-        self.jobs[job_id] = job_state
+        self._save(job_state, "Job created")
         logger.info(f"Created job {job_id}")
         return job_id
     
+    @_retry_on_conflict
     def transition_stage(
         self,
         job_id: str,
@@ -128,11 +227,13 @@ class JobManager:
         Transition job to a new stage.
         Returns True if transition is valid, False otherwise.
         """
-        if job_id not in self.jobs:
+        job = self.store.get(job_id)
+        if job is None:
             logger.error(f"Job {job_id} not found")
             return False
+        if job.status == JobStatus.CANCELLED:
+            return False
         
-        job = self.jobs[job_id]
         current_stage = job.current_stage
         
         # Validate transition
@@ -179,10 +280,12 @@ class JobManager:
         if message:
             log_msg += f": {message}"
         job.logs.append(f"[{datetime.utcnow().isoformat()}] {log_msg}")
+        self._save(job, log_msg)
         logger.info(f"Job {job_id}: {log_msg}")
         
         return True
     
+    @_retry_on_conflict
     def update_stage_progress(
         self,
         job_id: str,
@@ -190,10 +293,10 @@ class JobManager:
         message: Optional[str] = None
     ):
         """Update progress within current stage."""
-        if job_id not in self.jobs:
+        job = self.store.get(job_id)
+        if job is None:
             return
         
-        job = self.jobs[job_id]
         if job.current_stage and job.current_stage in job.stages:
             job.stages[job.current_stage].progress = max(0, min(100, progress))
             job.progress = max(
@@ -204,17 +307,20 @@ class JobManager:
             
             if message:
                 job.logs.append(f"[{datetime.utcnow().isoformat()}] {message}")
+            self._save(job, message)
     
+    @_retry_on_conflict
     def add_log(self, job_id: str, message: str, level: str = "info"):
         """Add log entry to job."""
-        if job_id not in self.jobs:
+        job = self.store.get(job_id)
+        if job is None:
             return
         
-        job = self.jobs[job_id]
         timestamp = datetime.utcnow().isoformat()
         log_entry = f"[{timestamp}] [{level.upper()}] {message}"
         job.logs.append(log_entry)
         job.updated_at = datetime.utcnow()
+        self._save(job, message)
         
         # Also log to logger
         if level == "error":
@@ -224,6 +330,7 @@ class JobManager:
         else:
             logger.info(f"Job {job_id}: {message}")
     
+    @_retry_on_conflict
     def mark_failed(
         self,
         job_id: str,
@@ -232,10 +339,10 @@ class JobManager:
         retriable: bool = False
     ):
         """Mark job as failed with error information."""
-        if job_id not in self.jobs:
+        job = self.store.get(job_id)
+        if job is None:
             return
         
-        job = self.jobs[job_id]
         job.status = JobStatus.FAILED
         job.current_stage = JobStage.FAILED
         job.error = {
@@ -249,24 +356,54 @@ class JobManager:
         if job.current_stage and job.current_stage in job.stages:
             job.stages[job.current_stage].end_timestamp = datetime.utcnow()
             job.stages[job.current_stage].error = error_message
+        self._save(job, error_message)
         
         self.add_log(job_id, f"Job failed: {error_message}", "error")
+        self.webhooks.job_finished(job_id, JobStatus.FAILED.value, tenant_id=job.metadata.get("tenant_id"),
+                                   error=error_message)
+    
+    @_retry_on_conflict
+    def mark_cancelled(self, job_id: str, message: str = "Job cancelled by client") -> bool:
+        """Mark an unfinished job cancelled; its pipeline stops at the next check. False if already finished."""
+        job = self.store.get(job_id)
+        if job is None or job.status in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED):
+            return False
+        
+        job.status = JobStatus.CANCELLED
+        job.error = {"code": "cancelled", "message": message, "retriable": False}
+        job.updated_at = datetime.utcnow()
+        if job.current_stage and job.current_stage in job.stages:
+            job.stages[job.current_stage].end_timestamp = datetime.utcnow()
+        job.logs.append(f"[{datetime.utcnow().isoformat()}] {message}")
+        self._save(job, message)
+        logger.info(f"Job {job_id}: {message}")
+        return True
+    
+    def is_cancelled(self, job_id: str) -> bool:
+        job = self.store.get(job_id)
+        return job is not None and job.status == JobStatus.CANCELLED
     
+    @_retry_on_conflict
     def mark_completed(self, job_id: str, result_id: str):
         """Mark job as completed with result_id."""
-        if job_id not in self.jobs:
+        job = self.store.get(job_id)
+        if job is None:
             return
         
-        job = self.jobs[job_id]
         job.status = JobStatus.COMPLETED
         job.result_id = result_id
         job.updated_at = datetime.utcnow()
+        self.store.save(job)
         
-        self.transition_stage(job_id, JobStage.COMPLETED, "Job completed successfully")
+        # The transition publishes the completion; publish it here only if the transition is refused
+        if not self.transition_stage(job_id, JobStage.COMPLETED, "Job completed successfully"):
+            self._save(job, "Job completed")
+        self.webhooks.job_finished(job_id, JobStatus.COMPLETED.value, tenant_id=job.metadata.get("tenant_id"),
+                                   result_id=result_id)
     
     def get_job(self, job_id: str) -> Optional[JobState]:
         """Get job state."""
-        return self.jobs.get(job_id)
+        return self.store.get(job_id)
     
     def get_job_progress(self, job_id: str) -> Optional[JobProgress]:
         """Get job progress in schema format."""
@@ -290,6 +427,7 @@ class JobManager:
         
         return stage_info.retry_count < self.max_retries
     
+    @_retry_on_conflict
     def increment_retry(self, job_id: str):
         """Increment retry count for current stage."""
         job = self.get_job(job_id)
@@ -299,6 +437,7 @@ class JobManager:
         stage_info = job.stages.get(job.current_stage)
         if stage_info:
             stage_info.retry_count += 1
+            self._save(job)
             self.add_log(job_id, f"Retry attempt {stage_info.retry_count}/{self.max_retries}")
     
     def get_retry_delay(self, job_id: str) -> int:
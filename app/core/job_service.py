@@ -4,20 +4,34 @@ import uuid
 from typing import Optional, Dict, Any
 from datetime import datetime
 from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy import and_
 
 from ..db.models import Job, Result, JobStatus
+from ..metrics.metrics import get_metrics_collector
 from ..storage import get_storage
+from .job_events import get_job_event_bus
+from .progress_buffer import ProgressBuffer, TERMINAL_STATUSES, get_progress_buffer
+from .result_registry import ResultRegistry, get_result_registry, result_record
+from .webhooks import get_webhook_dispatcher
 
 logger = logging.getLogger(__name__)
+metrics = get_metrics_collector()
 
 
 class JobService:
     """Service for managing jobs and results in the database."""
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        progress_buffer: Optional[ProgressBuffer] = None,
+        result_registry: Optional[ResultRegistry] = None
+    ):
         self.db = db
         self.storage = get_storage()
+        self.progress = progress_buffer or get_progress_buffer()
+        self.results = result_registry if result_registry is not None else get_result_registry()
     
     def create_job(
         self,
@@ -65,8 +79,11 @@ class JobService:
         return job
     
     def get_job(self, job_id: str) -> Optional[Job]:
-        """Get job by ID."""
-        return self.db.query(Job).filter(Job.id == job_id).first()
+        """Get job by ID (buffered progress for the job is written first)."""
+        query = self.db.query(Job).filter(Job.id == job_id)
+        if self.progress.flush(job_id):
+            query = query.populate_existing()
+        return query.first()
     
     def update_job_status(
         self,
@@ -76,26 +93,67 @@ class JobService:
         stage: Optional[str] = None,
         error: Optional[str] = None
     ) -> Optional[Job]:
-        """Update job status and progress."""
-        job = self.get_job(job_id)
-        if not job:
-            return None
+        """
+        Update job status and progress.
         
+        Progress ticks are written behind: they go to the progress buffer,
+        which coalesces the updates of a job and writes them a moment later.
+        The returned job already shows them, but they are not flushed by this
+        session. Terminal states and errors are written at once, together
+        with any progress still buffered for the job. Either way the change
+        is published on the job event bus; completion and failure also go
+        to the job's webhook subscribers.
+        """
+        fields: Dict[str, Any] = {"updated_at": datetime.utcnow()}
         if status is not None:
-            job.status = status
+            fields["status"] = status
         if progress is not None:
-            job.progress = str(progress)
+            fields["progress"] = str(progress)
         if stage is not None:
-            job.stage = stage
+            fields["stage"] = stage
         if error is not None:
-            job.error = error
+            fields["error"] = error
         
-        job.updated_at = datetime.utcnow()
-        self.db.commit()
-        self.db.refresh(job)
+        # Served from the session's identity map after the first tick
+        job = self.db.get(Job, job_id)
+        if not job:
+            return None
         
+        if status not in TERMINAL_STATUSES and error is None:
+            self.progress.add(self.db.get_bind(), job_id, fields)
+            for name, value in fields.items():
+                set_committed_value(job, name, value)
+        else:
+            metrics.record_progress_update(self.progress.name, "immediate")
+            fields = {**self.progress.take(job_id), **fields}
+            for name, value in fields.items():
+                setattr(job, name, value)
+            self.db.commit()
+            self.db.refresh(job)
+            if status in (JobStatus.COMPLETED.value, JobStatus.FAILED.value):
+                self._notify_finished(job)
+        
+        # Wakes long-polling status requests waiting on this job
+        get_job_event_bus().publish(job_id, {
+            "job_id": job_id,
+            "status": job.status,
+            "progress": int(job.progress or "0"),
+            "stage": job.stage,
+        })
         return job
     
+    def _notify_finished(self, job: Job) -> None:
+        """Queue webhook deliveries for a job that just completed or failed."""
+        result = self.get_result_record_by_job_id(job.id) if job.status == JobStatus.COMPLETED.value else None
+        get_webhook_dispatcher().job_finished(
+            job.id,
+            job.status,
+            tenant_id=(job.job_metadata or {}).get("tenant_id"),
+            result_id=result["result_id"] if result else None,
+            error=job.error,
+            db=self.db
+        )
+    
     def increment_attempts(self, job_id: str) -> Optional[Job]:
         """Increment retry attempts."""
         job = self.get_job(job_id)
@@ -154,6 +212,7 @@ class JobService:
         self.db.add(result)
         self.db.commit()
         self.db.refresh(result)
+        self.results.put(result_record(result))
         
         # Update job to completed
         self.update_job_status(job_id, status=JobStatus.COMPLETED.value, progress=100, stage="completed")
@@ -169,6 +228,20 @@ class JobService:
         """Get result by ID."""
         return self.db.query(Result).filter(Result.id == result_id).first()
     
+    def get_result_record(self, result_id: str) -> Optional[Dict[str, Any]]:
+        """Result record by ID from the result registry, loaded from the database on a miss."""
+        def load(key: str) -> Optional[Dict[str, Any]]:
+            result = self.get_result(key)
+            return result_record(result) if result else None
+        return self.results.get(result_id, loader=load)
+    
+    def get_result_record_by_job_id(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Result record by job ID from the result registry, loaded from the database on a miss."""
+        def load(key: str) -> Optional[Dict[str, Any]]:
+            result = self.get_result_by_job_id(key)
+            return result_record(result) if result else None
+        return self.results.get_by_job(job_id, loader=load)
+    
     def list_jobs(
         self,
         status: Optional[str] = None,
@@ -0,0 +1,211 @@
+"""
+Storage backends for JobManager job state.
+
+JobManager reads a job, applies a state machine step and saves it back; the
+store decides where job state lives and how long:
+
+- InMemoryJobStore: process-local, O(1) lookups, bounded to ``max_jobs``
+  (least recently used jobs are evicted first) and expiring jobs that were
+  not updated for ``ttl_seconds``;
+- RedisJobStore: one JSON document per job with a Redis TTL, so every API
+  replica and worker sees the same jobs and stale ones expire server-side.
+  Saves are compare-and-set on the job's ``revision``: a save based on a
+  stale read raises JobConflict, and JobManager re-reads and re-applies.
+
+create_job_store() picks the backend from JOB_STORE_BACKEND ("memory", the
+default, or "redis") and falls back to memory when Redis is unreachable.
+Per-job logs are capped by JobState itself (JOB_LOG_LIMIT entries), so a
+stored job has a bounded size on either backend.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .job_manager import JobState
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_JOBS = int(os.getenv("JOB_STORE_MAX_JOBS", "10000"))
+DEFAULT_TTL_SECONDS = int(os.getenv("JOB_STORE_TTL_SECONDS", "86400"))
+
+
+class JobConflict(Exception):
+    """Raised by save() when the job was saved by someone else since it was read."""
+
+    def __init__(self, job_id: str):
+        super().__init__(f"Job {job_id} was modified concurrently")
+        self.job_id = job_id
+
+
+class JobStore(ABC):
+    """Keyed storage of JobState objects."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional["JobState"]:
+        """Return the job, or None if it is unknown or expired."""
+        pass
+
+    @abstractmethod
+    def save(self, job: "JobState") -> None:
+        """Store ``job`` (insert or replace) and restart its TTL."""
+        pass
+
+    @abstractmethod
+    def delete(self, job_id: str) -> bool:
+        """Remove a job. Returns True if it existed."""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    def __contains__(self, job_id: object) -> bool:
+        return isinstance(job_id, str) and self.get(job_id) is not None
+
+    def __getitem__(self, job_id: str) -> "JobState":
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+
+class InMemoryJobStore(JobStore):
+    """Process-local job store bounded by an LRU size limit and a TTL."""
+
+    def __init__(
+        self,
+        max_jobs: int = DEFAULT_MAX_JOBS,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # job_id -> (job, expires_at); order is least to most recently used
+        self._jobs: "OrderedDict[str, Tuple[JobState, float]]" = OrderedDict()
+
+    def get(self, job_id: str) -> Optional["JobState"]:
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None:
+                return None
+            if entry[1] <= self._clock():
+                del self._jobs[job_id]
+                return None
+            self._jobs.move_to_end(job_id)
+            return entry[0]
+
+    def save(self, job: "JobState") -> None:
+        with self._lock:
+            now = self._clock()
+            self._jobs[job.job_id] = (job, now + self.ttl_seconds)
+            self._jobs.move_to_end(job.job_id)
+            self._evict_locked(now)
+
+    def _evict_locked(self, now: float) -> None:
+        # Expired jobs sit at the LRU end unless they were read recently; drop
+        # them from there, then enforce the size limit
+        while self._jobs:
+            job_id, (_, expires_at) = next(iter(self._jobs.items()))
+            if expires_at > now and len(self._jobs) <= self.max_jobs:
+                break
+            del self._jobs[job_id]
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            return self._jobs.pop(job_id, None) is not None
+
+    def purge_expired(self) -> int:
+        """Drop every expired job; returns how many were removed."""
+        with self._lock:
+            now = self._clock()
+            expired = [job_id for job_id, (_, expires_at) in self._jobs.items() if expires_at <= now]
+            for job_id in expired:
+                del self._jobs[job_id]
+            return len(expired)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+
+class RedisJobStore(JobStore):
+    """Job store shared through Redis: one JSON value per job with a TTL."""
+
+    def __init__(self, client, ttl_seconds: int = DEFAULT_TTL_SECONDS, prefix: str = "finscribe:job:"):
+        self.client = client
+        self.ttl_seconds = int(ttl_seconds)
+        self.prefix = prefix
+
+    def _key(self, job_id: str) -> str:
+        return f"{self.prefix}{job_id}"
+
+    def get(self, job_id: str) -> Optional["JobState"]:
+        from .job_manager import JobState
+
+        raw = self.client.get(self._key(job_id))
+        if raw is None:
+            return None
+        try:
+            return JobState.from_dict(json.loads(raw))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Corrupt job state for {job_id} in Redis: {str(e)}")
+            return None
+
+    @staticmethod
+    def _revision(raw: Optional[str]) -> int:
+        try:
+            return int(json.loads(raw).get("revision", 0)) if raw is not None else 0
+        except (ValueError, TypeError, AttributeError):
+            return -1  # corrupt: never matches, get() treats the job as missing
+
+    def save(self, job: "JobState") -> None:
+        """Store ``job`` if the stored revision is still the one it was read at; JobConflict otherwise."""
+        import redis
+
+        key = self._key(job.job_id)
+        document = job.to_dict()
+        document["revision"] = job.revision + 1
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                if self._revision(pipe.get(key)) != job.revision:
+                    raise JobConflict(job.job_id)
+                pipe.multi()
+                pipe.set(key, json.dumps(document), ex=self.ttl_seconds)
+                pipe.execute()
+            except redis.WatchError:
+                raise JobConflict(job.job_id)
+        job.revision += 1
+
+    def delete(self, job_id: str) -> bool:
+        return bool(self.client.delete(self._key(job_id)))
+
+    def __contains__(self, job_id: object) -> bool:
+        return isinstance(job_id, str) and bool(self.client.exists(self._key(job_id)))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=f"{self.prefix}*"))
+
+
+def create_job_store(backend: Optional[str] = None) -> JobStore:
+    """Job store selected by JOB_STORE_BACKEND; Redis falls back to memory when unavailable."""
+    backend = (backend or os.getenv("JOB_STORE_BACKEND", "memory")).lower()
+    if backend == "redis":
+        try:
+            import redis
+
+            client = redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True)
+            client.ping()
+            logger.info("Using Redis job store")
+            return RedisJobStore(client)
+        except Exception as e:
+            logger.warning(f"Redis job store not available: {e}. Falling back to in-memory job store.")
+    return InMemoryJobStore()
@@ -6,6 +6,9 @@ from typing import Dict, Any, Optional
 from abc import ABC, abstractmethod
 import logging
 
+from ..http_session import http_session
+from ..deadline import backoff, call_timeout, observe_stage
+
 try:
     from .huggingface_helper import HuggingFaceHelper
 except ImportError:
@@ -257,17 +260,18 @@ Return a JSON object with this exact structure:
         for attempt in range(self.max_retries):
             try:
                 start_time = time.time()
-                async with aiohttp.ClientSession() as session:
+                async with http_session() as session:
                     try:
                         async with session.post(
                             f"{self.server_url}/chat/completions",
                             json=payload,
                             headers={"Content-Type": "application/json"},
-                            timeout=aiohttp.ClientTimeout(total=self.timeout)
+                            timeout=aiohttp.ClientTimeout(total=call_timeout(self.timeout, "vlm_call"))
                         ) as response:
                             latency_ms = (time.time() - start_time) * 1000
                             
                             if response.status == 200:
+                                observe_stage("vlm_call", latency_ms / 1000)
                                 try:
                                     result = await response.json()
                                     
@@ -326,7 +330,7 @@ Return a JSON object with this exact structure:
                                 # Rate limit - retry with exponential backoff
                                 wait_time = 2 ** attempt
                                 logger.warning(f"Rate limited, waiting {wait_time}s before retry {attempt + 1}/{self.max_retries}")
-                                await asyncio.sleep(wait_time)
+                                await backoff(wait_time, "vlm_call")
                                 last_exception = Exception(f"Rate limit exceeded (HTTP 429)")
                                 continue
                             elif response.status >= 500:
@@ -334,7 +338,7 @@ Return a JSON object with this exact structure:
                                 error_text = await response.text()
                                 logger.warning(f"Server error {response.status}: {error_text}. Retry {attempt + 1}/{self.max_retries}")
                                 if attempt < self.max_retries - 1:
-                                    await asyncio.sleep(2 ** attempt)
+                                    await backoff(2 ** attempt, "vlm_call")
                                     last_exception = Exception(f"Server error {response.status}: {error_text}")
                                     continue
                                 else:
@@ -348,7 +352,7 @@ Return a JSON object with this exact structure:
                     except asyncio.TimeoutError:
                         logger.warning(f"Request timeout (attempt {attempt + 1}/{self.max_retries})")
                         if attempt < self.max_retries - 1:
-                            await asyncio.sleep(2 ** attempt)
+                            await backoff(2 ** attempt, "vlm_call")
                             last_exception = asyncio.TimeoutError(f"Request timeout after {self.timeout}s")
                             continue
                         else:
@@ -357,7 +361,7 @@ Return a JSON object with this exact structure:
             except aiohttp.ClientError as e:
                 logger.warning(f"Network error calling ERNIE VLM (attempt {attempt + 1}/{self.max_retries}): {str(e)}")
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+                    await backoff(2 ** attempt, "vlm_call")
                     last_exception = e
                     continue
                 else:
@@ -541,13 +545,13 @@ Return a detailed JSON comparison analysis."""
         for attempt in range(self.max_retries):
             try:
                 start_time = time.time()
-                async with aiohttp.ClientSession() as session:
+                async with http_session() as session:
                     try:
                         async with session.post(
                             f"{self.server_url}/chat/completions",
                             json=payload,
                             headers={"Content-Type": "application/json"},
-                            timeout=aiohttp.ClientTimeout(total=self.timeout * 2)  # Longer timeout for comparison
+                            timeout=aiohttp.ClientTimeout(total=call_timeout(self.timeout * 2, "vlm_call"))  # Longer timeout for comparison
                         ) as response:
                             latency_ms = (time.time() - start_time) * 1000
                             
@@ -611,14 +615,14 @@ Return a detailed JSON comparison analysis."""
                             elif response.status == 429:
                                 wait_time = 2 ** attempt
                                 logger.warning(f"Rate limited during comparison, waiting {wait_time}s before retry {attempt + 1}/{self.max_retries}")
-                                await asyncio.sleep(wait_time)
+                                await backoff(wait_time, "vlm_call")
                                 last_exception = Exception(f"Rate limit exceeded (HTTP 429)")
                                 continue
                             elif response.status >= 500:
                                 error_text = await response.text()
                                 logger.warning(f"Server error {response.status} during comparison: {error_text}. Retry {attempt + 1}/{self.max_retries}")
                                 if attempt < self.max_retries - 1:
-                                    await asyncio.sleep(2 ** attempt)
+                                    await backoff(2 ** attempt, "vlm_call")
                                     last_exception = Exception(f"Server error {response.status}: {error_text}")
                                     continue
                                 else:
@@ -631,7 +635,7 @@ Return a detailed JSON comparison analysis."""
                     except asyncio.TimeoutError:
                         logger.warning(f"Comparison request timeout (attempt {attempt + 1}/{self.max_retries})")
                         if attempt < self.max_retries - 1:
-                            await asyncio.sleep(2 ** attempt)
+                            await backoff(2 ** attempt, "vlm_call")
                             last_exception = asyncio.TimeoutError(f"Request timeout after {self.timeout * 2}s")
                             continue
                         else:
@@ -640,7 +644,7 @@ Return a detailed JSON comparison analysis."""
             except aiohttp.ClientError as e:
                 logger.warning(f"Network error calling ERNIE VLM for comparison (attempt {attempt + 1}/{self.max_retries}): {str(e)}")
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+                    await backoff(2 ** attempt, "vlm_call")
                     last_exception = e
                     continue
                 else:
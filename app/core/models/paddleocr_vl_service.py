@@ -29,6 +29,8 @@ from .paddleocr_prompts import (
     TABLE_RECOGNITION_PROMPT,
 )
 from .semantic_layout import SemanticLayoutAnalyzer, SemanticLayoutResult
+from ..http_session import http_session
+from ..deadline import backoff, call_timeout, observe_stage
 
 logger = logging.getLogger(__name__)
 
@@ -181,17 +183,18 @@ class PaddleOCRVLClient(OCRClientBase):
         for attempt in range(self.max_retries):
             try:
                 start_time = time.time()
-                async with aiohttp.ClientSession() as session:
+                async with http_session() as session:
                     try:
                         async with session.post(
                             f"{self.server_url}/chat/completions",
                             json=payload,
                             headers={"Content-Type": "application/json"},
-                            timeout=aiohttp.ClientTimeout(total=self.timeout)
+                            timeout=aiohttp.ClientTimeout(total=call_timeout(self.timeout, "ocr_call"))
                         ) as response:
                             latency_ms = (time.time() - start_time) * 1000
                             
                             if response.status == 200:
+                                observe_stage("ocr_call", latency_ms / 1000)
                                 try:
                                     result = await response.json()
                                     
@@ -226,7 +229,7 @@ class PaddleOCRVLClient(OCRClientBase):
                                 # Rate limit - retry with exponential backoff
                                 wait_time = 2 ** attempt
                                 logger.warning(f"Rate limited, waiting {wait_time}s before retry {attempt + 1}/{self.max_retries}")
-                                await asyncio.sleep(wait_time)
+                                await backoff(wait_time, "ocr_call")
                                 last_exception = Exception(f"Rate limit exceeded (HTTP 429)")
                                 continue
                             elif response.status >= 500:
@@ -234,7 +237,7 @@ class PaddleOCRVLClient(OCRClientBase):
                                 error_text = await response.text()
                                 logger.warning(f"Server error {response.status}: {error_text}. Retry {attempt + 1}/{self.max_retries}")
                                 if attempt < self.max_retries - 1:
-                                    await asyncio.sleep(2 ** attempt)
+                                    await backoff(2 ** attempt, "ocr_call")
                                     last_exception = Exception(f"Server error {response.status}: {error_text}")
                                     continue
                                 else:
@@ -248,7 +251,7 @@ class PaddleOCRVLClient(OCRClientBase):
                     except asyncio.TimeoutError:
                         logger.warning(f"Request timeout (attempt {attempt + 1}/{self.max_retries})")
                         if attempt < self.max_retries - 1:
-                            await asyncio.sleep(2 ** attempt)
+                            await backoff(2 ** attempt, "ocr_call")
                             last_exception = asyncio.TimeoutError(f"Request timeout after {self.timeout}s")
                             continue
                         else:
@@ -257,7 +260,7 @@ class PaddleOCRVLClient(OCRClientBase):
             except aiohttp.ClientError as e:
                 logger.warning(f"Network error calling PaddleOCR-VL (attempt {attempt + 1}/{self.max_retries}): {str(e)}")
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+                    await backoff(2 ** attempt, "ocr_call")
                     last_exception = e
                     continue
                 else:
@@ -0,0 +1,27 @@
+"""
+Cheap PDF page counting.
+
+Documents are sized before any work is done on them: the admission queue
+prices them (cost_estimator) and the worker picks the fast lane for single
+pages. Both count pages here, from the raw bytes without parsing the PDF, so
+they agree on every document:
+
+- the page tree's /Count when it can be read (the largest one: nested page
+  trees count their own subtrees);
+- otherwise the number of /Type /Page objects.
+
+PDFs whose page tree sits in compressed object streams show neither; they
+count as 0 (unknown).
+"""
+import re
+
+_PAGE_OBJECT = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+_PAGE_TREE_COUNT = re.compile(rb"/Type\s*/Pages\b[^>]*?/Count\s+(\d+)|/Count\s+(\d+)[^>]*?/Type\s*/Pages\b")
+
+
+def pdf_page_count(content: bytes) -> int:
+    """Pages of a PDF without parsing it: the page tree's /Count, else the page objects (0 if unknown)."""
+    counts = [int(a or b) for a, b in _PAGE_TREE_COUNT.findall(content)]
+    if counts:
+        return max(counts)
+    return len(_PAGE_OBJECT.findall(content))
@@ -14,6 +14,9 @@ from dataclasses import dataclass, asdict
 from decimal import Decimal, ROUND_HALF_UP
 import logging
 
+from finscribe.parsing import DocumentDateParser, parse_amount_float
+from finscribe.statement_stream import StreamingStatementParser
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -142,6 +145,9 @@ class FinancialDocumentPostProcessor:
         """
         logger.info("Starting financial document processing pipeline")
         
+        if ocr_results.get('document_type') == 'bank_statement' and 'pages' in ocr_results:
+            return self.process_bank_statement(ocr_results)
+        
         try:
             # 1. Parse OCR results into structured elements
             text_elements = self._parse_ocr_results(ocr_results)
@@ -445,6 +451,7 @@ class FinancialDocumentPostProcessor:
         
         # Look for date patterns
         date_pattern = r'\b(\d{1,2}[-/]\d{1,2}[-/]\d{2,4}|\d{4}[-/]\d{1,2}[-/]\d{1,2})\b'
+        date_parser = DocumentDateParser(self.date_formats)
         
         for elem in region.elements:
             text = elem.text.lower()
@@ -458,16 +465,11 @@ class FinancialDocumentPostProcessor:
             # Check for dates
             date_match = re.search(date_pattern, elem.text)
             if date_match:
-                date_str = date_match.group(1)
-                # Parse and categorize date
-                for date_format in self.date_formats:
-                    try:
-                        parsed_date = datetime.strptime(date_str, date_format)
-                        date_key = 'invoice_date' if 'date' in text else 'due_date' if 'due' in text else 'date'
-                        client_data['dates'][date_key] = parsed_date.strftime('%Y-%m-%d')
-                        break
-                    except ValueError:
-                        continue
+                # Parse (single attempt once the page's format is known) and categorize date
+                parsed_date = date_parser.parse(date_match.group(1))
+                if parsed_date:
+                    date_key = 'invoice_date' if 'date' in text else 'due_date' if 'due' in text else 'date'
+                    client_data['dates'][date_key] = parsed_date.strftime('%Y-%m-%d')
             
             # Client name might be a longer text not matching other patterns
             if len(elem.text) > 3 and not elem.is_numeric and not date_match:
@@ -516,20 +518,9 @@ class FinancialDocumentPostProcessor:
                     
                     # Clean and parse values
                     if elem.is_numeric:
-                        # Extract numeric value
-                        clean_text = re.sub(r'[^\d\.,\-]', '', elem.text)
-                        try:
-                            # Handle different decimal separators
-                            if ',' in clean_text and '.' in clean_text:
-                                # 1.234,56 format
-                                clean_text = clean_text.replace('.', '').replace(',', '.')
-                            elif ',' in clean_text:
-                                # European format
-                                clean_text = clean_text.replace(',', '.')
-                            
-                            item[header] = float(clean_text)
-                        except ValueError:
-                            item[header] = elem.text
+                        # Extract numeric value (separators inferred per value)
+                        value = parse_amount_float(elem.text, default=None)
+                        item[header] = value if value is not None else elem.text
                     else:
                         item[header] = elem.text
                 
@@ -637,29 +628,7 @@ class FinancialDocumentPostProcessor:
     
     def _extract_numeric_value(self, text: str) -> float:
         """Extract numeric value from text, handling currency symbols and separators"""
-        # Remove currency symbols and extra characters
-        clean = re.sub(r'[^\d\.,\-]', '', text)
-        
-        if not clean:
-            return 0.0
-        
-        # Handle different decimal separators
-        if ',' in clean and '.' in clean:
-            # Format like 1.234,56
-            clean = clean.replace('.', '').replace(',', '.')
-        elif ',' in clean:
-            # European format or thousand separator
-            if clean.count(',') == 1 and len(clean.split(',')[-1]) == 2:
-                # Probably decimal comma
-                clean = clean.replace(',', '.')
-            else:
-                # Probably thousand separator
-                clean = clean.replace(',', '')
-        
-        try:
-            return float(clean)
-        except ValueError:
-            return 0.0
+        return parse_amount_float(text)
     
     def _validate_financial_data(self, data: Dict) -> Dict:
         """
@@ -873,6 +842,64 @@ class FinancialDocumentPostProcessor:
             'version': '1.0'
         }
     
+    def iter_statement_transactions(self, pages, parser: Optional[StreamingStatementParser] = None):
+        """
+        Yield bank-statement transactions page by page.
+        
+        Args:
+            pages: Iterable (possibly lazy) of {'page_number', 'elements'} pages
+                   in the 'pages' OCR format
+            parser: Parser carrying the running balance; a new one if omitted
+        """
+        parser = parser or StreamingStatementParser(
+            tolerance=Decimal(str(self.config.get('numeric_tolerance', 0.01))),
+            bbox_format='xyxy',
+        )
+        min_confidence = self.config.get('min_confidence', 0.0)
+        for page in pages:
+            elements = (
+                element for element in page.get('elements', [])
+                if element.get('confidence', 1.0) >= min_confidence
+            )
+            yield from parser.feed_page(elements, page.get('page_number'))
+    
+    def process_bank_statement(self, ocr_results: Dict) -> Dict:
+        """Parse a multi-page bank statement with a running-balance check"""
+        try:
+            parser = StreamingStatementParser(
+                tolerance=Decimal(str(self.config.get('numeric_tolerance', 0.01))),
+                bbox_format='xyxy',
+            )
+            transactions = list(self.iter_statement_transactions(ocr_results.get('pages', []), parser))
+            summary = parser.finish()
+        except Exception as e:
+            logger.error(f"Error processing bank statement: {e}", exc_info=True)
+            return self._create_error_output(str(e))
+        
+        errors = [
+            f"Balance mismatch on page {m['page']}: expected {m['expected_balance']:.2f}, "
+            f"printed {m['printed_balance']:.2f}"
+            for m in summary['mismatches']
+        ]
+        return {
+            'success': True,
+            'timestamp': datetime.now().isoformat(),
+            'data': {
+                'document_type': 'bank_statement',
+                'transactions': transactions,
+                'statement_summary': summary,
+            },
+            'validation': {
+                'is_valid': summary['balance_ok'],
+                'errors': errors,
+                'warnings': [],
+                'confidence_scores': {},
+                'overall_confidence': 1.0 if summary['balance_ok'] else 0.5,
+            },
+            'metadata': ocr_results.get('metadata', {}),
+            'version': '1.0'
+        }
+    
     def process_ocr_output(self, ocr_results: Dict) -> Dict:
         """Public interface for processing OCR results"""
         return self.extract_financial_structure(ocr_results)
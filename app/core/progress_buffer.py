@@ -0,0 +1,194 @@
+"""
+Write-behind buffer for job progress updates.
+
+A document run reports progress many times (staging, OCR, each pipeline
+stage...), and writing every tick with its own query/commit/refresh puts
+dozens of synchronous round trips per job on the connection pool.
+ProgressBuffer keeps the latest fields per job in memory instead and writes
+them behind:
+
+- updates to the same job within ``window_seconds`` (PROGRESS_FLUSH_INTERVAL,
+  default 0.5s) coalesce into one UPDATE;
+- a flusher thread writes every job whose first pending update is older
+  than the window, all jobs of one database in a single transaction;
+- take() hands pending fields to a caller that writes the job itself
+  (JobService does this for terminal states, which are never buffered) and
+  flush() writes one or all jobs right away (reads and shutdown).
+
+Buffered writes never touch a job that already reached a terminal state, so
+a late flush cannot overwrite completed/failed/cancelled. Flush latency
+(first buffered update to commit) and the updates-per-write coalescing
+ratio are exported as Prometheus metrics and in stats().
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..db.models import Job, JobStatus
+from ..metrics.metrics import get_metrics_collector
+
+logger = logging.getLogger(__name__)
+metrics = get_metrics_collector()
+
+DEFAULT_WINDOW_SECONDS = float(os.getenv("PROGRESS_FLUSH_INTERVAL", "0.5"))
+
+TERMINAL_STATUSES = frozenset({
+    JobStatus.COMPLETED.value,
+    JobStatus.FAILED.value,
+    JobStatus.CANCELLED.value,
+})
+
+
+class _Pending:
+    """Coalesced, not yet written fields of one job."""
+
+    __slots__ = ("bind", "fields", "first_at", "updates")
+
+    def __init__(self, bind: Any):
+        self.bind = bind
+        self.fields: Dict[str, Any] = {}
+        self.first_at = time.monotonic()
+        self.updates = 0
+
+
+class ProgressBuffer:
+    """Per-job coalescing of non-terminal job updates, written behind by a flusher thread."""
+
+    def __init__(self, window_seconds: float = DEFAULT_WINDOW_SECONDS, name: str = "jobs"):
+        self.window_seconds = window_seconds
+        self.name = name
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending: Dict[str, _Pending] = {}
+        self._updates = 0
+        self._writes = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def add(self, bind: Any, job_id: str, fields: Dict[str, Any]) -> None:
+        """Buffer ``fields`` for ``job_id`` on the database behind ``bind`` (an engine or connection)."""
+        with self._lock:
+            entry = self._pending.get(job_id)
+            if entry is None:
+                entry = self._pending[job_id] = _Pending(bind)
+            entry.fields.update(fields)
+            entry.updates += 1
+            self._updates += 1
+            if self._thread is None and not self._stopping:
+                self._thread = threading.Thread(target=self._run, name=f"progress-{self.name}", daemon=True)
+                self._thread.start()
+        metrics.record_progress_update(self.name, "buffered")
+
+    def take(self, job_id: str) -> Dict[str, Any]:
+        """Remove and return the pending fields of ``job_id`` (empty if none) for the caller to write."""
+        with self._lock:
+            entry = self._pending.pop(job_id, None)
+            if entry is None:
+                return {}
+            self._writes += 1
+        metrics.record_progress_flush(self.name, time.monotonic() - entry.first_at)
+        return entry.fields
+
+    def has_pending(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._pending
+
+    def flush(self, job_id: Optional[str] = None) -> int:
+        """Write the pending fields of ``job_id`` (or of every job) now; returns jobs written."""
+        with self._lock:
+            if job_id is None:
+                entries = list(self._pending.items())
+                self._pending.clear()
+            elif job_id in self._pending:
+                entries = [(job_id, self._pending.pop(job_id))]
+            else:
+                entries = []
+        return self._write(entries)
+
+    def _flush_due(self) -> int:
+        deadline = time.monotonic() - self.window_seconds
+        with self._lock:
+            due = [job_id for job_id, entry in self._pending.items() if entry.first_at <= deadline]
+            entries = [(job_id, self._pending.pop(job_id)) for job_id in due]
+        return self._write(entries)
+
+    def _write(self, entries: List[Tuple[str, _Pending]]) -> int:
+        if not entries:
+            return 0
+        by_bind: Dict[int, List[Tuple[str, _Pending]]] = {}
+        for job_id, entry in entries:
+            by_bind.setdefault(id(entry.bind), []).append((job_id, entry))
+
+        written = 0
+        for group in by_bind.values():
+            session = Session(bind=group[0][1].bind)
+            try:
+                for job_id, entry in group:
+                    session.query(Job).filter(
+                        Job.id == job_id,
+                        Job.status.notin_(TERMINAL_STATUSES)
+                    ).update(entry.fields, synchronize_session=False)
+                session.commit()
+                written += len(group)
+            except Exception as e:
+                session.rollback()
+                logger.error(f"Failed to flush progress for {len(group)} jobs: {str(e)}", exc_info=True)
+                continue
+            finally:
+                session.close()
+            now = time.monotonic()
+            for _, entry in group:
+                metrics.record_progress_flush(self.name, now - entry.first_at)
+        with self._lock:
+            self._writes += written
+        return written
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                if self._stopping:
+                    return
+                self._wakeup.wait(self.window_seconds / 2 or 0.01)
+            try:
+                self._flush_due()
+            except Exception as e:
+                logger.error(f"Progress flusher error: {str(e)}", exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending_jobs": len(self._pending),
+                "updates": self._updates,
+                "writes": self._writes,
+                "coalescing_ratio": round(self._updates / self._writes, 2) if self._writes else None,
+                "window_seconds": self.window_seconds,
+            }
+
+    def shutdown(self) -> None:
+        """Stop the flusher thread and write everything still pending."""
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        self.flush()
+
+
+_buffer: Optional[ProgressBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_progress_buffer() -> ProgressBuffer:
+    """Process-wide progress buffer, created on first use and flushed at exit."""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = ProgressBuffer()
+            atexit.register(_buffer.shutdown)
+        return _buffer
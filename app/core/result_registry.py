@@ -0,0 +1,148 @@
+"""
+Bounded in-memory index of recent results.
+
+Result download and correction requests look results up by result_id (and
+JobService by job_id). ResultRegistry answers both with a dict lookup:
+
+- entries are indexed by result_id, with a second job_id -> result_id map,
+  so either lookup is O(1) however many jobs the process has seen;
+- retention is bounded: at most ``max_entries`` results
+  (RESULT_REGISTRY_MAX_ENTRIES, default 10000), least recently used first
+  out, and entries expire ``ttl_seconds`` after they were stored or loaded
+  (RESULT_REGISTRY_TTL_SECONDS, default one hour);
+- a miss falls back to the ``loader`` passed by the caller (normally a
+  primary-key query on the results table) and caches what it returns.
+
+Records are plain dicts: result_id, job_id, data, validation, metadata,
+markdown_output and raw_ocr_output.
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..metrics.metrics import get_metrics_collector
+
+logger = logging.getLogger(__name__)
+metrics = get_metrics_collector()
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("RESULT_REGISTRY_MAX_ENTRIES", "10000"))
+DEFAULT_TTL_SECONDS = int(os.getenv("RESULT_REGISTRY_TTL_SECONDS", "3600"))
+
+Loader = Callable[[str], Optional[Dict[str, Any]]]
+
+
+def result_record(result) -> Dict[str, Any]:
+    """Registry record for a results table row."""
+    data = result.data if isinstance(result.data, dict) else {}
+    return {
+        "result_id": result.id,
+        "job_id": result.job_id,
+        "data": result.data,
+        "validation": result.validation,
+        "metadata": data.get("metadata", {}),
+        "markdown_output": data.get("markdown_output"),
+        "raw_ocr_output": result.raw_ocr_output,
+    }
+
+
+class ResultRegistry:
+    """LRU/TTL-bounded result lookup by result_id and job_id."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # result_id -> (record, expires_at); order is least to most recently used
+        self._results: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._by_job: Dict[str, str] = {}
+
+    def put(self, record: Dict[str, Any]) -> None:
+        """Store ``record`` (needs result_id and job_id) and restart its TTL."""
+        with self._lock:
+            now = self._clock()
+            result_id = record["result_id"]
+            self._results[result_id] = (record, now + self.ttl_seconds)
+            self._results.move_to_end(result_id)
+            self._by_job[record["job_id"]] = result_id
+            self._evict_locked(now)
+
+    def _evict_locked(self, now: float) -> None:
+        while self._results:
+            result_id, (record, expires_at) = next(iter(self._results.items()))
+            if expires_at > now and len(self._results) <= self.max_entries:
+                break
+            self._drop_locked(result_id, record)
+
+    def _drop_locked(self, result_id: str, record: Dict[str, Any]) -> None:
+        del self._results[result_id]
+        if self._by_job.get(record["job_id"]) == result_id:
+            del self._by_job[record["job_id"]]
+
+    def _cached(self, result_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._results.get(result_id) if result_id else None
+            if entry is None:
+                return None
+            if entry[1] <= self._clock():
+                self._drop_locked(result_id, entry[0])
+                return None
+            self._results.move_to_end(result_id)
+            return entry[0]
+
+    def _lookup(self, result_id: Optional[str], key: str, loader: Optional[Loader]) -> Optional[Dict[str, Any]]:
+        record = self._cached(result_id)
+        if record is not None:
+            metrics.record_result_lookup("hit")
+            return record
+        record = loader(key) if loader is not None else None
+        if record is None:
+            metrics.record_result_lookup("miss")
+            return None
+        metrics.record_result_lookup("loaded")
+        self.put(record)
+        return record
+
+    def get(self, result_id: str, loader: Optional[Loader] = None) -> Optional[Dict[str, Any]]:
+        """Record of ``result_id``; on a miss, ``loader(result_id)`` is asked and its answer cached."""
+        return self._lookup(result_id, result_id, loader)
+
+    def get_by_job(self, job_id: str, loader: Optional[Loader] = None) -> Optional[Dict[str, Any]]:
+        """Latest result of ``job_id``; on a miss, ``loader(job_id)`` is asked and its answer cached."""
+        with self._lock:
+            result_id = self._by_job.get(job_id)
+        return self._lookup(result_id, job_id, loader)
+
+    def discard(self, result_id: str) -> bool:
+        """Forget a result. Returns True if it was cached."""
+        with self._lock:
+            entry = self._results.get(result_id)
+            if entry is None:
+                return False
+            self._drop_locked(result_id, entry[0])
+            return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._results)
+
+
+_registry: Optional[ResultRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_result_registry() -> ResultRegistry:
+    """Process-wide result registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ResultRegistry()
+        return _registry
@@ -1,7 +1,6 @@
 """
 Result storage with schema versioning and lineage tracking.
 """
-import json
 import uuid
 import logging
 from typing import Dict, Any, Optional
@@ -56,7 +55,7 @@ class ResultStorage:
             models_used=self._build_models_used(result_data),
             provenance=Provenance(**provenance),
             created_at=datetime.utcnow(),
-            processing_time_ms=result_data.get("metadata", {}).get("processing_time_ms")
+            processing_time_ms=self._processing_time_ms(result_data)
         )
         
         # Store as JSON
@@ -67,6 +66,11 @@ class ResultStorage:
         logger.info(f"Stored result {result_id} for job {job_id}")
         return result_id
     
+    def _processing_time_ms(self, result_data: Dict[str, Any]) -> Optional[int]:
+        """Processing time as whole milliseconds (the pipeline reports fractional ms)."""
+        processing_time_ms = result_data.get("metadata", {}).get("processing_time_ms")
+        return int(round(processing_time_ms)) if processing_time_ms is not None else None
+    
     def get_result(self, result_id: str) -> Optional[ResultResponse]:
         """Retrieve result by result_id."""
         result_path = os.path.join(self.storage_dir, f"{result_id}.json")
@@ -75,10 +79,10 @@ class ResultStorage:
             return None
         
         try:
-            with open(result_path, "r") as f:
-                data = json.load(f)
-            
-            return ResultResponse(**data)
+            with open(result_path, "rb") as f:
+                # One validation pass straight from JSON; the result is marked
+                # validated, so later stages and the response reuse it as is
+                return ResultResponse.model_validate_json(f.read())
         except Exception as e:
             logger.error(f"Error reading result {result_id}: {str(e)}")
             return None
@@ -18,6 +18,10 @@ from .validation import (
     ValidationResult,
     ValidationIssue,
 )
+from .trusted import (
+    TrustedModel,
+    ValidatedModel,
+)
 from .job import (
     JobStatus,
     JobResponse,
@@ -36,6 +40,9 @@ __all__ = [
     # Validation schemas
     "ValidationResult",
     "ValidationIssue",
+    # Validate-once base models
+    "TrustedModel",
+    "ValidatedModel",
     # Job schemas
     "JobStatus",
     "JobResponse",
@@ -8,10 +8,12 @@ These schemas define the structure of extracted financial data with:
 """
 
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import Field, ConfigDict
 
+from .trusted import TrustedModel, ValidatedModel
 
-class ExtractedField(BaseModel):
+
+class ExtractedField(TrustedModel):
     """A single extracted field with metadata."""
     
     field_name: str = Field(..., description="Name of the extracted field")
@@ -38,7 +40,7 @@ class ExtractedField(BaseModel):
     )
 
 
-class LineItem(BaseModel):
+class LineItem(TrustedModel):
     """A single line item from an invoice."""
     
     description: str = Field(..., description="Item description")
@@ -65,7 +67,7 @@ class LineItem(BaseModel):
     )
 
 
-class FinancialSummary(BaseModel):
+class FinancialSummary(TrustedModel):
     """Financial summary with totals."""
     
     subtotal: float = Field(..., ge=0.0, description="Subtotal before tax")
@@ -89,7 +91,7 @@ class FinancialSummary(BaseModel):
     )
 
 
-class VendorInfo(BaseModel):
+class VendorInfo(TrustedModel):
     """Vendor information."""
     
     name: Optional[str] = Field(None, description="Vendor name")
@@ -98,7 +100,7 @@ class VendorInfo(BaseModel):
     bbox: Optional[List[int]] = Field(None, description="Bounding box coordinates")
 
 
-class ClientInfo(BaseModel):
+class ClientInfo(TrustedModel):
     """Client/customer information."""
     
     invoice_number: Optional[str] = Field(None, description="Invoice number")
@@ -109,7 +111,7 @@ class ClientInfo(BaseModel):
     bbox: Optional[List[int]] = Field(None, description="Bounding box coordinates")
 
 
-class ExtractedDocument(BaseModel):
+class ExtractedDocument(ValidatedModel):
     """Complete extracted document structure."""
     
     document_type: str = Field(..., description="Document type (invoice, receipt, statement)")
@@ -154,7 +156,7 @@ class ExtractedDocument(BaseModel):
     )
 
 
-class ExtractionResult(BaseModel):
+class ExtractionResult(ValidatedModel):
     """Complete extraction result with metadata."""
     
     document_id: str = Field(..., description="Unique document identifier")
@@ -0,0 +1,153 @@
+"""
+Validate-once support for pydantic schemas.
+
+A stored result is validated when it is built or read back (ResultStorage),
+and FastAPI would validate it again against the endpoint's response_model.
+Each full pass costs time proportional to the number of line items.
+
+TrustedModel.trusted() builds an instance from data that has already been
+validated (e.g. the model_dump() of a validated instance, or a stored
+result), recursing into nested models, lists and dicts of models, without
+running validators. It performs no checks: use it only for python data
+produced inside the pipeline. JSON from storage or clients still goes
+through model_validate_json (datetimes, enums and other non-JSON types
+would otherwise stay strings).
+
+ValidatedModel adds a "validated once" marker for document-level models. It
+is set when an instance is built through validation (constructor,
+model_validate, model_validate_json) or the trusted path, and cleared when a
+field is reassigned. ensure() validates only unmarked values; the result
+endpoints send marked results through validated_response() (app/api/v1/schemas)
+instead of revalidating them. In-place changes to nested containers (e.g.
+appending to a list field) are not detected; reassign the field or call
+ensure(..., revalidate=True).
+
+The marker is a private attribute, which pydantic initializes per instance,
+so it is kept off line-item level models.
+"""
+import typing
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, PrivateAttr
+
+ModelT = TypeVar("ModelT", bound="TrustedModel")
+ValidatedT = TypeVar("ValidatedT", bound="ValidatedModel")
+
+_object_setattr = object.__setattr__
+
+
+class TrustedModel(BaseModel):
+    """Base model with a trusted (non-validating) construction path."""
+
+    @classmethod
+    def trusted(cls: Type[ModelT], data: Dict[str, Any]) -> ModelT:
+        """Build an instance from already-validated python data without validating it."""
+        return _builder(cls)(data)
+
+
+class ValidatedModel(TrustedModel):
+    """TrustedModel carrying a validated-once marker."""
+
+    _validated_once: bool = PrivateAttr(default=False)
+
+    def model_post_init(self, __context: Any) -> None:
+        # Runs after validation and after model_construct()
+        self._validated_once = True
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in self.model_fields:
+            self._validated_once = False
+
+    @property
+    def is_validated(self) -> bool:
+        """True if this instance was validated (or trusted) and not reassigned since."""
+        return self._validated_once
+
+    @classmethod
+    def ensure(cls: Type[ValidatedT], value: Any, revalidate: bool = False) -> ValidatedT:
+        """
+        Return ``value`` as a validated instance, validating only if needed.
+
+        Marked instances of ``cls`` are returned as they are; anything else
+        (dicts, unmarked or foreign instances) is validated once.
+        """
+        if isinstance(value, cls) and value._validated_once and not revalidate:
+            return value
+        if isinstance(value, BaseModel):
+            value = value.model_dump()
+        return cls.model_validate(value)
+
+
+def _annotation_builder(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    """Builder for values of a field annotation, or None if values are kept as is."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _builder(annotation)
+
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Union:
+        # Optional[X]: None values are skipped by the caller
+        non_none = [arg for arg in args if arg is not type(None)]
+        return _annotation_builder(non_none[0]) if len(non_none) == 1 else None
+    if origin in (list, tuple, set, frozenset) and args:
+        item = _annotation_builder(args[0])
+        if item is None:
+            return None
+        return lambda values: origin(item(v) for v in values)
+    if origin is dict and len(args) == 2:
+        item = _annotation_builder(args[1])
+        if item is None:
+            return None
+        return lambda values: {k: item(v) for k, v in values.items()}
+    return None
+
+
+@lru_cache(maxsize=None)
+def _builder(model: Type[BaseModel]) -> Callable[[Any], BaseModel]:
+    """
+    Trusted constructor for ``model``, with the per-field plan computed once.
+
+    Models without private attributes are assembled directly (what
+    model_construct does, minus its per-call bookkeeping); models with
+    private attributes go through model_construct so they are initialized.
+    """
+    fields = model.model_fields
+    names = frozenset(fields)
+    plan: Tuple[Tuple[str, Callable[[Any], Any]], ...] = tuple(
+        (name, build)
+        for name, field in fields.items()
+        for build in (_annotation_builder(field.annotation),)
+        if build is not None
+    )
+    optional = tuple((name, field) for name, field in fields.items() if not field.is_required())
+    direct = not model.__private_attributes__ and model.model_config.get("extra") != "allow"
+
+    def build(data: Any) -> BaseModel:
+        if type(data) is not dict and isinstance(data, BaseModel):
+            return data
+        if names.issuperset(data):
+            values = dict(data)
+        else:
+            values = {name: value for name, value in data.items() if name in names}
+        fields_set = set(values)
+        if len(values) < len(names):
+            for name, field in optional:
+                if name not in values:
+                    values[name] = field.get_default(call_default_factory=True)
+        for name, build_field in plan:
+            value = values.get(name)
+            if value is not None:
+                values[name] = build_field(value)
+
+        if not direct:
+            return model.model_construct(fields_set, **values)
+        instance = model.__new__(model)
+        _object_setattr(instance, "__dict__", values)
+        _object_setattr(instance, "__pydantic_fields_set__", fields_set)
+        _object_setattr(instance, "__pydantic_extra__", None)
+        _object_setattr(instance, "__pydantic_private__", None)
+        return instance
+
+    return build
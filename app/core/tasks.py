@@ -2,18 +2,58 @@
 Celery tasks for asynchronous document processing.
 
 This module defines background tasks for:
-- Document processing (OCR + LLM + Validation)
+- Document processing, split into one task per pipeline stage and chained
+  per document (see build_document_pipeline)
 - Active learning data export
 - Batch processing
+
+Stage tasks are named app.core.tasks.<stage>_task so that the task_routes in
+celery_app send each one to its queue: OCR and VLM parsing to "gpu",
+everything else to "cpu". Each stage receives the pipeline context built by
+the previous one (a JSON-serializable dict) and extends it with its own
+output; the stage bodies are the FinancialDocumentProcessor stage methods
+used by the in-process pipeline.
+
+Broker messages stay small (well under 1 KB) whatever the document size:
+the document bytes and every stage context go through the claim check
+(see claim_check), so messages carry content-addressed references that the
+stage fetches from storage. Stages enqueue their successor themselves from
+the ``next_stages`` list rather than through a Celery chain, which would
+embed every remaining signature in each message. A stage releases its
+incoming claims once its successor is queued; the job's claims are released
+when the pipeline completes or fails for good.
+
+The job's deadline (``deadline_at``, wall-clock seconds; JOB_DEADLINE_SECONDS
+from the start of the pipeline unless given) travels in the context. Each
+stage runs within it (see app/core/deadline.py): OCR is not started and
+optional work is skipped when too little time is left, and a stage whose
+retry would not fit before the deadline fails the job instead of retrying.
+
+A job cancelled through JobManager.mark_cancelled stops at the next stage
+boundary, and the OCR and VLM stages poll for the cancel while their
+backend call runs and abort it (see app/core/cancellation.py). The claims
+the job holds are released either way.
 """
 
+import hashlib
 import logging
-from typing import Dict, Any, Optional
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence
 from celery import Task
+from celery.canvas import Signature
 
 from .celery_app import celery_app
+from .cancellation import JobCancelled, release_token, run_cancellable, token_for
+from .claim_check import get_claim_check, is_claim
+from .deadline import (
+    DEFAULT_JOB_DEADLINE_SECONDS, Deadline, DeadlineExceeded, deadline_scope, run_within, within_budget
+)
 from .services import ExtractionService, ValidationService, ActiveLearningService
 from .document_processor import FinancialDocumentProcessor
+from .job_manager import job_manager
+from .result_storage import result_storage
+from .worker_runtime import get_worker_runtime
+from ..api.v1.schemas import JobStage
 from ..config.settings import load_config
 
 logger = logging.getLogger(__name__)
@@ -24,68 +64,357 @@ extraction_service = ExtractionService(config)
 validation_service = ValidationService(config)
 active_learning_service = ActiveLearningService(config)
 processor = FinancialDocumentProcessor(config)
+claims = get_claim_check()
+
+STAGE_MAX_RETRIES = 3
+STAGE_RETRY_COUNTDOWN = 10
+
+# Pipeline order; each entry names the task <stage>_task
+DOCUMENT_STAGES = ("preprocess", "ocr", "vlm_parse", "postprocess", "validate", "index")
 
 
 @celery_app.task(bind=True, name="process_document")
 def process_document_task(
     self: Task,
     job_id: str,
-    file_content: bytes,
+    file_content: Any,
     filename: str,
-    model_type: str = "fine_tuned"
+    model_type: str = "fine_tuned",
+    deadline_at: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Process a document asynchronously.
     
+    Starts the per-document stage pipeline (preprocess -> OCR -> parse ->
+    postprocess -> validate -> store); each stage runs on its own queue.
+    
     Args:
         job_id: Unique job identifier
-        file_content: Raw document bytes
+        file_content: Raw document bytes, or a claim reference to them
         filename: Original filename
         model_type: Model type to use
+        deadline_at: Wall-clock time (epoch seconds) by which the job should be finished
     
     Returns:
-        Processing result dictionary
+        Dictionary with the job_id and the id of the first stage task
+    """
+    logger.info(f"Starting document pipeline for job {job_id}")
+    first_stage = build_document_pipeline(job_id, file_content, filename, model_type, deadline_at).apply_async()
+    return {
+        "success": True,
+        "job_id": job_id,
+        "pipeline_task_id": first_stage.id
+    }
+
+
+def build_document_pipeline(
+    job_id: str,
+    file_content: Any,
+    filename: str,
+    model_type: str = "fine_tuned",
+    deadline_at: Optional[float] = None
+) -> Signature:
+    """
+    Signature of the first stage of the pipeline for one document.
+    
+    Checks the document bytes in (held by ``job_id``) so that only a
+    reference goes into the message; the stages that follow are named in
+    ``next_stages`` and queued one by one as the pipeline advances.
+    """
+    return preprocess_task.si(
+        job_id,
+        claims.check_in(file_content, holder=job_id),
+        filename,
+        model_type,
+        next_stages=list(DOCUMENT_STAGES[1:]),
+        deadline_at=deadline_at,
+    )
+
+
+def _advance(job_id: str, *stages: JobStage) -> None:
+    """
+    Move the tracked job through ``stages`` (no-op for jobs this process does not track).
+    
+    Raises JobCancelled for a cancelled job, so the stage does no work.
     """
+    if job_id not in job_manager.jobs:
+        return
+    if job_manager.is_cancelled(job_id):
+        raise JobCancelled(job_id, stages[0].value if stages else None)
+    for stage in stages:
+        job_manager.transition_stage(job_id, stage)
+
+
+def _send_stage(stage: str, context: Any, next_stages: List[str]) -> None:
+    """Queue ``stage`` with a (claim-checked) context."""
+    _STAGE_TASKS[stage].apply_async(args=(context,), kwargs={"next_stages": next_stages})
+
+
+def _hand_off(
+    incoming: Any,
+    context: Dict[str, Any],
+    next_stages: Optional[Sequence[str]],
+    release: Sequence[Any] = ()
+) -> Dict[str, Any]:
+    """
+    Pass ``context`` on to the next stage, or return it when there is none.
+    
+    The context is checked in so the next message carries a reference only;
+    the claims this stage consumed (its incoming context and ``release``) are
+    dropped after the next stage is queued, so a retry still finds them.
+    """
+    if not next_stages:
+        return context
+    job_id = context["job_id"]
+    if job_manager.is_cancelled(job_id):
+        raise JobCancelled(job_id, next_stages[0])
+    reference = claims.check_in(context, holder=job_id)
+    _send_stage(next_stages[0], reference, list(next_stages[1:]))
+    for claim in (incoming, *release):
+        claims.release(claim, job_id)
+    return {"job_id": job_id, "next_stage": next_stages[0]}
+
+
+def _release_job_claims(incoming: Any, context: Dict[str, Any]) -> None:
+    """Drop the claims a finished (or failed) pipeline still holds."""
+    job_id = context.get("job_id")
+    if job_id:
+        claims.release(incoming, job_id)
+        claims.release(context.get("file_content"), job_id)
+
+
+def _deadline(context: Dict[str, Any]) -> Optional[Deadline]:
+    """The job's deadline carried in a stage context, if any."""
+    deadline_at = context.get("deadline_at")
+    return Deadline.at(deadline_at) if deadline_at else None
+
+
+def _run_stage(context: Dict[str, Any], coroutine) -> Any:
+    """
+    Run a stage coroutine on the worker loop within the job's deadline.
+    
+    The job is polled for a cancel meanwhile; a cancel (here or in the
+    job store) aborts the coroutine with JobCancelled.
+    """
+    job_id = context["job_id"]
+    token = token_for(job_id)
     try:
-        logger.info(f"Starting document processing task for job {job_id}")
+        return get_worker_runtime().run(run_cancellable(
+            token, run_within(_deadline(context), coroutine), poll=lambda: job_manager.is_cancelled(job_id)
+        ))
+    finally:
+        release_token(job_id)
+
+
+def _stage_failed(task: Task, context: Dict[str, Any], stage: str, error: Exception, incoming: Any = None):
+    """Retry the stage, or mark the job failed once retries are exhausted or the deadline leaves no time for one."""
+    job_id = context.get("job_id")
+    if isinstance(error, JobCancelled):
+        logger.info(f"Pipeline of job {job_id} stopped at {stage}: job cancelled")
+        _release_job_claims(incoming, context)
+        return None
+    logger.error(f"Stage {stage} failed for job {job_id}: {str(error)}", exc_info=True)
+    deadline = _deadline(context)
+    out_of_time = isinstance(error, DeadlineExceeded) or (
+        deadline is not None and not deadline.allows(STAGE_RETRY_COUNTDOWN)
+    )
+    if task.request.retries < STAGE_MAX_RETRIES and not out_of_time:
+        raise task.retry(exc=error, countdown=STAGE_RETRY_COUNTDOWN, max_retries=STAGE_MAX_RETRIES)
+    if job_id in job_manager.jobs:
+        if out_of_time:
+            job_manager.mark_failed(job_id, "deadline_exceeded", str(error))
+        else:
+            job_manager.mark_failed(job_id, f"{stage}_failed", str(error), retriable=True)
+    _release_job_claims(incoming, context)
+    raise error
+
+
+@celery_app.task(bind=True)
+def preprocess_task(
+    self: Task,
+    job_id: str,
+    file_content: Any,
+    filename: str,
+    model_type: str = "fine_tuned",
+    next_stages: Optional[List[str]] = None,
+    deadline_at: Optional[float] = None
+) -> Dict[str, Any]:
+    """Stage 1 (cpu): validate the upload and open the pipeline context."""
+    context = {
+        "job_id": job_id,
+        "filename": filename,
+        "model_type": model_type,
+        "deadline_at": deadline_at or Deadline(DEFAULT_JOB_DEADLINE_SECONDS).expires_at,
+    }
+    try:
+        # A claim reference already knows the size and SHA-256 of the bytes; no need to fetch them here
+        if is_claim(file_content):
+            file_size, checksum = file_content["size"], file_content["__claim__"]
+        else:
+            file_size, checksum = len(file_content or b""), hashlib.sha256(file_content or b"").hexdigest()
+        if not file_size:
+            raise ValueError("File content is empty")
+        _advance(job_id, JobStage.STAGING, JobStage.PREPROCESS)
+        context.update({
+            "document_id": job_id,
+            "start_time": datetime.utcnow().isoformat(),
+            "file_content": claims.check_in(file_content, holder=job_id),
+            "file_size": file_size,
+            "checksum": checksum,
+        })
+        return _hand_off(None, context, next_stages)
+    except ValueError as e:
+        if job_id in job_manager.jobs:
+            job_manager.mark_failed(job_id, "invalid_input", str(e))
+        raise
+    except Exception as e:
+        _stage_failed(self, context, "preprocess", e, incoming=file_content)
+
+
+@celery_app.task(bind=True)
+def ocr_task(self: Task, context: Any, next_stages: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Stage 2 (gpu): layout OCR, then receipt detection on the OCR output."""
+    incoming = context
+    try:
+        context = claims.fetch(incoming)
+        _advance(context["job_id"], JobStage.OCR_LAYOUT)
+        file_content = claims.fetch(context["file_content"])
+        ocr_results = _run_stage(context, processor.run_ocr(file_content))
+        _advance(context["job_id"], JobStage.OCR_RECOGNIZE)
+        receipt_data = None
+        if processor.receipt_processing_enabled:
+            receipt_data = processor.detect_receipt(ocr_results)
+        return _hand_off(incoming, {**context, "ocr_results": ocr_results, "receipt_data": receipt_data}, next_stages)
+    except Exception as e:
+        _stage_failed(self, context, "ocr", e, incoming=incoming)
+
+
+@celery_app.task(bind=True)
+def vlm_parse_task(self: Task, context: Any, next_stages: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Stage 3 (gpu): semantic parsing with the VLM (receipt structure for receipts)."""
+    incoming = context
+    try:
+        context = claims.fetch(incoming)
+        _advance(context["job_id"], JobStage.SEMANTIC_PARSE)
+        document = context["file_content"]
+        if context.get("receipt_data"):
+            enriched_data = processor.receipt_enriched_data(context["receipt_data"])
+        else:
+            enriched_data = _run_stage(context, processor.enrich(context["ocr_results"], claims.fetch(document)))
+        # Later stages work on OCR output only; the document bytes leave the context here
+        parsed = {key: value for key, value in context.items() if key != "file_content"}
+        return _hand_off(incoming, {**parsed, "enriched_data": enriched_data}, next_stages, release=(document,))
+    except Exception as e:
+        _stage_failed(self, context, "vlm_parse", e, incoming=incoming)
+
+
+@celery_app.task(bind=True)
+def postprocess_task(self: Task, context: Any, next_stages: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Stage 4 (cpu): post-processing intelligence merged into the parse, plus Markdown."""
+    incoming = context
+    try:
+        context = claims.fetch(incoming)
+        _advance(context["job_id"], JobStage.POSTPROCESS)
+        post_processed_data = None
+        markdown_output = None
+        if processor.post_processing_enabled and not context.get("receipt_data"):
+            post_processed_data = processor.run_post_processing(context["ocr_results"])
+            processor.merge_post_processed(context["enriched_data"], post_processed_data)
+            with deadline_scope(_deadline(context)):
+                if post_processed_data and post_processed_data.get("success") and within_budget("markdown"):
+                    markdown_output = processor.generate_markdown(post_processed_data)
+        return _hand_off(
+            incoming,
+            {**context, "post_processed_data": post_processed_data, "markdown_output": markdown_output},
+            next_stages,
+        )
+    except Exception as e:
+        _stage_failed(self, context, "postprocess", e, incoming=incoming)
+
+
+@celery_app.task(bind=True)
+def validate_task(self: Task, context: Any, next_stages: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Stage 5 (cpu): business rule validation and duplicate check."""
+    incoming = context
+    try:
+        context = claims.fetch(incoming)
+        _advance(context["job_id"], JobStage.VALIDATE)
+        validation = processor.validate_enriched(context["enriched_data"], context.get("receipt_data"))
+        with deadline_scope(_deadline(context)):
+            check_duplicates = processor.duplicate_index is not None and within_budget("duplicate_check")
+        if check_duplicates:
+            processor.check_duplicates(context["document_id"], context["enriched_data"], validation)
+        return _hand_off(incoming, {**context, "validation": validation}, next_stages)
+    except Exception as e:
+        _stage_failed(self, context, "validate", e, incoming=incoming)
+
+
+@celery_app.task(bind=True)
+def index_task(self: Task, context: Any, next_stages: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Stage 6 (cpu): assemble the result, store it and complete the job."""
+    incoming = context
+    try:
+        context = claims.fetch(incoming)
+        job_id = context["job_id"]
+        _advance(job_id, JobStage.STORE)
+        result = processor.build_result(
+            context["document_id"],
+            context["filename"],
+            context["model_type"],
+            datetime.fromisoformat(context["start_time"]),
+            context["ocr_results"],
+            context["enriched_data"],
+            context["validation"],
+            post_processed_data=context.get("post_processed_data"),
+            receipt_data=context.get("receipt_data"),
+            markdown_output=context.get("markdown_output"),
+        )
         
-        # Update job status to processing
-        # TODO: Integrate with job_manager
+        validation = result.get("validation") or {}
+        if validation.get("needs_review", False):
+            active_learning_service.log_extraction(
+                document_id=result.get("document_id"),
+                filename=context["filename"],
+                enriched_data={"structured_data": result.get("structured_output", {})},
+                validation=validation,
+                model_type=context["model_type"]
+            )
         
-        # Process document
-        result = processor.process_document(file_content, filename, model_type)
+        result_id = result_storage.store_result(job_id, result, {
+            "source_type": "celery",
+            "filename": context["filename"],
+            "checksum": context["checksum"],
+            "ingest_time": context["start_time"],
+        })
+        if job_id in job_manager.jobs:
+            job_manager.mark_completed(job_id, result_id)
+        _release_job_claims(incoming, context)
         
-        if result.get("success"):
-            # Log to active learning if needed
-            enriched_data = result.get("structured_output", {})
-            validation = result.get("validation", {})
-            
-            if validation.get("needs_review", False):
-                active_learning_service.log_extraction(
-                    document_id=result.get("document_id"),
-                    filename=filename,
-                    enriched_data={"structured_data": enriched_data},
-                    validation=validation,
-                    model_type=model_type
-                )
-            
-            logger.info(f"Document processing completed for job {job_id}")
-            return {
-                "success": True,
-                "job_id": job_id,
-                "result": result
-            }
-        else:
-            logger.error(f"Document processing failed for job {job_id}: {result.get('error')}")
-            return {
-                "success": False,
-                "job_id": job_id,
-                "error": result.get("error")
-            }
-    
+        logger.info(f"Document pipeline completed for job {job_id} (result {result_id})")
+        return {
+            "success": True,
+            "job_id": job_id,
+            "result_id": result_id,
+            "result": result
+        }
     except Exception as e:
-        logger.error(f"Error in document processing task for job {job_id}: {str(e)}", exc_info=True)
-        raise self.retry(exc=e, countdown=60, max_retries=3)
+        _stage_failed(self, context, "index", e, incoming=incoming)
+
+
+_STAGE_TASKS = {
+    "preprocess": preprocess_task,
+    "ocr": ocr_task,
+    "vlm_parse": vlm_parse_task,
+    "postprocess": postprocess_task,
+    "validate": validate_task,
+    "index": index_task,
+}
+
+
+@celery_app.task(name="sweep_claims")
+def sweep_claims_task() -> int:
+    """Periodic (celery beat): free claim-checked payloads whose holders expired."""
+    return claims.sweep()
 
 
 @celery_app.task(name="export_active_learning")
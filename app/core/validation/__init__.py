@@ -1,3 +1,11 @@
 from .financial_validator import FinancialValidator
+from .batch import check_arithmetic_batch
+from .duplicate_index import DuplicateInvoiceIndex, DuplicateMatch, extract_invoice_fields
 
-__all__ = ["FinancialValidator"]
+__all__ = [
+    "FinancialValidator",
+    "check_arithmetic_batch",
+    "DuplicateInvoiceIndex",
+    "DuplicateMatch",
+    "extract_invoice_fields",
+]
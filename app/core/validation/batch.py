@@ -0,0 +1,203 @@
+"""
+Vectorized batch arithmetic validation over integer cents.
+
+Used to revalidate large numbers of extracted documents at once. Amounts are
+converted to int64 cents (quantities to thousandths, unit prices to
+ten-thousandths) and the line-item, subtotal and grand-total checks run as
+array operations. Exact integer arithmetic gives the same decisions as the
+Decimal arithmetic of FinancialValidator, without float drift.
+
+A document whose values are not plain numbers, are not exact at these scales
+or are too large for int64 is reported as "not passed", so callers re-run the
+scalar validator on it; that also produces the exact issue messages for
+documents that really fail.
+"""
+from decimal import Decimal
+from typing import Any, List, Sequence, Tuple
+import math
+
+import numpy as np
+
+CENT_SCALE = 100
+QUANTITY_SCALE = 1000
+UNIT_PRICE_SCALE = 10000
+
+# Largest accepted value (in currency units); keeps every sum and product of
+# scaled values inside int64 and inside Decimal's default 28-digit precision.
+MAX_VALUE = 10 ** 11
+MAX_SEGMENT_LENGTH = 1000
+_MAX_PRODUCT = 10 ** 18
+
+_NUMERIC_TYPES = (int, float)
+
+
+def to_scaled_ints(values: Sequence[Any], scale: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert plain numbers to ``value * scale`` as int64.
+
+    Args:
+        values: ints or floats
+        scale: Power of ten, e.g. CENT_SCALE
+
+    Returns:
+        (scaled int64 array, mask of values that are exactly representable
+        at ``scale`` and no larger than MAX_VALUE)
+    """
+    try:
+        floats = np.asarray(values, dtype=np.float64)
+    except OverflowError:  # ints beyond float range
+        floats = np.array(
+            [float(v) if abs(v) <= MAX_VALUE else math.inf for v in values], dtype=np.float64
+        )
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = np.round(floats * scale)
+        exact = (scaled / scale == floats) & (np.abs(floats) <= MAX_VALUE)
+    return np.where(exact, scaled, 0).astype(np.int64), exact
+
+
+def segment_sums(values: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Sum consecutive segments of ``values`` of the given lengths.
+
+    int64 wrap-around in the running sum cancels out in the differences, so
+    each segment sum is exact as long as it fits in int64 itself.
+    """
+    ends = np.cumsum(counts)
+    running = np.concatenate(([0], np.cumsum(values, dtype=np.int64)))
+    return running[ends] - running[ends - counts]
+
+
+def floor_scaled(tolerance: Decimal, scale: int) -> int:
+    """
+    Integer threshold for ``abs(diff) > tolerance`` on values scaled by ``scale``.
+
+    For an integer x, ``x > t`` holds exactly when ``x > floor(t)``.
+    """
+    return math.floor(tolerance * scale)
+
+
+def check_arithmetic_batch(structured_docs: Sequence[Any], tolerance: Decimal) -> np.ndarray:
+    """
+    Run FinancialValidator's arithmetic checks over many documents.
+
+    Args:
+        structured_docs: ``structured_data`` dicts (line_items, financial_summary)
+        tolerance: Absolute tolerance, as used by FinancialValidator
+
+    Returns:
+        Boolean array; True where every check passes exactly. False means the
+        document fails or could not be checked here, and needs the scalar path.
+    """
+    n_docs = len(structured_docs)
+    supported = np.ones(n_docs, dtype=bool)
+
+    totals: List[Any] = []
+    quantities: List[Any] = []
+    unit_prices: List[Any] = []
+    item_counts = np.zeros(n_docs, dtype=np.int64)
+    taxes: List[Any] = []
+    tax_counts = np.zeros(n_docs, dtype=np.int64)
+    discounts: List[Any] = []
+    discount_counts = np.zeros(n_docs, dtype=np.int64)
+    subtotals: List[Any] = [0] * n_docs
+    grand_totals: List[Any] = [0] * n_docs
+
+    for index, data in enumerate(structured_docs):
+        flat = _flatten_document(data)
+        if flat is None:
+            supported[index] = False
+            continue
+        doc_totals, doc_quantities, doc_prices, doc_taxes, doc_discounts, subtotal, grand_total = flat
+        totals.extend(doc_totals)
+        quantities.extend(doc_quantities)
+        unit_prices.extend(doc_prices)
+        item_counts[index] = len(doc_totals)
+        taxes.extend(doc_taxes)
+        tax_counts[index] = len(doc_taxes)
+        discounts.extend(doc_discounts)
+        discount_counts[index] = len(doc_discounts)
+        subtotals[index] = subtotal
+        grand_totals[index] = grand_total
+
+    total_cents, total_ok = to_scaled_ints(totals, CENT_SCALE)
+    qty_milli, qty_ok = to_scaled_ints(quantities, QUANTITY_SCALE)
+    price_units, price_ok = to_scaled_ints(unit_prices, UNIT_PRICE_SCALE)
+    tax_cents, tax_ok = to_scaled_ints(taxes, CENT_SCALE)
+    discount_cents, discount_ok = to_scaled_ints(discounts, CENT_SCALE)
+    subtotal_cents, subtotal_ok = to_scaled_ints(subtotals, CENT_SCALE)
+    grand_cents, grand_ok = to_scaled_ints(grand_totals, CENT_SCALE)
+
+    # Line items: |total - qty * unit_price| at the common scale of the product
+    product_scale = QUANTITY_SCALE * UNIT_PRICE_SCALE
+    with np.errstate(over="ignore"):
+        product_ok = np.abs(qty_milli.astype(np.float64) * price_units) < _MAX_PRODUCT
+        line_diff = np.abs(total_cents * (product_scale // CENT_SCALE) - qty_milli * price_units)
+    line_ok = total_ok & qty_ok & price_ok & product_ok
+    line_pass = line_diff <= floor_scaled(tolerance, product_scale)
+
+    supported &= segment_sums(~line_ok, item_counts) == 0
+    supported &= segment_sums(~tax_ok, tax_counts) == 0
+    supported &= segment_sums(~discount_ok, discount_counts) == 0
+    supported &= subtotal_ok & grand_ok
+
+    tolerance_cents = floor_scaled(tolerance, CENT_SCALE)
+    lines_pass = segment_sums(~line_pass, item_counts) == 0
+    line_sums = segment_sums(total_cents, item_counts)
+    subtotal_pass = np.abs(line_sums - subtotal_cents) <= tolerance_cents
+    expected_grand = subtotal_cents + segment_sums(tax_cents, tax_counts) - segment_sums(discount_cents, discount_counts)
+    grand_pass = np.abs(grand_cents - expected_grand) <= tolerance_cents
+
+    return supported & lines_pass & subtotal_pass & grand_pass
+
+
+def _flatten_document(data: Any):
+    """
+    Pull the numbers the arithmetic checks read out of one document.
+
+    Returns None for anything the vectorized path does not mirror exactly
+    (missing containers, non-numeric values, very long lists).
+    """
+    if not isinstance(data, dict):
+        return None
+    line_items = data.get("line_items", [])
+    summary = data.get("financial_summary", {})
+    if not isinstance(line_items, (list, tuple)) or not isinstance(summary, dict):
+        return None
+    tax_entries = summary.get("taxes", [])
+    discount_entries = summary.get("discounts", [])
+    if not isinstance(tax_entries, (list, tuple)) or not isinstance(discount_entries, (list, tuple)):
+        return None
+    if max(len(line_items), len(tax_entries), len(discount_entries)) > MAX_SEGMENT_LENGTH:
+        return None
+
+    totals, quantities, prices = [], [], []
+    for item in line_items:
+        if not isinstance(item, dict):
+            return None
+        total = item.get("total", 0)
+        quantity = item.get("quantity", 0)
+        unit_price = item.get("unit_price", 0)
+        if type(total) not in _NUMERIC_TYPES or type(quantity) not in _NUMERIC_TYPES \
+                or type(unit_price) not in _NUMERIC_TYPES:
+            return None
+        totals.append(total)
+        quantities.append(quantity)
+        prices.append(unit_price)
+
+    amounts = []
+    for entries in (tax_entries, discount_entries):
+        values = []
+        for entry in entries:
+            if not isinstance(entry, dict):
+                return None
+            amount = entry.get("amount", 0)
+            if type(amount) not in _NUMERIC_TYPES:
+                return None
+            values.append(amount)
+        amounts.append(values)
+
+    subtotal = summary.get("subtotal", 0)
+    grand_total = summary.get("grand_total", 0)
+    if type(subtotal) not in _NUMERIC_TYPES or type(grand_total) not in _NUMERIC_TYPES:
+        return None
+    return totals, quantities, prices, amounts[0], amounts[1], subtotal, grand_total
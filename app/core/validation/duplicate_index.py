@@ -0,0 +1,316 @@
+"""
+Persistent duplicate-invoice index.
+
+Invoices are indexed by normalized vendor, normalized invoice number, an
+amount bucket and a date bucket. Amount buckets are logarithmic, so two
+amounts within ``amount_tolerance`` (relative) of each other always fall in
+the same or adjacent buckets; date buckets are ``date_tolerance_days`` wide.
+A lookup therefore reads a fixed 3 x 3 bucket neighbourhood through one
+composite index, independent of how many invoices are stored, and then
+checks candidates against the exact tolerances.
+
+The index is a local SQLite file shared by every processor on the host.
+Each incremental add commits at once, so the write lock is held only for
+that statement and the row is visible to other processes immediately;
+rebuild() replaces the whole index from existing results in bulk.
+"""
+import json
+import logging
+import math
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from finscribe.parsing import parse_amount, parse_date
+from finscribe.vendors import VendorResolver, vendor_key
+
+logger = logging.getLogger(__name__)
+
+_INVOICE_NUMBER_RE = re.compile(r"[^0-9A-Z]")
+_LEADING_ZEROS_RE = re.compile(r"(?<![0-9])0+(?=[0-9])")
+_MISSING_DAY = -1
+_INSERT_SQL = "INSERT OR REPLACE INTO invoices VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+
+class InvoiceFields(NamedTuple):
+    """Fields of an invoice that identify it for duplicate detection."""
+    vendor: Optional[str]
+    invoice_number: Optional[str]
+    amount: Any
+    date: Any
+
+
+class DuplicateMatch(NamedTuple):
+    """An indexed invoice that matches a queried one."""
+    document_id: str
+    amount_cents: int
+    day: Optional[int]  # proleptic Gregorian ordinal
+    exact: bool  # same amount and same date
+
+
+def normalize_invoice_number(value: Any) -> str:
+    """Uppercase alphanumerics with leading zeros of number runs removed ("inv-0042" -> "INV42")."""
+    if value is None:
+        return ""
+    return _INVOICE_NUMBER_RE.sub("", _LEADING_ZEROS_RE.sub("", str(value).upper()))
+
+
+def extract_invoice_fields(record: Dict[str, Any]) -> InvoiceFields:
+    """
+    Read vendor, invoice number, amount and date from a result record.
+
+    Accepts ETL canonical records (vendor / invoice_id / total / date), API
+    structured output (vendor_block / client_info / financial_summary), and
+    stored results wrapping either under "canonical_schema" or
+    "structured_output".
+    """
+    if isinstance(record.get("canonical_schema"), dict):
+        record = record["canonical_schema"]
+    elif isinstance(record.get("structured_output"), dict):
+        record = record["structured_output"]
+
+    if "vendor_block" in record or "client_info" in record or "financial_summary" in record:
+        vendor_block = record.get("vendor_block") or {}
+        client_info = record.get("client_info") or {}
+        summary = record.get("financial_summary") or {}
+        return InvoiceFields(
+            vendor=vendor_block.get("name") if isinstance(vendor_block, dict) else vendor_block,
+            invoice_number=client_info.get("invoice_number"),
+            amount=summary.get("grand_total", summary.get("total")),
+            date=client_info.get("invoice_date") or client_info.get("date"),
+        )
+    return InvoiceFields(
+        vendor=record.get("vendor"),
+        invoice_number=record.get("invoice_id", record.get("invoice_number")),
+        amount=record.get("total"),
+        date=record.get("date"),
+    )
+
+
+def _to_cents(value: Any) -> Optional[int]:
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        amount = parse_amount(value)
+    else:
+        try:
+            amount = Decimal(str(value))
+        except InvalidOperation:
+            return None
+    if amount is None or not amount.is_finite():
+        return None
+    return int((amount * 100).to_integral_value())
+
+
+def _to_day(value: Any) -> Optional[int]:
+    if isinstance(value, datetime):
+        return value.toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    if isinstance(value, str) and value:
+        parsed = parse_date(value, fallback=True)
+        return parsed.toordinal() if parsed else None
+    return None
+
+
+class DuplicateInvoiceIndex:
+    """
+    Duplicate-invoice lookup over a persistent SQLite index.
+
+    Args:
+        path: SQLite file (":memory:" for a throwaway index)
+        amount_tolerance: Relative amount difference still considered a duplicate
+        date_tolerance_days: Date difference (days) still considered a duplicate
+        vendor_resolver: Maps OCR variants of vendor names to canonical vendors
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        amount_tolerance: float = 0.01,
+        date_tolerance_days: int = 3,
+        vendor_resolver: Optional[VendorResolver] = None,
+    ):
+        self.path = path
+        self.vendor_resolver = vendor_resolver
+        self.amount_tolerance = amount_tolerance
+        self.date_tolerance_days = max(0, int(date_tolerance_days))
+        self._log_step = math.log1p(amount_tolerance) if amount_tolerance > 0 else None
+        self._day_width = max(1, self.date_tolerance_days)
+        self._lock = threading.Lock()
+
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS invoices ("
+            "document_id TEXT PRIMARY KEY, vendor TEXT NOT NULL, invoice_no TEXT NOT NULL, "
+            "amount_cents INTEGER NOT NULL, day INTEGER NOT NULL, "
+            "amount_bucket INTEGER NOT NULL, day_bucket INTEGER NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS invoices_key "
+            "ON invoices (vendor, invoice_no, amount_bucket, day_bucket)"
+        )
+        self._conn.commit()
+
+    # ---------- Keys ----------
+
+    def _amount_bucket(self, cents: int) -> int:
+        """Logarithmic bucket of |cents|, signed; 0 for a zero amount."""
+        if cents == 0:
+            return 0
+        magnitude = abs(cents)
+        bucket = int(math.log(magnitude) / self._log_step) + 1 if self._log_step else magnitude
+        return bucket if cents > 0 else -bucket
+
+    def _day_bucket(self, day: int) -> int:
+        return day // self._day_width if day != _MISSING_DAY else _MISSING_DAY
+
+    def key_for(self, record: Dict[str, Any]) -> Optional[Tuple[str, str, int, int]]:
+        """
+        (vendor, invoice number, amount cents, day ordinal) of a record, or
+        None if it lacks an amount or both vendor and invoice number.
+        """
+        fields = extract_invoice_fields(record)
+        vendor = vendor_key(fields.vendor, self.vendor_resolver) or ""
+        invoice_no = normalize_invoice_number(fields.invoice_number)
+        cents = _to_cents(fields.amount)
+        if cents is None or not (vendor or invoice_no):
+            return None
+        day = _to_day(fields.date)
+        return vendor, invoice_no, cents, day if day is not None else _MISSING_DAY
+
+    def _within_tolerance(self, cents: int, day: int, other_cents: int, other_day: int) -> bool:
+        if (day == _MISSING_DAY) != (other_day == _MISSING_DAY):
+            return False
+        if day != _MISSING_DAY and abs(day - other_day) > self.date_tolerance_days:
+            return False
+        if (cents < 0) != (other_cents < 0):
+            return False
+        return abs(cents - other_cents) <= self.amount_tolerance * min(abs(cents), abs(other_cents))
+
+    # ---------- Queries ----------
+
+    def find_duplicates(
+        self, record: Dict[str, Any], exclude_id: Optional[str] = None
+    ) -> List[DuplicateMatch]:
+        """Indexed invoices that duplicate ``record`` within the tolerances."""
+        key = self.key_for(record)
+        if key is None:
+            return []
+        return self._find(key, exclude_id)
+
+    def _find(self, key: Tuple[str, str, int, int], exclude_id: Optional[str]) -> List[DuplicateMatch]:
+        vendor, invoice_no, cents, day = key
+        amount_bucket = self._amount_bucket(cents)
+        day_bucket = self._day_bucket(day)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT document_id, amount_cents, day FROM invoices "
+                "WHERE vendor = ? AND invoice_no = ? AND amount_bucket BETWEEN ? AND ? "
+                "AND day_bucket BETWEEN ? AND ?",
+                (vendor, invoice_no, amount_bucket - 1, amount_bucket + 1, day_bucket - 1, day_bucket + 1),
+            ).fetchall()
+        return [
+            DuplicateMatch(doc_id, other_cents, other_day if other_day != _MISSING_DAY else None,
+                           other_cents == cents and other_day == day)
+            for doc_id, other_cents, other_day in rows
+            if doc_id != exclude_id and self._within_tolerance(cents, day, other_cents, other_day)
+        ]
+
+    # ---------- Updates ----------
+
+    def _row(self, document_id: str, key: Tuple[str, str, int, int]) -> Tuple:
+        vendor, invoice_no, cents, day = key
+        return (document_id, vendor, invoice_no, cents, day, self._amount_bucket(cents), self._day_bucket(day))
+
+    def _insert(self, document_id: str, key: Tuple[str, str, int, int]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(_INSERT_SQL, self._row(document_id, key))
+
+    def add(self, document_id: str, record: Dict[str, Any]) -> bool:
+        """Index (or re-index) one invoice; returns False if it has no usable key."""
+        key = self.key_for(record)
+        if key is None:
+            return False
+        self._insert(document_id, key)
+        return True
+
+    def check_and_add(self, document_id: str, record: Dict[str, Any]) -> List[DuplicateMatch]:
+        """find_duplicates() followed by add(), for the load path."""
+        key = self.key_for(record)
+        if key is None:
+            return []
+        matches = self._find(key, document_id)
+        self._insert(document_id, key)
+        return matches
+
+    def remove(self, document_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM invoices WHERE document_id = ?", (document_id,))
+
+    def rebuild(self, records: Iterable[Tuple[str, Dict[str, Any]]], chunk_size: int = 50000) -> int:
+        """
+        Replace the index with ``(document_id, record)`` pairs in bulk.
+
+        Returns:
+            Number of invoices indexed
+        """
+        indexed = 0
+        with self._lock:
+            self._conn.execute("DROP INDEX IF EXISTS invoices_key")
+            self._conn.execute("DELETE FROM invoices")
+            chunk: List[Tuple] = []
+            for document_id, record in records:
+                key = self.key_for(record)
+                if key is None:
+                    continue
+                chunk.append(self._row(document_id, key))
+                if len(chunk) >= chunk_size:
+                    self._conn.executemany(_INSERT_SQL, chunk)
+                    indexed += len(chunk)
+                    chunk = []
+            if chunk:
+                self._conn.executemany(_INSERT_SQL, chunk)
+                indexed += len(chunk)
+            self._conn.execute(
+                "CREATE INDEX invoices_key ON invoices (vendor, invoice_no, amount_bucket, day_bucket)"
+            )
+            self._conn.commit()
+        logger.info(f"Rebuilt duplicate index with {indexed} invoices")
+        return indexed
+
+    def rebuild_from_directory(self, directory: str) -> int:
+        """Rebuild from stored result JSON files (``<document_id>.json``)."""
+        def records():
+            for path in sorted(Path(directory).glob("*.json")):
+                try:
+                    with open(path, "r") as f:
+                        data = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Skipping unreadable result {path}: {e}")
+                    continue
+                if isinstance(data, dict):
+                    yield data.get("document_id") or path.stem, data
+
+        return self.rebuild(records())
+
+    def flush(self) -> None:
+        """Commit any open transaction (incremental updates are committed as they are made)."""
+        with self._lock:
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM invoices").fetchone()[0]
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
@@ -8,13 +8,18 @@ This module:
 4. Aggregates confidence scores from OCR/LLM extraction
 5. Flags documents needing human review
 
+Many documents can be validated at once with validate_batch(), which runs the
+arithmetic checks over integer-cent arrays (see batch.py).
+
 Used by: app/core/document_processor.py, app/api/v1/camel_endpoints.py
 """
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Sequence, Union
 from decimal import Decimal, ROUND_HALF_UP
 from datetime import datetime
 import logging
 
+from .batch import check_arithmetic_batch
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,13 +36,39 @@ class FinancialValidator:
     
     def validate(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Run all validation checks and return results."""
+        return self._validate_document(data)
+    
+    def validate_batch(self, documents: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Validate many documents; results are identical to calling validate() on each.
+        
+        Arithmetic is checked for the whole batch in integer cents. Only the
+        documents that fail there (or hold values the vectorized check cannot
+        represent exactly) go through the scalar arithmetic check, which also
+        produces their issue messages.
+        """
+        documents = list(documents)
+        passed = check_arithmetic_batch(
+            [data.get("structured_data", {}) if isinstance(data, dict) else None for data in documents],
+            self.tolerance,
+        )
+        return [
+            self._validate_document(data, {"is_valid": True, "issues": []} if ok else None)
+            for data, ok in zip(documents, passed.tolist())
+        ]
+    
+    def _validate_document(
+        self, data: Dict[str, Any], math_result: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """validate(), optionally with an arithmetic result computed in batch."""
         issues: List[str] = []
         field_confidences: Dict[str, float] = {}
         
         structured = data.get("structured_data", {})
         
         # Validate arithmetic
-        math_result = self._validate_arithmetic(structured)
+        if math_result is None:
+            math_result = self._validate_arithmetic(structured)
         if not math_result["is_valid"]:
             issues.extend(math_result["issues"])
         
@@ -0,0 +1,398 @@
+"""
+Signed job completion webhooks.
+
+Integrators subscribe a URL to a single job (job_id) or to every job of a
+tenant (tenant_id) instead of polling the job status endpoints. When a job
+completes or fails, WebhookDispatcher.job_finished() looks up the matching
+subscriptions and queues one delivery per subscription:
+
+- payloads are JSON, signed with the subscription secret in the
+  ``X-FinScribe-Signature: t=<unix time>,v1=<hex HMAC-SHA256 of "<t>.<body>">``
+  header (see verify_signature for the receiving side);
+- deliveries run on a dedicated WorkerRuntime loop with at most
+  WEBHOOK_MAX_CONCURRENT (default 8) requests in flight, over a shared
+  keep-alive HTTP session;
+- a failed attempt (network error, timeout or non-2xx answer) is retried
+  with exponential backoff and jitter; waiting retries hold no concurrency
+  slot;
+- after WEBHOOK_MAX_ATTEMPTS (default 6) the delivery is dead-lettered: kept
+  in memory and written to storage under ``webhooks/dead_letter/<id>.json``,
+  from where it can be redelivered;
+- destinations that resolve to loopback, link-local, private or otherwise
+  internal addresses are refused (dead-lettered without a request), and
+  redirects are not followed, unless WEBHOOK_ALLOW_PRIVATE_DESTINATIONS=true.
+"""
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .http_session import http_session
+from .worker_runtime import WorkerRuntime
+from ..metrics.metrics import get_metrics_collector
+from ..storage import get_storage
+from ..storage.base import StorageInterface
+
+logger = logging.getLogger(__name__)
+metrics = get_metrics_collector()
+
+SIGNATURE_HEADER = "X-FinScribe-Signature"
+EVENT_HEADER = "X-FinScribe-Event"
+DELIVERY_HEADER = "X-FinScribe-Delivery"
+DEAD_LETTER_PREFIX = "webhooks/dead_letter/"
+JOB_EVENTS = ("job.completed", "job.failed")
+
+DEFAULT_MAX_CONCURRENT = int(os.getenv("WEBHOOK_MAX_CONCURRENT", "8"))
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "6"))
+DEFAULT_BACKOFF_SECONDS = float(os.getenv("WEBHOOK_BACKOFF_BASE_SECONDS", "2"))
+DEFAULT_MAX_BACKOFF_SECONDS = float(os.getenv("WEBHOOK_MAX_BACKOFF_SECONDS", "300"))
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", "10"))
+DEFAULT_ALLOW_PRIVATE_DESTINATIONS = os.getenv("WEBHOOK_ALLOW_PRIVATE_DESTINATIONS", "false").lower() == "true"
+DEAD_LETTER_LIMIT = 1000
+
+
+class WebhookDestinationError(ValueError):
+    """A webhook URL points at a destination deliveries may not be sent to."""
+
+
+def _internal_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return (ip.is_private or ip.is_loopback or ip.is_link_local or ip.is_multicast
+            or ip.is_reserved or ip.is_unspecified)
+
+
+def check_destination_url(url: str) -> str:
+    """
+    Reject webhook URLs that are not http(s) or name an internal host literally
+    (localhost, loopback, link-local or private IPs); returns the host name.
+
+    Host names are resolved, and checked again, right before each delivery.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise WebhookDestinationError("Webhook URL must be http(s)")
+    host = parts.hostname.rstrip(".").lower()
+    if host == "localhost" or host.endswith(".localhost"):
+        raise WebhookDestinationError(f"Webhook destination {host} is not allowed")
+    try:
+        internal = _internal_address(host)
+    except ValueError:
+        return host  # a name, not an address literal
+    if internal:
+        raise WebhookDestinationError(f"Webhook destination {host} is not allowed")
+    return host
+
+
+async def resolve_destination(url: str) -> None:
+    """Raise WebhookDestinationError if any address ``url``'s host resolves to is internal."""
+    host = check_destination_url(url)
+    infos = await asyncio.get_running_loop().getaddrinfo(host, urlsplit(url).port, type=socket.SOCK_STREAM)
+    for info in infos:
+        if _internal_address(info[4][0]):
+            raise WebhookDestinationError(f"Webhook destination {host} resolves to internal address {info[4][0]}")
+
+
+def sign_payload(secret: str, body: bytes, timestamp: Optional[int] = None) -> str:
+    """Signature header value for ``body``."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(secret.encode("utf-8"), f"{timestamp}.".encode("utf-8") + body, hashlib.sha256)
+    return f"t={timestamp},v1={digest.hexdigest()}"
+
+
+def verify_signature(secret: str, body: bytes, header: Optional[str], tolerance: int = 300,
+                     now: Optional[float] = None) -> bool:
+    """
+    Check a signature header on a received webhook.
+
+    Rejects signatures older than ``tolerance`` seconds, so a captured
+    request cannot be replayed later.
+    """
+    try:
+        parts = dict(part.split("=", 1) for part in (header or "").split(","))
+        timestamp = int(parts["t"])
+    except (KeyError, ValueError):
+        return False
+    now = time.time() if now is None else now
+    if abs(now - timestamp) > tolerance:
+        return False
+    expected = sign_payload(secret, body, timestamp).split("v1=", 1)[1]
+    return hmac.compare_digest(expected, parts.get("v1", ""))
+
+
+@dataclass
+class WebhookDelivery:
+    """One payload on its way to one subscription."""
+    subscription_id: str
+    url: str
+    secret: str
+    event: str
+    payload: Dict[str, Any]
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    attempts: int = 0
+    last_error: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    owner_tenant_id: Optional[str] = None  # tenant of the subscription; scopes the dead-letter endpoints
+
+    def body(self) -> bytes:
+        return json.dumps({"id": self.id, "event": self.event, "created_at": self.created_at,
+                           "data": self.payload}, default=str).encode("utf-8")
+
+    def to_dict(self, include_secret: bool = True) -> Dict[str, Any]:
+        data = asdict(self)
+        if not include_secret:
+            data.pop("secret")
+        return data
+
+
+class WebhookDispatcher:
+    """Bounded, retrying delivery queue for webhook payloads."""
+
+    def __init__(
+        self,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay: float = DEFAULT_BACKOFF_SECONDS,
+        max_delay: float = DEFAULT_MAX_BACKOFF_SECONDS,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        storage: Optional[StorageInterface] = None,
+        session_factory: Optional[Callable[[], Any]] = None,
+        allow_private: bool = DEFAULT_ALLOW_PRIVATE_DESTINATIONS
+    ):
+        self.max_concurrent = max_concurrent
+        self.allow_private = allow_private
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self._storage = storage
+        self._session_factory = session_factory
+        self._runtime: Optional[WorkerRuntime] = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._dead_letters: "OrderedDict[str, WebhookDelivery]" = OrderedDict()
+
+    @property
+    def storage(self) -> StorageInterface:
+        if self._storage is None:
+            self._storage = get_storage()
+        return self._storage
+
+    @property
+    def pending(self) -> int:
+        """Deliveries queued, in flight or waiting for a retry."""
+        return self._pending
+
+    def _ensure_runtime(self) -> WorkerRuntime:
+        with self._lock:
+            if self._runtime is None or not self._runtime.is_running:
+                self._runtime = WorkerRuntime(concurrency=self.max_concurrent, name="webhooks").start()
+            return self._runtime
+
+    def _set_pending(self, delta: int) -> None:
+        with self._lock:
+            self._pending += delta
+            metrics.set_webhook_queue_depth(self._pending)
+            if self._pending == 0:
+                self._idle.notify_all()
+
+    def enqueue(self, delivery: WebhookDelivery) -> str:
+        """Queue ``delivery`` for sending; returns its id."""
+        self._set_pending(1)
+        self._ensure_runtime().submit(self._attempt(delivery))
+        return delivery.id
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _post(self, delivery: WebhookDelivery) -> None:
+        if not self.allow_private:
+            await resolve_destination(delivery.url)
+        body = delivery.body()
+        headers = {
+            "Content-Type": "application/json",
+            SIGNATURE_HEADER: sign_payload(delivery.secret, body),
+            EVENT_HEADER: delivery.event,
+            DELIVERY_HEADER: delivery.id,
+        }
+        async with http_session() as session:
+            async with session.post(delivery.url, data=body, headers=headers, allow_redirects=False,
+                                    timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
+                if response.status >= 300:
+                    raise RuntimeError(f"HTTP {response.status}")
+
+    async def _attempt(self, delivery: WebhookDelivery) -> None:
+        delivery.attempts += 1
+        started = time.perf_counter()
+        try:
+            await self._post(delivery)
+        except Exception as e:
+            delivery.last_error = str(e) or type(e).__name__
+            latency = time.perf_counter() - started
+            if delivery.attempts >= self.max_attempts or isinstance(e, WebhookDestinationError):
+                metrics.record_webhook_delivery(delivery.event, "dead_lettered", latency)
+                self._dead_letter(delivery)
+                self._set_pending(-1)
+                return
+            metrics.record_webhook_delivery(delivery.event, "retry", latency)
+            delay = self._backoff(delivery.attempts)
+            logger.info(f"Webhook delivery {delivery.id} to {delivery.url} failed "
+                        f"(attempt {delivery.attempts}): {delivery.last_error}; retrying in {delay:.1f}s")
+            # The retry waits on a timer, not in a concurrency slot
+            asyncio.get_running_loop().call_later(delay, self._retry, delivery)
+            return
+        metrics.record_webhook_delivery(delivery.event, "delivered", time.perf_counter() - started)
+        self._set_pending(-1)
+
+    def _retry(self, delivery: WebhookDelivery) -> None:
+        try:
+            self._runtime.submit(self._attempt(delivery))
+        except RuntimeError:
+            logger.warning(f"Webhook runtime stopped; dead-lettering delivery {delivery.id}")
+            self._dead_letter(delivery)
+            self._set_pending(-1)
+
+    def _dead_letter(self, delivery: WebhookDelivery) -> None:
+        logger.warning(f"Webhook delivery {delivery.id} to {delivery.url} dead-lettered after "
+                       f"{delivery.attempts} attempts: {delivery.last_error}")
+        with self._lock:
+            self._dead_letters[delivery.id] = delivery
+            while len(self._dead_letters) > DEAD_LETTER_LIMIT:
+                self._dead_letters.popitem(last=False)
+        try:
+            self.storage.put_json(f"{DEAD_LETTER_PREFIX}{delivery.id}.json", delivery.to_dict())
+        except Exception as e:
+            logger.error(f"Failed to persist dead-lettered webhook {delivery.id}: {e}")
+
+    def dead_letters(self) -> List[WebhookDelivery]:
+        """Dead-lettered deliveries held in memory, oldest first."""
+        with self._lock:
+            return list(self._dead_letters.values())
+
+    def dead_letter(self, delivery_id: str) -> Optional[WebhookDelivery]:
+        """A dead-lettered delivery held in memory or in storage, or None."""
+        with self._lock:
+            delivery = self._dead_letters.get(delivery_id)
+        if delivery is None:
+            data = self.storage.get_json(f"{DEAD_LETTER_PREFIX}{delivery_id}.json")
+            if data is not None:
+                delivery = WebhookDelivery(**data)
+        return delivery
+
+    def redeliver(self, delivery_id: str) -> bool:
+        """Queue a dead-lettered delivery again with a fresh attempt budget."""
+        with self._lock:
+            delivery = self._dead_letters.pop(delivery_id, None)
+        key = f"{DEAD_LETTER_PREFIX}{delivery_id}.json"
+        if delivery is None:
+            data = self.storage.get_json(key)
+            if data is None:
+                return False
+            delivery = WebhookDelivery(**data)
+        self.storage.delete(key)
+        delivery.attempts = 0
+        self.enqueue(delivery)
+        return True
+
+    def job_finished(
+        self,
+        job_id: str,
+        status: str,
+        tenant_id: Optional[str] = None,
+        result_id: Optional[str] = None,
+        error: Optional[str] = None,
+        db=None
+    ) -> int:
+        """
+        Queue deliveries for a job that reached ``status`` (completed or failed).
+
+        Subscriptions are looked up on ``db`` (a new session if None).
+        Returns the number of deliveries queued; lookup errors are logged,
+        never raised, so they cannot fail the job.
+        """
+        event = f"job.{status}"
+        try:
+            subscriptions = self._subscriptions(job_id, tenant_id, db)
+        except Exception as e:
+            logger.warning(f"Webhook subscription lookup failed for job {job_id}: {e}")
+            return 0
+        payload = {
+            "job_id": job_id,
+            "status": status,
+            "tenant_id": tenant_id,
+            "result_id": result_id,
+            "result_url": f"/api/v1/results/{result_id}" if result_id else None,
+            "error": error,
+        }
+        queued = 0
+        for subscription in subscriptions:
+            if subscription.events and event not in subscription.events:
+                continue
+            self.enqueue(WebhookDelivery(subscription_id=subscription.id, url=subscription.url,
+                                         secret=subscription.secret, event=event, payload=payload,
+                                         owner_tenant_id=subscription.owner_tenant_id))
+            queued += 1
+        return queued
+
+    def _subscriptions(self, job_id: str, tenant_id: Optional[str], db) -> list:
+        from sqlalchemy import or_
+        from ..db.models import WebhookSubscription
+
+        own_session = db is None
+        if own_session:
+            if self._session_factory is None:
+                from ..db import SessionLocal
+                self._session_factory = SessionLocal
+            db = self._session_factory()
+        try:
+            match = WebhookSubscription.job_id == job_id
+            if tenant_id:
+                match = or_(match, WebhookSubscription.tenant_id == tenant_id)
+            return db.query(WebhookSubscription).filter(match, WebhookSubscription.is_active == "true").all()
+        finally:
+            if own_session:
+                db.close()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until no delivery is pending; False if ``timeout`` passed first."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Give pending deliveries up to ``timeout`` seconds, then stop the delivery loop."""
+        self.wait_idle(timeout)
+        with self._lock:
+            runtime, self._runtime = self._runtime, None
+        if runtime is not None:
+            runtime.shutdown(timeout=1.0)
+
+
+_dispatcher: Optional[WebhookDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_webhook_dispatcher() -> WebhookDispatcher:
+    """Process-wide webhook dispatcher."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = WebhookDispatcher()
+        return _dispatcher
@@ -2,10 +2,15 @@ import asyncio
 import time
 import os
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
+from .cancellation import JobCancelled, release_token, run_cancellable, token_for
+from .content_store import get_content_store
+from .deadline import job_deadline, run_within
 from .document_processor import FinancialDocumentProcessor
 from .job_service import JobService
+from .pdf_pages import pdf_page_count
+from .worker_runtime import get_worker_runtime
 from ..config.settings import load_config
 from ..db import SessionLocal
 from ..metrics.metrics import get_metrics_collector
@@ -25,6 +30,19 @@ except Exception as e:
     raise
 
 
+# Job stage and progress reported when a pipeline stage completes
+STAGE_PROGRESS = {
+    "ocr": ("parse", 40),
+    "receipt_detection": ("parse", 45),
+    "post_processing": ("parse", 55),
+    "markdown": ("parse", 60),
+    "vlm_enrichment": ("validate", 75),
+    "validation": ("postprocess", 85),
+    "duplicate_check": ("postprocess", 87),
+    "active_learning": ("postprocess", 90),
+    "combined_output": ("postprocess", 95),
+}
+
 def get_db_session():
     """Get database session for worker."""
     return SessionLocal()
@@ -34,9 +52,23 @@ def process_job(job_id: str, file_content: bytes, filename: str, job_type: str):
     """
     Background worker that processes document analysis jobs.
     Uses the new PaddleOCR-VL + ERNIE 4.5 pipeline.
+    
+    Analysis results are shared through the content store: a document
+    analysed before (same checksum, pipeline and model versions) is not
+    processed again.
+    
+    Analysis runs within the job's deadline (set at upload, see
+    app/core/deadline.py), capped at the processing timeout: backend calls
+    and optional stages that no longer fit are cut short or skipped.
+    
+    The job can be cancelled while it runs (POST /jobs/{job_id}/cancel):
+    its cancellation token interrupts the pipeline, including a backend
+    call in flight, and the job thread returns without storing a result.
     """
     db = get_db_session()
     job_service = JobService(db)
+    # Registered before the job is read, so a cancel in between is not missed
+    token = token_for(job_id)
     
     try:
         # Validate inputs
@@ -45,6 +77,10 @@ def process_job(job_id: str, file_content: bytes, filename: str, job_type: str):
             logger.error(f"Job {job_id} not found in database")
             return
         
+        if job.status == "cancelled" or token.cancelled:
+            logger.info(f"Job {job_id}: Cancelled before processing started")
+            return
+        
         if not file_content or len(file_content) == 0:
             error_msg = "File content is empty"
             logger.error(f"{error_msg} for job {job_id}")
@@ -59,34 +95,43 @@ def process_job(job_id: str, file_content: bytes, filename: str, job_type: str):
             metrics.record_job_failed(job_type, "invalid_type")
             return
         
-        loop = None
         start_time = time.time()
         
         try:
-            # Run async processing in sync context
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            # Run async processing on the worker's persistent event loop
+            runtime = get_worker_runtime()
             
-            # Set a timeout for the entire processing (5 minutes)
+            # Set a timeout for the entire processing (5 minutes), or less if the job deadline is closer
             timeout_seconds = 300
+            deadline = job_deadline(job.job_metadata, timeout_seconds)
             
             try:
                 # Update to processing state
                 job_service.update_job_status(job_id, status="processing", progress=5, stage="staging")
                 
+                store = get_content_store() if job_type == "analyze" and job.checksum else None
+                cached = store.get(job.checksum) if store else None
+                
                 # Run with timeout
-                if job_type == "compare":
-                    result = loop.run_until_complete(
+                if cached is not None:
+                    logger.info(f"Job {job_id}: Reusing the stored analysis of document {job.checksum[:12]}")
+                    result = cached
+                elif job_type == "compare":
+                    result = runtime.run(
                         asyncio.wait_for(
-                            _process_comparison(job_id, file_content, filename, job_service),
+                            run_cancellable(token, _process_comparison(job_id, file_content, filename, job_service)),
                             timeout=timeout_seconds
                         )
                     )
+                elif deadline.expired:
+                    raise asyncio.TimeoutError()
                 else:
-                    result = loop.run_until_complete(
+                    result = runtime.run(
                         asyncio.wait_for(
-                            _process_analysis(job_id, file_content, filename, job_service),
-                            timeout=timeout_seconds
+                            run_cancellable(
+                                token, run_within(deadline, _process_analysis(job_id, file_content, filename, job_service))
+                            ),
+                            timeout=deadline.remaining()
                         )
                     )
                 
@@ -94,6 +139,9 @@ def process_job(job_id: str, file_content: bytes, filename: str, job_type: str):
                 if not result or not isinstance(result, dict):
                     raise ValueError("Processing returned invalid result")
                 
+                # A job cancelled while its last stage ran gets no result
+                token.raise_if_cancelled("store")
+                
                 # Store result in database
                 job_service.create_result(
                     job_id=job_id,
@@ -102,6 +150,9 @@ def process_job(job_id: str, file_content: bytes, filename: str, job_type: str):
                     models_used=result.get("metadata", {}).get("models_used"),
                     raw_ocr_output=result.get("raw_ocr_output")
                 )
+                # Results cut short (e.g. VLM enrichment skipped near the deadline) are not shared
+                if store and cached is None and not result.get("metadata", {}).get("partial_results"):
+                    store.put(job.checksum, result)
                 
                 # Record metrics
                 elapsed = time.time() - start_time
@@ -110,32 +161,29 @@ def process_job(job_id: str, file_content: bytes, filename: str, job_type: str):
                 
                 logger.info(f"Job {job_id}: Completed successfully in {elapsed:.2f}s")
                 
+            except JobCancelled:
+                _job_cancelled(job_service, job_id)
             except asyncio.TimeoutError:
-                error_msg = f"Processing timeout after {timeout_seconds} seconds"
+                if job_type == "analyze" and deadline.expires_at < start_time + timeout_seconds:
+                    error_msg = "Job deadline exceeded before processing finished"
+                    reason = "deadline_exceeded"
+                else:
+                    error_msg = f"Processing timeout after {timeout_seconds} seconds"
+                    reason = "timeout"
                 logger.error(f"Job {job_id}: {error_msg}")
                 job_service.update_job_status(job_id, status="failed", error=error_msg)
-                metrics.record_job_failed(job_type, "timeout")
+                metrics.record_job_failed(job_type, reason)
             except Exception as e:
+                if token.cancelled:
+                    # Cancelled between stages; the pipeline reports that as a failure
+                    _job_cancelled(job_service, job_id)
+                    return
                 error_msg = str(e)
                 logger.error(f"Job {job_id}: Processing failed - {error_msg}", exc_info=True)
                 job_service.update_job_status(job_id, status="failed", error=error_msg)
                 elapsed = time.time() - start_time
-                metrics.record_job_failed(job_type, type(e).__name__)
+                metrics.record_job_failed(job_type, "deadline_exceeded" if deadline.expired else type(e).__name__)
                 metrics.record_task_latency("process_job", elapsed, "failed")
-            finally:
-                if loop:
-                    try:
-                        # Cancel any remaining tasks
-                        pending = asyncio.all_tasks(loop)
-                        for task in pending:
-                            task.cancel()
-                        # Give tasks time to cancel
-                        if pending:
-                            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-                    except Exception as cleanup_error:
-                        logger.warning(f"Error during cleanup for job {job_id}: {str(cleanup_error)}")
-                    finally:
-                        loop.close()
             
         except Exception as e:
             error_msg = f"Critical error in worker: {str(e)}"
@@ -143,24 +191,107 @@ def process_job(job_id: str, file_content: bytes, filename: str, job_type: str):
             job_service.update_job_status(job_id, status="failed", error=error_msg)
             metrics.record_job_failed(job_type, "critical_error")
     finally:
+        release_token(job_id)
         db.close()
 
 
+class _StatusWriter:
+    """
+    Job status updates made from a job's coroutines, run off the event loop.
+
+    JobService calls are blocking database I/O; on the shared worker loop
+    they would stall every other job. Updates run in the loop's executor one
+    at a time, in the order they were made (the job's session is not
+    thread-safe), and drain() waits for the last one before the job thread
+    uses the session again. A failed update is logged; it does not fail the
+    job.
+    """
+
+    def __init__(self, job_service: JobService, job_id: str):
+        self.job_service = job_service
+        self.job_id = job_id
+        self._last: Optional[asyncio.Future] = None
+
+    def update(self, **fields: Any) -> asyncio.Future:
+        """Queue an update_job_status() call; callable from sync callbacks on the loop."""
+        previous = self._last
+
+        async def write() -> None:
+            if previous is not None:
+                await previous
+            try:
+                await asyncio.to_thread(self.job_service.update_job_status, self.job_id, **fields)
+            except Exception as e:
+                logger.warning(f"Job {self.job_id}: Status update {fields} failed: {str(e)}")
+
+        self._last = asyncio.ensure_future(write())
+        return self._last
+
+    async def drain(self) -> None:
+        if self._last is not None:
+            # Shielded: a cancelled job must still not leave a write running on its session
+            await asyncio.shield(self._last)
+
+
+def _job_cancelled(job_service: JobService, job_id: str) -> None:
+    """Keep a job that was cancelled while processing in the cancelled state."""
+    logger.info(f"Job {job_id}: Processing stopped, job was cancelled")
+    job_service.update_job_status(job_id, status="cancelled")
+
+
+def _is_small_document(file_content: bytes) -> bool:
+    """
+    True for documents eligible for the fast lane: single page and under the size limit.
+    
+    Page counts come from pdf_page_count(), as for the admission cost
+    estimate; PDFs it cannot count (e.g. compressed object streams) and
+    TIFFs (possibly multi-page) take the regular path.
+    """
+    worker_config = config.get("worker", {})
+    if not worker_config.get("fast_lane_enabled", True):
+        return False
+    if len(file_content) > worker_config.get("fast_lane_max_kb", 512) * 1024:
+        return False
+    if file_content.startswith(b"%PDF"):
+        return pdf_page_count(file_content) == 1
+    return not file_content.startswith((b"II*\x00", b"MM\x00*"))
+
+
 async def _process_analysis(job_id: str, file_content: bytes, filename: str, job_service: JobService) -> Dict[str, Any]:
-    """Process document through the AI pipeline."""
+    """
+    Process document through the AI pipeline.
+    
+    Progress is reported as pipeline stages complete (see STAGE_PROGRESS).
+    Small single-page documents take the fast lane, which skips Markdown and
+    combined output generation and returns the structured output only.
+    """
+    status = _StatusWriter(job_service, job_id)
     try:
-        job_service.update_job_status(job_id, progress=15, stage="ocr")
+        start = time.perf_counter()
+        fast_lane = _is_small_document(file_content)
+        reported = {"progress": 15}
+        await status.update(progress=15, stage="ocr")
         
-        # Run the full pipeline
-        job_service.update_job_status(job_id, progress=30, stage="ocr")
+        def on_stage(stage: str, elapsed_ms: float) -> None:
+            job_stage, progress = STAGE_PROGRESS.get(stage, (None, 0))
+            if progress > reported["progress"]:
+                reported["progress"] = progress
+                status.update(progress=progress, stage=job_stage)
         
         try:
-            # Use combined output to get both JSON and Markdown
-            result = await processor.process_document_with_combined_output(
-                file_content, filename, model_type="fine_tuned"
-            )
+            if fast_lane:
+                result = await processor.process_document(
+                    file_content, filename, model_type="fine_tuned", on_stage=on_stage, fast_lane=True
+                )
+            else:
+                # Use combined output to get both JSON and Markdown
+                result = await processor.process_document_with_combined_output(
+                    file_content, filename, model_type="fine_tuned", on_stage=on_stage
+                )
+        except JobCancelled:
+            raise
         except Exception as proc_error:
-            logger.error(f"Error in processor.process_document_with_combined_output for job {job_id}: {str(proc_error)}", exc_info=True)
+            logger.error(f"Error in document processing for job {job_id}: {str(proc_error)}", exc_info=True)
             raise Exception(f"Document processing failed: {str(proc_error)}")
         
         # Validate result
@@ -171,16 +302,14 @@ async def _process_analysis(job_id: str, file_content: bytes, filename: str, job
             error_msg = result.get("error", "Unknown processing error")
             raise Exception(f"Processing failed: {error_msg}")
         
-        job_service.update_job_status(job_id, progress=70, stage="parse")
-        await asyncio.sleep(0.1)  # Small delay for UI feedback
-        
-        job_service.update_job_status(job_id, progress=90, stage="postprocess")
-        
         # Build result in expected format with structured output (JSON + Markdown)
         try:
             # Get JSON data (either from 'json' key if using combined output, or 'structured_output' for backward compatibility)
             json_data = result.get("json") or result.get("structured_output", {})
             markdown_output = result.get("markdown") or result.get("markdown_output", "")
+            metadata = result.get("metadata", {})
+            stage_timings = dict(metadata.get("stage_timings_ms", {}))
+            stage_timings["total"] = round((time.perf_counter() - start) * 1000, 3)
             
             return {
                 "document_id": result.get("document_id", job_id),
@@ -190,8 +319,10 @@ async def _process_analysis(job_id: str, file_content: bytes, filename: str, job
                 "validation": result.get("validation", {"is_valid": True}),
                 "raw_ocr_output": result.get("raw_ocr_output", {}),
                 "metadata": {
-                    **result.get("metadata", {}),
-                    "output_formats": ["json", "markdown"] if markdown_output else ["json"]
+                    **metadata,
+                    "output_formats": ["json", "markdown"] if markdown_output else ["json"],
+                    "stage_timings_ms": stage_timings,
+                    "fast_lane": fast_lane
                 },
                 "markdown_output": markdown_output,  # Human-readable Markdown format
                 "active_learning_ready": result.get("active_learning_ready", False)
@@ -202,12 +333,15 @@ async def _process_analysis(job_id: str, file_content: bytes, filename: str, job
     except Exception as e:
         logger.error(f"Error in _process_analysis for job {job_id}: {str(e)}", exc_info=True)
         raise
+    finally:
+        await status.drain()
 
 
 async def _process_comparison(job_id: str, file_content: bytes, filename: str, job_service: JobService) -> Dict[str, Any]:
     """Process document with both models for comparison."""
+    status = _StatusWriter(job_service, job_id)
     try:
-        job_service.update_job_status(job_id, progress=15, stage="ocr_fine_tuned")
+        await status.update(progress=15, stage="ocr_fine_tuned")
         
         # Run comparison
         try:
@@ -220,15 +354,14 @@ async def _process_comparison(job_id: str, file_content: bytes, filename: str, j
         if not result:
             raise ValueError("Comparison returned None result")
         
-        job_service.update_job_status(job_id, progress=70, stage="ocr_baseline")
-        await asyncio.sleep(0.1)
-        
-        job_service.update_job_status(job_id, progress=90, stage="comparison")
+        await status.update(progress=90, stage="comparison")
         
         return result
     except Exception as e:
         logger.error(f"Error in _process_comparison for job {job_id}: {str(e)}", exc_info=True)
         raise
+    finally:
+        await status.drain()
 
 
 def process_compare_documents_job(
@@ -266,13 +399,11 @@ def process_compare_documents_job(
             metrics.record_job_failed("compare", "empty_file")
             return
         
-        loop = None
         start_time = time.time()
         
         try:
-            # Run async processing in sync context
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            # Run async processing on the worker's persistent event loop
+            runtime = get_worker_runtime()
             
             # Set a timeout for the entire processing (10 minutes for two documents)
             timeout_seconds = 600
@@ -282,7 +413,7 @@ def process_compare_documents_job(
                 job_service.update_job_status(job_id, status="processing", progress=5, stage="staging")
                 
                 # Run with timeout
-                result = loop.run_until_complete(
+                result = runtime.run(
                     asyncio.wait_for(
                         _process_document_comparison(job_id, file_content_1, filename_1, file_content_2, filename_2, job_service),
                         timeout=timeout_seconds
@@ -321,20 +452,6 @@ def process_compare_documents_job(
                 elapsed = time.time() - start_time
                 metrics.record_job_failed("compare", type(e).__name__)
                 metrics.record_task_latency("process_compare_job", elapsed, "failed")
-            finally:
-                if loop:
-                    try:
-                        # Cancel any remaining tasks
-                        pending = asyncio.all_tasks(loop)
-                        for task in pending:
-                            task.cancel()
-                        # Give tasks time to cancel
-                        if pending:
-                            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-                    except Exception as cleanup_error:
-                        logger.warning(f"Error during cleanup for job {job_id}: {str(cleanup_error)}")
-                    finally:
-                        loop.close()
             
         except Exception as e:
             error_msg = f"Critical error in worker: {str(e)}"
@@ -354,17 +471,18 @@ async def _process_document_comparison(
     job_service: JobService
 ) -> Dict[str, Any]:
     """Process two documents through OCR and VLM comparison."""
+    status = _StatusWriter(job_service, job_id)
     try:
         # Process first document with OCR
-        job_service.update_job_status(job_id, progress=10, stage="ocr_document1")
+        await status.update(progress=10, stage="ocr_document1")
         ocr_result_1 = await processor.ocr_service.parse_document(file_content_1)
         
         # Process second document with OCR
-        job_service.update_job_status(job_id, progress=30, stage="ocr_document2")
+        await status.update(progress=30, stage="ocr_document2")
         ocr_result_2 = await processor.ocr_service.parse_document(file_content_2)
         
         # Run VLM comparison
-        job_service.update_job_status(job_id, progress=50, stage="vlm_comparison")
+        await status.update(progress=50, stage="vlm_comparison")
         
         try:
             comparison_result = await processor.vlm_service.compare_documents(
@@ -380,7 +498,7 @@ async def _process_document_comparison(
         if not comparison_result:
             raise ValueError("Comparison returned None result")
         
-        job_service.update_job_status(job_id, progress=90, stage="postprocess")
+        await status.update(progress=90, stage="postprocess")
         
         # Build result in expected format
         return {
@@ -405,6 +523,8 @@ async def _process_document_comparison(
     except Exception as e:
         logger.error(f"Error in _process_document_comparison for job {job_id}: {str(e)}", exc_info=True)
         raise
+    finally:
+        await status.drain()
 
 
 def _run_ocr(file_content: bytes, filename: str) -> Dict[str, Any]:
@@ -0,0 +1,165 @@
+"""
+Persistent event loop runtime for background jobs.
+
+process_job used to create, run and close a new event loop for every job,
+which also threw away every loop-bound resource (aiohttp connection pools,
+caches keyed on the loop). WorkerRuntime owns one event loop running in a
+dedicated thread for the lifetime of the worker process; jobs are submitted
+to it as tasks from any thread and their callers wait on the returned
+future.
+
+- concurrency: at most this many submitted coroutines run at once; the
+  rest wait their turn on the loop (WORKER_CONCURRENCY, default 4).
+- session reuse: the loop opts in to shared aiohttp sessions (see
+  http_session), so model service calls keep their connections alive
+  between jobs.
+- shutdown: stops accepting work, waits for in-flight jobs up to a grace
+  period, cancels what is left, closes shared sessions and async generators
+  and joins the loop thread. The process-wide runtime is shut down at exit.
+"""
+import asyncio
+import atexit
+import concurrent.futures
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Optional
+
+from .http_session import close_http_sessions, enable_session_reuse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "4"))
+
+
+class WorkerRuntime:
+    """One event loop in a background thread, shared by all jobs of a worker."""
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, name: str = "worker-runtime"):
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+        self._accepting = False
+        self._active = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._accepting and self._loop is not None and self._loop.is_running()
+
+    @property
+    def active_jobs(self) -> int:
+        """Jobs currently holding a concurrency slot."""
+        return self._active
+
+    def start(self) -> "WorkerRuntime":
+        """Start the loop thread (no-op if already running)."""
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._thread = threading.Thread(target=self._run_loop, name=self.name, daemon=True)
+            self._thread.start()
+        self._started.wait()
+        self._accepting = True
+        logger.info(f"Worker runtime {self.name} started (concurrency={self.concurrency})")
+        return self
+
+    def _run_loop(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        enable_session_reuse(loop)
+        loop.call_soon(self._started.set)
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _guarded(self, coro: Awaitable[Any]) -> Any:
+        async with self._semaphore:
+            self._active += 1
+            try:
+                return await coro
+            finally:
+                self._active -= 1
+
+    def submit(self, coro: Awaitable[Any]) -> concurrent.futures.Future:
+        """Schedule ``coro`` on the runtime loop; returns a thread-safe future."""
+        if not self._accepting:
+            if asyncio.iscoroutine(coro):
+                coro.close()
+            raise RuntimeError(f"Worker runtime {self.name} is not running")
+        return asyncio.run_coroutine_threadsafe(self._guarded(coro), self._loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run ``coro`` on the runtime loop and block until it finishes."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    async def _drain(self, timeout: float) -> None:
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            if pending:
+                logger.warning(f"Worker runtime {self.name}: cancelling {len(pending)} unfinished task(s)")
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+        await close_http_sessions()
+        await asyncio.get_running_loop().shutdown_asyncgens()
+
+    def shutdown(self, timeout: float = 30.0) -> None:
+        """Stop accepting jobs, let in-flight ones finish for up to ``timeout`` seconds, then stop."""
+        with self._lock:
+            if self._thread is None:
+                return
+            self._accepting = False
+            loop, thread = self._loop, self._thread
+        if loop.is_running():
+            try:
+                asyncio.run_coroutine_threadsafe(self._drain(timeout), loop).result(timeout + 5)
+            except Exception as e:
+                logger.warning(f"Worker runtime {self.name}: error during shutdown - {str(e)}")
+            loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        with self._lock:
+            self._thread = None
+            self._loop = None
+            self._started.clear()
+        logger.info(f"Worker runtime {self.name} stopped")
+
+
+_runtime: Optional[WorkerRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_worker_runtime() -> WorkerRuntime:
+    """Process-wide runtime, started on first use."""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None or not _runtime.is_running:
+            _runtime = WorkerRuntime().start()
+        return _runtime
+
+
+def shutdown_worker_runtime(timeout: float = 30.0) -> None:
+    """Shut down the process-wide runtime if it was started."""
+    global _runtime
+    with _runtime_lock:
+        runtime, _runtime = _runtime, None
+    if runtime is not None:
+        runtime.shutdown(timeout)
+
+
+atexit.register(shutdown_worker_runtime)
@@ -95,3 +95,18 @@ class ActiveLearning(Base):
     # Relationships
     job = relationship("Job", back_populates="active_learning_records")
 
+
+
+class WebhookSubscription(Base):
+    """Webhook endpoint notified when a job (job_id) or any job of a tenant (tenant_id) finishes."""
+    __tablename__ = "webhook_subscriptions"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    url = Column(String, nullable=False)
+    secret = Column(String, nullable=False)  # HMAC-SHA256 signing secret
+    tenant_id = Column(String, nullable=True, index=True)  # Every job of this tenant
+    job_id = Column(String, nullable=True, index=True)  # A single job
+    owner_tenant_id = Column(String, nullable=True, index=True)  # Tenant that created it; None without API key
+    events = Column(JSON, nullable=True)  # Subscribed events; None means all
+    is_active = Column(String, default="true")
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
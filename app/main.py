@@ -88,6 +88,12 @@ try:
 except ImportError:
     OCR_ENDPOINTS_AVAILABLE = False
     logger.warning("OCR endpoints not available")
+try:
+    from .api.v1.webhooks import router as webhooks_router
+    WEBHOOKS_AVAILABLE = True
+except ImportError:
+    WEBHOOKS_AVAILABLE = False
+    logger.warning("Webhook endpoints not available")
 
 app = FastAPI(
     title="FinScribe AI Backend",
@@ -193,6 +199,8 @@ if ACTIVE_LEARNING_AVAILABLE:
     app.include_router(active_learning_router, prefix="/api/v1", tags=["training"])
 if OCR_ENDPOINTS_AVAILABLE:
     app.include_router(ocr_router, prefix="/api/v1", tags=["ocr"])
+if WEBHOOKS_AVAILABLE:
+    app.include_router(webhooks_router, prefix="/api/v1", tags=["webhooks"])
 
 @app.get("/")
 def read_root():
@@ -22,6 +22,12 @@ jobs_failed = Counter(
     ['job_type', 'error_type']
 )
 
+jobs_cancelled = Counter(
+    'finscribe_jobs_cancelled_total',
+    'Total number of jobs cancelled by clients',
+    ['state']  # queued (never started) or processing (stopped while running)
+)
+
 # Latency metrics
 ocr_latency = Histogram(
     'finscribe_ocr_latency_seconds',
@@ -67,6 +73,109 @@ queue_size = Gauge(
     ['queue_name']
 )
 
+# Admission control metrics
+admission_wait = Histogram(
+    'finscribe_admission_wait_seconds',
+    'Time jobs spend in the admission queue before starting',
+    ['queue_name'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+)
+
+admission_rejected = Counter(
+    'finscribe_admission_rejected_total',
+    'Total number of jobs rejected because the admission queue was full',
+    ['queue_name']
+)
+
+admission_running = Gauge(
+    'finscribe_admission_running',
+    'Jobs currently running under admission control',
+    ['queue_name']
+)
+
+tenant_queue_depth = Gauge(
+    'finscribe_tenant_queue_depth',
+    'Jobs of a tenant waiting in the admission queue',
+    ['queue_name', 'tenant']
+)
+
+tenant_wait = Histogram(
+    'finscribe_tenant_wait_seconds',
+    'Time a tenant\'s jobs spend in the admission queue before starting',
+    ['queue_name', 'tenant'],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900, 3600)
+)
+
+cost_estimate_ratio = Histogram(
+    'finscribe_cost_estimate_ratio',
+    'Actual / predicted processing time of admitted jobs (1 = exact estimate)',
+    buckets=(0.25, 0.5, 0.67, 0.8, 0.9, 1.1, 1.25, 1.5, 2, 4)
+)
+
+# Deadline metrics
+deadline_skips = Counter(
+    'finscribe_deadline_skips_total',
+    'Stages, backend calls and retries skipped because the job deadline was too close',
+    ['stage']
+)
+
+deadline_saved_seconds = Counter(
+    'finscribe_deadline_saved_seconds_total',
+    'Expected processing seconds not spent thanks to deadline-aware skipping',
+    ['stage']
+)
+
+# Job progress write-behind metrics
+progress_updates = Counter(
+    'finscribe_progress_updates_total',
+    'Job status/progress updates received, by how they were written',
+    ['buffer', 'mode']
+)
+
+progress_writes = Counter(
+    'finscribe_progress_writes_total',
+    'Job rows written for buffered progress updates (updates / writes = coalescing ratio)',
+    ['buffer']
+)
+
+progress_flush_latency = Histogram(
+    'finscribe_progress_flush_latency_seconds',
+    'Time from the first buffered progress update of a job to its database write',
+    ['buffer'],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5)
+)
+
+# Webhook delivery metrics
+webhook_deliveries = Counter(
+    'finscribe_webhook_deliveries_total',
+    'Webhook delivery attempts by outcome (delivered, retry, dead_lettered)',
+    ['event', 'outcome']
+)
+
+webhook_delivery_latency = Histogram(
+    'finscribe_webhook_delivery_latency_seconds',
+    'Duration of one webhook POST, successful or not',
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10)
+)
+
+webhook_queue_depth = Gauge(
+    'finscribe_webhook_queue_depth',
+    'Webhook deliveries waiting to be sent or retried'
+)
+
+# Result registry metrics
+result_lookups = Counter(
+    'finscribe_result_lookups_total',
+    'Result lookups by outcome (hit: registry, loaded: persistent storage, miss: not found)',
+    ['outcome']
+)
+
+content_store_lookups = Counter(
+    'finscribe_content_store_lookups_total',
+    'Content-addressed result lookups by record kind and outcome (memory, storage, miss)',
+    ['kind', 'outcome']
+)
+
 # Storage metrics
 storage_objects_uploaded = Counter(
     'finscribe_storage_objects_uploaded_total',
@@ -119,6 +228,11 @@ class MetricsCollector:
         """Record job failure."""
         jobs_failed.labels(job_type=job_type, error_type=error_type).inc()
     
+    @staticmethod
+    def record_job_cancelled(state: str):
+        """Record a job cancelled while queued or processing."""
+        jobs_cancelled.labels(state=state).inc()
+    
     @staticmethod
     def record_active_learning(needs_review: bool = False):
         """Record active learning record creation."""
@@ -144,6 +258,75 @@ class MetricsCollector:
         """Update queue size gauge."""
         queue_size.labels(queue_name=queue_name).set(size)
     
+    @staticmethod
+    def update_tenant_queue_depth(queue_name: str, tenant: str, depth: int):
+        """Update a tenant's admission queue depth."""
+        tenant_queue_depth.labels(queue_name=queue_name, tenant=tenant).set(depth)
+    
+    @staticmethod
+    def record_tenant_wait(queue_name: str, tenant: str, wait_seconds: float):
+        """Record time a tenant's job waited in the admission queue."""
+        tenant_wait.labels(queue_name=queue_name, tenant=tenant).observe(wait_seconds)
+    
+    @staticmethod
+    def record_deadline_skip(stage: str, saved_seconds: float):
+        """Record work skipped because the job deadline was too close."""
+        deadline_skips.labels(stage=stage).inc()
+        deadline_saved_seconds.labels(stage=stage).inc(saved_seconds)
+    
+    @staticmethod
+    def record_cost_estimate(predicted_seconds: float, actual_seconds: float):
+        """Record how a job's processing time compared with its estimate."""
+        cost_estimate_ratio.observe(actual_seconds / predicted_seconds)
+    
+    @staticmethod
+    def record_admission_wait(queue_name: str, wait_seconds: float):
+        """Record time a job waited in the admission queue."""
+        admission_wait.labels(queue_name=queue_name).observe(wait_seconds)
+    
+    @staticmethod
+    def record_admission_rejected(queue_name: str):
+        """Record a job rejected by admission control."""
+        admission_rejected.labels(queue_name=queue_name).inc()
+    
+    @staticmethod
+    def update_admission_running(queue_name: str, running: int):
+        """Update running jobs gauge for an admission queue."""
+        admission_running.labels(queue_name=queue_name).set(running)
+    
+    @staticmethod
+    def record_progress_update(buffer_name: str, mode: str):
+        """Record a job progress update ("buffered" or "immediate")."""
+        progress_updates.labels(buffer=buffer_name, mode=mode).inc()
+    
+    @staticmethod
+    def record_progress_flush(buffer_name: str, latency_seconds: float):
+        """Record the write of one job's coalesced progress updates."""
+        progress_writes.labels(buffer=buffer_name).inc()
+        progress_flush_latency.labels(buffer=buffer_name).observe(latency_seconds)
+    
+    @staticmethod
+    def record_webhook_delivery(event: str, outcome: str, latency_seconds: Optional[float] = None):
+        """Record one webhook delivery attempt and, if a request was sent, its duration."""
+        webhook_deliveries.labels(event=event, outcome=outcome).inc()
+        if latency_seconds is not None:
+            webhook_delivery_latency.observe(latency_seconds)
+    
+    @staticmethod
+    def set_webhook_queue_depth(depth: int):
+        """Set the number of webhook deliveries pending."""
+        webhook_queue_depth.set(depth)
+    
+    @staticmethod
+    def record_result_lookup(outcome: str):
+        """Record a result registry lookup."""
+        result_lookups.labels(outcome=outcome).inc()
+    
+    @staticmethod
+    def record_content_store_lookup(kind: str, outcome: str):
+        """Record a content store lookup."""
+        content_store_lookups.labels(kind=kind, outcome=outcome).inc()
+    
     class Timer:
         """Context manager for timing operations."""
         def __init__(self, collector, metric_func, *labels):
@@ -41,6 +41,8 @@ class PricingTier:
     limits: Dict[str, int]
     overage_rates: Dict[str, Decimal]
     addons: List[str]
+    scheduling_weight: int = 1  # Share of processing capacity while tenants compete
+    max_concurrent_jobs: int = 1  # Jobs of one tenant processed at the same time
 
 
 class SaaSSubscriptionManager:
@@ -69,7 +71,9 @@ class SaaSSubscriptionManager:
                     "api_request": Decimal("0.001"),
                     "storage_gb": Decimal("0.50"),
                 },
-                addons=["basic_support"]
+                addons=["basic_support"],
+                scheduling_weight=1,
+                max_concurrent_jobs=1
             ),
             "growth": PricingTier(
                 name="Growth",
@@ -95,7 +99,9 @@ class SaaSSubscriptionManager:
                     "api_request": Decimal("0.0008"),
                     "storage_gb": Decimal("0.40"),
                 },
-                addons=["priority_support", "basic_integrations"]
+                addons=["priority_support", "basic_integrations"],
+                scheduling_weight=2,
+                max_concurrent_jobs=2
             ),
             "professional": PricingTier(
                 name="Professional",
@@ -125,7 +131,9 @@ class SaaSSubscriptionManager:
                     "api_request": Decimal("0.0006"),
                     "storage_gb": Decimal("0.30"),
                 },
-                addons=["priority_support", "advanced_integrations", "custom_fields"]
+                addons=["priority_support", "advanced_integrations", "custom_fields"],
+                scheduling_weight=4,
+                max_concurrent_jobs=4
             ),
             "enterprise": PricingTier(
                 name="Enterprise",
@@ -160,7 +168,9 @@ class SaaSSubscriptionManager:
                     "api_request": Decimal("0.0004"),
                     "storage_gb": Decimal("0.20"),
                 },
-                addons=["all"]
+                addons=["all"],
+                scheduling_weight=8,
+                max_concurrent_jobs=6
             )
         }
         
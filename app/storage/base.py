@@ -34,7 +34,7 @@ class StorageInterface(ABC):
     
     @abstractmethod
     def list_prefix(self, prefix: str) -> List[str]:
-        """List all keys with given prefix."""
+        """List all keys with given prefix (raises if the listing fails; [] means no keys)."""
         pass
     
     def put_json(self, key: str, data: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> str:
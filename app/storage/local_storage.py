@@ -108,6 +108,7 @@ class LocalStorage(StorageInterface):
                     keys.append(str(relative).replace('\\', '/'))
         except Exception as e:
             logger.error(f"Failed to list prefix {prefix}: {e}")
+            raise
         
         return sorted(keys)
 
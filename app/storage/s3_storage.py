@@ -149,6 +149,7 @@ class S3Storage(StorageInterface):
                         keys.append(obj['Key'])
         except Exception as e:
             logger.error(f"Error listing prefix {prefix} from S3: {e}")
+            raise
         
         return sorted(keys)
 
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_batch_validation.py
+
+Microbenchmark: FinancialValidator.validate() per document (Decimal
+arithmetic) against validate_batch() (integer-cent arrays), on synthetic
+invoices of which a small share has arithmetic mismatches.
+
+Usage:
+    python benchmarks/bench_batch_validation.py [--docs 20000] [--items 8] [--bad 0.02]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.validation import FinancialValidator, check_arithmetic_batch
+
+
+def make_documents(count, items, bad_share):
+    rng = random.Random(3)
+    documents = []
+    for _ in range(count):
+        line_items = []
+        subtotal_cents = 0
+        for i in range(rng.randint(1, items * 2)):
+            quantity = rng.randint(1, 10)
+            price_cents = rng.randint(50, 50000)
+            subtotal_cents += quantity * price_cents
+            line_items.append({
+                "description": f"Item {i}",
+                "quantity": quantity,
+                "unit_price": price_cents / 100,
+                "total": quantity * price_cents / 100,
+                "confidence": 0.9,
+            })
+        tax_cents = subtotal_cents * 8 // 100
+        grand_cents = subtotal_cents + tax_cents
+        if rng.random() < bad_share:
+            grand_cents += rng.randint(2, 500)
+        documents.append({
+            "structured_data": {
+                "client_info": {"invoice_date": "2024-01-15", "due_date": "2024-02-15", "confidence": 0.9},
+                "line_items": line_items,
+                "financial_summary": {
+                    "subtotal": subtotal_cents / 100,
+                    "taxes": [{"amount": tax_cents / 100}],
+                    "discounts": [],
+                    "grand_total": grand_cents / 100,
+                    "currency": "USD",
+                },
+            }
+        })
+    return documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--items", type=int, default=8, help="mean line items per document")
+    parser.add_argument("--bad", type=float, default=0.02, help="share of documents with a mismatch")
+    args = parser.parse_args()
+
+    documents = make_documents(args.docs, args.items, args.bad)
+    validator = FinancialValidator()
+
+    start = time.perf_counter()
+    scalar = [validator._validate_arithmetic(doc["structured_data"]) for doc in documents]
+    scalar_math = time.perf_counter() - start
+
+    start = time.perf_counter()
+    passed = check_arithmetic_batch([doc["structured_data"] for doc in documents], validator.tolerance)
+    batch_math = time.perf_counter() - start
+
+    assert [r["is_valid"] for r in scalar] == passed.tolist()
+
+    start = time.perf_counter()
+    full_scalar = [validator.validate(doc) for doc in documents]
+    full_scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    full_batch = validator.validate_batch(documents)
+    full_batch_time = time.perf_counter() - start
+
+    assert full_batch == full_scalar
+
+    print(f"documents:                 {args.docs}  ({int((~passed).sum())} with mismatches)")
+    print(f"arithmetic, scalar:        {scalar_math * 1000:8.1f} ms  ({args.docs / scalar_math:,.0f} docs/s)")
+    print(f"arithmetic, batch:         {batch_math * 1000:8.1f} ms  ({args.docs / batch_math:,.0f} docs/s)")
+    print(f"validate() per document:   {full_scalar_time * 1000:8.1f} ms")
+    print(f"validate_batch():          {full_batch_time * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_content_store.py
+
+Latency of content store lookups for a typical analysis record (--fields
+extracted fields plus raw OCR regions), against local filesystem storage in
+a temporary directory: a miss, a hit read from storage (first lookup in a
+process, e.g. a document ingested by the ETL worker and then uploaded to the
+API) and a hit served from the in-process LRU. A processed document costs
+seconds of OCR and VLM time; all three lookups should stay around a
+millisecond or below.
+
+Usage:
+    python benchmarks/bench_content_store.py [--lookups 2000] [--fields 40]
+"""
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.content_store import ContentStore, content_checksum
+from app.storage.local_storage import LocalStorage
+
+
+def _record(fields: int):
+    return {
+        "data": {f"field_{n}": {"value": f"value {n}", "confidence": 0.9} for n in range(fields)},
+        "validation": {"is_valid": True, "errors": []},
+        "raw_ocr_output": {"regions": [{"text": f"line {n}", "bbox": [0, n, 100, n + 10]} for n in range(fields * 3)]},
+        "metadata": {"models_used": ["PaddleOCR-VL", "ERNIE"]},
+    }
+
+
+def _mean_ms(fn, args) -> float:
+    started = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - started) / len(args) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--fields", type=int, default=40)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = LocalStorage(tmp)
+        checksums = [content_checksum(f"document {n}".encode()) for n in range(args.lookups)]
+        writer = ContentStore(storage=storage, max_entries=args.lookups)
+        for checksum in checksums:
+            writer.put(checksum, _record(args.fields))
+
+        reader = ContentStore(storage=storage, max_entries=args.lookups)
+        missing = [content_checksum(f"unknown {n}".encode()) for n in range(args.lookups)]
+        print(f"{'lookup':>14} {'mean ms':>9}")
+        print(f"{'miss':>14} {_mean_ms(reader.get, missing):>9.3f}")
+        print(f"{'storage hit':>14} {_mean_ms(reader.get, checksums):>9.3f}")
+        print(f"{'memory hit':>14} {_mean_ms(reader.get, checksums):>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
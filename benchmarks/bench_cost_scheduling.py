@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_cost_scheduling.py
+
+Replays a mixed document workload (receipt photos, 1-3 page invoices, 5-30
+page statements, 20-80 page contracts) through the admission queue's
+scheduling on a simulated clock. Jobs arrive as a Poisson stream at --load
+utilisation of --workers; each document's true processing time depends on
+its pages, size, resolution and type, plus noise, and is hidden from the
+scheduler. Three orders are compared:
+
+- fifo: arrival order (the old queue);
+- sjf: shortest expected job first with aging, using a CostEstimator that
+  starts from its priors and is calibrated by the jobs completed so far;
+- oracle: the same with the true processing times, as a lower bound.
+
+Printed are mean and p95 completion time (queue wait + processing) over all
+jobs, for single-page documents, and the worst wait of a contract (aging
+bounds it), plus the mean relative error of the estimates over the last
+tenth of the jobs (the priors alone are off by about 46% on this mix).
+
+Usage:
+    python benchmarks/bench_cost_scheduling.py [--jobs 20000] [--workers 4] [--load 0.85] [--aging-rate 0.5]
+"""
+import argparse
+import heapq
+import logging
+import random
+import statistics
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.cost_estimator import CostEstimator, JobFeatures
+from app.core.fair_queue import FairQueue
+
+# doc type: (share of jobs, page range, MB per page range, megapixels range, true time factor)
+MIX = {
+    "receipt": (0.45, (1, 1), (0.3, 1.5), (2.0, 12.0), 0.7),
+    "invoice": (0.35, (1, 3), (0.1, 0.4), (0.0, 0.0), 1.0),
+    "statement": (0.15, (5, 30), (0.05, 0.2), (0.0, 0.0), 1.4),
+    "contract": (0.05, (20, 80), (0.05, 0.2), (0.0, 0.0), 1.2),
+}
+
+
+def true_seconds(features, rng):
+    base = 1.5 + 2.2 * features.pages + 0.4 * features.size_mb + 0.35 * features.megapixels
+    return base * MIX[features.doc_type][4] * rng.lognormvariate(0, 0.25)
+
+
+def make_trace(args):
+    rng = random.Random(args.seed)
+    docs = []
+    types, weights = zip(*[(t, spec[0]) for t, spec in MIX.items()])
+    for _ in range(args.jobs):
+        doc_type = rng.choices(types, weights)[0]
+        _, (p_lo, p_hi), (mb_lo, mb_hi), (mp_lo, mp_hi), _ = MIX[doc_type]
+        pages = rng.randint(p_lo, p_hi)
+        features = JobFeatures(pages=pages, size_mb=pages * rng.uniform(mb_lo, mb_hi),
+                               megapixels=rng.uniform(mp_lo, mp_hi), doc_type=doc_type)
+        docs.append((features, true_seconds(features, rng)))
+    mean_service = statistics.fmean(seconds for _, seconds in docs)
+    rate = args.load * args.workers / mean_service
+    t = 0.0
+    trace = []
+    for features, seconds in docs:
+        t += rng.expovariate(rate)
+        trace.append((t, features, seconds))
+    return trace
+
+
+def replay(trace, args, mode):
+    now = 0.0
+    queue = FairQueue({}, shortest_first=mode != "fifo", aging_rate=args.aging_rate, clock=lambda: now)
+    estimator = CostEstimator()
+    events = []  # (finish time, job index, expected seconds)
+    free = args.workers
+    completion = [0.0] * len(trace)
+    waits = [0.0] * len(trace)
+    errors = []
+    index = 0
+
+    while index < len(trace) or events:
+        if events and (index == len(trace) or events[0][0] <= trace[index][0]):
+            now, job, expected = heapq.heappop(events)
+            arrived, features, seconds = trace[job]
+            errors.append(abs(expected - seconds) / seconds)
+            estimator.observe(features, seconds)
+            completion[job] = now - arrived
+            queue.done(None)
+            free += 1
+        else:
+            now, features, seconds = trace[index]
+            expected = seconds if mode == "oracle" else estimator.predict(features)
+            queue.push(None, (index, expected), cost=expected)
+            index += 1
+        while free:
+            entry = queue.pop()
+            if entry is None:
+                break
+            _, (job, expected) = entry
+            waits[job] = now - trace[job][0]
+            free -= 1
+            heapq.heappush(events, (now + trace[job][2], job, expected))
+    return completion, waits, errors
+
+
+def _p95(values):
+    return statistics.quantiles(values, n=20)[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--load", type=float, default=0.85)
+    parser.add_argument("--aging-rate", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    trace = make_trace(args)
+    single = [n for n, (_, features, _) in enumerate(trace) if features.pages == 1]
+    contracts = [n for n, (_, features, _) in enumerate(trace) if features.doc_type == "contract"]
+    tail = max(1, len(trace) // 10)
+
+    print(f"{'order':>7} {'mean s':>8} {'p95 s':>8} {'1-page mean s':>14} {'1-page p95 s':>13} "
+          f"{'contract max wait s':>20} {'est. error %':>13}")
+    for mode in ("fifo", "sjf", "oracle"):
+        completion, waits, errors = replay(trace, args, mode)
+        one_page = [completion[n] for n in single]
+        print(f"{mode:>7} {statistics.fmean(completion):>8.1f} {_p95(completion):>8.1f} "
+              f"{statistics.fmean(one_page):>14.1f} {_p95(one_page):>13.1f} "
+              f"{max(waits[n] for n in contracts):>20.1f} {100 * statistics.fmean(errors[-tail:]):>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_duplicate_index.py
+
+Duplicate-invoice index at scale: bulk rebuild of N synthetic invoices, then
+lookup latency for re-submitted (duplicate) and new invoices.
+
+Usage:
+    python benchmarks/bench_duplicate_index.py [--invoices 1000000] [--queries 20000] [--db PATH]
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.validation.duplicate_index import DuplicateInvoiceIndex
+
+START = date(2020, 1, 1)
+
+
+def make_invoice(rng, vendors, number):
+    return {
+        "vendor": f"Vendor {rng.randrange(vendors)} GmbH",
+        "invoice_id": f"INV-{number:07d}",
+        "total": rng.randint(100, 5_000_000) / 100,
+        "date": (START + timedelta(days=rng.randrange(1800))).isoformat(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--invoices", type=int, default=1_000_000)
+    parser.add_argument("--vendors", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--db", default=None, help="SQLite path (default: temporary file)")
+    args = parser.parse_args()
+
+    rng = random.Random(13)
+    invoices = [make_invoice(rng, args.vendors, i) for i in range(args.invoices)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = DuplicateInvoiceIndex(args.db or str(Path(tmp) / "duplicates.db"))
+
+        start = time.perf_counter()
+        indexed = index.rebuild((f"doc-{i}", invoice) for i, invoice in enumerate(invoices))
+        rebuild = time.perf_counter() - start
+
+        queries = []
+        for _ in range(args.queries // 2):
+            original = dict(invoices[rng.randrange(args.invoices)])
+            original["total"] = round(original["total"] * rng.uniform(0.995, 1.005), 2)
+            queries.append((original, True))
+            queries.append((make_invoice(rng, args.vendors, args.invoices + rng.randrange(10**6)), False))
+
+        latencies = []
+        found = 0
+        for record, is_duplicate in queries:
+            t0 = time.perf_counter()
+            matches = index.find_duplicates(record)
+            latencies.append(time.perf_counter() - t0)
+            found += bool(matches) and is_duplicate
+
+        start = time.perf_counter()
+        for i, (record, _) in enumerate(queries[:5000]):
+            index.check_and_add(f"new-{i}", record)
+        index.flush()
+        incremental = time.perf_counter() - start
+        index.close()
+
+    latencies.sort()
+    print(f"indexed invoices:     {indexed}")
+    print(f"bulk rebuild:         {rebuild:8.2f} s  ({indexed / rebuild:,.0f} invoices/s)")
+    print(f"lookups:              {len(queries)}  (duplicates found: {found}/{len(queries) // 2})")
+    print(f"lookup mean / p99:    {statistics.mean(latencies) * 1e6:8.1f} / {latencies[int(len(latencies) * 0.99)] * 1e6:.1f} us")
+    print(f"check_and_add:        {incremental / 5000 * 1e6:8.1f} us/invoice")
+
+
+if __name__ == "__main__":
+    main()
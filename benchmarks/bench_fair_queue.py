@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_fair_queue.py
+
+Simulated admission queue under a bulk upload: one enterprise tenant submits
+--bulk jobs at once while --small-tenants starter/growth tenants each submit
+a job every few minutes. The same workload (simulated clock, random service
+times) is run through a single FIFO and through the per-tenant FairQueue
+with plan-tier weights and concurrency caps. Printed are the small tenants'
+queue wait percentiles and when the bulk upload finished. With the FIFO the
+small tenants wait behind the whole backlog; with fair queueing their wait
+stays within about one service time, and the bulk upload runs at its plan's
+concurrency cap, so it finishes later than with the FIFO.
+
+Usage:
+    python benchmarks/bench_fair_queue.py [--bulk 50000] [--workers 8] [--small-tenants 20] [--hours 8]
+"""
+import argparse
+import heapq
+import random
+import statistics
+import sys
+from collections import deque
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.fair_queue import FairQueue
+
+
+class FifoQueue:
+    """The old single queue, with the FairQueue interface the simulation uses."""
+
+    def __init__(self):
+        self._jobs = deque()
+
+    def push(self, tenant_id, item, tier=None, cost=1.0):
+        self._jobs.append((tenant_id, item))
+
+    def pop(self):
+        return self._jobs.popleft() if self._jobs else None
+
+    def done(self, tenant_id):
+        pass
+
+
+def simulate(queue, args, seed):
+    rng = random.Random(seed)
+    arrivals = [(0.0, "bulk", "enterprise")] * args.bulk
+    for n in range(args.small_tenants):
+        tier = "starter" if n % 2 else "growth"
+        t = rng.uniform(0, args.interval)
+        while t < args.hours * 3600:
+            arrivals.append((t, f"tenant-{n}", tier))
+            t += rng.expovariate(1 / args.interval)
+    arrivals.sort(key=lambda a: a[0])
+
+    events = []  # (time, seq, tenant) job completions
+    seq = 0
+    free = args.workers
+    waits = {"bulk": [], "small": []}
+    bulk_done_at = 0.0
+    index = 0
+    now = 0.0
+
+    def dispatch(now):
+        nonlocal free, seq
+        while free:
+            entry = queue.pop()
+            if entry is None:
+                return
+            tenant, enqueued_at = entry
+            waits["bulk" if tenant == "bulk" else "small"].append(now - enqueued_at)
+            free -= 1
+            seq += 1
+            heapq.heappush(events, (now + rng.uniform(args.service_min, args.service_max), seq, tenant))
+
+    while index < len(arrivals) or events:
+        next_arrival = arrivals[index][0] if index < len(arrivals) else float("inf")
+        if events and events[0][0] <= next_arrival:
+            now, _, tenant = heapq.heappop(events)
+            queue.done(tenant)
+            free += 1
+            if tenant == "bulk":
+                bulk_done_at = now
+        else:
+            now, tenant, tier = arrivals[index]
+            index += 1
+            queue.push(tenant, now, tier=tier)
+        dispatch(now)
+    return waits, bulk_done_at
+
+
+def _pct(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else (values[0] if values else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bulk", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--small-tenants", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=300.0, help="mean seconds between a small tenant's jobs")
+    parser.add_argument("--hours", type=float, default=8.0)
+    parser.add_argument("--service-min", type=float, default=2.0)
+    parser.add_argument("--service-max", type=float, default=6.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'queue':>6} {'small jobs':>10} {'p50 wait s':>11} {'p95 wait s':>11} {'max wait s':>11} "
+          f"{'bulk done h':>12}")
+    for name, queue in (("fifo", FifoQueue()), ("fair", FairQueue())):
+        waits, bulk_done_at = simulate(queue, args, args.seed)
+        small = waits["small"]
+        print(f"{name:>6} {len(small):>10} {_pct(small, 50):>11.1f} {_pct(small, 95):>11.1f} "
+              f"{max(small):>11.1f} {bulk_done_at / 3600:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_parsing.py
+
+Microbenchmark: legacy per-module amount/date parsing (multi-format loops,
+dateutil per value) against finscribe.parsing (memoized, per-document date
+format inference).
+
+Usage:
+    python benchmarks/bench_parsing.py [--pages 500] [--dates-per-page 20]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from dateutil import parser as dateparser
+
+from finscribe.parsing import DocumentDateParser, clear_parse_caches, extract_amount
+
+LEGACY_AMOUNT_RE = re.compile(r"([£$€]?)[\s]*(-?\d{1,3}(?:[,\d{3}]*)(?:\.\d{1,4})?)")
+LEGACY_DATE_RE = re.compile(r"(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2}[-/]\d{2,4})")
+LEGACY_FORMATS = ["%Y-%m-%d", "%Y/%m/%d", "%m-%d-%Y", "%m/%d/%Y", "%d/%m/%Y"]
+
+
+def legacy_amount(text):
+    m = LEGACY_AMOUNT_RE.search(text.replace(",", ""))
+    if not m:
+        return None
+    return Decimal(m.group(2)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def legacy_date(text):
+    m = LEGACY_DATE_RE.search(text)
+    candidate = m.group(0) if m else text
+    for fmt in LEGACY_FORMATS:
+        try:
+            return datetime.strptime(candidate, fmt)
+        except ValueError:
+            continue
+    try:
+        return dateparser.parse(candidate)
+    except Exception:
+        return None
+
+
+def make_pages(pages, dates_per_page):
+    rng = random.Random(11)
+    result = []
+    for _ in range(pages):
+        day_first = rng.random() < 0.5
+        texts = []
+        for _ in range(dates_per_page):
+            d, m = rng.randint(13, 28), rng.randint(1, 12)
+            texts.append(f"{d:02d}/{m:02d}/2024" if day_first else f"{m:02d}/{d:02d}/2024")
+        amounts = [f"${rng.randint(1, 500)}.{rng.randint(0, 99):02d}" for _ in range(dates_per_page * 3)]
+        result.append((texts, amounts))
+    return result
+
+
+def run_legacy(pages):
+    for dates, amounts in pages:
+        for text in dates:
+            legacy_date(text)
+        for text in amounts:
+            legacy_amount(text)
+
+
+def run_shared(pages):
+    for dates, amounts in pages:
+        parser = DocumentDateParser()
+        for text in dates:
+            parser.parse(text)
+        for text in amounts:
+            extract_amount(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--dates-per-page", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages, args.dates_per_page)
+    values = args.pages * args.dates_per_page * 4
+
+    start = time.perf_counter()
+    run_legacy(pages)
+    legacy = time.perf_counter() - start
+
+    clear_parse_caches()
+    start = time.perf_counter()
+    run_shared(pages)
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    run_shared(pages)
+    warm = time.perf_counter() - start
+
+    print(f"values parsed:        {values}")
+    print(f"legacy:               {legacy * 1000:8.1f} ms  ({legacy / values * 1e6:.2f} us/value)")
+    print(f"shared (cold cache):  {cold * 1000:8.1f} ms  ({cold / values * 1e6:.2f} us/value)")
+    print(f"shared (warm cache):  {warm * 1000:8.1f} ms  ({warm / values * 1e6:.2f} us/value)")
+
+
+if __name__ == "__main__":
+    main()
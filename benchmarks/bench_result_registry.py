@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_result_registry.py
+
+Result lookup latency as the number of jobs a process has seen grows. Results
+are stored in a bounded ResultRegistry, and the mean lookup time (by
+result_id and by job_id, recent results only) is printed at each checkpoint.
+For comparison the old lookup, a scan over a dict holding every job ever
+seen, is timed too, up to --scan-limit jobs (it keeps every result in
+memory). Registry latency and size should stay flat; the scan grows
+linearly.
+
+Usage:
+    python benchmarks/bench_result_registry.py [--jobs 1000000] [--max-entries 10000] [--scan-limit 200000]
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.result_registry import ResultRegistry
+
+
+def _mean_us(lookup, keys) -> float:
+    started = time.perf_counter()
+    for key in keys:
+        lookup(key)
+    return (time.perf_counter() - started) / len(keys) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--max-entries", type=int, default=10_000)
+    parser.add_argument("--scan-limit", type=int, default=200_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    registry = ResultRegistry(max_entries=args.max_entries)
+    job_status = {}
+    checkpoints = sorted({args.jobs // 100, args.jobs // 10, args.jobs // 2, args.jobs} - {0})
+
+    def scan(result_id):
+        for job_data in job_status.values():
+            if job_data["result"]["document_id"] == result_id:
+                return job_data["result"]
+        return None
+
+    print(f"{'jobs':>10} {'stored':>8} {'by result us':>13} {'by job us':>10} {'scan us':>10}")
+    created = 0
+    for checkpoint in checkpoints:
+        while created < checkpoint:
+            record = {"result_id": f"result-{created}", "job_id": f"job-{created}", "data": {"n": created}}
+            registry.put(record)
+            if created < args.scan_limit:
+                job_status[record["job_id"]] = {"result": {"document_id": record["result_id"]}}
+            created += 1
+        recent = [random.randrange(max(0, created - args.max_entries), created) for _ in range(args.lookups)]
+        by_result = _mean_us(registry.get, [f"result-{n}" for n in recent])
+        by_job = _mean_us(registry.get_by_job, [f"job-{n}" for n in recent])
+        scan_us = "-"
+        if created <= args.scan_limit:
+            sampled = [f"result-{random.randrange(created)}" for _ in range(20)]
+            scan_us = f"{_mean_us(scan, sampled):.1f}"
+        print(f"{created:>10} {len(registry):>8} {by_result:>13.2f} {by_job:>10.2f} {scan_us:>10}")
+
+
+if __name__ == "__main__":
+    main()
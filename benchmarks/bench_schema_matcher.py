@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_schema_matcher.py
+
+Compare per-field regex matching against the compiled schema matcher as the
+number of registered schemas grows (3 built-in schemas padded up to 20).
+
+Usage:
+    python benchmarks/bench_schema_matcher.py [--regions 200] [--repeat 20]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from finscribe.schemas import DocumentSchema, FieldSpec, get_registered_schemas
+from finscribe.schemas.matcher import CompiledSchemaMatcher
+
+REGION_TEXTS = [
+    "ACME CORPORATION",
+    "Invoice #INV-{n}",
+    "Date: 2024-01-{d:02d}",
+    "Due Date: 2024-02-{d:02d}",
+    "Widget {n} x 2 @ 12.50",
+    "Subtotal: ${n}.00",
+    "Sales Tax: {d}.40",
+    "Total ${n}.40 USD",
+    "Paid by card at 10:{d:02d} AM",
+    "Thank you for shopping with us",
+]
+
+
+def make_schemas(count: int) -> List[DocumentSchema]:
+    """Built-in schemas plus synthetic ones mixing shared and unique patterns."""
+    builtins = get_registered_schemas()
+    shared = [f for s in builtins for f in s.fields if f.regex]
+    schemas = list(builtins)
+    for i in range(count - len(builtins)):
+        fields = [
+            FieldSpec(f"ref_{i}", required=True, region_type="header", regex=rf"(REF{i}|Ref-{i})[\s#:]*(\w+)"),
+            FieldSpec(f"code_{i}", required=False, region_type="footer", regex=rf"code\s*{i}[\s:]*(\d+)"),
+        ]
+        fields += [shared[(i + k) % len(shared)] for k in range(6)]
+        schemas.append(DocumentSchema(f"synthetic_{i}", fields, keywords=[f"form {i}", f"document type {i}"]))
+    return schemas
+
+
+def make_regions(n: int) -> List[dict]:
+    rng = random.Random(7)
+    regions = []
+    for i in range(n):
+        template = REGION_TEXTS[i % len(REGION_TEXTS)]
+        regions.append({"text": template.format(n=rng.randint(100, 9999), d=rng.randint(1, 28))})
+    return regions
+
+
+def legacy_scan(schemas: List[DocumentSchema], regions: List[dict]) -> int:
+    """Keyword loops per doc type plus one re.search per field per region."""
+    hits = 0
+    doc_text = " ".join(r["text"] for r in regions).lower()
+    for schema in schemas:
+        if any(keyword in doc_text for keyword in schema.keywords):
+            break
+    for region in regions:
+        for schema in schemas:
+            for field in schema.fields:
+                if field.regex and re.search(field.regex, region["text"], re.IGNORECASE):
+                    hits += 1
+    return hits
+
+
+def compiled_scan(matcher: CompiledSchemaMatcher, regions: List[dict]) -> int:
+    hits = 0
+    matcher.infer_doc_type(" ".join(r["text"] for r in regions))
+    for region in regions:
+        for region_type in ("header", "footer"):
+            for fields in matcher.scan_region(region["text"], region_type).values():
+                hits += len(fields)
+    return hits
+
+
+def timeit(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--regions", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    regions = make_regions(args.regions)
+    print(f"{'schemas':>8} {'legacy ms':>10} {'compiled ms':>12} {'speedup':>8}")
+    for count in (3, 5, 10, 20):
+        schemas = make_schemas(count)
+        matcher = CompiledSchemaMatcher(schemas)
+        legacy = timeit(lambda: legacy_scan(schemas, regions), args.repeat)
+        compiled = timeit(lambda: compiled_scan(matcher, regions), args.repeat)
+        print(f"{count:>8} {legacy * 1000:>10.2f} {compiled * 1000:>12.2f} {legacy / compiled:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_statement_stream.py
+
+Streaming bank-statement parsing: peak memory for growing statements (should
+stay flat, bounded by one page) and time to the first transaction when pages
+arrive one by one from a simulated OCR stage.
+
+The memoized amount/date parsers (finscribe.parsing) are cleared after every
+page for the memory runs; they are bounded separately and would otherwise
+grow until they reach their size limit.
+
+Usage:
+    python benchmarks/bench_statement_stream.py [--pages 200] [--rows 40] [--ocr-ms 20]
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from finscribe.parsing import clear_parse_caches
+from finscribe.statement_stream import StreamingStatementParser
+
+
+def _region(text, x, y):
+    return {"text": text, "bbox": [x, y, 80, 14], "confidence": 0.95}
+
+
+def make_page(rng, page, rows, balance):
+    """OCR regions of one statement page; returns (regions, closing balance)."""
+    regions = [_region(text, x, 40) for text, x in
+               (("Date", 20), ("Description", 120), ("Debit", 400), ("Credit", 500), ("Balance", 600))]
+    regions += [_region("Balance brought forward", 120, 70), _region(f"{balance:,.2f}", 600, 70)]
+    y = 100
+    for row in range(rows):
+        amount = Decimal(rng.randint(100, 50000)) / 100
+        debit = rng.random() < 0.7
+        balance += -amount if debit else amount
+        day = 1 + (page * rows + row) % 28
+        regions += [_region(f"{day:02d}/03/2024", 20, y), _region(f"Payment {page}-{row}", 120, y),
+                    _region(f"{amount:,.2f}", 400 if debit else 500, y), _region(f"{balance:,.2f}", 600, y)]
+        y += 30
+    regions += [_region("Balance carried forward", 120, y), _region(f"{balance:,.2f}", 600, y)]
+    return regions, balance
+
+
+def statement(pages, rows, ocr_delay=0.0, clear_caches=False):
+    """Lazily generated statement pages, optionally delayed like page-by-page OCR."""
+    rng = random.Random(3)
+    balance = Decimal("10000.00")
+    for page in range(pages):
+        if ocr_delay:
+            time.sleep(ocr_delay)
+        if clear_caches:
+            clear_parse_caches()
+        regions, balance = make_page(rng, page, rows, balance)
+        yield regions
+
+
+def peak_memory(pages, rows):
+    parser = StreamingStatementParser()
+    tracemalloc.start()
+    count = sum(1 for _ in parser.parse_pages(statement(pages, rows, clear_caches=True)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, peak, parser.finish()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=40)
+    parser.add_argument("--ocr-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    for pages in (args.pages // 8, args.pages // 2, args.pages):
+        count, peak, summary = peak_memory(pages, args.rows)
+        print(f"{pages:5d} pages: {count:6d} transactions, peak {peak / 1024:8.1f} KiB, "
+              f"balance_ok={summary['balance_ok']}")
+
+    start = time.perf_counter()
+    count = sum(1 for _ in StreamingStatementParser().parse_pages(statement(args.pages, args.rows)))
+    elapsed = time.perf_counter() - start
+    print(f"throughput:        {count / elapsed:10.0f} transactions/s ({elapsed / args.pages * 1000:.2f} ms/page)")
+
+    stream = StreamingStatementParser().parse_pages(statement(args.pages, args.rows, args.ocr_ms / 1000))
+    start = time.perf_counter()
+    next(stream)
+    first = time.perf_counter() - start
+    for _ in stream:
+        pass
+    total = time.perf_counter() - start
+    print(f"first transaction: {first * 1000:10.1f} ms (all {args.pages} pages OCR'd after {total * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
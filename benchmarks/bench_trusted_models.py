@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_trusted_models.py
+
+Per-invoice cost of pydantic validation and serialization at 10, 100 and
+1,000 line items.
+
+ExtractedDocument: full validation, trusted construction, ensure() on an
+already-validated instance, JSON dump/validate, and a four-boundary pipeline
+(parse, validation, storage, API response) revalidating at every boundary
+versus validating once.
+
+API ResultResponse (untyped ``data`` payload holding the invoice): building
+it validated versus trusted, and producing the response body the way
+FastAPI does for a returned model (dump, revalidate against response_model,
+serialize) versus serializing the marked instance directly.
+
+Usage:
+    python benchmarks/bench_trusted_models.py [--sizes 10 100 1000] [--seconds 0.5]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.api.v1.endpoints import ResultResponse
+from app.core.schemas import ExtractedDocument
+
+BOUNDARIES = 4
+
+
+def make_invoice(n_items):
+    return {
+        "document_type": "invoice",
+        "vendor": {"name": "Acme Corporation", "confidence": 0.98, "bbox": [10, 10, 300, 60]},
+        "client": {"invoice_number": "INV-2024-001", "invoice_date": "2024-03-15", "confidence": 0.94},
+        "line_items": [
+            {"description": f"Professional services {i}", "quantity": 2.0, "unit_price": 75.5,
+             "line_total": 151.0, "confidence": 0.95, "bbox": [50, 500 + i, 800, 520 + i]}
+            for i in range(n_items)
+        ],
+        "financial_summary": {"subtotal": 151.0 * n_items, "tax_rate": 0.1,
+                              "tax_amount": 15.1 * n_items, "grand_total": 166.1 * n_items,
+                              "currency": "USD"},
+    }
+
+
+def per_call(fn, seconds):
+    """Mean seconds per call, repeating until ``seconds`` have elapsed."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return elapsed / calls
+
+
+def revalidate_every_boundary(data):
+    model = ExtractedDocument.model_validate(data)
+    for _ in range(BOUNDARIES - 1):
+        model = ExtractedDocument.model_validate(model.model_dump())
+    return model
+
+
+def validate_once(data):
+    model = ExtractedDocument.model_validate(data)
+    for _ in range(BOUNDARIES - 1):
+        model = ExtractedDocument.ensure(model)
+    return model
+
+
+def result_fields(data):
+    return {"result_id": "r-1", "job_id": "j-1", "data": data, "validation": {"is_valid": True},
+            "metadata": {"schema_version": "1.0"}, "markdown_output": None, "output_formats": ["json"]}
+
+
+def fastapi_style_body(model):
+    return ResultResponse.model_validate(model.model_dump()).model_dump_json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--seconds", type=float, default=0.5)
+    args = parser.parse_args()
+
+    widths = (10, 10, 10, 10, 10, 12, 12)
+    print("ExtractedDocument (us/invoice)")
+    print(f"{'items':>6} {'validate':>10} {'trusted':>10} {'ensure':>10} {'dump_json':>10} "
+          f"{'load_json':>10} {'pipeline x4':>12} {'validate 1x':>12}")
+    for n_items in args.sizes:
+        data = make_invoice(n_items)
+        model = ExtractedDocument.model_validate(data)
+        dumped = model.model_dump()
+        payload = model.model_dump_json()
+
+        timings = [
+            per_call(lambda: ExtractedDocument.model_validate(data), args.seconds),
+            per_call(lambda: ExtractedDocument.trusted(dumped), args.seconds),
+            per_call(lambda: ExtractedDocument.ensure(model), args.seconds),
+            per_call(model.model_dump_json, args.seconds),
+            per_call(lambda: ExtractedDocument.model_validate_json(payload), args.seconds),
+            per_call(lambda: revalidate_every_boundary(data), args.seconds),
+            per_call(lambda: validate_once(data), args.seconds),
+        ]
+        print(f"{n_items:>6} " + " ".join(f"{t * 1e6:>{w}.1f}" for t, w in zip(timings, widths)))
+
+    print()
+    print("API ResultResponse with the invoice as data payload (us/invoice)")
+    print(f"{'items':>6} {'validate':>10} {'trusted':>10} {'revalidated response':>22} {'marked response':>16}")
+    for n_items in args.sizes:
+        fields = result_fields(make_invoice(n_items))
+        model = ResultResponse.trusted(fields)
+        timings = [
+            per_call(lambda: ResultResponse(**fields), args.seconds),
+            per_call(lambda: ResultResponse.trusted(fields), args.seconds),
+            per_call(lambda: fastapi_style_body(model), args.seconds),
+            per_call(lambda: ResultResponse.ensure(model).model_dump_json(), args.seconds),
+        ]
+        print(f"{n_items:>6} " + " ".join(f"{t * 1e6:>{w}.1f}" for t, w in zip(timings, (10, 10, 22, 16))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_vendor_resolver.py
+
+VendorResolver over a synthetic canonical vendor list: index build time,
+top-k query latency and recall@1 / recall@k for OCR-corrupted names.
+
+Usage:
+    python benchmarks/bench_vendor_resolver.py [--vendors 100000] [--queries 5000] [--k 5]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from finscribe.vendors import VendorResolver
+
+PREFIXES = ["North", "South", "Global", "United", "First", "Pacific", "Atlantic", "Metro", "Prime", "Apex",
+            "Summit", "Blue", "Green", "Red", "Silver", "Golden", "Alpine", "Coastal", "Royal", "Urban"]
+CORES = ["Paper", "Steel", "Logistics", "Consulting", "Foods", "Textiles", "Software", "Energy", "Office",
+         "Print", "Freight", "Medical", "Dental", "Legal", "Catering", "Electric", "Plumbing", "Marine",
+         "Security", "Cleaning", "Packaging", "Chemicals", "Timber", "Glass", "Motors", "Media"]
+SUFFIXES = ["Inc", "LLC", "Ltd", "GmbH", "Corp", "Co", "Group", "Partners", "Holdings", "AG", "SA", "BV"]
+SYLLABLES = ["ka", "lo", "ri", "ven", "tor", "mar", "sel", "dan", "ix", "qu", "or", "bel", "zen", "tra"]
+OCR_CONFUSIONS = {"o": "0", "0": "o", "l": "1", "i": "l", "s": "5", "b": "8", "e": "c", "a": "o", "g": "q"}
+
+
+def make_vendors(count, seed=21):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        coined = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        parts = [rng.choice(PREFIXES), coined, rng.choice(CORES), rng.choice(SUFFIXES)]
+        if rng.random() < 0.5:
+            parts.pop(0)
+        names.add(" ".join(parts))
+    return sorted(names)
+
+
+def ocr_corrupt(name, rng, edits=2):
+    """Apply OCR-style damage: character confusions, drops, doubled letters, case and spacing noise."""
+    chars = list(name)
+    for _ in range(edits):
+        pos = rng.randrange(len(chars))
+        op = rng.random()
+        if op < 0.5 and chars[pos].lower() in OCR_CONFUSIONS:
+            chars[pos] = OCR_CONFUSIONS[chars[pos].lower()]
+        elif op < 0.7:
+            del chars[pos]
+        elif op < 0.85:
+            chars.insert(pos, chars[pos])
+        else:
+            chars.insert(pos, " ")
+    text = "".join(chars)
+    return text.upper() if rng.random() < 0.2 else text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vendors", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    names = make_vendors(args.vendors)
+    start = time.perf_counter()
+    resolver = VendorResolver(names)
+    build = time.perf_counter() - start
+
+    rng = random.Random(5)
+    targets = [rng.choice(names) for _ in range(args.queries)]
+    queries = [ocr_corrupt(name, rng) for name in targets]
+
+    latencies, top1, topk = [], 0, 0
+    for target, query in zip(targets, queries):
+        t0 = time.perf_counter()
+        matches = resolver.search(query, k=args.k)
+        latencies.append(time.perf_counter() - t0)
+        found = [match.name for match in matches]
+        top1 += bool(found) and found[0] == target
+        topk += target in found
+
+    latencies.sort()
+    print(f"vendors:              {len(resolver)}  (index built in {build:.2f} s)")
+    print(f"query mean / p99:     {statistics.mean(latencies) * 1e6:8.1f} / {latencies[int(len(latencies) * 0.99)] * 1e6:.1f} us")
+    print(f"recall@1:             {top1 / args.queries:.3f}")
+    print(f"recall@{args.k}:             {topk / args.queries:.3f}")
+
+
+if __name__ == "__main__":
+    main()
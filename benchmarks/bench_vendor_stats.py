@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_vendor_stats.py
+
+Throughput of per-vendor statistical scoring (score + Welford update +
+batched SQLite persistence) on synthetic records from many vendors.
+
+Usage:
+    python benchmarks/bench_vendor_stats.py [--records 200000] [--vendors 5000] [--db PATH]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.etl.vendor_stats import VendorStatisticalValidator, VendorStatsStore
+
+
+def make_records(count, vendors):
+    rng = random.Random(7)
+    profiles = [(f"Vendor {i} Ltd.", rng.uniform(50, 5000), rng.choice([0.0, 0.05, 0.08, 0.2]))
+                for i in range(vendors)]
+    records = []
+    for _ in range(count):
+        name, typical, tax_rate = profiles[rng.randrange(vendors)]
+        subtotal = max(1.0, rng.gauss(typical, typical * 0.1))
+        if rng.random() < 0.001:
+            subtotal *= 20
+        records.append({
+            "vendor": name,
+            "subtotal": subtotal,
+            "tax": subtotal * tax_rate,
+            "total": subtotal * (1 + tax_rate),
+            "line_items": [{}] * rng.randint(1, 8),
+        })
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=200000)
+    parser.add_argument("--vendors", type=int, default=5000)
+    parser.add_argument("--db", default=None, help="SQLite path (default: temporary file)")
+    args = parser.parse_args()
+
+    records = make_records(args.records, args.vendors)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = VendorStatsStore(args.db or str(Path(tmp) / "vendor_stats.db"))
+        validator = VendorStatisticalValidator(store)
+
+        start = time.perf_counter()
+        flagged = sum(1 for record in records if validator.score(record)["warnings"])
+        store.close()
+        elapsed = time.perf_counter() - start
+
+    print(f"records:   {args.records}  vendors: {args.vendors}  flagged: {flagged}")
+    print(f"elapsed:   {elapsed * 1000:8.1f} ms")
+    print(f"throughput: {args.records / elapsed:,.0f} records/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+benchmarks/bench_worker_runtime.py
+
+1,000 small jobs run the way process_job used to (new event loop per job,
+cancel leftovers, close) versus on the persistent WorkerRuntime, serially
+from one caller thread and concurrently from a pool of caller threads (like
+FastAPI background tasks).
+
+Two job shapes:
+  trivial  - a couple of awaits, measures loop setup/teardown alone
+  session  - also opens an HTTP session per job (the model services do this
+             for every OCR/VLM call); private per job on the old path,
+             shared per loop on the runtime
+
+Usage:
+    python benchmarks/bench_worker_runtime.py [--jobs 1000] [--threads 16] [--concurrency 4]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+from app.core.http_session import http_session
+from app.core.worker_runtime import WorkerRuntime
+
+
+async def trivial_job(n):
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    return n
+
+
+async def session_job(n):
+    async with http_session() as session:
+        await asyncio.sleep(0)
+        return n if session is not None else None
+
+
+def loop_per_job(coro):
+    """The previous process_job pattern."""
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(asyncio.wait_for(coro, timeout=300))
+    finally:
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        if pending:
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.close()
+
+
+def timed(fn, jobs, threads):
+    start = time.perf_counter()
+    if threads == 1:
+        for n in range(jobs):
+            fn(n)
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(fn, range(jobs)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    runtime = WorkerRuntime(concurrency=args.concurrency, name="bench-runtime").start()
+    print(f"{'job':>8} {'callers':>8} {'loop/job (us)':>14} {'runtime (us)':>13} {'speedup':>8}")
+    try:
+        for name, job in (("trivial", trivial_job), ("session", session_job)):
+            for threads in (1, args.threads):
+                old = timed(lambda n: loop_per_job(job(n)), args.jobs, threads)
+                new = timed(lambda n: runtime.run(asyncio.wait_for(job(n), timeout=300)), args.jobs, threads)
+                print(f"{name:>8} {threads:>8} {old / args.jobs * 1e6:>14.1f} "
+                      f"{new / args.jobs * 1e6:>13.1f} {old / new:>7.1f}x")
+    finally:
+        runtime.shutdown()
+
+
+if __name__ == "__main__":
+    main()
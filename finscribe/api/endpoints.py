@@ -154,10 +154,11 @@ async def analyze(file: UploadFile = File(...)):
                 logger.info(f"Split PDF into {len(page_images)} pages")
                 
                 # Enqueue OCR task for each page
+                page_names = [f"page_{page_idx}" for page_idx in range(len(page_images))]
                 for page_idx, page_bytes in enumerate(page_images):
                     page_key = f"{STAGING_PREFIX}/{job_id}/page_{page_idx}.png"
                     storage.put_bytes(page_key, page_bytes)
-                    ocr_task.delay(job_id, f"page_{page_idx}", page_key)
+                    ocr_task.delay(job_id, page_names[page_idx], page_key, page_names)
                 
             except ImportError as e:
                 logger.error(f"PDF processing not available: {e}")
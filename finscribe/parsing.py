@@ -0,0 +1,262 @@
+"""
+Shared amount and date parsing.
+
+Single implementation of monetary-amount and date parsing used by the semantic
+parse task, the post-processor, the receipt processor and the ETL transformer:
+- results for repeated strings are memoized
+- decimal / thousands separators are locale-aware (or inferred per value)
+- dates within one document share an inferred format, so once one date is
+  resolved the rest of the page parses in a single strptime attempt
+"""
+
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+from typing import Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+from dateutil import parser as dateutil_parser
+
+_CACHE_SIZE = 16384
+
+
+class NumberLocale(NamedTuple):
+    """Decimal and thousands separators of a number format."""
+    decimal: str
+    thousands: str
+
+
+NUMBER_LOCALES: Dict[str, NumberLocale] = {
+    "en": NumberLocale(".", ","),   # 1,234.56
+    "de": NumberLocale(",", "."),   # 1.234,56
+    "fr": NumberLocale(",", " "),   # 1 234,56
+    "ch": NumberLocale(".", "'"),   # 1'234.56
+}
+
+# Monetary amount inside free text; the number part expects "en" separators
+AMOUNT_RE = re.compile(r"([£$€]?)[\s]*(-?\d{1,3}(?:[,\d{3}]*)(?:\.\d{1,4})?)")
+DATE_RE = re.compile(r"(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2}[-/]\d{2,4})")
+
+# Month-first before day-first, matching dateutil's default (dayfirst=False)
+DEFAULT_DATE_FORMATS: Tuple[str, ...] = (
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%m-%d-%Y",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+)
+
+_NUMBER_CHARS_RE = re.compile(r"[^\d.,'\- ]")
+_CENT = Decimal("0.01")
+
+
+# ---------- Amounts ----------
+
+def _infer_number_locale(digits: str) -> NumberLocale:
+    """
+    Guess separators from a single cleaned number string.
+
+    The right-most of ',' / '.' is the decimal separator when both occur; a
+    single comma is decimal unless exactly three digits follow it, and
+    repeated dots are thousands separators.
+    """
+    last_comma, last_dot = digits.rfind(","), digits.rfind(".")
+    if last_comma >= 0 and last_dot >= 0:
+        return NUMBER_LOCALES["de"] if last_comma > last_dot else NUMBER_LOCALES["en"]
+    if last_comma >= 0:
+        if digits.count(",") == 1 and len(digits) - last_comma - 1 != 3:
+            return NUMBER_LOCALES["de"]
+        return NUMBER_LOCALES["en"]
+    if digits.count(".") > 1:
+        return NUMBER_LOCALES["de"]
+    return NUMBER_LOCALES["en"]
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def parse_amount(text: str, locale: Optional[str] = None) -> Optional[Decimal]:
+    """
+    Parse a string holding a single number (currency symbols allowed).
+
+    Args:
+        text: e.g. "$1,234.56", "1.234,56 €", "(12.00)"
+        locale: Key of NUMBER_LOCALES; inferred from the value when None
+
+    Returns:
+        Decimal value, or None if the text holds no parsable number
+    """
+    if not text:
+        return None
+    stripped = text.strip()
+    negative = stripped.startswith("(") and stripped.endswith(")")
+
+    cleaned = _NUMBER_CHARS_RE.sub("", stripped).strip()
+    if cleaned.startswith("-"):
+        negative = True
+    cleaned = cleaned.replace("-", "")
+    if not any(ch.isdigit() for ch in cleaned):
+        return None
+
+    separators = NUMBER_LOCALES[locale] if locale else _infer_number_locale(cleaned)
+    cleaned = cleaned.replace(" ", "").replace("'", "")
+    if separators.thousands not in (" ", "'"):
+        cleaned = cleaned.replace(separators.thousands, "")
+    cleaned = cleaned.replace(separators.decimal, ".")
+
+    try:
+        value = Decimal(cleaned)
+    except InvalidOperation:
+        return None
+    return -value if negative else value
+
+
+def parse_amount_float(
+    text: str, default: Optional[float] = 0.0, locale: Optional[str] = None
+) -> Optional[float]:
+    """parse_amount() as a float, with a default for unparsable text."""
+    value = parse_amount(text, locale) if isinstance(text, str) else None
+    return float(value) if value is not None else default
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def extract_amount(text: str, locale: str = "en") -> Tuple[Optional[Decimal], Optional[str]]:
+    """
+    Extract the first monetary amount in free text.
+
+    Returns:
+        (amount rounded to cents, currency symbol) or (None, None)
+    """
+    if text is None:
+        return None, None
+    separators = NUMBER_LOCALES[locale]
+    normalized = text.replace(separators.thousands, "")
+    if separators.decimal != ".":
+        normalized = normalized.replace(separators.decimal, ".")
+    m = AMOUNT_RE.search(normalized)
+    if not m:
+        return None, None
+    currency, num = m.group(1) or "", m.group(2)
+    try:
+        return Decimal(num).quantize(_CENT, rounding=ROUND_HALF_UP), currency or None
+    except (InvalidOperation, TypeError):
+        return None, None
+
+
+# Ranked receipt patterns: "$d.dd", "d.dd", "$d", "d". A single alternation in
+# rank order finds, for every rank, the same leftmost match as a separate
+# re.search per pattern would.
+_RANKED_AMOUNT_RE = re.compile(r"\$(\d+\.\d{2})|(\d+\.\d{2})|\$(\d+)|(\d+)")
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def extract_ranked_amount(text: str) -> Optional[float]:
+    """
+    Best receipt-style amount in text: prefer "$x.xx", then "x.xx", "$x", "x".
+    """
+    best_rank, best_value = None, None
+    for m in _RANKED_AMOUNT_RE.finditer(text):
+        rank = m.lastindex
+        if best_rank is None or rank < best_rank:
+            best_rank, best_value = rank, m.group(rank)
+            if rank == 1:
+                break
+    return float(best_value) if best_value is not None else None
+
+
+# ---------- Dates ----------
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _strptime(candidate: str, fmt: str) -> Optional[datetime]:
+    try:
+        dt = datetime.strptime(candidate, fmt)
+    except ValueError:
+        return None
+    # "%Y" accepts 2-digit years ("1/2/24" -> year 24); leave those to dateutil
+    return dt if dt.year >= 1000 else None
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _dateutil_parse(text: str) -> Optional[datetime]:
+    try:
+        return dateutil_parser.parse(text, dayfirst=False, yearfirst=False)
+    except (ValueError, OverflowError, TypeError):
+        return None
+
+
+@lru_cache(maxsize=_CACHE_SIZE)
+def _date_candidate(text: str) -> Optional[str]:
+    m = DATE_RE.search(text)
+    return m.group(0) if m else None
+
+
+def parse_date(
+    text: str,
+    formats: Sequence[str] = DEFAULT_DATE_FORMATS,
+    fallback: bool = False,
+) -> Optional[datetime]:
+    """
+    Parse the first date-like token in text (memoized per string).
+
+    Args:
+        text: Text containing a date
+        formats: strptime formats tried in order
+        fallback: Use dateutil when no format matches (on the whole text if
+            no date-like token is found)
+
+    Returns:
+        datetime or None
+    """
+    return DocumentDateParser(formats, fallback=fallback).parse(text)
+
+
+class DocumentDateParser:
+    """
+    Date parser with per-document format inference.
+
+    The format that resolves the first date is remembered; later dates are
+    tried with that format first, so a consistent page costs one strptime
+    attempt per date. A date that does not fit the inferred format falls back
+    to the full format list and becomes the new inferred format.
+    """
+
+    def __init__(self, formats: Iterable[str] = DEFAULT_DATE_FORMATS, fallback: bool = False):
+        self.formats: Tuple[str, ...] = tuple(formats)
+        self.fallback = fallback
+        self.inferred_format: Optional[str] = None
+        self.attempts = 0
+
+    def parse(self, text: str) -> Optional[datetime]:
+        """Parse the first date-like token in ``text``."""
+        if not text:
+            return None
+        candidate = _date_candidate(text)
+        if candidate is None:
+            return _dateutil_parse(text) if self.fallback else None
+
+        if self.inferred_format is not None:
+            self.attempts += 1
+            dt = _strptime(candidate, self.inferred_format)
+            if dt is not None:
+                return dt
+
+        for fmt in self.formats:
+            if fmt == self.inferred_format:
+                continue
+            self.attempts += 1
+            dt = _strptime(candidate, fmt)
+            if dt is not None:
+                self.inferred_format = fmt
+                return dt
+
+        return _dateutil_parse(candidate) if self.fallback else None
+
+    def parse_iso(self, text: str) -> Optional[str]:
+        """parse() formatted as an ISO date (YYYY-MM-DD)."""
+        dt = self.parse(text)
+        return dt.date().isoformat() if dt is not None else None
+
+
+def clear_parse_caches() -> None:
+    """Drop memoized parse results."""
+    for fn in (parse_amount, extract_amount, extract_ranked_amount, _strptime, _dateutil_parse, _date_candidate):
+        fn.cache_clear()
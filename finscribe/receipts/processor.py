@@ -12,6 +12,8 @@ import numpy as np
 from PIL import Image
 import logging
 
+from finscribe.parsing import extract_ranked_amount
+
 logger = logging.getLogger(__name__)
 
 class ReceiptProcessor:
@@ -389,23 +391,8 @@ class ReceiptProcessor:
         return payment_info
     
     def _extract_amount(self, text: str) -> Optional[float]:
-        """Extract monetary amount from text"""
-        patterns = [
-            r'\$(\d+\.\d{2})',
-            r'(\d+\.\d{2})',
-            r'\$(\d+)',
-            r'(\d+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                try:
-                    return float(match.group(1))
-                except ValueError:
-                    continue
-        
-        return None
+        """Extract monetary amount from text ("$x.xx" > "x.xx" > "$x" > "x")"""
+        return extract_ranked_amount(text)
     
     def validate_receipt(self, receipt_data: Dict) -> Dict:
         """Validate receipt data consistency"""
@@ -5,7 +5,7 @@ Groups OCR regions by layout zones and applies schema-based field extraction.
 """
 
 from typing import Dict, List, Any, Optional
-from .schemas import DocumentSchema, infer_doc_type, get_schema_for_doc_type
+from .schemas import DocumentSchema, infer_doc_type, get_schema_for_doc_type, get_compiled_matcher
 import logging
 
 logger = logging.getLogger(__name__)
@@ -78,55 +78,30 @@ def extract_fields_by_schema(
     """
     # Group regions by layout
     layout_groups = group_regions_by_layout(regions, image_height)
+    matcher = get_compiled_matcher([schema])
     
     extracted = {}
     
-    # Extract fields for each region type
+    # Extract fields for each region type; each region is scanned once for
+    # all of the schema's fields, and the first region yielding a value wins.
     for region_type in ["header", "table", "footer"]:
         regions_in_type = layout_groups.get(region_type, [])
-        fields_for_type = schema.get_fields_by_region(region_type)
         
-        for field_spec in fields_for_type:
-            # Try to match field using regex if available
-            for region in regions_in_type:
-                text = region.get("text", "")
-                
-                if field_spec.matches(text):
-                    # Extract value from text
-                    value = _extract_field_value(text, field_spec)
-                    if value:
-                        extracted[field_spec.name] = {
-                            "value": value,
-                            "confidence": region.get("confidence", 0.5),
-                            "region_type": region_type,
-                            "source_text": text
-                        }
-                        break
+        for region in regions_in_type:
+            text = region.get("text", "")
+            hits = matcher.match_fields(text, schema, region_type)
+            
+            for field_name, hit in hits.items():
+                if field_name in extracted:
+                    continue
+                value = hit.group if hit.group is not None else hit.text
+                value = value.strip()
+                if value:
+                    extracted[field_name] = {
+                        "value": value,
+                        "confidence": region.get("confidence", 0.5),
+                        "region_type": region_type,
+                        "source_text": text
+                    }
     
     return extracted
-
-
-def _extract_field_value(text: str, field_spec: Any) -> Optional[str]:
-    """
-    Extract field value from text using regex.
-    
-    Args:
-        text: Text to extract from
-        field_spec: FieldSpec with regex pattern
-        
-    Returns:
-        Extracted value or None
-    """
-    if not field_spec.regex:
-        return text.strip()
-    
-    import re
-    match = re.search(field_spec.regex, text, re.IGNORECASE)
-    if match:
-        # Return the first capture group if available, otherwise the full match
-        if match.groups():
-            return match.group(1).strip()
-        return match.group(0).strip()
-    
-    return None
-
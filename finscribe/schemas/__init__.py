@@ -4,10 +4,13 @@ Document schema definitions.
 Provides layout-aware schemas for different financial document types.
 """
 
+from typing import Dict, List
+
 from .base import DocumentSchema, FieldSpec
 from .invoice import INVOICE_SCHEMA
 from .receipt import RECEIPT_SCHEMA
 from .bank_statement import BANK_STATEMENT_SCHEMA
+from .matcher import CompiledSchemaMatcher, clear_matcher_cache, get_compiled_matcher
 
 __all__ = [
     "DocumentSchema",
@@ -15,51 +18,65 @@ __all__ = [
     "INVOICE_SCHEMA",
     "RECEIPT_SCHEMA",
     "BANK_STATEMENT_SCHEMA",
+    "CompiledSchemaMatcher",
+    "get_compiled_matcher",
+    "register_schema",
+    "get_registered_schemas",
+    "infer_doc_type",
+    "get_schema_for_doc_type",
 ]
 
+# Registered schemas in doc-type inference priority order
+_SCHEMA_REGISTRY: Dict[str, DocumentSchema] = {
+    "invoice": INVOICE_SCHEMA,
+    "bank_statement": BANK_STATEMENT_SCHEMA,
+    "receipt": RECEIPT_SCHEMA,
+}
+
+
+def register_schema(schema: DocumentSchema) -> None:
+    """
+    Register a schema for doc-type inference and lookup.
+
+    New doc types are appended with the lowest inference priority; registering
+    an existing doc type replaces its schema in place.
+
+    Args:
+        schema: DocumentSchema to register
+    """
+    _SCHEMA_REGISTRY[schema.doc_type] = schema
+    clear_matcher_cache()
+
+
+def get_registered_schemas() -> List[DocumentSchema]:
+    """Get all registered schemas in inference priority order."""
+    return list(_SCHEMA_REGISTRY.values())
+
 
 def infer_doc_type(text: str) -> str:
     """
     Auto-detect document type from text content.
-    
+
+    Keywords of all registered schemas are matched in a single pass; the
+    first registered schema with a keyword present wins.
+
     Args:
         text: Document text content
-        
+
     Returns:
         Document type string: 'invoice', 'receipt', 'bank_statement', or 'generic'
     """
-    text_lower = text.lower()
-    
-    # Check for invoice indicators
-    if any(keyword in text_lower for keyword in ["invoice", "invoice number", "bill to"]):
-        return "invoice"
-    
-    # Check for bank statement indicators
-    if any(keyword in text_lower for keyword in ["statement", "account statement", "bank statement", "closing balance"]):
-        return "bank_statement"
-    
-    # Check for receipt indicators
-    if any(keyword in text_lower for keyword in ["receipt", "thank you", "purchase", "transaction"]):
-        return "receipt"
-    
-    return "generic"
+    return get_compiled_matcher(get_registered_schemas()).infer_doc_type(text)
 
 
 def get_schema_for_doc_type(doc_type: str) -> DocumentSchema:
     """
     Get schema for a document type.
-    
+
     Args:
         doc_type: Document type string
-        
+
     Returns:
         DocumentSchema instance
     """
-    schemas = {
-        "invoice": INVOICE_SCHEMA,
-        "receipt": RECEIPT_SCHEMA,
-        "bank_statement": BANK_STATEMENT_SCHEMA,
-    }
-    
-    return schemas.get(doc_type, INVOICE_SCHEMA)  # Default to invoice schema
-
+    return _SCHEMA_REGISTRY.get(doc_type, INVOICE_SCHEMA)  # Default to invoice schema
@@ -55,5 +55,5 @@ BANK_STATEMENT_SCHEMA = DocumentSchema(
             description="Currency code"
         ),
     ],
+    keywords=["statement", "account statement", "bank statement", "closing balance"],
 )
-
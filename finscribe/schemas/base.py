@@ -4,8 +4,9 @@ Base schema definitions for document parsing.
 Defines field specifications and document schemas with region contracts.
 """
 
-from dataclasses import dataclass
-from typing import List, Dict, Optional, Any
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import List, Dict, Optional, Any, Pattern
 import re
 
 
@@ -18,10 +19,17 @@ class FieldSpec:
     regex: Optional[str] = None
     description: Optional[str] = None
     
+    @cached_property
+    def pattern(self) -> Optional[Pattern[str]]:
+        """Compiled (case-insensitive) regex, built once per field."""
+        if self.regex:
+            return re.compile(self.regex, re.IGNORECASE)
+        return None
+    
     def matches(self, text: str) -> bool:
         """Check if text matches this field's regex pattern."""
-        if self.regex:
-            return bool(re.search(self.regex, text, re.IGNORECASE))
+        if self.pattern is not None:
+            return self.pattern.search(text) is not None
         return False
 
 
@@ -30,6 +38,7 @@ class DocumentSchema:
     """Schema definition for a document type."""
     doc_type: str
     fields: List[FieldSpec]
+    keywords: List[str] = field(default_factory=list)  # doc-type indicators, lowercase
     
     def get_fields_by_region(self, region_type: str) -> List[FieldSpec]:
         """Get all fields for a specific region type."""
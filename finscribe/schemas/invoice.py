@@ -75,5 +75,5 @@ INVOICE_SCHEMA = DocumentSchema(
             description="Currency code"
         ),
     ],
+    keywords=["invoice", "invoice number", "bill to"],
 )
-
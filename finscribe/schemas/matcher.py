@@ -0,0 +1,249 @@
+"""
+Compiled multi-schema matcher.
+
+Field regexes and doc-type keywords of a set of schemas are compiled once into
+a literal-keyword automaton (a single alternation regex) plus one compiled
+pattern per unique regex. Each OCR region is scanned once by the automaton;
+only the field patterns whose required keywords occur in the region are then
+evaluated, so matching cost stays flat as schemas with new keywords are added.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+import re
+
+try:  # Python 3.11+
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse  # type: ignore
+    import sre_constants  # type: ignore
+
+from .base import DocumentSchema, FieldSpec
+
+
+class PatternHit(NamedTuple):
+    """Leftmost match of a single pattern within a text."""
+    start: int
+    text: str
+    group: Optional[str]  # first capture group of the pattern, if it has any
+
+
+def _leading_literals(items: list) -> Optional[Set[str]]:
+    """
+    Literal strings one of which must start any match of a parsed sequence.
+
+    Returns None when no such set can be derived (the pattern must then be
+    evaluated unconditionally).
+    """
+    for index, (op, av) in enumerate(items):
+        if op is sre_constants.AT:
+            continue  # zero-width anchors (\\b, ^) do not consume text
+        if op is sre_constants.LITERAL:
+            run = []
+            for next_op, next_av in items[index:]:
+                if next_op is not sre_constants.LITERAL:
+                    break
+                run.append(chr(next_av))
+            return {"".join(run)}
+        if op is sre_constants.SUBPATTERN:
+            return _leading_literals(list(av[-1]))
+        if op is sre_constants.BRANCH:
+            literals: Set[str] = set()
+            for branch in av[1]:
+                branch_literals = _leading_literals(list(branch))
+                if not branch_literals:
+                    return None
+                literals |= branch_literals
+            return literals
+        if op is sre_constants.IN:
+            if all(in_op is sre_constants.LITERAL for in_op, _ in av):
+                return {chr(value) for _, value in av}
+            return None
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[0] >= 1:
+            return _leading_literals(list(av[2]))
+        return None
+    return None
+
+
+def required_keywords(pattern: str, flags: int = re.IGNORECASE) -> Optional[Set[str]]:
+    """
+    Casefolded keywords at least one of which occurs in any match of ``pattern``.
+
+    Casefolding both keywords and text keeps the check conservative for
+    case-insensitive patterns.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except re.error:
+        return None
+    literals = _leading_literals(list(parsed.data))
+    if not literals or not all(literals):
+        return None
+    return {literal.casefold() for literal in literals}
+
+
+class KeywordAutomaton:
+    """
+    Report which of many literal keywords occur in a text, in one pass.
+
+    Keywords are combined into a single zero-width alternation, longest first,
+    so every start position is visited once and overlapping keywords (e.g.
+    "total" inside "subtotal") are all found.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        unique = sorted({kw.casefold() for kw in keywords if kw}, key=lambda kw: (-len(kw), kw))
+        self.keywords: List[str] = unique
+        self._pattern = (
+            re.compile("(?=(" + "|".join(re.escape(kw) for kw in unique) + "))") if unique else None
+        )
+        # The longest keyword matching at a position implies every keyword that
+        # is a prefix of it matched there too.
+        self._implied: Dict[str, Tuple[str, ...]] = {
+            kw: tuple(other for other in unique if kw.startswith(other)) for kw in unique
+        }
+
+    def find(self, text: str) -> Set[str]:
+        """Return the set of keywords present in ``text`` (case-insensitive)."""
+        found: Set[str] = set()
+        if self._pattern is None:
+            return found
+        for m in self._pattern.finditer(text.casefold()):
+            found.update(self._implied[m.group(1)])
+        return found
+
+
+class MultiPatternScanner:
+    """
+    Find the leftmost match of many regexes with one keyword pass per text.
+
+    Each unique pattern is compiled once. Patterns with derivable keywords are
+    only searched when the keyword automaton finds one of them in the text;
+    hits are identical to ``re.search(pattern, text, flags)``.
+    """
+
+    def __init__(self, patterns: Sequence[str], flags: int = re.IGNORECASE):
+        self.patterns: List[str] = list(dict.fromkeys(patterns))
+        self._compiled = [re.compile(pattern, flags) for pattern in self.patterns]
+        self._always: List[int] = []
+        self._by_keyword: Dict[str, List[int]] = {}
+
+        for index, pattern in enumerate(self.patterns):
+            keywords = required_keywords(pattern, flags)
+            if keywords is None:
+                self._always.append(index)
+            else:
+                for keyword in keywords:
+                    self._by_keyword.setdefault(keyword, []).append(index)
+
+        self._automaton = KeywordAutomaton(self._by_keyword)
+
+    def candidates(self, text: str) -> List[int]:
+        """Indices of patterns that can possibly match ``text``."""
+        selected = set(self._always)
+        for keyword in self._automaton.find(text):
+            selected.update(self._by_keyword[keyword])
+        return sorted(selected)
+
+    def scan(self, text: str) -> Dict[int, PatternHit]:
+        """
+        Return the leftmost hit for every pattern that matches ``text``.
+
+        Keys are indices into ``self.patterns``.
+        """
+        hits: Dict[int, PatternHit] = {}
+        for index in self.candidates(text):
+            m = self._compiled[index].search(text)
+            if m is not None:
+                hits[index] = PatternHit(m.start(), m.group(0), m.group(1) if m.re.groups else None)
+        return hits
+
+
+class CompiledSchemaMatcher:
+    """
+    Field and doc-type matcher compiled once for a set of schemas.
+
+    Identical regexes shared between schemas (dates, currency codes, ...) are
+    compiled and evaluated once per region. Schemas are treated as immutable
+    once compiled.
+    """
+
+    def __init__(self, schemas: Iterable[DocumentSchema]):
+        self.schemas: List[DocumentSchema] = list(schemas)
+        self._region_scanners: Dict[str, MultiPatternScanner] = {}
+        # region type -> pattern index -> [(doc type, field name)]
+        self._region_owners: Dict[str, Dict[int, List[Tuple[str, str]]]] = {}
+
+        by_region: Dict[str, List[Tuple[str, FieldSpec]]] = {}
+        for schema in self.schemas:
+            for field_spec in schema.fields:
+                if field_spec.regex:
+                    by_region.setdefault(field_spec.region_type, []).append((schema.doc_type, field_spec))
+
+        for region_type, entries in by_region.items():
+            scanner = MultiPatternScanner([spec.regex for _, spec in entries])
+            index_of = {pattern: i for i, pattern in enumerate(scanner.patterns)}
+            owners: Dict[int, List[Tuple[str, str]]] = {}
+            for doc_type, spec in entries:
+                owners.setdefault(index_of[spec.regex], []).append((doc_type, spec.name))
+            self._region_scanners[region_type] = scanner
+            self._region_owners[region_type] = owners
+
+        # Schema order is the doc-type inference priority
+        self._keyword_automaton = KeywordAutomaton(kw for schema in self.schemas for kw in schema.keywords)
+        self._keyword_owners: Dict[str, List[str]] = {}
+        for schema in self.schemas:
+            for keyword in schema.keywords:
+                self._keyword_owners.setdefault(keyword.casefold(), []).append(schema.doc_type)
+        self._priority = {schema.doc_type: rank for rank, schema in enumerate(self.schemas)}
+
+    def scan_region(self, text: str, region_type: str) -> Dict[str, Dict[str, PatternHit]]:
+        """
+        Scan one region once for all candidate schemas.
+
+        Returns:
+            Mapping of doc_type -> field name -> leftmost hit
+        """
+        scanner = self._region_scanners.get(region_type)
+        if scanner is None:
+            return {}
+
+        owners = self._region_owners[region_type]
+        result: Dict[str, Dict[str, PatternHit]] = {}
+        for index, hit in scanner.scan(text).items():
+            for doc_type, field_name in owners[index]:
+                result.setdefault(doc_type, {})[field_name] = hit
+        return result
+
+    def match_fields(self, text: str, schema: DocumentSchema, region_type: str) -> Dict[str, PatternHit]:
+        """Hits for the fields of ``schema`` in ``region_type`` found in ``text``."""
+        return self.scan_region(text, region_type).get(schema.doc_type, {})
+
+    def infer_doc_type(self, text: str, default: str = "generic") -> str:
+        """Highest-priority doc type whose keywords occur in ``text``."""
+        found = {
+            doc_type
+            for keyword in self._keyword_automaton.find(text)
+            for doc_type in self._keyword_owners[keyword]
+        }
+        if not found:
+            return default
+        return min(found, key=self._priority.__getitem__)
+
+
+_matcher_cache: Dict[Tuple[int, ...], Tuple[Tuple[DocumentSchema, ...], CompiledSchemaMatcher]] = {}
+
+
+def get_compiled_matcher(schemas: Sequence[DocumentSchema]) -> CompiledSchemaMatcher:
+    """Return a cached matcher for ``schemas`` (compiled on first use)."""
+    key = tuple(id(schema) for schema in schemas)
+    cached = _matcher_cache.get(key)
+    if cached is None:
+        cached = (tuple(schemas), CompiledSchemaMatcher(schemas))
+        _matcher_cache[key] = cached
+    return cached[1]
+
+
+def clear_matcher_cache() -> None:
+    """Drop compiled matchers (call after registering or changing schemas)."""
+    _matcher_cache.clear()
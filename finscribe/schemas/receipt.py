@@ -62,5 +62,5 @@ RECEIPT_SCHEMA = DocumentSchema(
             description="Currency code"
         ),
     ],
+    keywords=["receipt", "thank you", "purchase", "transaction"],
 )
-
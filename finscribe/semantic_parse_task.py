@@ -18,12 +18,13 @@ import os
 import re
 import json
 import logging
-from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from decimal import Decimal
 from typing import List, Dict, Any, Tuple, Optional
-from dateutil import parser as dateparser  # pip install python-dateutil
 from datetime import datetime
 
-from .staging import LocalStorage, read_bytes_from_storage, StorageInterface
+from .staging import LocalStorage, get_storage, read_bytes_from_storage, StorageInterface
+from .parsing import DocumentDateParser, extract_amount
+from .statement_stream import StreamingStatementParser
 
 from .celery_app import celery_app
 
@@ -33,13 +34,13 @@ logger.setLevel(logging.INFO)
 # Configure storage (replace with DI if desired)
 STORAGE_BASE = os.getenv("STORAGE_BASE", "./storage")
 ACTIVE_LEARNING_KEY = os.getenv("ACTIVE_LEARNING_KEY", "active_learning/active_learning.jsonl")
+# Consecutive statement_parse_task retries without a new page before the task gives up
+STATEMENT_MAX_STALLED_RETRIES = int(os.getenv("STATEMENT_MAX_STALLED_RETRIES", "120"))
 storage: StorageInterface = LocalStorage(STORAGE_BASE)
 
 
 # ---------- Utility helpers ----------
-AMOUNT_RE = re.compile(r"([£$€]?)[\s]*(-?\d{1,3}(?:[,\d{3}]*)(?:\.\d{1,4})?)")
 INVOICE_NO_RE = re.compile(r"(invoice\s*#?\s*[:\-]?\s*([A-Za-z0-9\-\/]+))", re.IGNORECASE)
-DATE_RE = re.compile(r"(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2}[-/]\d{2,4})")
 TOTAL_KEYWORDS = re.compile(r"\b(total|amount due|grand total|balance due)\b", re.IGNORECASE)
 SUBTOTAL_KEYWORDS = re.compile(r"\b(subtotal)\b", re.IGNORECASE)
 TAX_KEYWORDS = re.compile(r"\b(tax|vat)\b", re.IGNORECASE)
@@ -50,33 +51,7 @@ def _normalize_amount_text(text: str) -> Tuple[Optional[Decimal], Optional[str]]
     Extract first recognized monetary amount from text and return (Decimal, currency_symbol).
     Returns (None, None) if not found / parse fails.
     """
-    if text is None:
-        return None, None
-    m = AMOUNT_RE.search(text.replace(",", ""))
-    if not m:
-        return None, None
-    currency, num = m.group(1) or "", m.group(2)
-    try:
-        # Decimal parsing for accuracy
-        dec = Decimal(num)
-        # round to 2 decimal places for typical currencies
-        dec = dec.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-        return dec, currency or None
-    except (InvalidOperation, TypeError):
-        return None, None
-
-
-def _parse_date_text(text: str) -> Optional[str]:
-    """Try to parse a date-like string and return ISO date or None."""
-    if not text:
-        return None
-    m = DATE_RE.search(text)
-    candidate = m.group(0) if m else text
-    try:
-        dt = dateparser.parse(candidate, dayfirst=False, yearfirst=False)
-        return dt.date().isoformat()
-    except Exception:
-        return None
+    return extract_amount(text)
 
 
 def _group_regions_to_rows(regions: List[Dict], y_tol: int = 10) -> List[List[Dict]]:
@@ -183,6 +158,8 @@ def _extract_invoice_fields_from_regions(regions: List[Dict]) -> Dict[str, Any]:
     tax = None
     total = None
     currency = None
+    # One parser per document, so its dates are tried in the format inferred from the first one
+    dates = DocumentDateParser(fallback=True)
 
     # Search for invoice number/date/vendor keywords in top regions (by y)
     # sort by y (top-first)
@@ -194,7 +171,7 @@ def _extract_invoice_fields_from_regions(regions: List[Dict]) -> Dict[str, Any]:
             if m:
                 invoice_no = m.group(2)
         if not invoice_date:
-            d = _parse_date_text(txt)
+            d = dates.parse_iso(txt)
             if d:
                 invoice_date = d
         # vendor heuristic: likely top-left block; capture a few words
@@ -410,6 +387,78 @@ def semantic_parse_task(self, job_id: str, page_key: str, ocr_artifact_key: Opti
         raise self.retry(exc=exc, countdown=min(60, (2 ** self.request.retries)))
 
 
+def parse_statement_pages(job_id: str, page_keys: List[str], state: Optional[Dict[str, Any]] = None,
+                          storage_backend: Optional[StorageInterface] = None) -> Dict[str, Any]:
+    """
+    Parse the available pages of a bank statement in order, resuming from ``state``.
+
+    Each page's transactions are written to
+    results/{job_id}/statement/page_{n}.json as soon as the page is parsed;
+    parsing stops at the first page whose OCR artifact does not exist yet.
+    The summary (results/{job_id}/statement/summary.json) is written after
+    the last page.
+
+    OCR artifacts are read from the pipeline storage that ocr_task writes
+    them to (get_storage()) unless ``storage_backend`` is given.
+
+    Returns:
+        {"next_page", "done", "parser"} - pass it back as ``state`` to continue
+    """
+    backend = storage_backend or get_storage()
+    state = state or {}
+    next_page = state.get("next_page", 0)
+    parser = (StreamingStatementParser.from_state(state["parser"])
+              if state.get("parser") else StreamingStatementParser())
+
+    while next_page < len(page_keys):
+        page_key = page_keys[next_page]
+        raw = backend.get_bytes(f"ocr/{job_id}/{page_key.split('/')[-1]}.json")
+        if raw is None:
+            break
+        artifact = json.loads(raw.decode("utf-8"))
+        regions = artifact.get("ocr") or artifact.get("regions") or []
+        transactions = list(parser.feed_page(regions, next_page + 1))
+        page_result = {"job_id": job_id, "page": next_page + 1, "page_key": page_key,
+                       "transactions": transactions}
+        backend.put_bytes(f"results/{job_id}/statement/page_{next_page + 1}.json",
+                          json.dumps(page_result, ensure_ascii=False).encode("utf-8"))
+        next_page += 1
+
+    done = next_page >= len(page_keys)
+    if done:
+        summary = parser.finish()
+        summary["needs_review"] = not summary["balance_ok"]
+        backend.put_bytes(f"results/{job_id}/statement/summary.json",
+                          json.dumps(summary, ensure_ascii=False).encode("utf-8"))
+    return {"next_page": next_page, "done": done, "parser": parser.state_dict()}
+
+
+@celery_app.task(bind=True, name="finscribe.statement_parse_task", max_retries=None, default_retry_delay=5)
+def statement_parse_task(self, job_id: str, page_keys: List[str],
+                         state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Celery task: stream a bank statement's pages through the statement parser.
+
+    Pages are parsed in order as their OCR artifacts appear, so early pages
+    produce transactions while later pages are still being OCR'd. While a
+    page is missing the task re-queues itself with the parser state (a few
+    hundred bytes) instead of holding earlier pages. Only retries that
+    parsed no new page count towards STATEMENT_MAX_STALLED_RETRIES, so long
+    statements are not cut off while their pages keep arriving.
+    """
+    state = state or {}
+    parsed_before, stalled = state.get("next_page", 0), state.get("stalled", 0)
+    state = parse_statement_pages(job_id, page_keys, state)
+    logger.info("statement_parse_task job=%s parsed %d/%d pages", job_id, state["next_page"], len(page_keys))
+    if not state["done"]:
+        state["stalled"] = 0 if state["next_page"] > parsed_before else stalled + 1
+        if state["stalled"] > STATEMENT_MAX_STALLED_RETRIES:
+            raise RuntimeError(f"Statement job {job_id}: OCR of page {state['next_page'] + 1} did not arrive "
+                               f"within {STATEMENT_MAX_STALLED_RETRIES} retries")
+        raise self.retry(args=(job_id, page_keys, state), countdown=self.default_retry_delay)
+    return {"ok": True, "job_id": job_id, "summary_key": f"results/{job_id}/statement/summary.json"}
+
+
 # ---------- Persistence stub (replace with real DB writes) ----------
 def _persist_result_db_stub(job_id: str, structured_key: str, structured: Dict[str, Any]) -> None:
     """
@@ -0,0 +1,392 @@
+"""
+Streaming bank-statement parser.
+
+Statements are parsed one OCR page at a time. Each page's regions are
+grouped into rows, transaction rows (rows starting with a date) are turned
+into signed amounts, and every printed balance is checked against the
+running balance carried over from the previous rows and pages. Transactions
+are yielded as soon as their page has been parsed; nothing but the running
+totals is kept between pages, so memory is bounded by the largest page.
+
+The parser state between pages is a small JSON-serializable dict
+(state_dict() / from_state()), so a statement can also be parsed by a task
+that handles pages as they are OCR'd and persists the state in between.
+"""
+import re
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .parsing import DocumentDateParser, parse_amount
+
+# Mismatched balances kept (as examples) in the summary
+MAX_MISMATCH_EXAMPLES = 20
+
+_AMOUNT_CELL_RE = re.compile(
+    r"^[(+\-]?\s*[$€£¥₹]?\s*-?\d[\d,. ]*\d?\s*\)?\s*(?:-|CR|DR|Cr|Dr)?$"
+)
+_DEBIT_MARK_RE = re.compile(r"(^\s*-|^\s*\(.*\)\s*$|-\s*$|\bDR\s*$)", re.IGNORECASE)
+_CREDIT_MARK_RE = re.compile(r"(^\s*\+|\bCR\s*$)", re.IGNORECASE)
+_OPENING_RE = re.compile(
+    r"\b(opening balance|balance brought forward|brought forward|previous balance|starting balance)\b",
+    re.IGNORECASE,
+)
+_CLOSING_RE = re.compile(
+    r"\b(closing balance|balance carried forward|carried forward|new balance|ending balance)\b",
+    re.IGNORECASE,
+)
+_COLUMN_KEYWORDS = {
+    "debit": re.compile(r"\b(debits?|withdrawals?|paid out|money out)\b", re.IGNORECASE),
+    "credit": re.compile(r"\b(credits?|deposits?|paid in|money in)\b", re.IGNORECASE),
+    "amount": re.compile(r"^\s*amount\s*$", re.IGNORECASE),
+    "balance": re.compile(r"^\s*balance\s*$", re.IGNORECASE),
+}
+
+
+def _bbox_xywh(region: Dict[str, Any], bbox_format: str) -> Tuple[float, float, float, float]:
+    bbox = region.get("bbox") or [0, 0, 0, 0]
+    x, y, a, b = (float(v) for v in bbox[:4])
+    if bbox_format == "xyxy":
+        return x, y, a - x, b - y
+    return x, y, a, b
+
+
+def group_rows(regions: Iterable[Dict[str, Any]], y_tol: float = 12,
+               bbox_format: str = "xywh") -> List[List[Tuple[float, str]]]:
+    """
+    Cluster one page's OCR regions into text rows.
+
+    Args:
+        regions: {"text": ..., "bbox": [...]} dicts
+        y_tol: Maximum distance (pixels) of a region's vertical center from
+            the row's mean center
+        bbox_format: "xywh" (finscribe OCR artifacts) or "xyxy" (post-processor pages)
+
+    Returns:
+        Rows top to bottom; each a list of (x center, text) sorted by x
+    """
+    items = []
+    for region in regions:
+        text = (region.get("text") or "").strip()
+        if not text:
+            continue
+        x, y, w, h = _bbox_xywh(region, bbox_format)
+        items.append((y + h / 2, x + w / 2, text))
+    items.sort()
+
+    rows: List[List[Tuple[float, str]]] = []
+    row_sum = 0.0
+    for cy, cx, text in items:
+        if rows and abs(cy - row_sum / len(rows[-1])) <= y_tol:
+            rows[-1].append((cx, text))
+            row_sum += cy
+        else:
+            rows.append([(cx, text)])
+            row_sum = cy
+    for row in rows:
+        row.sort()
+    return rows
+
+
+def _signed_amount(text: str) -> Optional[Decimal]:
+    """Amount of an amount cell, negative for "-", "(...)" and "DR" debits."""
+    amount = parse_amount(text)
+    if amount is None:
+        return None
+    amount = abs(amount)
+    return -amount if _DEBIT_MARK_RE.search(text) else amount
+
+
+def _to_float(value: Optional[Decimal]) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+class StreamingStatementParser:
+    """
+    Incremental parser for multi-page bank statements.
+
+    Args:
+        opening_balance: Balance before the first transaction, when known
+            from elsewhere; otherwise taken from an "opening balance" line or
+            derived from the first printed balance
+        tolerance: Absolute difference at which a printed balance mismatches
+        y_tol: Row clustering tolerance, see group_rows()
+        bbox_format: "xywh" or "xyxy"
+    """
+
+    def __init__(
+        self,
+        opening_balance: Optional[Decimal] = None,
+        tolerance: Decimal = Decimal("0.01"),
+        y_tol: float = 12,
+        bbox_format: str = "xywh",
+    ):
+        self.tolerance = Decimal(str(tolerance))
+        self.y_tol = y_tol
+        self.bbox_format = bbox_format
+        self.opening_balance: Optional[Decimal] = (
+            Decimal(str(opening_balance)) if opening_balance is not None else None
+        )
+        self.running_balance: Optional[Decimal] = self.opening_balance
+        self.closing_balance: Optional[Decimal] = None
+        self.columns: Dict[str, float] = {}
+        self.pages = 0
+        self.transactions = 0
+        self.checked = 0
+        self.total_debits = Decimal("0")
+        self.total_credits = Decimal("0")
+        self.mismatch_count = 0
+        self.mismatches: List[Dict[str, Any]] = []
+        self._dates = DocumentDateParser()
+
+    # ---------- State ----------
+
+    def state_dict(self) -> Dict[str, Any]:
+        """JSON-serializable parser state between pages."""
+        def text(value: Optional[Decimal]) -> Optional[str]:
+            return str(value) if value is not None else None
+
+        return {
+            "opening_balance": text(self.opening_balance),
+            "running_balance": text(self.running_balance),
+            "closing_balance": text(self.closing_balance),
+            "columns": dict(self.columns),
+            "pages": self.pages,
+            "transactions": self.transactions,
+            "checked": self.checked,
+            "total_debits": str(self.total_debits),
+            "total_credits": str(self.total_credits),
+            "mismatch_count": self.mismatch_count,
+            "mismatches": list(self.mismatches),
+            "date_format": self._dates.inferred_format,
+            "tolerance": str(self.tolerance),
+            "y_tol": self.y_tol,
+            "bbox_format": self.bbox_format,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "StreamingStatementParser":
+        """Restore a parser saved with state_dict()."""
+        def number(value: Optional[str]) -> Optional[Decimal]:
+            return Decimal(value) if value is not None else None
+
+        parser = cls(
+            tolerance=Decimal(state.get("tolerance", "0.01")),
+            y_tol=state.get("y_tol", 12),
+            bbox_format=state.get("bbox_format", "xywh"),
+        )
+        parser.opening_balance = number(state.get("opening_balance"))
+        parser.running_balance = number(state.get("running_balance"))
+        parser.closing_balance = number(state.get("closing_balance"))
+        parser.columns = dict(state.get("columns") or {})
+        parser.pages = state.get("pages", 0)
+        parser.transactions = state.get("transactions", 0)
+        parser.checked = state.get("checked", 0)
+        parser.total_debits = Decimal(state.get("total_debits", "0"))
+        parser.total_credits = Decimal(state.get("total_credits", "0"))
+        parser.mismatch_count = state.get("mismatch_count", 0)
+        parser.mismatches = list(state.get("mismatches") or [])
+        parser._dates.inferred_format = state.get("date_format")
+        return parser
+
+    # ---------- Parsing ----------
+
+    def parse_pages(self, pages: Iterable[Iterable[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the transactions of each page as soon as the page is parsed.
+
+        ``pages`` may be a lazy iterator (e.g. OCR running page by page); only
+        the current page is held in memory.
+        """
+        for page in pages:
+            yield from self.feed_page(page)
+
+    def feed_page(self, regions: Iterable[Dict[str, Any]],
+                  page_number: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Parse one page and yield its transactions in reading order.
+
+        Each transaction is {"date", "description", "amount" (signed, credits
+        positive), "balance" (printed, or None), "page", "balance_ok" (None
+        when there was nothing to check against)}.
+        """
+        self.pages += 1
+        page = page_number if page_number is not None else self.pages
+        pending: Optional[Dict[str, Any]] = None
+
+        for row in group_rows(regions, self.y_tol, self.bbox_format):
+            if self._detect_columns(row):
+                continue
+            if self._check_balance_line(row, page):
+                continue
+            transaction = self._parse_row(row, page)
+            if transaction is not None:
+                if pending is not None:
+                    yield pending
+                pending = transaction
+            elif pending is not None and self._is_continuation(row):
+                # Wrapped description line of the previous transaction
+                pending["description"] = f"{pending['description']} {' '.join(t for _, t in row)}".strip()
+        if pending is not None:
+            yield pending
+
+    def _detect_columns(self, row: List[Tuple[float, str]]) -> bool:
+        """Record debit/credit/amount/balance column positions from a header row."""
+        found: Dict[str, float] = {}
+        if any(_AMOUNT_CELL_RE.match(text) for _, text in row):
+            return False
+        for cx, text in row:
+            for column, pattern in _COLUMN_KEYWORDS.items():
+                if column not in found and pattern.search(text):
+                    found[column] = cx
+                    break
+        if "balance" in found and ("debit" in found or "credit" in found or "amount" in found):
+            self.columns = found
+            return True
+        return False
+
+    def _is_continuation(self, row: List[Tuple[float, str]]) -> bool:
+        return not any(_AMOUNT_CELL_RE.match(t) for _, t in row)
+
+    def _split_row(self, row: List[Tuple[float, str]]) -> Tuple[List[str], List[Tuple[float, str]]]:
+        """(description texts, amount cells) of a row."""
+        words, amounts = [], []
+        for cx, text in row:
+            if _AMOUNT_CELL_RE.match(text) and parse_amount(text) is not None:
+                amounts.append((cx, text))
+            else:
+                words.append(text)
+        return words, amounts
+
+    def _parse_row(self, row: List[Tuple[float, str]], page: int) -> Optional[Dict[str, Any]]:
+        first = row[0][1]
+        date = self._dates.parse(first)
+        if date is None:
+            return None
+        words, amounts = self._split_row(row[1:])
+        if not amounts:
+            return None
+
+        amount, balance = self._assign_amounts(amounts)
+        if amount is None and balance is not None and self.running_balance is not None:
+            amount = balance - self.running_balance
+        if amount is None:
+            return None
+
+        balance_ok = self._apply(amount, balance, page, date.date().isoformat())
+        if amount < 0:
+            self.total_debits += -amount
+        else:
+            self.total_credits += amount
+        self.transactions += 1
+        return {
+            "date": date.date().isoformat(),
+            "description": " ".join(words),
+            "amount": float(amount),
+            "balance": _to_float(balance),
+            "page": page,
+            "balance_ok": balance_ok,
+        }
+
+    def _assign_amounts(self, amounts: List[Tuple[float, str]]) -> Tuple[Optional[Decimal], Optional[Decimal]]:
+        """Signed transaction amount and printed balance of a row's amount cells."""
+        if self.columns:
+            amount = balance = None
+            for cx, text in amounts:
+                column = min(self.columns, key=lambda name: abs(self.columns[name] - cx))
+                value = _signed_amount(text)
+                if column == "balance":
+                    balance = value
+                elif column == "debit":
+                    amount = -abs(value)
+                elif column == "credit":
+                    amount = abs(value)
+                else:
+                    amount = value
+            return amount, balance
+
+        if len(amounts) == 1:
+            return _signed_amount(amounts[0][1]), None
+
+        amount_text, balance_text = amounts[-2][1], amounts[-1][1]
+        amount, balance = _signed_amount(amount_text), _signed_amount(balance_text)
+        explicit = _DEBIT_MARK_RE.search(amount_text) or _CREDIT_MARK_RE.search(amount_text)
+        if not explicit and self.running_balance is not None:
+            # Unsigned amount column: the sign that reproduces the printed balance
+            if abs(self.running_balance - amount - balance) <= self.tolerance:
+                amount = -amount
+        return amount, balance
+
+    def _apply(self, amount: Decimal, balance: Optional[Decimal], page: int, date: str) -> Optional[bool]:
+        """Advance the running balance and check it against a printed one."""
+        if self.running_balance is None:
+            if balance is None:
+                return None
+            # No opening balance: derive it from the first printed balance
+            self.opening_balance = balance - amount
+            self.running_balance = balance
+            return None
+
+        self.running_balance += amount
+        if balance is None:
+            return None
+        self.checked += 1
+        ok = abs(self.running_balance - balance) <= self.tolerance
+        if not ok:
+            self._record_mismatch(page, date, self.running_balance, balance)
+        # Resynchronize so one misread amount is reported once
+        self.running_balance = balance
+        return ok
+
+    def _check_balance_line(self, row: List[Tuple[float, str]], page: int) -> bool:
+        """
+        Handle opening/brought-forward and closing/carried-forward balance
+        lines; returns False for any other row.
+        """
+        text = " ".join(t for _, t in row)
+        opening = _OPENING_RE.search(text)
+        closing = _CLOSING_RE.search(text)
+        if not (opening or closing):
+            return False
+        _, amounts = self._split_row(row)
+        if not amounts:
+            return True
+        value = _signed_amount(amounts[-1][1])
+        if opening and self.running_balance is None:
+            self.opening_balance = value
+            self.running_balance = value
+            return True
+        if closing:
+            self.closing_balance = value
+        if self.running_balance is not None:
+            self.checked += 1
+            if abs(self.running_balance - value) > self.tolerance:
+                self._record_mismatch(page, None, self.running_balance, value)
+                self.running_balance = value
+        return True
+
+    def _record_mismatch(self, page: int, date: Optional[str], expected: Decimal, printed: Decimal) -> None:
+        self.mismatch_count += 1
+        if len(self.mismatches) < MAX_MISMATCH_EXAMPLES:
+            self.mismatches.append({
+                "page": page,
+                "date": date,
+                "expected_balance": float(expected),
+                "printed_balance": float(printed),
+                "difference": float(printed - expected),
+            })
+
+    def finish(self) -> Dict[str, Any]:
+        """Summary of the statement parsed so far, with the balance check result."""
+        return {
+            "pages": self.pages,
+            "transaction_count": self.transactions,
+            "opening_balance": _to_float(self.opening_balance),
+            "closing_balance": _to_float(self.closing_balance),
+            "computed_closing_balance": _to_float(self.running_balance),
+            "total_debits": float(self.total_debits),
+            "total_credits": float(self.total_credits),
+            "balances_checked": self.checked,
+            "mismatch_count": self.mismatch_count,
+            "mismatches": list(self.mismatches),
+            "balance_ok": self.mismatch_count == 0,
+        }
@@ -2,9 +2,24 @@
 Async streaming OCR capability.
 
 Streams region-level OCR results as they finish, providing real-time updates.
+
+Region results are appended to a per-job JSONL file by ocr_region_task and
+followed by stream_ocr_results with a JSONLTailer, which remembers its byte
+offset and reads only what was appended since its last read, so following a
+document costs I/O proportional to its size. Between reads the stream sleeps
+until the file changes: on Linux it is woken by inotify on the results
+directory; elsewhere (or if inotify cannot be set up) it polls the file size
+with an interval that starts short and backs off while nothing is appended.
 """
 
+import asyncio
+import ctypes
+import ctypes.util
 import logging
+import os
+import struct
+import sys
+import time
 from typing import Dict, Any, List, Optional, AsyncGenerator
 from celery import shared_task
 from finscribe.ocr_client import get_ocr_client
@@ -13,6 +28,14 @@ from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# A stream ends once regions have arrived and none followed for this long
+IDLE_TIMEOUT_SECONDS = 1.5
+# Adaptive polling fallback: first interval after new data, and the cap it backs off to
+POLL_MIN_INTERVAL = 0.05
+POLL_MAX_INTERVAL = 1.0
+# Even with inotify, re-check the file this often (changes on network filesystems raise no events)
+INOTIFY_RECHECK_SECONDS = 2.0
+
 
 class StreamingOCRStorage:
     """Simple storage interface for streaming OCR results."""
@@ -21,6 +44,10 @@ class StreamingOCRStorage:
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
     
+    def results_path(self, job_id: str) -> Path:
+        """Path of the job's region results file."""
+        return self.base_path / f"{job_id}_regions.jsonl"
+    
     def append_region(self, job_id: str, region: Dict[str, Any]) -> str:
         """
         Append a region result to the streaming output file.
@@ -32,7 +59,7 @@ class StreamingOCRStorage:
         Returns:
             Path to the results file
         """
-        results_file = self.base_path / f"{job_id}_regions.jsonl"
+        results_file = self.results_path(job_id)
         
         with open(results_file, "a", encoding="utf-8") as f:
             f.write(json.dumps(region, ensure_ascii=False) + "\n")
@@ -41,7 +68,7 @@ class StreamingOCRStorage:
     
     def get_all_regions(self, job_id: str) -> List[Dict[str, Any]]:
         """Get all regions collected so far."""
-        results_file = self.base_path / f"{job_id}_regions.jsonl"
+        results_file = self.results_path(job_id)
         
         if not results_file.exists():
             return []
@@ -59,7 +86,7 @@ class StreamingOCRStorage:
     
     def clear_results(self, job_id: str):
         """Clear results for a job."""
-        results_file = self.base_path / f"{job_id}_regions.jsonl"
+        results_file = self.results_path(job_id)
         if results_file.exists():
             results_file.unlink()
 
@@ -135,43 +162,191 @@ def ocr_region_task(self, job_id: str, region: Dict[str, Any]):
         raise
 
 
-async def stream_ocr_results(job_id: str) -> AsyncGenerator[Dict[str, Any], None]:
+class JSONLTailer:
+    """
+    Incremental reader of an append-only JSONL file.
+    
+    Each read_new() call reads only the bytes appended since the previous
+    call and returns the complete records among them; a trailing line that
+    is still being written is kept until its newline arrives. If the file
+    shrinks (cleared and rewritten) reading starts over from the beginning.
+    """
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        self.offset = 0
+        self.bytes_read = 0
+        self._partial = b""
+    
+    def read_new(self) -> List[Dict[str, Any]]:
+        """Records appended since the last call."""
+        try:
+            size = os.stat(self.path).st_size
+        except FileNotFoundError:
+            return []
+        if size < self.offset:
+            self.offset = 0
+            self._partial = b""
+        if size == self.offset:
+            return []
+        
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        self.offset += len(data)
+        self.bytes_read += len(data)
+        
+        lines = (self._partial + data).split(b"\n")
+        self._partial = lines.pop()
+        records = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping malformed line in {self.path}")
+        return records
+
+
+class PollingWatcher:
+    """Waits for changes by polling, backing off while nothing changes."""
+    
+    def __init__(self, min_interval: float = POLL_MIN_INTERVAL, max_interval: float = POLL_MAX_INTERVAL):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+    
+    def activity(self):
+        """New data arrived: poll quickly again."""
+        self.interval = self.min_interval
+    
+    async def wait(self, timeout: Optional[float] = None):
+        delay = self.interval if timeout is None else min(self.interval, timeout)
+        self.interval = min(self.max_interval, self.interval * 2)
+        await asyncio.sleep(max(delay, 0))
+    
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Waits for inotify events on one file (Linux only, through libc)."""
+    
+    _IN_MODIFY = 0x00000002
+    _IN_CLOSE_WRITE = 0x00000008
+    _IN_MOVED_TO = 0x00000080
+    _IN_CREATE = 0x00000100
+    _IN_Q_OVERFLOW = 0x00004000
+    _EVENT = struct.Struct("iIII")
+    
+    def __init__(self, path, recheck_interval: float = INOTIFY_RECHECK_SECONDS):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        path = Path(path)
+        self.name = os.fsencode(path.name)
+        self.recheck_interval = recheck_interval
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Watch the directory: the file may not exist yet, and is recreated when cleared
+        mask = self._IN_MODIFY | self._IN_CLOSE_WRITE | self._IN_MOVED_TO | self._IN_CREATE
+        if libc.inotify_add_watch(self._fd, os.fsencode(path.parent), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch failed for {path.parent}")
+        self._loop.add_reader(self._fd, self._on_events)
+    
+    def _on_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            _, mask, _, length = self._EVENT.unpack_from(data, offset)
+            name = data[offset + self._EVENT.size:offset + self._EVENT.size + length].rstrip(b"\0")
+            offset += self._EVENT.size + length
+            if name == self.name or mask & self._IN_Q_OVERFLOW:
+                self._changed.set()
+    
+    def activity(self):
+        pass
+    
+    async def wait(self, timeout: Optional[float] = None):
+        timeout = self.recheck_interval if timeout is None else min(timeout, self.recheck_interval)
+        try:
+            await asyncio.wait_for(self._changed.wait(), max(timeout, 0))
+        except asyncio.TimeoutError:
+            pass
+        self._changed.clear()
+    
+    def close(self):
+        self._loop.remove_reader(self._fd)
+        os.close(self._fd)
+
+
+def _file_watcher(path, use_inotify: bool = True):
+    """inotify watcher for ``path`` where available, adaptive polling otherwise."""
+    if use_inotify:
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError) as e:
+            logger.debug(f"inotify not available ({e}); polling {path}")
+    return PollingWatcher()
+
+
+async def stream_ocr_results(
+    job_id: str,
+    idle_timeout: float = IDLE_TIMEOUT_SECONDS,
+    use_inotify: bool = True
+) -> AsyncGenerator[Dict[str, Any], None]:
     """
     Stream OCR results as they become available.
     
+    Only newly appended records are read on each wake-up. The stream ends
+    once regions have arrived and no new one followed for ``idle_timeout``
+    seconds.
+    
     Args:
         job_id: Job identifier
+        idle_timeout: Seconds without new regions after which the stream ends
+        use_inotify: Wait on inotify events where available (else poll)
         
     Yields:
         Region dictionaries as they are processed
     """
     storage = get_storage()
+    path = storage.results_path(job_id)
+    tailer = JSONLTailer(path)
+    watcher = _file_watcher(path, use_inotify)
+    # Regions retried by Celery can be appended twice
     seen_region_ids = set()
+    last_region_at = None
     
-    while True:
-        # Get all regions collected so far
-        regions = storage.get_all_regions(job_id)
-        
-        # Yield new regions
-        for region in regions:
-            region_id = region.get("region_id")
-            if region_id and region_id not in seen_region_ids:
-                seen_region_ids.add(region_id)
-                yield region
-        
-        # Check if processing is complete (this would need to be tracked separately)
-        # For now, we'll break after a timeout or when no new regions appear
-        import asyncio
-        await asyncio.sleep(0.5)  # Poll every 500ms
-        
-        # In a real implementation, you'd check job status
-        # For now, break if we've seen all regions
-        if len(regions) > 0 and len(seen_region_ids) >= len(regions):
-            # Wait a bit more to see if new regions appear
-            await asyncio.sleep(1.0)
-            final_regions = storage.get_all_regions(job_id)
-            if len(final_regions) == len(regions):
-                break
+    try:
+        while True:
+            regions = tailer.read_new()
+            if regions:
+                watcher.activity()
+                last_region_at = time.monotonic()
+            for region in regions:
+                region_id = region.get("region_id")
+                if region_id and region_id not in seen_region_ids:
+                    seen_region_ids.add(region_id)
+                    yield region
+            
+            remaining = None
+            if last_region_at is not None:
+                remaining = idle_timeout - (time.monotonic() - last_region_at)
+                if remaining <= 0:
+                    break
+            await watcher.wait(remaining)
+    finally:
+        watcher.close()
 
 
 def split_image_to_regions(
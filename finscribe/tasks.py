@@ -3,19 +3,26 @@ Celery tasks for FinScribe Smart Scan.
 
 Pipeline:
   ingest -> OCR -> semantic parse -> persist result
+
+The document type is decided once per job, from the OCR text of its first
+page, and every page is routed by that decision. Bank statements are parsed
+across pages: the first page dispatches statement_parse_task for all pages
+of the job, which streams them through the statement parser as their OCR
+artifacts appear. Other documents get a semantic parse per page.
 """
 
 from __future__ import annotations
 import json
 import os
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 from .celery_app import celery_app
 from .staging import get_storage
 from .ocr_client import get_ocr_client
-from .semantic_parse_task import parse_ocr_artifact_to_structured
+from .schemas import infer_doc_type
+from .semantic_parse_task import parse_ocr_artifact_to_structured, statement_parse_task
 from .db.models import Job, OCRResult, ParsedResult
 from .db import get_db_session
 
@@ -29,15 +36,17 @@ ocr_client = get_ocr_client()
 
 
 @celery_app.task(bind=True, name="finscribe.ocr_task")
-def ocr_task(self, job_id: str, page_key: str, image_storage_key: str):
+def ocr_task(self, job_id: str, page_key: str, image_storage_key: str, page_keys: Optional[List[str]] = None):
     """
     Performs OCR on a single page image and saves OCR artifact.
-    Automatically triggers semantic parsing.
+    Automatically triggers semantic parsing, or statement parsing for bank
+    statements.
     
     Args:
         job_id: Job identifier
         page_key: Page identifier (e.g., "page_0", "page_1")
         image_storage_key: Storage key for the image to process
+        page_keys: Page identifiers of every page of the job, in order
     """
     logger.info("[OCR] job=%s page=%s key=%s", job_id, page_key, image_storage_key)
 
@@ -92,12 +101,48 @@ def ocr_task(self, job_id: str, page_key: str, image_storage_key: str):
     except Exception as e:
         logger.warning(f"Failed to persist OCR result to DB: {e}")
 
-    # Enqueue semantic parsing
-    semantic_parse_task.delay(job_id, page_key, ocr_key)
+    # Enqueue parsing
+    _route_page(job_id, page_key, page_keys or [page_key], regions)
 
     return {"job_id": job_id, "ocr_key": ocr_key, "regions_count": len(regions)}
 
 
+def _doc_type_key(job_id: str) -> str:
+    return f"ocr/{job_id}/doc_type.json"
+
+
+def _route_page(job_id: str, page_key: str, page_keys: List[str], regions: List[Dict[str, Any]]) -> None:
+    """
+    Dispatch parsing for an OCR'd page by the job's document type.
+
+    The first page decides the type and records it next to the OCR
+    artifacts. A later page OCR'd before that decision is routed by the
+    first page once it decides (its artifact already exists by then).
+    """
+    if page_key == page_keys[0]:
+        page_text = " ".join(str(region.get("text", "")) for region in regions if isinstance(region, dict))
+        doc_type = infer_doc_type(page_text)
+        storage.put_bytes(_doc_type_key(job_id), json.dumps({"doc_type": doc_type}).encode())
+        logger.info("[OCR] job=%s parsed as %s", job_id, doc_type)
+        if doc_type == "bank_statement":
+            # One statement parse per job; it waits for the other pages
+            statement_parse_task.delay(job_id, page_keys)
+            return
+        for key in page_keys:
+            ocr_key = f"ocr/{job_id}/{key}.json"
+            if key == page_key or storage.exists(ocr_key):
+                semantic_parse_task.delay(job_id, key, ocr_key)
+        return
+
+    raw = storage.get_bytes(_doc_type_key(job_id))
+    if raw is None:
+        return  # the first page routes this one when it decides
+    if json.loads(raw.decode())["doc_type"] != "bank_statement":
+        # A page whose artifact landed while the first page was deciding may
+        # be dispatched twice; the parse result is overwritten, not duplicated
+        semantic_parse_task.delay(job_id, page_key, f"ocr/{job_id}/{page_key}.json")
+
+
 @celery_app.task(bind=True, name="finscribe.semantic_parse_task", max_retries=2)
 def semantic_parse_task(self, job_id: str, page_key: str, ocr_key: Optional[str] = None):
     """
@@ -0,0 +1,188 @@
+"""
+Vendor name normalization and fuzzy resolution.
+
+Vendor names are used as keys by per-vendor statistics, duplicate detection
+and exports. normalize_vendor() maps casing, punctuation and spacing variants
+of a name to the same key; VendorResolver maps OCR-damaged names to the
+closest canonical vendor through a trigram inverted index.
+"""
+
+import json
+import os
+import re
+from array import array
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+_VENDOR_NOISE_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_vendor(name: Any) -> Optional[str]:
+    """Casefolded vendor name without punctuation or repeated whitespace."""
+    if not name:
+        return None
+    key = _WHITESPACE_RE.sub(" ", _VENDOR_NOISE_RE.sub(" ", str(name).casefold())).strip()
+    return key or None
+
+
+# ---------- Fuzzy resolution ----------
+
+class VendorMatch(NamedTuple):
+    """Candidate canonical vendor for a queried name."""
+    name: str
+    score: float  # Dice similarity of character trigrams, 0..1
+    vendor_id: int
+
+
+def trigrams(key: str) -> FrozenSet[str]:
+    """Character trigrams of a normalized name, padded so short names and word edges count."""
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class VendorResolver:
+    """
+    Fuzzy lookup of canonical vendor names through a character-trigram
+    inverted index.
+
+    A query counts shared trigrams over the posting lists of its rarest
+    trigrams (very common trigrams such as " co" carry little signal and
+    are skipped once enough postings have been read) with numpy, then
+    rescores the best-overlapping candidates with the exact trigram Dice
+    coefficient.
+
+    Args:
+        names: Initial canonical vendor names
+        posting_budget: Postings read per query before frequent trigrams are skipped
+        candidate_pool: Candidates rescored exactly per query
+    """
+
+    def __init__(self, names: Iterable[str] = (), posting_budget: int = 20000, candidate_pool: int = 32):
+        self.posting_budget = posting_budget
+        self.candidate_pool = candidate_pool
+        self.names: List[str] = []
+        self._grams: List[FrozenSet[str]] = []
+        self._by_key: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}
+        self.add_many(names)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return normalize_vendor(name) in self._by_key
+
+    def add(self, name: str) -> Optional[int]:
+        """Add a canonical name; returns its id (the existing id for a known name)."""
+        key = normalize_vendor(name)
+        if key is None:
+            return None
+        vendor_id = self._by_key.get(key)
+        if vendor_id is not None:
+            return vendor_id
+        vendor_id = len(self.names)
+        grams = trigrams(key)
+        self.names.append(name)
+        self._grams.append(grams)
+        self._by_key[key] = vendor_id
+        postings = self._postings
+        for gram in grams:
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = array("i", (vendor_id,))
+            else:
+                posting.append(vendor_id)
+        return vendor_id
+
+    def add_many(self, names: Iterable[str]) -> int:
+        """Add several names; returns how many were new."""
+        before = len(self.names)
+        for name in names:
+            self.add(name)
+        return len(self.names) - before
+
+    def search(self, name: str, k: int = 5, min_score: float = 0.0) -> List[VendorMatch]:
+        """Top-``k`` canonical vendors for ``name``, best first."""
+        key = normalize_vendor(name)
+        if key is None or not self.names:
+            return []
+
+        exact = self._by_key.get(key)
+        grams = trigrams(key)
+        posting_lists = sorted(
+            (self._postings[gram] for gram in grams if gram in self._postings), key=len
+        )
+        selected = []
+        read = 0
+        for index, posting in enumerate(posting_lists):
+            if index >= 3 and read + len(posting) > self.posting_budget:
+                break
+            selected.append(np.frombuffer(posting, dtype=np.int32))
+            read += len(posting)
+
+        candidates = self._top_overlaps(selected) if selected else []
+        if exact is not None and exact not in candidates:
+            candidates.append(exact)
+
+        size = len(grams)
+        scored = []
+        for vendor_id in candidates:
+            other = self._grams[vendor_id]
+            score = 2.0 * len(grams & other) / (size + len(other))
+            if score >= min_score:
+                scored.append(VendorMatch(self.names[vendor_id], score, vendor_id))
+        scored.sort(key=lambda match: (-match.score, match.vendor_id))
+        return scored[:k]
+
+    def _top_overlaps(self, postings: List[np.ndarray]) -> List[int]:
+        """Ids of the ``candidate_pool`` vendors sharing the most of the given postings."""
+        merged = np.sort(np.concatenate(postings))
+        starts = np.flatnonzero(np.concatenate(([True], merged[1:] != merged[:-1])))
+        ids = merged[starts]
+        if len(ids) <= self.candidate_pool:
+            return ids.tolist()
+        shared = np.diff(np.append(starts, len(merged)))
+        # Cut-off from the histogram of overlap counts: linear, and unaffected
+        # by the many ties that make partial sorting slow here.
+        at_least = np.cumsum(np.bincount(shared)[::-1])[::-1]
+        cutoff = int(np.flatnonzero(at_least >= self.candidate_pool)[-1])
+        above = ids[shared > cutoff]
+        tied = ids[shared == cutoff][:self.candidate_pool - len(above)]
+        return above.tolist() + tied.tolist()
+
+    def resolve(self, name: str, threshold: float = 0.6) -> Optional[str]:
+        """Best canonical name scoring at least ``threshold``, else None."""
+        matches = self.search(name, k=1, min_score=threshold)
+        return matches[0].name if matches else None
+
+    def save(self, path: str) -> None:
+        """Write the canonical names to a JSON file (the index is rebuilt on load)."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": 1, "names": self.names}, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "VendorResolver":
+        """Resolver over the names saved at ``path`` (empty if the file does not exist)."""
+        if not os.path.exists(path):
+            return cls(**kwargs)
+        with open(path, "r") as f:
+            data = json.load(f)
+        return cls(data.get("names", []), **kwargs)
+
+
+def vendor_key(name: Any, resolver: Optional[VendorResolver] = None, threshold: float = 0.6) -> Optional[str]:
+    """
+    Key for grouping records by vendor: the normalized canonical name when
+    ``resolver`` knows a close enough vendor, else the normalized name itself.
+    """
+    if resolver is not None and name:
+        canonical = resolver.resolve(str(name), threshold)
+        if canonical is not None:
+            return normalize_vendor(canonical)
+    return normalize_vendor(name)
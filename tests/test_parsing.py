@@ -0,0 +1,187 @@
+"""
+Equivalence tests for the shared amount/date parsing module against the
+per-module parsers it replaced.
+"""
+
+import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+import pytest
+from dateutil import parser as dateparser
+
+from finscribe.parsing import (
+    DocumentDateParser,
+    extract_amount,
+    extract_ranked_amount,
+    parse_amount,
+    parse_amount_float,
+    parse_date,
+)
+
+
+# ---------- Legacy reference implementations ----------
+
+LEGACY_AMOUNT_RE = re.compile(r"([£$€]?)[\s]*(-?\d{1,3}(?:[,\d{3}]*)(?:\.\d{1,4})?)")
+LEGACY_DATE_RE = re.compile(r"(\d{4}[-/]\d{1,2}[-/]\d{1,2}|\d{1,2}[-/]\d{1,2}[-/]\d{2,4})")
+
+
+def legacy_normalize_amount_text(text):
+    """semantic_parse_task._normalize_amount_text"""
+    if text is None:
+        return None, None
+    m = LEGACY_AMOUNT_RE.search(text.replace(",", ""))
+    if not m:
+        return None, None
+    currency, num = m.group(1) or "", m.group(2)
+    try:
+        dec = Decimal(num).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        return dec, currency or None
+    except (InvalidOperation, TypeError):
+        return None, None
+
+
+def legacy_parse_date_text(text):
+    """semantic_parse_task._parse_date_text"""
+    if not text:
+        return None
+    m = LEGACY_DATE_RE.search(text)
+    candidate = m.group(0) if m else text
+    try:
+        return dateparser.parse(candidate, dayfirst=False, yearfirst=False).date().isoformat()
+    except Exception:
+        return None
+
+
+def legacy_receipt_amount(text):
+    """ReceiptProcessor._extract_amount"""
+    for pattern in [r'\$(\d+\.\d{2})', r'(\d+\.\d{2})', r'\$(\d+)', r'(\d+)']:
+        match = re.search(pattern, text)
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def legacy_post_processing_date(date_str, formats=('%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%Y/%m/%d')):
+    """FinancialDocumentPostProcessor._extract_client_data date loop"""
+    for date_format in formats:
+        try:
+            return datetime.strptime(date_str, date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+def legacy_etl_parse_number(text):
+    """DocumentTransformer._parse_number"""
+    if not text:
+        return 0.0
+    try:
+        return float(re.sub(r'[^\d.]', '', str(text)))
+    except ValueError:
+        return 0.0
+
+
+AMOUNT_TEXTS = [
+    "Total $108.00",
+    "$1,234.56",
+    "Subtotal: 1,000",
+    "€ 99.999",
+    "£5",
+    "Tax (10%) 13.00",
+    "-12.50",
+    "Invoice #INV-1234",
+    "no digits here",
+    "",
+    "Qty 2 @ 3.50",
+    "$12.3 and 4.56",
+    "Balance 1,234,567.891",
+]
+
+DATE_TEXTS = [
+    "Date: 2024-01-15",
+    "2024/1/5",
+    "03/04/2024",
+    "25/04/2024",
+    "Due 12-31-2024",
+    "31-12-2024",
+    "1/2/24",
+    "2024-02-30",
+    "13/13/2024",
+    "Invoice #INV-1234",
+    "ACME Corporation",
+]
+
+
+# ---------- Equivalence ----------
+
+@pytest.mark.parametrize("text", AMOUNT_TEXTS)
+def test_extract_amount_matches_semantic_parser(text):
+    assert extract_amount(text) == legacy_normalize_amount_text(text)
+
+
+@pytest.mark.parametrize("text", DATE_TEXTS)
+def test_parse_date_matches_semantic_parser(text):
+    dt = parse_date(text, fallback=True)
+    assert (dt.date().isoformat() if dt else None) == legacy_parse_date_text(text)
+
+
+@pytest.mark.parametrize("text", AMOUNT_TEXTS + ["$5 3.50", "a1234.567", "$12"])
+def test_ranked_amount_matches_receipt_processor(text):
+    assert extract_ranked_amount(text) == legacy_receipt_amount(text)
+
+
+@pytest.mark.parametrize("text", ["2024-01-15", "15/01/2024", "01/15/2024", "15-01-2024", "2024/01/15", "junk"])
+def test_post_processing_dates_match(text):
+    formats = ('%Y-%m-%d', '%d/%m/%Y', '%m/%d/%Y', '%d-%m-%Y', '%Y/%m/%d')
+    dt = DocumentDateParser(formats).parse(text)
+    assert (dt.strftime('%Y-%m-%d') if dt else None) == legacy_post_processing_date(text)
+
+
+@pytest.mark.parametrize("text", ["$1,234.56", "100", "12.50 USD", "", "n/a"])
+def test_etl_numbers_match(text):
+    assert parse_amount_float(text) == legacy_etl_parse_number(text)
+
+
+# ---------- Locale handling (deliberate divergences from legacy parsers) ----------
+
+@pytest.mark.parametrize("text, locale, expected", [
+    ("1,234.56", None, Decimal("1234.56")),   # legacy post-processor read 1.23456
+    ("1.234,56", None, Decimal("1234.56")),
+    ("12,50", None, Decimal("12.50")),
+    ("1.234.567", None, Decimal("1234567")),
+    ("1 234,56 €", "fr", Decimal("1234.56")),
+    ("1'234.56", "ch", Decimal("1234.56")),
+    ("1,234", "de", Decimal("1.234")),
+    ("(12.00)", None, Decimal("-12.00")),
+    ("-5", None, Decimal("-5")),               # legacy ETL dropped the sign
+    ("abc", None, None),
+])
+def test_parse_amount_locales(text, locale, expected):
+    assert parse_amount(text, locale) == expected
+
+
+def test_extract_amount_locale():
+    assert extract_amount("Summe: 1.234,56 €", locale="de") == (Decimal("1234.56"), None)
+
+
+# ---------- Per-document format inference ----------
+
+def test_document_date_parser_infers_format():
+    """After the first date, consistent dates parse in one attempt each."""
+    parser = DocumentDateParser(("%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y"))
+    assert parser.parse("25/04/2024") == datetime(2024, 4, 25)
+    assert parser.inferred_format == "%d/%m/%Y"
+
+    attempts = parser.attempts
+    assert parser.parse("03/04/2024") == datetime(2024, 4, 3)  # day-first, like the page
+    assert parser.parse("Due: 17/05/2024") == datetime(2024, 5, 17)
+    assert parser.attempts == attempts + 2
+
+
+def test_document_date_parser_switches_format():
+    parser = DocumentDateParser(("%Y-%m-%d", "%m/%d/%Y"))
+    assert parser.parse("2024-01-15") == datetime(2024, 1, 15)
+    assert parser.parse("01/20/2024") == datetime(2024, 1, 20)
+    assert parser.inferred_format == "%m/%d/%Y"
+    assert parser.parse("nothing") is None
@@ -0,0 +1,155 @@
+"""
+Tests for the compiled schema matcher.
+"""
+
+import json
+import re
+import pytest
+from pathlib import Path
+
+from finscribe.schemas import (
+    BANK_STATEMENT_SCHEMA,
+    INVOICE_SCHEMA,
+    RECEIPT_SCHEMA,
+    DocumentSchema,
+    FieldSpec,
+    get_registered_schemas,
+    infer_doc_type,
+)
+from finscribe.schemas.matcher import (
+    CompiledSchemaMatcher,
+    KeywordAutomaton,
+    MultiPatternScanner,
+    required_keywords,
+)
+from finscribe.schema_router import extract_fields_by_schema, group_regions_by_layout
+
+
+SAMPLE_TEXTS = [
+    "Invoice #INV-1234",
+    "Date: 2024-01-15",
+    "Due Date: 2024-02-15",
+    "Subtotal: $100.00",
+    "Sales Tax: 8.00",
+    "Grand Total $108.00 USD",
+    "Amount due: 1,250.50",
+    "Paid by credit card at 10:45 PM",
+    "Account #: ****-1234",
+    "Opening balance: 1,000.00",
+    "Closing Balance 2,500.00",
+    "01/03/2024 to 31/03/2024",
+    "nothing to see here",
+    "",
+]
+
+
+def _reference_extract(regions, schema):
+    """Per-field, per-region extraction as implemented before compilation."""
+    layout_groups = group_regions_by_layout(regions)
+    extracted = {}
+    for region_type in ["header", "table", "footer"]:
+        for field_spec in schema.get_fields_by_region(region_type):
+            for region in layout_groups.get(region_type, []):
+                text = region.get("text", "")
+                match = re.search(field_spec.regex, text, re.IGNORECASE) if field_spec.regex else None
+                if match:
+                    value = (match.group(1) if match.groups() else match.group(0)).strip()
+                    if value:
+                        extracted[field_spec.name] = {
+                            "value": value,
+                            "confidence": region.get("confidence", 0.5),
+                            "region_type": region_type,
+                            "source_text": text,
+                        }
+                        break
+    return extracted
+
+
+def test_scanner_matches_individual_searches():
+    """Every pattern reports the same leftmost match as re.search."""
+    patterns = [f.regex for s in get_registered_schemas() for f in s.fields if f.regex]
+    scanner = MultiPatternScanner(patterns)
+
+    for text in SAMPLE_TEXTS:
+        hits = scanner.scan(text)
+        for index, pattern in enumerate(scanner.patterns):
+            m = re.search(pattern, text, re.IGNORECASE)
+            if m is None:
+                assert index not in hits
+            else:
+                assert hits[index].start == m.start()
+                assert hits[index].text == m.group(0)
+                assert hits[index].group == (m.group(1) if m.re.groups else None)
+
+
+def test_scanner_finds_overlapping_matches():
+    """Patterns matching at the same or overlapping positions are all reported."""
+    scanner = MultiPatternScanner([r"total", r"(grand )?total \d+", r"\d+"])
+    hits = scanner.scan("grand total 42")
+    assert hits[0].text == "total"
+    assert hits[1].text == "grand total 42"
+    assert hits[2].text == "42"
+
+
+def test_scanner_handles_backreferences():
+    """Patterns are evaluated unmodified, so backreferences keep their meaning."""
+    scanner = MultiPatternScanner([r"(\d)\1", r"\d+"])
+    hits = scanner.scan("a 12 33")
+    assert hits[0].text == "33"
+    assert hits[1].text == "12"
+
+
+def test_required_keywords():
+    """Leading literals are extracted; optional or class-led patterns have none."""
+    assert required_keywords(r"(tax|sales tax|vat)[\s:]*\d+") == {"tax", "sales tax", "vat"}
+    assert required_keywords(r"\b(USD|EUR)\b") == {"usd", "eur"}
+    assert required_keywords(r"(due|due date)[\s:]*") == {"due"}
+    assert required_keywords(r"\d{4}-\d{2}") is None
+    assert required_keywords(r"(grand )?total") is None
+
+
+def test_keyword_automaton_overlaps():
+    """Overlapping keywords and keywords sharing a prefix are all reported."""
+    automaton = KeywordAutomaton(["total", "subtotal", "due", "due date", "Statement"])
+    assert automaton.find("SubTotal and Due Date") == {"subtotal", "total", "due", "due date"}
+    assert automaton.find("bank statement") == {"statement"}
+    assert automaton.find("nothing") == set()
+
+
+@pytest.mark.parametrize("schema", [INVOICE_SCHEMA, RECEIPT_SCHEMA, BANK_STATEMENT_SCHEMA])
+def test_extract_fields_matches_reference(schema):
+    """Compiled extraction returns the same fields as per-field scanning."""
+    fixture_path = Path(__file__).parent / "fixtures" / "invoice_ocr.json"
+    with open(fixture_path, "r") as f:
+        regions = json.load(f)["regions"]
+
+    synthetic = [
+        {"text": text, "bbox": [0, y, 100, 10], "confidence": 0.9}
+        for y, text in zip(range(0, 1400, 100), SAMPLE_TEXTS)
+    ]
+
+    for case in (regions, synthetic):
+        assert extract_fields_by_schema(case, schema) == _reference_extract(case, schema)
+
+
+def test_infer_doc_type_priority():
+    """Earlier registered schemas win when keywords of several types occur."""
+    assert infer_doc_type("Invoice for your purchase") == "invoice"
+    assert infer_doc_type("Closing balance and receipt") == "bank_statement"
+    assert infer_doc_type("RECEIPT") == "receipt"
+
+
+def test_matcher_scales_to_added_schemas():
+    """Extra schemas contribute their keywords and fields to the same scan."""
+    purchase_order = DocumentSchema(
+        doc_type="purchase_order",
+        fields=[FieldSpec("po_number", required=True, region_type="header", regex=r"PO[\s#:]*(\d+)")],
+        keywords=["purchase order"],
+    )
+    matcher = CompiledSchemaMatcher([purchase_order] + get_registered_schemas())
+
+    assert matcher.infer_doc_type("Purchase Order PO# 991") == "purchase_order"
+    hits = matcher.scan_region("PO# 991 dated 2024-01-15", "header")
+    assert hits["purchase_order"]["po_number"].group == "991"
+    assert hits["invoice"]["invoice_date"].text == "2024-01-15"
+    assert hits["receipt"]["date"].text == "2024-01-15"
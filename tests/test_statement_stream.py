@@ -0,0 +1,285 @@
+"""
+Tests for the streaming bank-statement parser.
+"""
+
+import json
+from decimal import Decimal
+
+from finscribe.staging import LocalStorage
+from finscribe.statement_stream import StreamingStatementParser, group_rows
+
+
+def _region(text, x, y, w=80, h=14):
+    return {"text": text, "bbox": [x, y, w, h], "confidence": 0.95}
+
+
+def _page(rows, header=True, brought_forward=None, carried_forward=None):
+    """OCR regions of one statement page; rows are (date, description, debit, credit, balance)."""
+    regions = [_region("Page", 20, 10)]
+    y = 40
+    if header:
+        for text, x in (("Date", 20), ("Description", 120), ("Debit", 400), ("Credit", 500), ("Balance", 600)):
+            regions.append(_region(text, x, y))
+        y += 30
+    if brought_forward is not None:
+        regions += [_region("Balance brought forward", 120, y), _region(f"{brought_forward:,.2f}", 600, y)]
+        y += 30
+    for date, description, debit, credit, balance in rows:
+        regions += [_region(date, 20, y), _region(description, 120, y)]
+        if debit:
+            regions.append(_region(f"{debit:,.2f}", 400, y))
+        if credit:
+            regions.append(_region(f"{credit:,.2f}", 500, y))
+        regions.append(_region(f"{balance:,.2f}", 600, y))
+        y += 30
+    if carried_forward is not None:
+        regions += [_region("Balance carried forward", 120, y), _region(f"{carried_forward:,.2f}", 600, y)]
+    return regions
+
+
+def test_group_rows_accepts_both_bbox_formats():
+    regions = [_region("b", 200, 100), _region("a", 10, 103), _region("c", 10, 140)]
+    xyxy = [dict(r, bbox=[r["bbox"][0], r["bbox"][1], r["bbox"][0] + 80, r["bbox"][1] + 14]) for r in regions]
+    expected = [["a", "b"], ["c"]]
+    assert [[t for _, t in row] for row in group_rows(regions)] == expected
+    assert [[t for _, t in row] for row in group_rows(xyxy, bbox_format="xyxy")] == expected
+
+
+def test_columns_and_running_balance_across_pages():
+    parser = StreamingStatementParser(opening_balance=Decimal("1000.00"))
+    page1 = _page([("13/03/2024", "Salary", None, 2500.00, 3500.00),
+                   ("14/03/2024", "Rent", 1200.00, None, 2300.00)], carried_forward=2300.00)
+    page2 = _page([("15/03/2024", "Groceries", 85.40, None, 2214.60)], brought_forward=2300.00)
+
+    first = list(parser.feed_page(page1))
+    assert [t["amount"] for t in first] == [2500.00, -1200.00]
+    assert all(t["balance_ok"] for t in first)
+    assert first[0]["date"] == "2024-03-13" and first[0]["description"] == "Salary"
+
+    second = list(parser.feed_page(page2))
+    assert second == [{"date": "2024-03-15", "description": "Groceries", "amount": -85.40,
+                       "balance": 2214.60, "page": 2, "balance_ok": True}]
+
+    summary = parser.finish()
+    assert summary["balance_ok"] is True
+    assert summary["transaction_count"] == 3
+    assert summary["computed_closing_balance"] == 2214.60
+    assert summary["total_debits"] == 1285.40 and summary["total_credits"] == 2500.00
+
+
+def test_balance_mismatch_is_reported_once():
+    parser = StreamingStatementParser(opening_balance=Decimal("100"))
+    page = _page([("01/03/2024", "Coffee", 3.50, None, 96.50),
+                  ("02/03/2024", "Misread", 10.00, None, 80.00),
+                  ("03/03/2024", "Lunch", 12.00, None, 68.00)])
+    transactions = list(parser.feed_page(page))
+    assert [t["balance_ok"] for t in transactions] == [True, False, True]
+
+    summary = parser.finish()
+    assert summary["balance_ok"] is False
+    assert summary["mismatch_count"] == 1
+    assert summary["mismatches"][0]["difference"] == -6.50
+
+
+def test_sign_inferred_without_columns():
+    """Unsigned amounts in a single column take the sign that reproduces the balance."""
+    parser = StreamingStatementParser()
+    regions = [
+        _region("Opening balance", 120, 20), _region("500.00", 600, 20),
+        _region("01/03/2024", 20, 50), _region("Card payment", 120, 50),
+        _region("40.00", 500, 50), _region("460.00", 600, 50),
+        _region("02/03/2024", 20, 80), _region("Refund", 120, 80),
+        _region("15.00", 500, 80), _region("475.00", 600, 80),
+        _region("Closing balance", 120, 110), _region("475.00", 600, 110),
+    ]
+    transactions = list(parser.feed_page(regions))
+    assert [t["amount"] for t in transactions] == [-40.00, 15.00]
+    summary = parser.finish()
+    assert summary["opening_balance"] == 500.00
+    assert summary["closing_balance"] == 475.00
+    assert summary["balance_ok"] is True
+
+
+def test_wrapped_description_joins_previous_transaction():
+    parser = StreamingStatementParser(opening_balance=Decimal("0"))
+    regions = _page([("01/03/2024", "Transfer from", None, 50.00, 50.00)])
+    regions.append(_region("J SMITH REF 42", 120, 118))
+    regions += [_region("02/03/2024", 20, 160), _region("Fee", 120, 160),
+                _region("1.00", 400, 160), _region("49.00", 600, 160)]
+    transactions = list(parser.feed_page(regions))
+    assert transactions[0]["description"] == "Transfer from J SMITH REF 42"
+    assert transactions[1]["amount"] == -1.00
+
+
+def test_state_round_trip_resumes_between_pages():
+    pages = [
+        _page([("01/03/2024", "A", None, 10.00, 110.00)], brought_forward=100.00),
+        _page([("02/03/2024", "B", 5.00, None, 105.00)], header=False),
+    ]
+    whole = StreamingStatementParser()
+    expected = list(whole.parse_pages(pages))
+
+    first = StreamingStatementParser()
+    got = list(first.feed_page(pages[0]))
+    state = json.loads(json.dumps(first.state_dict()))
+    resumed = StreamingStatementParser.from_state(state)
+    got += list(resumed.feed_page(pages[1]))
+
+    assert got == expected
+    assert resumed.finish() == whole.finish()
+
+
+def test_parse_pages_is_lazy():
+    consumed = []
+
+    def pages():
+        for n in range(3):
+            consumed.append(n)
+            yield _page([(f"0{n + 1}/03/2024", f"Item {n}", None, 1.00, float(n + 1))])
+
+    stream = StreamingStatementParser(opening_balance=Decimal("0")).parse_pages(pages())
+    first = next(stream)
+    assert first["description"] == "Item 0"
+    assert consumed == [0]
+
+
+def test_statement_task_resumes_when_pages_arrive(tmp_path):
+    from finscribe.semantic_parse_task import parse_statement_pages
+
+    storage = LocalStorage(str(tmp_path))
+    page_keys = ["page_0", "page_1"]
+    pages = [
+        _page([("01/03/2024", "A", None, 10.00, 110.00)], brought_forward=100.00),
+        _page([("02/03/2024", "B", 5.00, None, 105.00)], brought_forward=110.00),
+    ]
+    storage.put_bytes("ocr/job1/page_0.json", json.dumps({"ocr": pages[0]}).encode())
+
+    state = parse_statement_pages("job1", page_keys, storage_backend=storage)
+    assert state["next_page"] == 1 and not state["done"]
+    page1 = json.loads(storage.get_bytes("results/job1/statement/page_1.json"))
+    assert page1["transactions"][0]["amount"] == 10.00
+    assert not storage.exists("results/job1/statement/summary.json")
+
+    storage.put_bytes("ocr/job1/page_1.json", json.dumps({"ocr": pages[1]}).encode())
+    state = parse_statement_pages("job1", page_keys, json.loads(json.dumps(state)), storage_backend=storage)
+    assert state["done"]
+    summary = json.loads(storage.get_bytes("results/job1/statement/summary.json"))
+    assert summary["transaction_count"] == 2
+    assert summary["balance_ok"] is True
+
+
+class LatePages(LocalStorage):
+    """Storage on which OCR artifacts of later pages only show up after a number of reads."""
+
+    def __init__(self, base_path, arrivals):
+        super().__init__(base_path)
+        self.arrivals = arrivals
+        self.reads = {}
+
+    def get_bytes(self, key):
+        self.reads[key] = self.reads.get(key, 0) + 1
+        if self.reads[key] <= self.arrivals.get(key, 0):
+            return None
+        return super().get_bytes(key)
+
+
+def test_statement_task_counts_only_retries_without_progress(tmp_path, monkeypatch):
+    import pytest
+    from finscribe import semantic_parse_task as module
+
+    monkeypatch.setattr(module.celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(module, "STATEMENT_MAX_STALLED_RETRIES", 2)
+    pages = [
+        _page([("01/03/2024", "A", None, 10.00, 110.00)], brought_forward=100.00),
+        _page([("02/03/2024", "B", 5.00, None, 105.00)], brought_forward=110.00),
+        _page([("03/03/2024", "C", 5.00, None, 100.00)], brought_forward=105.00),
+    ]
+    # Each later page takes two empty checks to arrive: four retries in all, never more than two in a row
+    storage = LatePages(str(tmp_path), {"ocr/job1/page_1.json": 2, "ocr/job1/page_2.json": 2})
+    for n, regions in enumerate(pages):
+        storage.put_bytes(f"ocr/job1/page_{n}.json", json.dumps({"ocr": regions}).encode())
+    monkeypatch.setattr(module, "get_storage", lambda: storage)
+
+    result = module.statement_parse_task.apply(args=("job1", ["page_0", "page_1", "page_2"])).get()
+    assert result["ok"] is True
+    assert json.loads(storage.get_bytes("results/job1/statement/summary.json"))["transaction_count"] == 3
+
+    # A page that never arrives fails the task once the stalled checks run out
+    storage.arrivals["ocr/job2/page_1.json"] = 10
+    storage.put_bytes("ocr/job2/page_0.json", json.dumps({"ocr": pages[0]}).encode())
+    with pytest.raises(RuntimeError, match="page 2 did not arrive"):
+        module.statement_parse_task.apply(args=("job2", ["page_0", "page_1"])).get()
+    assert storage.reads["ocr/job2/page_1.json"] == 4  # the first run, then three retries without a new page
+
+
+def test_ocr_of_first_statement_page_starts_statement_parse(tmp_path, monkeypatch):
+    from finscribe import tasks
+    from finscribe.staging import get_storage
+
+    # ocr_task and the statement task both use the default pipeline storage
+    monkeypatch.delenv("MINIO_ENDPOINT", raising=False)
+    monkeypatch.setenv("STORAGE_BASE", str(tmp_path))
+    monkeypatch.setattr(tasks, "storage", get_storage())
+    tasks.storage.put_bytes("staging/job1/page_0.png", b"png")
+    pages = [
+        [_region("Bank Statement", 20, 0)] + _page([("01/03/2024", "A", None, 10.00, 110.00)], brought_forward=100.00),
+        # A later page is routed by the first page's type, even if it reads like an invoice
+        [_region("Invoice payment total", 20, 0)] + _page([("02/03/2024", "B", 5.00, None, 105.00)],
+                                                          brought_forward=110.00),
+    ]
+    ocr = iter(pages)
+    dispatched = []
+    monkeypatch.setattr(tasks.ocr_client, "analyze_image", lambda image: next(ocr))
+    monkeypatch.setattr(tasks.statement_parse_task, "delay", lambda *args: dispatched.append(("statement", args)))
+    monkeypatch.setattr(tasks.semantic_parse_task, "delay", lambda *args: dispatched.append(("invoice", args)))
+
+    tasks.ocr_task.run("job1", "page_0", "staging/job1/page_0.png", ["page_0", "page_1"])
+    tasks.ocr_task.run("job1", "page_1", "staging/job1/page_0.png", ["page_0", "page_1"])
+    assert dispatched == [("statement", ("job1", ["page_0", "page_1"]))]
+
+    result = tasks.statement_parse_task.run(*dispatched[0][1])
+    assert result["ok"] is True
+    assert json.loads(get_storage().get_bytes(result["summary_key"]))["transaction_count"] == 2
+
+
+def test_pages_ocrd_before_the_first_are_routed_once_it_decides(tmp_path, monkeypatch):
+    from finscribe import tasks
+
+    monkeypatch.setattr(tasks, "storage", LocalStorage(str(tmp_path)))
+    tasks.storage.put_bytes("staging/job1/page.png", b"png")
+    invoice = [_region("Invoice #INV-1", 20, 0), _region("Total 10.00", 20, 40)]
+    monkeypatch.setattr(tasks.ocr_client, "analyze_image", lambda image: invoice)
+    dispatched = []
+    monkeypatch.setattr(tasks.statement_parse_task, "delay", lambda *args: dispatched.append(("statement", args)))
+    monkeypatch.setattr(tasks.semantic_parse_task, "delay", lambda *args: dispatched.append(("invoice", args[1])))
+    page_keys = ["page_0", "page_1", "page_2"]
+
+    tasks.ocr_task.run("job1", "page_1", "staging/job1/page.png", page_keys)
+    assert dispatched == []  # waits for the first page's decision
+    tasks.ocr_task.run("job1", "page_0", "staging/job1/page.png", page_keys)
+    tasks.ocr_task.run("job1", "page_2", "staging/job1/page.png", page_keys)
+    assert dispatched == [("invoice", "page_0"), ("invoice", "page_1"), ("invoice", "page_2")]
+
+
+def test_post_processor_routes_bank_statements():
+    from app.core.post_processing import FinancialDocumentPostProcessor
+
+    def to_elements(regions):
+        return [{"text": r["text"], "confidence": r["confidence"],
+                 "bbox": [r["bbox"][0], r["bbox"][1], r["bbox"][0] + r["bbox"][2], r["bbox"][1] + r["bbox"][3]]}
+                for r in regions]
+
+    ocr_results = {
+        "document_type": "bank_statement",
+        "pages": [
+            {"page_number": 1, "elements": to_elements(
+                _page([("01/03/2024", "Salary", None, 900.00, 1000.00)], brought_forward=100.00))},
+            {"page_number": 2, "elements": to_elements(
+                _page([("02/03/2024", "Rent", 700.00, None, 350.00)], brought_forward=1000.00))},
+        ],
+    }
+    result = FinancialDocumentPostProcessor().process_ocr_output(ocr_results)
+    assert result["success"] is True
+    assert [t["page"] for t in result["data"]["transactions"]] == [1, 2]
+    assert result["validation"]["is_valid"] is False
+    assert "expected 300.00, printed 350.00" in result["validation"]["errors"][0]
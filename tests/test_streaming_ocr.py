@@ -0,0 +1,91 @@
+"""
+Tests for incremental tailing of streaming OCR results.
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+
+import pytest
+
+from finscribe import streaming_ocr
+from finscribe.streaming_ocr import JSONLTailer, PollingWatcher, StreamingOCRStorage, stream_ocr_results
+
+
+def _region(n):
+    return {"region_id": f"region_{n}", "text": f"line {n}", "confidence": 0.9, "bbox": [0, n, 10, 10]}
+
+
+def test_tailer_reads_each_byte_once_and_waits_for_complete_lines(tmp_path):
+    path = tmp_path / "job_regions.jsonl"
+    tailer = JSONLTailer(path)
+    assert tailer.read_new() == []  # file not created yet
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(_region(0)) + "\n" + json.dumps(_region(1))[:10])
+    assert [r["region_id"] for r in tailer.read_new()] == ["region_0"]
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(_region(1))[10:] + "\n")
+    assert [r["region_id"] for r in tailer.read_new()] == ["region_1"]
+    assert tailer.read_new() == []
+
+    # Cleared and rewritten: start over
+    path.write_text(json.dumps(_region(2)) + "\n", encoding="utf-8")
+    assert [r["region_id"] for r in tailer.read_new()] == ["region_2"]
+
+
+def test_tailing_large_document_costs_io_proportional_to_size(tmp_path):
+    storage = StreamingOCRStorage(str(tmp_path))
+    tailer = JSONLTailer(storage.results_path("job"))
+    received = 0
+    for n in range(10_000):
+        storage.append_region("job", _region(n))
+        if n % 10 == 0:
+            received += len(tailer.read_new())
+    received += len(tailer.read_new())
+
+    assert received == 10_000
+    assert tailer.bytes_read == storage.results_path("job").stat().st_size
+
+
+def test_polling_watcher_backs_off_and_resets():
+    watcher = PollingWatcher(min_interval=0.001, max_interval=0.004)
+    for _ in range(4):
+        asyncio.run(watcher.wait())
+    assert watcher.interval == 0.004
+    watcher.activity()
+    assert watcher.interval == 0.001
+
+
+@pytest.mark.parametrize("use_inotify", [
+    pytest.param(True, marks=pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux-only")),
+    False,
+])
+def test_stream_yields_appended_regions_once_then_ends(tmp_path, monkeypatch, use_inotify):
+    storage = StreamingOCRStorage(str(tmp_path))
+    monkeypatch.setattr(streaming_ocr, "_storage", storage)
+
+    def write():
+        for n in range(50):
+            storage.append_region("job", _region(n))
+            if n == 10:
+                storage.append_region("job", _region(n))  # a retried task appends its region again
+            time.sleep(0.005)
+
+    async def consume():
+        received = []
+        started = time.monotonic()
+        writer = threading.Thread(target=write)
+        writer.start()
+        async for region in stream_ocr_results("job", idle_timeout=0.3, use_inotify=use_inotify):
+            received.append((region["region_id"], time.monotonic() - started))
+        writer.join()
+        return received, time.monotonic() - started
+
+    received, elapsed = asyncio.run(consume())
+    assert [region_id for region_id, _ in received] == [f"region_{n}" for n in range(50)]
+    # Regions arrive while the writer is still going, and the stream stops soon after it does
+    assert received[0][1] < 0.2
+    assert elapsed < 2
@@ -0,0 +1,93 @@
+"""
+Tests for vendor normalization and the trigram vendor resolver.
+"""
+
+import random
+
+from finscribe.vendors import VendorResolver, normalize_vendor, trigrams, vendor_key
+
+WORDS = ["North", "Global", "Pacific", "Summit", "Paper", "Steel", "Logistics", "Foods", "Office",
+         "Freight", "Medical", "Print", "Marine", "Energy", "Textiles", "Timber"]
+SUFFIXES = ["Inc", "LLC", "Ltd", "GmbH", "Corp", "Group"]
+OCR_CONFUSIONS = {"o": "0", "l": "1", "i": "l", "s": "5", "b": "8", "e": "c", "g": "q"}
+
+
+def _vendor_names(count, seed=3):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        coined = "".join(rng.choice("bcdfgklmnprstvz") + rng.choice("aeiou") for _ in range(rng.randint(2, 4)))
+        names.add(f"{rng.choice(WORDS)} {coined.capitalize()} {rng.choice(WORDS)} {rng.choice(SUFFIXES)}")
+    return sorted(names)
+
+
+def _ocr_corrupt(name, rng):
+    chars = list(name)
+    for _ in range(2):
+        pos = rng.randrange(len(chars))
+        if chars[pos].lower() in OCR_CONFUSIONS and rng.random() < 0.6:
+            chars[pos] = OCR_CONFUSIONS[chars[pos].lower()]
+        elif rng.random() < 0.5:
+            del chars[pos]
+        else:
+            chars.insert(pos, " ")
+    text = "".join(chars)
+    return text.upper() if rng.random() < 0.3 else text
+
+
+def test_trigrams_are_padded():
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+
+
+def test_exact_and_variant_names():
+    resolver = VendorResolver(["ACME Corporation", "Acme Supplies Ltd", "Zenith Paper Co"])
+    best = resolver.search("acme  corporation.")[0]
+    assert (best.name, best.score) == ("ACME Corporation", 1.0)
+    assert resolver.resolve("ACME C0rp0ration") == "ACME Corporation"
+    assert resolver.resolve("Totally Unknown Vendor") is None
+    assert "acme corporation" in resolver
+
+
+def test_search_returns_ranked_top_k():
+    resolver = VendorResolver(["Paper Co", "Paper Company", "Paper Corp", "Steel Co"])
+    matches = resolver.search("Paper Co", k=3)
+    assert len(matches) == 3
+    assert matches[0].name == "Paper Co"
+    assert [m.score for m in matches] == sorted((m.score for m in matches), reverse=True)
+    assert all(m.name != "Steel Co" for m in matches)
+
+
+def test_incremental_add_and_persistence(tmp_path):
+    resolver = VendorResolver(["Alpha GmbH"])
+    assert resolver.add("ALPHA gmbh") == 0  # already known
+    assert resolver.add("Beta Logistics") == 1
+    assert resolver.add_many(["Gamma Foods", "Beta Logistics"]) == 1
+
+    path = str(tmp_path / "vendors.json")
+    resolver.save(path)
+    loaded = VendorResolver.load(path)
+    assert loaded.names == resolver.names
+    assert loaded.resolve("Bcta Log1stics") == "Beta Logistics"
+    assert len(VendorResolver.load(str(tmp_path / "missing.json"))) == 0
+
+
+def test_recall_on_ocr_corrupted_names():
+    names = _vendor_names(5000)
+    resolver = VendorResolver(names)
+    rng = random.Random(11)
+    targets = [rng.choice(names) for _ in range(500)]
+
+    top1 = top5 = 0
+    for target in targets:
+        found = [match.name for match in resolver.search(_ocr_corrupt(target, rng), k=5)]
+        top1 += bool(found) and found[0] == target
+        top5 += target in found
+    assert top1 / len(targets) >= 0.9
+    assert top5 / len(targets) >= 0.95
+
+
+def test_vendor_key_uses_resolver():
+    resolver = VendorResolver(["Summit Paper Inc"])
+    assert vendor_key("SUMMlT PAPER lNC", resolver) == "summit paper inc"
+    assert vendor_key("SUMMlT PAPER lNC") == normalize_vendor("SUMMlT PAPER lNC")
+    assert vendor_key(None, resolver) is None
@@ -0,0 +1,129 @@
+"""Tests for admission control on background jobs."""
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import admission
+from app.core.admission import AdmissionController, AdmissionQueueFull
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def controller():
+    controller = AdmissionController(max_concurrent=2, max_queue=2, name="test")
+    yield controller
+    controller.shutdown(timeout=2)
+
+
+def test_runs_at_most_max_concurrent(controller):
+    release = threading.Event()
+    state = {"running": 0, "peak": 0, "done": 0}
+    lock = threading.Lock()
+
+    def job():
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        release.wait(2)
+        with lock:
+            state["running"] -= 1
+            state["done"] += 1
+
+    for _ in range(4):
+        controller.reserve().submit(job)
+    _wait_for(lambda: controller.running == 2)
+    assert controller.queue_depth == 2
+
+    release.set()
+    _wait_for(lambda: state["done"] == 4)
+    assert state["peak"] == 2
+    assert controller.queue_depth == 0
+
+
+def test_rejects_when_full_and_cancel_frees_place(controller):
+    release = threading.Event()
+    rejected_before = REGISTRY.get_sample_value("finscribe_admission_rejected_total", {"queue_name": "test"}) or 0
+
+    for _ in range(3):
+        controller.reserve().submit(release.wait, 2)
+    held = controller.reserve()
+    with pytest.raises(AdmissionQueueFull) as excinfo:
+        controller.reserve()
+    assert excinfo.value.retry_after >= admission.MIN_RETRY_AFTER
+    assert REGISTRY.get_sample_value("finscribe_admission_rejected_total", {"queue_name": "test"}) == rejected_before + 1
+
+    held.cancel()
+    controller.reserve().cancel()
+    release.set()
+
+
+def test_submit_during_shutdown_is_refused():
+    controller = AdmissionController(max_concurrent=1, max_queue=2, name="test-shutdown")
+    reservation = controller.reserve()
+    controller.shutdown(timeout=2)
+    with pytest.raises(RuntimeError):
+        reservation.submit(lambda: None)
+    assert controller.queue_depth == 0
+
+
+def test_wait_time_and_depth_metrics(controller):
+    waits_before = REGISTRY.get_sample_value("finscribe_admission_wait_seconds_count", {"queue_name": "test"}) or 0
+    done = threading.Event()
+    controller.reserve().submit(done.set)
+    assert done.wait(2)
+    _wait_for(lambda: controller.running == 0)
+    assert REGISTRY.get_sample_value("finscribe_admission_wait_seconds_count", {"queue_name": "test"}) == waits_before + 1
+    assert REGISTRY.get_sample_value("finscribe_queue_size", {"queue_name": "admission_test"}) == 0
+
+
+def test_analyze_returns_429_with_retry_after(monkeypatch):
+    from app.api.v1 import endpoints
+    from app.db import Base, get_db
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    release = threading.Event()
+    started = []
+
+    def stand_in_job(job_id, contents, filename, job_type):
+        started.append(job_id)
+        release.wait(2)
+
+    controller = AdmissionController(max_concurrent=1, max_queue=1, name="test_api")
+    monkeypatch.setattr(admission, "_controller", controller)
+    monkeypatch.setattr(endpoints, "process_job", stand_in_job)
+
+    app = FastAPI()
+    app.include_router(endpoints.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = lambda: Session()
+    client = TestClient(app)
+    upload = {"file": ("a.pdf", b"%PDF-1.4\n" + b"0" * 200, "application/pdf")}
+
+    try:
+        assert client.post("/api/v1/analyze", files=upload).status_code == 200
+        assert client.post("/api/v1/analyze", files=upload).status_code == 200
+        response = client.post("/api/v1/analyze", files=upload)
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+        release.set()
+        _wait_for(lambda: len(started) == 2 and controller.running == 0)
+        assert client.post("/api/v1/analyze", files=upload).status_code == 200
+    finally:
+        release.set()
+        controller.shutdown(timeout=2)
@@ -0,0 +1,111 @@
+"""Tests for batch (integer-cent) arithmetic validation."""
+import copy
+import random
+from decimal import Decimal
+
+from app.core.etl.validator import DocumentValidator
+from app.core.validation import FinancialValidator, check_arithmetic_batch
+
+
+def _random_document(rng):
+    items = []
+    for i in range(rng.randint(0, 6)):
+        quantity = rng.choice([1, 2, 3, 0.5, 1.25, rng.randint(1, 20)])
+        unit_price = rng.choice([round(rng.uniform(0, 500), 2), 0.125, 19.99, 0.1])
+        total = float(Decimal(str(quantity)) * Decimal(str(unit_price)))
+        total = rng.choice([total, round(total, 2), total + 0.01, total + 5, total])
+        items.append({"description": f"Item {i}", "quantity": quantity, "unit_price": unit_price, "total": total})
+    subtotal = sum(Decimal(str(item["total"])) for item in items)
+    tax = round(float(subtotal) * 0.08, 2)
+    summary = {
+        "subtotal": rng.choice([float(subtotal), float(subtotal) + 0.02, float(subtotal)]),
+        "taxes": [{"amount": tax}],
+        "discounts": rng.choice([[], [{"amount": 1.5}]]),
+        "currency": rng.choice(["USD", "$", "€"]),
+    }
+    summary["grand_total"] = rng.choice([
+        float(Decimal(str(summary["subtotal"])) + Decimal(str(tax))
+              - sum(Decimal(str(d["amount"])) for d in summary["discounts"])),
+        float(subtotal) + tax,
+        float(subtotal),
+    ])
+    return {
+        "structured_data": {
+            "client_info": {"invoice_date": "2024-01-15", "due_date": rng.choice(["2024-02-15", "2024-01-01"])},
+            "vendor_block": {"confidence": 0.9},
+            "line_items": [dict(item, confidence=0.8) for item in items],
+            "financial_summary": summary,
+        }
+    }
+
+
+ODD_DOCUMENTS = [
+    {"structured_data": {}},
+    {"structured_data": {"line_items": None, "financial_summary": {}}},
+    {"structured_data": {"line_items": [{"quantity": "2", "unit_price": 5, "total": "10"}]}},
+    {"structured_data": {"line_items": [{"quantity": True, "unit_price": 5, "total": 5}]}},
+    {"structured_data": {"line_items": [{"quantity": float("nan"), "unit_price": 5, "total": 5}]}},
+    {"structured_data": {"line_items": [{"quantity": 1, "unit_price": 10 ** 30, "total": 10 ** 30}]}},
+    {"structured_data": {"financial_summary": {"subtotal": 0, "grand_total": 0.001}}},
+    {"structured_data": {"financial_summary": {"taxes": None}}},
+    {"structured_data": {"financial_summary": {"subtotal": 0.1, "taxes": [{"amount": 0.2}], "grand_total": 0.3}}},
+]
+
+
+def test_batch_matches_scalar_validator():
+    rng = random.Random(5)
+    documents = [_random_document(rng) for _ in range(300)] + ODD_DOCUMENTS
+    validator = FinancialValidator()
+
+    expected = [validator.validate(doc) for doc in copy.deepcopy(documents)]
+    assert validator.validate_batch(copy.deepcopy(documents)) == expected
+    assert any(result["math_ok"] for result in expected)
+    assert not all(result["math_ok"] for result in expected)
+
+
+def test_batch_respects_tolerance():
+    doc = {
+        "line_items": [{"quantity": 1, "unit_price": 10.0, "total": 10.05}],
+        "financial_summary": {"subtotal": 10.05, "grand_total": 10.05},
+    }
+    assert not check_arithmetic_batch([doc], Decimal("0.01"))[0]
+    assert check_arithmetic_batch([doc], Decimal("0.05"))[0]
+
+
+def test_exact_cents_avoid_float_drift():
+    """0.1 + 0.2 == 0.3 in cents, although not in floats."""
+    doc = {
+        "line_items": [{"quantity": 1, "unit_price": 0.1, "total": 0.1}],
+        "financial_summary": {"subtotal": 0.1, "taxes": [{"amount": 0.2}], "grand_total": 0.3},
+    }
+    assert check_arithmetic_batch([doc], Decimal("0"))[0]
+
+
+def test_etl_batch_matches_scalar():
+    rng = random.Random(9)
+    validator = DocumentValidator()
+    records = []
+    for _ in range(300):
+        amounts = [round(rng.uniform(1, 300), 2) for _ in range(rng.randint(0, 5))]
+        subtotal = rng.choice([round(sum(amounts), 2), round(sum(amounts), 2) + 0.01, 3.333, None])
+        tax = round(rng.uniform(0, 30), 2)
+        total = round((subtotal or 0) + tax + rng.choice([0, 0, 0.005, 0.01, 0.5]), 3)
+        records.append({
+            "total": rng.choice([total, f"${total:,}"]),
+            "subtotal": subtotal,
+            "tax": tax,
+            "line_items": [{"amount": amount} for amount in amounts],
+        })
+
+    expected = [validator._validate_arithmetic(record) for record in records]
+    assert validator.validate_arithmetic_batch(records) == expected
+
+
+def test_etl_arithmetic_is_exact():
+    validator = DocumentValidator()
+    result = validator._validate_arithmetic({"subtotal": 1.1, "tax": 0, "total": 1.11})
+    assert result["passed"] is True
+    assert result["warnings"] == ["Minor arithmetic difference: 0.01"]
+
+    result = validator._validate_arithmetic({"subtotal": 0.1, "tax": 0.2, "total": 0.3})
+    assert result == {"passed": True, "errors": [], "warnings": []}
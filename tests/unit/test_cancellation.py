@@ -0,0 +1,171 @@
+"""Tests for cancelling queued and running jobs."""
+import copy
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.schemas import JobStatus
+from app.config.settings import load_config
+from app.core.admission import AdmissionController
+from app.core.fair_queue import FairQueue
+from app.core.models.paddleocr_vl_service import PaddleOCRVLService
+
+DOCUMENT = b"%PDF-1.4\n" + b"invoice INV-0042 total 118.00 " * 20
+
+
+class SlowOCRBackend:
+    """Local stand-in for the PaddleOCR-VL server that answers after ``delay`` seconds."""
+
+    def __init__(self, delay: float):
+        self.requests = 0
+        self.released = threading.Event()
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                backend.requests += 1
+                backend.released.wait(delay)
+                body = json.dumps({"choices": [{"message": {"content": '{"text": "late"}'}}]}).encode()
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    pass  # the client gave up
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def wait_for_requests(self, count: int, timeout: float = 5) -> None:
+        deadline = time.monotonic() + timeout
+        while self.requests < count:
+            assert time.monotonic() < deadline, "backend was not called"
+            time.sleep(0.01)
+
+    def close(self):
+        self.released.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def backend():
+    backend = SlowOCRBackend(delay=30)
+    yield backend
+    backend.close()
+
+
+def _http_ocr(url: str) -> PaddleOCRVLService:
+    config = copy.deepcopy(load_config())
+    config["model_mode"] = "remote"
+    config["paddleocr_vl"]["vllm_server_url"] = url
+    return PaddleOCRVLService(config)
+
+
+def _cancelled(state):
+    return REGISTRY.get_sample_value("finscribe_jobs_cancelled_total", {"state": state}) or 0
+
+
+def _wait_until(condition, timeout: float = 3) -> float:
+    started = time.monotonic()
+    while not condition():
+        assert time.monotonic() - started < timeout
+        time.sleep(0.01)
+    return time.monotonic() - started
+
+
+def test_cancel_stops_running_job_and_drops_queued_one(backend, monkeypatch):
+    from app.api.v1 import endpoints
+    from app.core import worker
+    from app.db import Base, get_db
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    controller = AdmissionController(max_concurrent=1, max_queue=4, name="cancel-test", queue=FairQueue({}))
+    monkeypatch.setattr(endpoints, "get_admission_controller", lambda: controller)
+    monkeypatch.setattr(endpoints, "get_content_store", lambda: None)
+    monkeypatch.setattr(worker, "get_content_store", lambda: None)
+    monkeypatch.setattr(worker, "get_db_session", Session)
+    monkeypatch.setattr(worker.processor, "ocr_service", _http_ocr(backend.url))
+    monkeypatch.setattr(worker.processor, "content_store", None)
+
+    app = FastAPI()
+    app.include_router(endpoints.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = lambda: Session()
+    client = TestClient(app)
+    queued, processing = _cancelled("queued"), _cancelled("processing")
+    try:
+        running_id, waiting_id = [
+            client.post("/api/v1/analyze", files={"file": (f"{n}.pdf", DOCUMENT + bytes([n]), "application/pdf")})
+            .json()["job_id"]
+            for n in range(2)
+        ]
+        backend.wait_for_requests(1)
+
+        # The second job is still queued: it leaves the queue and never reaches the backend
+        response = client.post(f"/api/v1/jobs/{waiting_id}/cancel")
+        assert response.status_code == 200 and response.json()["status"] == "cancelled"
+        assert controller.queue_depth == 0
+
+        # The first job's 30 s OCR call is aborted and its slot freed at once
+        response = client.post(f"/api/v1/jobs/{running_id}/cancel")
+        assert response.status_code == 200 and response.json()["status"] == "cancelled"
+        assert _wait_until(lambda: controller.running == 0) < 2
+    finally:
+        controller.shutdown(timeout=2)
+
+    assert backend.requests == 1
+    assert (_cancelled("queued") - queued, _cancelled("processing") - processing) == (1, 1)
+    for job_id in (running_id, waiting_id):
+        job = client.get(f"/api/v1/jobs/{job_id}").json()
+        assert job["status"] == "cancelled" and job["result"] is None
+    assert client.post(f"/api/v1/jobs/{running_id}/cancel").status_code == 409
+
+
+def test_cancel_aborts_celery_stage_in_flight(backend, monkeypatch, tmp_path):
+    from app.core import tasks
+    from app.core.celery_app import celery_app
+    from app.core.claim_check import CLAIM_PREFIX, ClaimCheck
+    from app.core.job_manager import job_manager
+    from app.core.result_storage import ResultStorage
+    from app.storage.local_storage import LocalStorage
+
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(celery_app.conf, "task_eager_propagates", True)
+    monkeypatch.setattr(tasks, "result_storage", ResultStorage(str(tmp_path)))
+    monkeypatch.setattr(tasks, "claims", ClaimCheck(LocalStorage(str(tmp_path / "storage"))))
+    monkeypatch.setattr(tasks.processor, "ocr_service", _http_ocr(backend.url))
+    monkeypatch.setattr(tasks.processor, "content_store", None)
+    stored = []
+    monkeypatch.setattr(tasks.result_storage, "store_result", lambda *args: stored.append(args))
+
+    job_id = job_manager.create_job(metadata={"filename": "invoice.pdf"})
+    pipeline = threading.Thread(target=lambda: tasks.build_document_pipeline(job_id, DOCUMENT, "invoice.pdf").apply())
+    pipeline.start()
+    backend.wait_for_requests(1)
+
+    # Recorded in the job store, as another process would; the OCR stage polls for it
+    assert job_manager.mark_cancelled(job_id)
+    started = time.monotonic()
+    pipeline.join(timeout=5)
+    assert not pipeline.is_alive() and time.monotonic() - started < 3
+    assert backend.requests == 1 and stored == []
+    assert job_manager.get_job(job_id).status == JobStatus.CANCELLED
+    assert tasks.claims.storage.list_prefix(CLAIM_PREFIX) == []
@@ -0,0 +1,86 @@
+"""Tests for the stage-split Celery document pipeline (eager mode)."""
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+
+from app.api.v1.schemas import JobStage, JobStatus
+from app.core import tasks
+from app.core.celery_app import celery_app
+from app.core.claim_check import ClaimCheck
+from app.core.job_manager import job_manager
+from app.core.result_storage import ResultStorage
+from app.storage.local_storage import LocalStorage
+
+
+def _png():
+    buf = io.BytesIO()
+    Image.new("RGB", (200, 200), "white").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def eager(monkeypatch, tmp_path):
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(celery_app.conf, "task_eager_propagates", True)
+    monkeypatch.setattr(tasks, "result_storage", ResultStorage(str(tmp_path)))
+    monkeypatch.setattr(tasks, "claims", ClaimCheck(LocalStorage(str(tmp_path / "storage"))))
+    monkeypatch.setattr(tasks.processor, "active_learning_file", str(tmp_path / "al.jsonl"))
+    monkeypatch.setattr(tasks.active_learning_service, "log_extraction", lambda **kwargs: None)
+    return tmp_path
+
+
+@pytest.mark.parametrize("task_name, queue", [
+    ("app.core.tasks.preprocess_task", "cpu"),
+    ("app.core.tasks.ocr_task", "gpu"),
+    ("app.core.tasks.vlm_parse_task", "gpu"),
+    ("app.core.tasks.postprocess_task", "cpu"),
+    ("app.core.tasks.validate_task", "cpu"),
+    ("app.core.tasks.index_task", "cpu"),
+])
+def test_stage_tasks_follow_declared_routes(task_name, queue):
+    assert task_name in celery_app.tasks
+    assert celery_app.amqp.router.route({}, task_name)["queue"].name == queue
+
+
+def test_pipeline_runs_all_stages_and_completes_job(eager, monkeypatch):
+    job_id = job_manager.create_job(metadata={"filename": "receipt.png"})
+    content = _png()
+    stored_results = []
+    store_result = tasks.result_storage.store_result
+    monkeypatch.setattr(tasks.result_storage, "store_result",
+                        lambda *args: stored_results.append(args[1]) or store_result(*args))
+
+    handed_off = tasks.build_document_pipeline(job_id, content, "receipt.png").apply().get()
+
+    assert handed_off == {"job_id": job_id, "next_stage": "ocr"}
+    job = job_manager.get_job(job_id)
+    assert job.status == JobStatus.COMPLETED
+    assert [stage for stage in job.stages] == [
+        JobStage.RECEIVED, JobStage.STAGING, JobStage.PREPROCESS, JobStage.OCR_LAYOUT, JobStage.OCR_RECOGNIZE,
+        JobStage.SEMANTIC_PARSE, JobStage.POSTPROCESS, JobStage.VALIDATE, JobStage.STORE, JobStage.COMPLETED,
+    ]
+    assert tasks.result_storage.get_result(job.result_id).job_id == job_id
+
+    # Same structured output as the in-process pipeline
+    in_process = asyncio.run(tasks.processor.process_document(content, "receipt.png"))
+    assert stored_results[0]["structured_output"] == in_process["structured_output"]
+    assert stored_results[0]["validation"] == in_process["validation"]
+
+
+def test_document_bytes_leave_context_after_parsing(eager):
+    context = tasks.preprocess_task.apply(args=("job-x", _png(), "r.png")).get()
+    context = tasks.ocr_task.apply(args=(context,)).get()
+    assert "file_content" in context
+    context = tasks.vlm_parse_task.apply(args=(context,)).get()
+    assert "file_content" not in context and "enriched_data" in context
+
+
+def test_empty_document_fails_job(eager):
+    job_id = job_manager.create_job()
+    with pytest.raises(ValueError):
+        tasks.build_document_pipeline(job_id, b"", "empty.pdf").apply().get()
+    job = job_manager.get_job(job_id)
+    assert job.status == JobStatus.FAILED
+    assert job.error["code"] == "invalid_input"
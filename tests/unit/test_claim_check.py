@@ -0,0 +1,147 @@
+"""Tests for the claim check on Celery payloads."""
+import io
+import os
+import uuid
+
+import pytest
+from kombu.utils.json import dumps
+from PIL import Image
+
+from app.core import tasks
+from app.core.celery_app import celery_app
+from app.core.claim_check import CLAIM_PREFIX, ClaimCheck, is_claim
+from app.core.result_storage import ResultStorage
+from app.storage.local_storage import LocalStorage
+
+
+@pytest.fixture
+def claims(tmp_path):
+    return ClaimCheck(LocalStorage(str(tmp_path / "storage")), threshold=256, ttl_seconds=60)
+
+
+def _message_size(task_name, args, kwargs):
+    """Serialized body size of the broker message Celery would send (headers are fixed-size bookkeeping)."""
+    message = celery_app.amqp.as_task_v2(str(uuid.uuid4()), task_name, args=args, kwargs=kwargs)
+    return len(dumps(message.body))
+
+
+def test_small_payloads_stay_inline_and_large_ones_round_trip(claims):
+    assert claims.check_in(b"tiny", holder="job") == b"tiny"
+    assert claims.check_in({"a": 1}, holder="job") == {"a": 1}
+
+    document = os.urandom(4096)
+    reference = claims.check_in(document, holder="job")
+    assert is_claim(reference) and reference["size"] == 4096 and reference["kind"] == "bytes"
+    assert claims.fetch(reference) == document
+
+    context = {"job_id": "job", "file_content": reference, "ocr": ["x" * 500]}
+    assert claims.fetch(claims.check_in(context, holder="job")) == context
+    assert claims.fetch("not a claim") == "not a claim"
+
+
+def test_identical_payloads_share_one_object_until_last_release(claims):
+    document = os.urandom(1024)
+    first = claims.check_in(document, holder="job-1")
+    second = claims.check_in(document, holder="job-2")
+    assert first == second
+    assert len([key for key in claims.storage.list_prefix(CLAIM_PREFIX) if key.endswith("/data")]) == 1
+
+    assert claims.release(first, "job-1") is False
+    assert claims.fetch(second) == document
+    assert claims.release(second, "job-2") is True
+    with pytest.raises(KeyError):
+        claims.fetch(first)
+
+
+class FlakyStorage(LocalStorage):
+    """Local storage whose listings can fail and whose deletes can run a hook first."""
+
+    def __init__(self, base_path):
+        super().__init__(base_path)
+        self.listing_fails = False
+        self.before_delete = None
+
+    def list_prefix(self, prefix):
+        if self.listing_fails:
+            raise ConnectionError("storage unavailable")
+        return super().list_prefix(prefix)
+
+    def delete(self, key):
+        if self.before_delete is not None and key.endswith("/data"):
+            hook, self.before_delete = self.before_delete, None
+            hook()
+        return super().delete(key)
+
+
+def test_release_fails_closed(tmp_path):
+    storage = FlakyStorage(str(tmp_path / "storage"))
+    claims = ClaimCheck(storage, threshold=256)
+    document = os.urandom(1024)
+
+    # Holders can't be listed: the object stays
+    reference = claims.check_in(document, holder="job-1")
+    storage.listing_fails = True
+    assert claims.release(reference, "job-1") is False
+    storage.listing_fails = False
+    assert claims.fetch(reference) == document
+
+    # Another job checks the same content in while the object is being deleted: it is written back
+    claims.hold(reference, "job-1")
+    storage.before_delete = lambda: claims.check_in(document, holder="job-2")
+    assert claims.release(reference, "job-1") is False
+    assert claims.fetch(reference) == document
+    assert claims.release(reference, "job-2") is True
+
+
+def test_sweep_runs_on_the_beat_schedule():
+    entry = next(e for e in celery_app.conf.beat_schedule.values() if e["task"] == "sweep_claims")
+    assert entry["schedule"] > 0 and "sweep_claims" in celery_app.tasks
+
+
+def test_sweep_frees_claims_whose_holders_expired(claims):
+    stale = claims.check_in(os.urandom(1024), holder="dead-job")
+    live = claims.check_in(os.urandom(1024), holder="live-job")
+    claims.hold(live, "dead-job")
+
+    assert claims.sweep() == 0
+    assert claims.sweep(now=float("inf")) == 2
+    assert claims.storage.list_prefix(CLAIM_PREFIX) == []
+    with pytest.raises(KeyError):
+        claims.fetch(stale)
+
+
+def test_broker_messages_stay_under_1kb_for_large_documents(claims, monkeypatch, tmp_path):
+    monkeypatch.setattr(celery_app.conf, "task_always_eager", True)
+    monkeypatch.setattr(celery_app.conf, "task_eager_propagates", True)
+    monkeypatch.setattr(tasks, "claims", claims)
+    monkeypatch.setattr(tasks, "result_storage", ResultStorage(str(tmp_path / "results")))
+    monkeypatch.setattr(tasks.processor, "active_learning_file", str(tmp_path / "al.jsonl"))
+    monkeypatch.setattr(tasks.active_learning_service, "log_extraction", lambda **kwargs: None)
+
+    buf = io.BytesIO()
+    Image.frombytes("RGB", (1200, 1200), os.urandom(1200 * 1200 * 3)).save(buf, format="PNG")
+    document = buf.getvalue()
+    assert len(document) > 4 * 1024 * 1024
+
+    sizes = {}
+    send_stage = tasks._send_stage
+
+    def measured_send(stage, context, next_stages):
+        sizes[stage] = _message_size(f"app.core.tasks.{stage}_task", (context,), {"next_stages": next_stages})
+        send_stage(stage, context, next_stages)
+
+    monkeypatch.setattr(tasks, "_send_stage", measured_send)
+
+    job_id = str(uuid.uuid4())
+    api_reference = claims.check_in(document, holder=job_id)
+    sizes["process_document"] = _message_size("process_document", (), {
+        "job_id": job_id, "file_content": api_reference, "filename": "scan.png", "model_type": "fine_tuned",
+    })
+    first_stage = tasks.build_document_pipeline(job_id, api_reference, "scan.png")
+    sizes["preprocess"] = _message_size(first_stage.task, first_stage.args, first_stage.kwargs)
+    first_stage.apply().get()
+
+    assert set(sizes) == {"process_document", *tasks.DOCUMENT_STAGES}
+    assert max(sizes.values()) < 1024, sizes
+    # Every claim of the job is released once the pipeline completes
+    assert claims.storage.list_prefix(CLAIM_PREFIX) == []
@@ -0,0 +1,132 @@
+"""Tests for the content-addressed result store shared by the API and ETL paths."""
+import asyncio
+import copy
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config.settings import load_config
+from app.core.content_store import ANALYSIS, OCR, ContentStore, content_checksum
+from app.storage.local_storage import LocalStorage
+
+DOCUMENT = b"%PDF-1.4\n" + b"invoice INV-0042 total 118.00 " * 20
+OCR_OUTPUT = {"status": "success", "text": "INV-0042 Total 118.00", "regions": [], "confidence": 0.97}
+
+
+class StandInOCR:
+    def __init__(self):
+        self.calls = 0
+
+    async def parse_document(self, content):
+        self.calls += 1
+        return copy.deepcopy(OCR_OUTPUT)
+
+
+class PartialOCR:
+    async def parse_document(self, content):
+        return {"status": "partial", "text": ""}
+
+
+def _lookups(kind, outcome):
+    return REGISTRY.get_sample_value("finscribe_content_store_lookups_total", {"kind": kind, "outcome": outcome}) or 0
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalStorage(str(tmp_path / "storage"))
+
+
+def test_records_are_shared_through_storage(storage):
+    checksum = content_checksum(DOCUMENT)
+    misses, memory, stored = _lookups(ANALYSIS, "miss"), _lookups(ANALYSIS, "memory"), _lookups(ANALYSIS, "storage")
+
+    api = ContentStore(storage=storage)
+    assert api.get(checksum) is None
+    api.put(checksum, {"data": {"total": 118.0}})
+    assert api.get(checksum) == {"data": {"total": 118.0}}
+
+    # Another process with the same versions finds it in storage, then in memory
+    etl = ContentStore(storage=storage)
+    assert etl.get(checksum)["data"] == {"total": 118.0}
+    assert etl.get(checksum)["data"] == {"total": 118.0}
+    assert (_lookups(ANALYSIS, "miss") - misses, _lookups(ANALYSIS, "memory") - memory,
+            _lookups(ANALYSIS, "storage") - stored) == (1, 2, 1)
+
+
+def test_model_and_pipeline_upgrades_invalidate_keys(storage):
+    checksum = content_checksum(DOCUMENT)
+    config = load_config()
+    store = ContentStore(config, storage=storage)
+    store.put(checksum, {"data": {}}, ANALYSIS)
+    store.put(checksum, OCR_OUTPUT, OCR)
+
+    upgraded = copy.deepcopy(config)
+    upgraded["ernie_vl"]["model_name"] = "baidu/ERNIE-6"
+    after_vlm_upgrade = ContentStore(upgraded, storage=storage)
+    assert after_vlm_upgrade.get(checksum, ANALYSIS) is None
+    assert after_vlm_upgrade.get(checksum, OCR) == OCR_OUTPUT  # OCR model unchanged
+
+    upgraded["paddleocr_vl"]["model_name"] = "PaddlePaddle/PaddleOCR-VL-2"
+    assert ContentStore(upgraded, storage=storage).get(checksum, OCR) is None
+    assert ContentStore(config, storage=storage, pipeline_version="2").get(checksum, OCR) is None
+
+
+def test_etl_and_api_ocr_run_once_per_document(storage, tmp_path):
+    from app.core.document_processor import FinancialDocumentProcessor
+    from app.core.etl import ETLPipeline, StagedFile
+
+    store = ContentStore(storage=storage)
+    etl_ocr = StandInOCR()
+    pipeline = ETLPipeline({
+        "storage": {key: str(tmp_path / key) for key in ("staging_dir", "data_lake_dir", "metadata_dir")},
+        "enable_classification": False,
+        "enable_multi_target_load": False,
+    })
+    pipeline.content_store = store
+    staged = StagedFile(source_type="imap", filename="invoice.pdf", content=DOCUMENT)
+    result = asyncio.run(pipeline.execute(staged, etl_ocr))
+    assert result.raw_ocr_output == OCR_OUTPUT
+    asyncio.run(pipeline.execute(staged, etl_ocr))
+    assert etl_ocr.calls == 1
+
+    processor = FinancialDocumentProcessor(load_config())
+    processor.content_store = store
+    processor.ocr_service = StandInOCR()
+    assert asyncio.run(processor.run_ocr(DOCUMENT)) == OCR_OUTPUT
+    assert processor.ocr_service.calls == 0
+
+    # Partial OCR output is not stored
+    other = b"%PDF-1.4\n" + b"receipt " * 50
+    processor.ocr_service = PartialOCR()
+    asyncio.run(processor.run_ocr(other))
+    assert store.get(content_checksum(other), OCR) is None
+
+
+def test_analyze_answers_known_documents_without_queueing(storage, monkeypatch):
+    from app.api.v1 import endpoints
+    from app.db import Base, get_db
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    store = ContentStore(storage=storage)
+    store.put(content_checksum(DOCUMENT), {"data": {"total": 118.0}, "validation": {"is_valid": True},
+                                           "raw_ocr_output": OCR_OUTPUT})
+    monkeypatch.setattr(endpoints, "get_content_store", lambda: store)
+    monkeypatch.setattr(endpoints, "get_admission_controller",
+                        lambda: pytest.fail("a stored document must not be queued"))
+
+    app = FastAPI()
+    app.include_router(endpoints.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = lambda: Session()
+    client = TestClient(app)
+
+    response = client.post("/api/v1/analyze", files={"file": ("invoice.pdf", DOCUMENT, "application/pdf")})
+    assert response.status_code == 200 and response.json()["status"] == "completed"
+    job = client.get(f"/api/v1/jobs/{response.json()['job_id']}").json()
+    assert job["status"] == "completed" and job["progress"] == 100
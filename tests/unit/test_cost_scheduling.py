@@ -0,0 +1,102 @@
+"""Tests for cost estimation and shortest-expected-job-first admission."""
+import io
+import random
+import threading
+import time
+
+from PIL import Image
+from prometheus_client import REGISTRY
+
+from app.core.admission import AdmissionController
+from app.core.cost_estimator import CostEstimator, JobFeatures, job_features
+from app.core.fair_queue import FairQueue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_features_are_read_from_the_upload():
+    pdf = (b"%PDF-1.4\n1 0 obj <</Type /Pages /Kids [2 0 R 3 0 R 4 0 R] /Count 3>> endobj\n"
+           b"2 0 obj <</Type /Page>> endobj 3 0 obj <</Type/Page>> endobj 4 0 obj <</Type /Page>> endobj")
+    features = job_features(pdf, "March_Statement.pdf")
+    assert (features.pages, features.megapixels, features.doc_type) == (3, 0.0, "statement")
+
+    buf = io.BytesIO()
+    Image.new("RGB", (2000, 1500)).save(buf, format="PNG")
+    features = job_features(buf.getvalue(), "IMG_0042.png")
+    assert (features.pages, features.megapixels, features.doc_type) == (1, 3.0, "image")
+
+
+def test_estimator_calibrates_from_completed_jobs():
+    rng = random.Random(3)
+
+    def job():
+        doc_type = rng.choice(["receipt", "statement"])
+        pages = 1 if doc_type == "receipt" else rng.randint(5, 30)
+        features = JobFeatures(pages=pages, size_mb=0.1 * pages, doc_type=doc_type)
+        return features, (1 + 6 * pages) * (0.5 if doc_type == "receipt" else 1.5)
+
+    def mean_error(estimator, jobs):
+        return sum(abs(estimator.predict(f) - s) / s for f, s in jobs) / len(jobs)
+
+    held_out = [job() for _ in range(200)]
+    estimator = CostEstimator()
+    before = mean_error(estimator, held_out)
+    ratios_before = REGISTRY.get_sample_value("finscribe_cost_estimate_ratio_count") or 0
+    for _ in range(2000):
+        features, seconds = job()
+        estimator.observe(features, seconds, predicted=estimator.predict(features))
+    assert mean_error(estimator, held_out) < before / 2
+    assert REGISTRY.get_sample_value("finscribe_cost_estimate_ratio_count") - ratios_before == 2000
+    assert estimator.stats()["observed"] == 2000
+
+
+def test_shortest_first_with_aging():
+    clock = FakeClock()
+    queue = FairQueue({}, shortest_first=True, aging_rate=1.0, clock=clock)
+    queue.push("t", "long", cost=100)
+    clock.now = 10
+    queue.push("t", "short", cost=1)
+    assert queue.pop() == ("t", "short")
+    queue.done("t")
+
+    # The long job has waited longer than the cost difference: it goes next
+    clock.now = 200
+    queue.push("t", "later-short", cost=1)
+    assert queue.pop() == ("t", "long")
+
+
+def test_shortest_first_keeps_tenants_fair():
+    queue = FairQueue({}, shortest_first=True)
+    for n in range(50):
+        queue.push("bulk", f"bulk-{n}", cost=1)
+    queue.push("other", "statement", cost=20)
+    order = [queue.pop()[0] for _ in range(3)]
+    assert "other" in order
+
+
+def test_admission_runs_short_documents_first():
+    estimator = CostEstimator()
+    controller = AdmissionController(max_concurrent=1, max_queue=8, name="sjf-test",
+                                     queue=FairQueue({}, shortest_first=True), estimator=estimator)
+    release = threading.Event()
+    ran = []
+    try:
+        controller.reserve().submit(release.wait, 2)
+        while controller.running < 1:
+            time.sleep(0.001)
+        controller.reserve(features=JobFeatures(pages=80, doc_type="contract")).submit(ran.append, "contract")
+        controller.reserve(features=JobFeatures(pages=1, doc_type="receipt")).submit(ran.append, "receipt")
+        release.set()
+        deadline = time.monotonic() + 2
+        while len(ran) < 2 and time.monotonic() < deadline:
+            time.sleep(0.005)
+    finally:
+        controller.shutdown(timeout=2)
+    assert ran == ["receipt", "contract"]
+    assert estimator.stats()["observed"] == 2
@@ -0,0 +1,156 @@
+"""Tests for job deadlines carried through the processing pipeline."""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.config.settings import load_config
+from app.core import deadline as deadlines
+from app.core.deadline import (
+    STAGE_DEFAULT_SECONDS, Deadline, DeadlineExceeded, backoff, call_timeout, deadline_scope, job_deadline, run_within
+)
+from app.core.models.paddleocr_vl_service import PaddleOCRVLClient
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class SlowOCRBackend:
+    """Local stand-in for the PaddleOCR-VL server that answers after ``delay`` seconds."""
+
+    def __init__(self, delay: float):
+        self.requests = 0
+        self.released = threading.Event()
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                backend.requests += 1
+                backend.released.wait(delay)
+                body = json.dumps({"choices": [{"message": {"content": '{"text": "late"}'}}]}).encode()
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    pass  # the client gave up
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.released.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class StandInOCR:
+    async def parse_document(self, content):
+        return {"status": "success", "text": "INV-0042 Total 118.00", "regions": [], "confidence": 0.97}
+
+
+class CountingVLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def enrich_financial_data(self, ocr_results, content):
+        self.calls += 1
+        return {"structured_data": {"financial_summary": {"grand_total": 118.0}}, "status": "success"}
+
+
+@pytest.fixture(autouse=True)
+def default_estimates(monkeypatch):
+    # Stage estimates are process-wide moving averages; start each test from the defaults
+    monkeypatch.setattr(deadlines, "_expected", dict(STAGE_DEFAULT_SECONDS))
+
+
+def _skips(stage):
+    return REGISTRY.get_sample_value("finscribe_deadline_skips_total", {"stage": stage}) or 0
+
+
+def _saved(stage):
+    return REGISTRY.get_sample_value("finscribe_deadline_saved_seconds_total", {"stage": stage}) or 0
+
+
+def test_calls_and_retries_fit_the_remaining_time():
+    clock = FakeClock()
+    with deadline_scope(Deadline(45, clock)):
+        assert call_timeout(30, "vlm_call") == 30
+        clock.now += 30
+        assert call_timeout(30, "vlm_call") == 15
+
+        # A 4 s backoff plus a typical 20 s VLM call would overrun: give up instead of sleeping
+        skips, saved = _skips("vlm_call_retry"), _saved("vlm_call_retry")
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(backoff(4, "vlm_call"))
+        assert (_skips("vlm_call_retry") - skips, _saved("vlm_call_retry") - saved) == (1, 24)
+
+        clock.now += 14.5
+        with pytest.raises(DeadlineExceeded):
+            call_timeout(30, "vlm_call")
+    assert call_timeout(30, "vlm_call") == 30  # no deadline outside the scope
+
+
+def test_job_deadline_comes_from_admission():
+    admitted = Deadline(900)
+    deadline = job_deadline({"tenant_id": "t", "deadline_at": admitted.expires_at}, cap_seconds=300)
+    assert 299 < deadline.remaining() <= 300
+    assert job_deadline({"deadline_at": admitted.expires_at}).expires_at == admitted.expires_at
+    assert job_deadline({"deadline_at": time.time() - 1}, cap_seconds=300).expired
+    assert 899 < job_deadline(None).remaining() <= 900
+
+
+def test_slow_backend_call_is_cut_at_the_deadline():
+    backend = SlowOCRBackend(delay=30)
+    client = PaddleOCRVLClient(backend.url, timeout=30, max_retries=3)
+    skips = _skips("ocr_call_retry")
+    started = time.monotonic()
+    try:
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(run_within(Deadline(1.5), client.analyze_image(b"\x89PNG page")))
+    finally:
+        backend.close()
+    assert time.monotonic() - started < 5
+    assert backend.requests == 1  # no retry that could not finish in time
+    assert _skips("ocr_call_retry") - skips == 1
+
+
+def test_processor_skips_enrichment_when_deadline_is_close():
+    from app.core.document_processor import FinancialDocumentProcessor
+
+    config = load_config()
+    config["active_learning"] = {"enabled": False}
+    processor = FinancialDocumentProcessor(config)
+    processor.content_store = None
+    processor.ocr_service = StandInOCR()
+    processor.vlm_service = CountingVLM()
+    skips, saved = _skips("vlm_enrichment"), _saved("vlm_enrichment")
+
+    # Enough time for OCR (10 s expected), not for VLM enrichment (20 s)
+    result = asyncio.run(run_within(Deadline(15), processor.process_document(b"%PDF-1.4 invoice", "invoice.pdf")))
+    assert result["success"] and processor.vlm_service.calls == 0
+    assert result["metadata"]["partial_results"]
+    assert (_skips("vlm_enrichment") - skips, _saved("vlm_enrichment") - saved) == (1, 20)
+
+    result = asyncio.run(run_within(Deadline(60), processor.process_document(b"%PDF-1.4 invoice", "invoice.pdf")))
+    assert processor.vlm_service.calls == 1 and not result["metadata"]["partial_results"]
+
+    # Too little time left to start OCR: the job fails without calling the backend
+    result = asyncio.run(run_within(Deadline(2), processor.process_document(b"%PDF-1.4 invoice", "invoice.pdf")))
+    assert not result["success"] and result["error_type"] == "DeadlineExceeded"
@@ -0,0 +1,94 @@
+"""Tests for the duplicate-invoice index."""
+import asyncio
+import json
+
+from app.core.etl.validator import DocumentValidator
+from app.core.validation.duplicate_index import (
+    DuplicateInvoiceIndex,
+    extract_invoice_fields,
+    normalize_invoice_number,
+)
+
+INVOICE = {"vendor": "ACME Corp.", "invoice_id": "INV-0042", "total": 1250.00, "date": "2024-03-01"}
+
+
+def test_normalize_invoice_number():
+    assert normalize_invoice_number("inv-0042") == normalize_invoice_number("INV 42") == "INV42"
+    assert normalize_invoice_number("2024/001") == "20241"
+    assert normalize_invoice_number(None) == ""
+
+
+def test_extract_fields_from_structured_output():
+    structured = {
+        "vendor_block": {"name": "ACME Corp."},
+        "client_info": {"invoice_number": "INV-0042", "invoice_date": "2024-03-01"},
+        "financial_summary": {"grand_total": 1250.0},
+    }
+    fields = extract_invoice_fields({"structured_output": structured})
+    assert fields == ("ACME Corp.", "INV-0042", 1250.0, "2024-03-01")
+
+
+def test_fuzzy_amount_and_date_tolerance():
+    index = DuplicateInvoiceIndex(amount_tolerance=0.01, date_tolerance_days=3)
+    assert index.add("doc-1", INVOICE)
+
+    exact = index.find_duplicates(dict(INVOICE, vendor="acme corp", invoice_id="INV 42"))
+    assert [(m.document_id, m.exact) for m in exact] == [("doc-1", True)]
+
+    near = index.find_duplicates(dict(INVOICE, total="$1,255.00", date="03/03/2024"))
+    assert [(m.document_id, m.exact) for m in near] == [("doc-1", False)]
+
+    assert index.find_duplicates(dict(INVOICE, total=1300.00)) == []
+    assert index.find_duplicates(dict(INVOICE, date="2024-03-10")) == []
+    assert index.find_duplicates(dict(INVOICE, invoice_id="INV-43")) == []
+    assert index.find_duplicates(INVOICE, exclude_id="doc-1") == []
+
+
+def test_check_and_add_and_remove():
+    index = DuplicateInvoiceIndex()
+    assert index.check_and_add("doc-1", INVOICE) == []
+    assert [m.document_id for m in index.check_and_add("doc-2", INVOICE)] == ["doc-1"]
+    index.remove("doc-1")
+    assert [m.document_id for m in index.find_duplicates(INVOICE)] == ["doc-2"]
+    assert index.check_and_add("doc-3", {"total": 10.0}) == []  # no vendor or number
+
+
+def test_persistence_and_rebuild(tmp_path):
+    path = str(tmp_path / "dupes.db")
+    index = DuplicateInvoiceIndex(path)
+    index.add("doc-1", INVOICE)
+    # A second processor on the same file sees the add at once and can write too
+    other = DuplicateInvoiceIndex(path)
+    assert [m.document_id for m in other.check_and_add("doc-2", INVOICE)] == ["doc-1"]
+    assert [m.document_id for m in index.find_duplicates(INVOICE, exclude_id="doc-1")] == ["doc-2"]
+    other.remove("doc-2")
+    other.close()
+    index.close()
+    assert len(DuplicateInvoiceIndex(path)) == 1
+
+    results = tmp_path / "results"
+    results.mkdir()
+    for i in range(5):
+        record = {"document_id": f"r{i}", "canonical_schema": dict(INVOICE, invoice_id=f"INV-{i}")}
+        (results / f"r{i}.json").write_text(json.dumps(record))
+    (results / "broken.json").write_text("{")
+
+    index = DuplicateInvoiceIndex(path)
+    assert index.rebuild_from_directory(str(results)) == 5
+    assert len(index) == 5
+    assert [m.document_id for m in index.find_duplicates(dict(INVOICE, invoice_id="INV-3"))] == ["r3"]
+
+
+def test_etl_validator_reports_duplicates(tmp_path):
+    validator = DocumentValidator({
+        "enable_duplicate_detection": True,
+        "duplicate_index_path": str(tmp_path / "dupes.db"),
+    })
+    record = dict(INVOICE, currency="USD", line_items=[])
+    first = asyncio.run(validator.validate({}, record))
+    assert first["validation_details"]["duplicates"]["duplicate_of"] == []
+
+    validator.index_document("doc-1", record)
+    second = asyncio.run(validator.validate({}, record))
+    assert second["validation_details"]["duplicates"]["duplicate_of"] == ["doc-1"]
+    assert "Possible duplicate of document doc-1 (same amount and date)" in second["warnings"]
@@ -0,0 +1,214 @@
+"""Tests for the job event bus and the push-based progress streams."""
+import asyncio
+import json
+import queue
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.schemas import JobStage
+from app.core.job_events import JobEventBus
+from app.core.job_manager import JobManager
+from app.core.job_store import InMemoryJobStore
+
+
+class StandInRedis:
+    """In-process stand-in for Redis pub/sub shared by several buses."""
+
+    def __init__(self):
+        self.listeners = []
+
+    def publish(self, channel, data):
+        for listener in self.listeners:
+            listener.put({"type": "pmessage", "channel": channel, "data": data})
+
+    def disconnect(self):
+        """Drop every subscriber connection, as a Redis restart would."""
+        listeners, self.listeners = self.listeners, []
+        for listener in listeners:
+            listener.put(ConnectionError("Connection closed by server."))
+
+    def pubsub(self, ignore_subscribe_messages=True):
+        broker = self
+
+        class PubSub:
+            def psubscribe(self, pattern):
+                self.messages = queue.Queue()
+                broker.listeners.append(self.messages)
+
+            def listen(self):
+                while True:
+                    message = self.messages.get()
+                    if isinstance(message, Exception):
+                        raise message
+                    yield message
+
+            def close(self):
+                pass
+
+        return PubSub()
+
+
+def _drive(manager, job_id, delay=0.02):
+    """Walk a job through the pipeline from another thread, like a worker would."""
+    def run():
+        for stage in (JobStage.STAGING, JobStage.PREPROCESS, JobStage.OCR_LAYOUT, JobStage.OCR_RECOGNIZE,
+                      JobStage.SEMANTIC_PARSE, JobStage.POSTPROCESS, JobStage.VALIDATE, JobStage.STORE):
+            time.sleep(delay)
+            manager.transition_stage(job_id, stage)
+        manager.mark_completed(job_id, "result-1")
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_events_published_from_other_threads_arrive_in_milliseconds():
+    bus = JobEventBus()
+    manager = JobManager(store=InMemoryJobStore(), events=bus)
+    job_id = manager.create_job()
+
+    async def watch():
+        async with bus.subscribe(job_id) as subscription:
+            assert await subscription.get(timeout=0.05) is None  # idle: nothing arrives, nothing polls
+            published = time.perf_counter()
+            threading.Thread(target=manager.transition_stage, args=(job_id, JobStage.STAGING)).start()
+            event = await subscription.get(timeout=1)
+            return event, time.perf_counter() - published
+
+    event, latency = asyncio.run(watch())
+    assert event["step"] == "staging" and event["progress"] == JobManager.STAGE_PROGRESS[JobStage.STAGING]
+    assert latency < 0.1
+    assert bus.subscriber_count() == 0
+
+
+def test_slow_subscriber_keeps_newest_events():
+    bus = JobEventBus()
+
+    async def watch():
+        async with bus.subscribe("job") as subscription:
+            for n in range(200):
+                bus.publish("job", {"n": n})
+            received = []
+            while (event := await subscription.get(timeout=0.01)) is not None:
+                received.append(event["n"])
+            return received
+
+    received = asyncio.run(watch())
+    assert received[-1] == 199 and len(received) < 200
+
+
+def test_redis_fans_events_out_to_other_replicas():
+    redis = StandInRedis()
+    publisher, receiver = JobEventBus(), JobEventBus()
+    publisher.enable_redis(redis)
+    receiver.enable_redis(redis)
+
+    async def watch():
+        async with receiver.subscribe("job-1") as remote, publisher.subscribe("job-1") as local:
+            publisher.publish("job-1", {"progress": 50})
+            return await remote.get(timeout=1), await local.get(timeout=1), await local.get(timeout=0.1)
+
+    remote_event, local_event, duplicate = asyncio.run(watch())
+    assert remote_event == local_event == {"progress": 50}
+    assert duplicate is None  # a replica ignores its own events coming back from Redis
+
+
+def test_listener_resubscribes_after_redis_disconnect(monkeypatch):
+    from app.core import job_events
+
+    monkeypatch.setattr(job_events, "RECONNECT_MIN_SECONDS", 0.01)
+    redis = StandInRedis()
+    publisher, receiver = JobEventBus(), JobEventBus()
+    publisher.enable_redis(redis)
+    receiver.enable_redis(redis)
+    redis.disconnect()
+    deadline = time.monotonic() + 2
+    while len(redis.listeners) < 2:
+        assert time.monotonic() < deadline, "listeners did not re-subscribe"
+        time.sleep(0.01)
+
+    async def watch():
+        async with receiver.subscribe("job-1") as remote:
+            publisher.publish("job-1", {"progress": 75})
+            return await remote.get(timeout=1)
+
+    assert asyncio.run(watch()) == {"progress": 75}
+    assert receiver._listener.is_alive()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from app.api.v1 import endpoints_enhanced
+
+    manager = JobManager(store=InMemoryJobStore(), events=JobEventBus())
+    monkeypatch.setattr(endpoints_enhanced, "job_manager", manager)
+    if endpoints_enhanced.SSE_AVAILABLE:
+        from sse_starlette.sse import AppStatus
+
+        # sse-starlette keeps its shutdown event globally, bound to the first test client's loop
+        monkeypatch.setattr(AppStatus, "should_exit_event", None)
+    app = FastAPI()
+    app.include_router(endpoints_enhanced.router, prefix="/api/v1")
+    return TestClient(app), manager
+
+
+def test_sse_stream_pushes_each_stage_then_completes(client):
+    client, manager = client
+    job_id = manager.create_job()
+    worker = _drive(manager, job_id)
+
+    events = []
+    with client.stream("GET", f"/api/v1/stream/jobs/{job_id}") as response:
+        event_name = None
+        for line in response.iter_lines():
+            if line.startswith("event:"):
+                event_name = line.split(":", 1)[1].strip()
+            elif line.startswith("data:"):
+                events.append((event_name, json.loads(line.split(":", 1)[1])))
+                if event_name in ("complete", "error"):
+                    break
+    worker.join()
+
+    progress = [data["progress"] for name, data in events if name == "progress"]
+    assert progress == sorted(progress) and progress[-1] == 100
+    assert len(progress) >= 5
+    assert events[-1][0] == "complete" and events[-1][1]["result_id"] == "result-1"
+
+
+def test_websocket_pushes_progress_and_unknown_job_errors(client):
+    client, manager = client
+    job_id = manager.create_job()
+
+    with client.websocket_connect(f"/api/v1/ws/jobs/{job_id}") as websocket:
+        assert websocket.receive_json()["progress"] == 0
+        worker = _drive(manager, job_id, delay=0.01)
+        messages = []
+        while "event" not in (message := websocket.receive_json()):
+            messages.append(message)
+        worker.join()
+    assert message["event"] == "complete" and message["data"]["status"] == "completed"
+    assert messages[-1]["progress"] == 100
+
+    with client.websocket_connect("/api/v1/ws/jobs/missing") as websocket:
+        assert websocket.receive_json() == {"error": "Job not found"}
+
+
+def test_streams_close_when_the_job_is_cancelled(client):
+    client, manager = client
+    job_id = manager.create_job()
+    manager.transition_stage(job_id, JobStage.STAGING)
+    threading.Timer(0.1, manager.mark_cancelled, args=(job_id,)).start()
+
+    with client.websocket_connect(f"/api/v1/ws/jobs/{job_id}") as websocket:
+        while "event" not in (message := websocket.receive_json()):
+            pass
+    assert message["event"] == "cancelled" and message["data"]["status"] == "cancelled"
+
+    # Already cancelled: the SSE stream sends the last progress and closes at once
+    with client.stream("GET", f"/api/v1/stream/jobs/{job_id}") as response:
+        names = [line.split(":", 1)[1].strip() for line in response.iter_lines() if line.startswith("event:")]
+    assert names == ["progress", "cancelled"]
@@ -0,0 +1,118 @@
+"""Tests for conditional GET and long polling on job status endpoints."""
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.conditional import etag_matches, job_etag
+from app.api.v1.schemas import JobStage
+from app.core.job_events import JobEventBus
+from app.core.job_manager import JobManager
+from app.core.job_service import JobService
+from app.core.job_store import InMemoryJobStore
+
+
+def _later(delay, fn, *args, **kwargs):
+    timer = threading.Timer(delay, fn, args=args, kwargs=kwargs)
+    timer.start()
+    return timer
+
+
+def test_etag_matching():
+    etag = job_etag("job", "processing", 40)
+    assert etag.startswith('W/"') and etag == job_etag("job", "processing", 40)
+    assert etag != job_etag("job", "processing", 45)
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", {etag[2:]}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag) and not etag_matches('"other"', etag)
+
+
+@pytest.fixture
+def db_client():
+    from app.api.v1 import endpoints
+    from app.db import Base, get_db
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    app = FastAPI()
+    app.include_router(endpoints.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = lambda: Session()
+    job = JobService(Session()).create_job(filename="a.pdf", file_content=b"data", file_size=4, checksum="c")
+    return TestClient(app), Session, job.id
+
+
+def test_unchanged_job_returns_304_with_etag(db_client):
+    client, Session, job_id = db_client
+    first = client.get(f"/api/v1/jobs/{job_id}")
+    assert first.status_code == 200 and first.json()["status"] == "queued"
+    etag = first.headers["ETag"]
+
+    again = client.get(f"/api/v1/jobs/{job_id}", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["ETag"] == etag and again.content == b""
+
+    JobService(Session()).update_job_status(job_id, status="processing", progress=40, stage="parse")
+    changed = client.get(f"/api/v1/jobs/{job_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json()["progress"] == 40
+    assert changed.headers["ETag"] != etag
+
+
+def test_wait_holds_until_job_changes(db_client):
+    client, Session, job_id = db_client
+    etag = client.get(f"/api/v1/jobs/{job_id}").headers["ETag"]
+
+    _later(0.2, JobService(Session()).update_job_status, job_id, status="processing", progress=15, stage="ocr")
+    started = time.monotonic()
+    response = client.get(f"/api/v1/jobs/{job_id}", params={"wait": 10}, headers={"If-None-Match": etag})
+    elapsed = time.monotonic() - started
+
+    assert response.status_code == 200 and response.json()["progress"] == 15
+    assert 0.15 <= elapsed < 2
+
+
+def test_wait_sees_terminal_status_written_by_another_session(db_client):
+    client, Session, job_id = db_client
+    JobService(Session()).update_job_status(job_id, status="processing", progress=40, stage="parse")
+    etag = client.get(f"/api/v1/jobs/{job_id}").headers["ETag"]
+
+    _later(0.3, JobService(Session()).update_job_status, job_id, status="completed", progress=100)
+    started = time.monotonic()
+    response = client.get(f"/api/v1/jobs/{job_id}", params={"wait": 4}, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200 and response.json()["status"] == "completed"
+    assert time.monotonic() - started < 2
+
+
+def test_wait_times_out_with_304(db_client):
+    client, _, job_id = db_client
+    etag = client.get(f"/api/v1/jobs/{job_id}").headers["ETag"]
+
+    started = time.monotonic()
+    response = client.get(f"/api/v1/jobs/{job_id}", params={"wait": 0.3}, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert 0.3 <= time.monotonic() - started < 2
+
+
+def test_job_manager_status_endpoint_long_polls(monkeypatch):
+    from app.api.v1 import async_endpoints
+
+    manager = JobManager(store=InMemoryJobStore(), events=JobEventBus())
+    monkeypatch.setattr(async_endpoints, "job_manager", manager)
+    app = FastAPI()
+    app.include_router(async_endpoints.router, prefix="/api/v1")
+    client = TestClient(app)
+    job_id = manager.create_job()
+    manager.transition_stage(job_id, JobStage.STAGING)
+
+    etag = client.get(f"/api/v1/jobs/{job_id}").headers["ETag"]
+    assert client.get(f"/api/v1/jobs/{job_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    _later(0.1, manager.transition_stage, job_id, JobStage.PREPROCESS)
+    response = client.get(f"/api/v1/jobs/{job_id}", params={"wait": 10}, headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json()["stage"] == "preprocess"
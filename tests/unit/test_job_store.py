@@ -0,0 +1,206 @@
+"""Tests for the pluggable JobManager stores."""
+import fnmatch
+
+import pytest
+from redis import WatchError
+
+from app.api.v1.schemas import JobStage, JobStatus
+from app.core import job_manager as job_manager_module
+from app.core.job_manager import JobManager
+from app.core.job_store import InMemoryJobStore, JobConflict, RedisJobStore
+
+
+class StandInRedis:
+    """Just the Redis commands RedisJobStore uses, with TTLs recorded."""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    def delete(self, key):
+        self.ttls.pop(key, None)
+        return 1 if self.values.pop(key, None) is not None else 0
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def scan_iter(self, match):
+        return [key for key in self.values if fnmatch.fnmatch(key, match)]
+
+    def pipeline(self):
+        return StandInPipeline(self)
+
+
+class StandInPipeline:
+    """WATCH/MULTI/EXEC: the queued writes fail with WatchError if a watched key changed."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.watched = {}
+        self.queued = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def watch(self, key):
+        self.watched[key] = self.redis.values.get(key)
+
+    def get(self, key):
+        return self.redis.values.get(key)
+
+    def multi(self):
+        pass
+
+    def set(self, key, value, ex=None):
+        self.queued.append((key, value, ex))
+
+    def execute(self):
+        if any(self.redis.values.get(key) != value for key, value in self.watched.items()):
+            raise WatchError()
+        for key, value, ex in self.queued:
+            self.redis.set(key, value, ex=ex)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(params=["memory", "redis"])
+def manager(request):
+    if request.param == "memory":
+        return JobManager(store=InMemoryJobStore(max_jobs=100, ttl_seconds=60))
+    return JobManager(store=RedisJobStore(StandInRedis(), ttl_seconds=60))
+
+
+def test_state_machine_and_stage_progress_on_each_store(manager):
+    job_id = manager.create_job(metadata={"filename": "a.pdf"})
+    assert job_id in manager.jobs
+
+    progress = []
+    for stage in (JobStage.STAGING, JobStage.PREPROCESS, JobStage.OCR_LAYOUT):
+        assert manager.transition_stage(job_id, stage)
+        progress.append(manager.get_job(job_id).progress)
+    assert progress == [JobManager.STAGE_PROGRESS[stage] for stage in
+                        (JobStage.STAGING, JobStage.PREPROCESS, JobStage.OCR_LAYOUT)]
+    assert not manager.transition_stage(job_id, JobStage.VALIDATE)
+
+    manager.update_stage_progress(job_id, 50, "halfway")
+    assert manager.get_job(job_id).progress == 25
+    manager.increment_retry(job_id)
+    assert manager.get_job(job_id).stages[JobStage.OCR_LAYOUT].retry_count == 1
+
+    for stage in (JobStage.OCR_RECOGNIZE, JobStage.SEMANTIC_PARSE, JobStage.POSTPROCESS,
+                  JobStage.VALIDATE, JobStage.STORE):
+        manager.transition_stage(job_id, stage)
+    manager.mark_completed(job_id, "result-1")
+
+    progress = manager.get_job_progress(job_id)
+    assert progress.status == JobStatus.COMPLETED and progress.progress == 100
+    assert progress.result_id == "result-1"
+    assert manager.get_job(job_id).metadata == {"filename": "a.pdf"}
+    assert any("halfway" in entry for entry in progress.logs)
+
+
+def test_failed_job_keeps_error(manager):
+    job_id = manager.create_job()
+    manager.mark_failed(job_id, "invalid_input", "empty", retriable=False)
+    job = manager.get_job(job_id)
+    assert job.status == JobStatus.FAILED and job.error["code"] == "invalid_input"
+    assert not manager.should_retry(job_id)
+
+
+def test_logs_are_a_capped_ring(manager):
+    job_id = manager.create_job()
+    for n in range(job_manager_module.JOB_LOG_LIMIT + 50):
+        manager.add_log(job_id, f"entry {n}")
+    logs = manager.get_job_progress(job_id).logs
+    assert len(logs) == job_manager_module.JOB_LOG_LIMIT
+    assert logs[-1].endswith(f"entry {job_manager_module.JOB_LOG_LIMIT + 49}")
+
+
+def test_redis_store_sets_ttl_on_every_save():
+    redis = StandInRedis()
+    manager = JobManager(store=RedisJobStore(redis, ttl_seconds=3600))
+    job_id = manager.create_job()
+    manager.transition_stage(job_id, JobStage.STAGING)
+    assert redis.ttls == {f"finscribe:job:{job_id}": 3600}
+    assert len(manager.jobs) == 1
+
+
+def test_redis_store_reapplies_updates_that_raced_another_replica():
+    redis = StandInRedis()
+    store = RedisJobStore(redis, ttl_seconds=3600)
+    api, worker = JobManager(store=store), JobManager(store=RedisJobStore(redis, ttl_seconds=3600))
+    job_id = api.create_job()
+
+    # The worker saves between the API replica's read and its save
+    real_get = store.get
+    raced = []
+
+    def get_then_race(key):
+        job = real_get(key)
+        if not raced:
+            raced.append(True)
+            worker.transition_stage(job_id, JobStage.STAGING, artifact_path="staged.pdf")
+        return job
+
+    store.get = get_then_race
+    api.add_log(job_id, "client polled")
+
+    job = worker.get_job(job_id)
+    assert job.current_stage == JobStage.STAGING and job.artifacts == {"staging": "staged.pdf"}
+    assert any("client polled" in entry for entry in job.logs)
+
+    stale = worker.get_job(job_id)
+    api.add_log(job_id, "newer")
+    with pytest.raises(JobConflict):
+        store.save(stale)
+
+
+def test_memory_store_evicts_least_recently_used_and_expires():
+    clock = FakeClock()
+    store = InMemoryJobStore(max_jobs=3, ttl_seconds=10, clock=clock)
+    manager = JobManager(store=store)
+    first, second, third = (manager.create_job() for _ in range(3))
+
+    manager.get_job(first)  # first is now more recently used than second
+    fourth = manager.create_job()
+    assert second not in manager.jobs
+    assert all(job_id in manager.jobs for job_id in (first, third, fourth))
+
+    clock.now += 5
+    manager.add_log(fourth, "still alive")  # updating a job restarts its TTL
+    clock.now += 6
+    assert first not in manager.jobs and third not in manager.jobs
+    assert fourth in manager.jobs
+    assert manager.get_job(first) is None
+
+
+def test_memory_stays_bounded_over_simulated_day():
+    clock = FakeClock()
+    store = InMemoryJobStore(max_jobs=10_000, ttl_seconds=3600, clock=clock)
+    manager = JobManager(store=store)
+    peak = 0
+    # One fake job every 10 seconds for 24 hours with a one-hour TTL
+    for _ in range(24 * 360):
+        job_id = manager.create_job()
+        manager.transition_stage(job_id, JobStage.STAGING)
+        for n in range(5):
+            manager.add_log(job_id, f"tick {n}")
+        clock.now += 10
+        peak = max(peak, len(store))
+    assert peak <= 361
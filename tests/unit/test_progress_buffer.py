@@ -0,0 +1,111 @@
+"""Tests for write-behind job progress updates."""
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.job_service import JobService
+from app.core.progress_buffer import ProgressBuffer
+from app.db import Base
+from app.db.models import Job
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # File-backed so the flusher thread and the test share one database
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def _count_updates(engine):
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("UPDATE JOBS"):
+            statements.append(statement)
+
+    return statements
+
+
+def _stored(engine, job_id):
+    session = sessionmaker(bind=engine)()
+    try:
+        return session.get(Job, job_id)
+    finally:
+        session.close()
+
+
+def _new_job(service):
+    return service.create_job(filename="a.pdf", file_content=b"data", file_size=4, checksum="c").id
+
+
+def test_progress_ticks_coalesce_into_one_write(engine):
+    buffer = ProgressBuffer(window_seconds=60, name="test")
+    service = JobService(sessionmaker(bind=engine)(), progress_buffer=buffer)
+    job_id = _new_job(service)
+    updates = _count_updates(engine)
+
+    for progress in range(1, 31):
+        job = service.update_job_status(job_id, status="processing", progress=progress, stage="ocr")
+    assert job.progress == "30"
+    assert updates == []
+    assert _stored(engine, job_id).progress == "0"
+
+    assert buffer.flush() == 1
+    assert len(updates) == 1
+    stored = _stored(engine, job_id)
+    assert (stored.status, stored.progress, stored.stage) == ("processing", "30", "ocr")
+    assert buffer.stats()["coalescing_ratio"] == 30
+
+
+def test_terminal_state_is_written_at_once_and_never_overwritten(engine):
+    buffer = ProgressBuffer(window_seconds=60, name="test")
+    service = JobService(sessionmaker(bind=engine)(), progress_buffer=buffer)
+    job_id = _new_job(service)
+    writes_before = REGISTRY.get_sample_value("finscribe_progress_writes_total", {"buffer": "test"}) or 0
+
+    service.update_job_status(job_id, status="processing", progress=90, stage="postprocess")
+    service.update_job_status(job_id, status="failed", error="boom")
+    stored = _stored(engine, job_id)
+    assert (stored.status, stored.progress, stored.stage, stored.error) == ("failed", "90", "postprocess", "boom")
+    assert not buffer.has_pending(job_id)
+    assert REGISTRY.get_sample_value("finscribe_progress_writes_total", {"buffer": "test"}) == writes_before + 1
+
+    # A late tick for the finished job is dropped at flush time
+    buffer.add(engine, job_id, {"status": "processing", "progress": "95"})
+    buffer.flush()
+    assert _stored(engine, job_id).status == "failed"
+
+
+def test_reads_see_buffered_progress(engine):
+    buffer = ProgressBuffer(window_seconds=60, name="test")
+    worker = JobService(sessionmaker(bind=engine)(), progress_buffer=buffer)
+    job_id = _new_job(worker)
+    worker.update_job_status(job_id, status="processing", progress=40, stage="parse")
+
+    reader = JobService(sessionmaker(bind=engine)(), progress_buffer=buffer)
+    assert reader.get_job(job_id).progress == "40"
+
+
+def test_flusher_writes_behind_after_window(engine):
+    buffer = ProgressBuffer(window_seconds=0.05, name="test")
+    service = JobService(sessionmaker(bind=engine)(), progress_buffer=buffer)
+    job_ids = [_new_job(service) for _ in range(3)]
+    latency_before = REGISTRY.get_sample_value("finscribe_progress_flush_latency_seconds_count",
+                                               {"buffer": "test"}) or 0
+
+    for job_id in job_ids:
+        service.update_job_status(job_id, status="processing", progress=15, stage="ocr")
+
+    deadline = time.monotonic() + 2
+    while any(_stored(engine, job_id).progress != "15" for job_id in job_ids):
+        assert time.monotonic() < deadline, "flusher did not write pending progress"
+        time.sleep(0.01)
+    assert REGISTRY.get_sample_value("finscribe_progress_flush_latency_seconds_count",
+                                     {"buffer": "test"}) == latency_before + 3
+    buffer.shutdown()
@@ -0,0 +1,104 @@
+"""Tests for the bounded result registry and the endpoints that use it."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.result_registry import ResultRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _record(n):
+    return {"result_id": f"result-{n}", "job_id": f"job-{n}", "data": {"n": n}}
+
+
+def _lookups(outcome):
+    return REGISTRY.get_sample_value("finscribe_result_lookups_total", {"outcome": outcome}) or 0
+
+
+def test_lookup_by_result_and_job_with_lru_eviction():
+    registry = ResultRegistry(max_entries=3)
+    for n in range(3):
+        registry.put(_record(n))
+    assert registry.get("result-0")["data"] == {"n": 0}  # now most recently used
+
+    registry.put(_record(3))
+    assert len(registry) == 3
+    assert registry.get("result-1") is None and registry.get_by_job("job-1") is None
+    assert registry.get_by_job("job-0")["result_id"] == "result-0"
+    assert registry.get_by_job("job-3")["result_id"] == "result-3"
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    registry = ResultRegistry(ttl_seconds=60, clock=clock)
+    registry.put(_record(1))
+    clock.now = 59
+    assert registry.get("result-1") is not None
+    clock.now = 61
+    assert registry.get("result-1") is None and registry.get_by_job("job-1") is None
+    assert len(registry) == 0
+
+
+def test_misses_fall_back_to_loader_and_cache_the_answer():
+    registry = ResultRegistry()
+    calls = []
+
+    def load(key):
+        calls.append(key)
+        return _record(7) if key in ("result-7", "job-7") else None
+
+    hits, loaded, missed = _lookups("hit"), _lookups("loaded"), _lookups("miss")
+    assert registry.get("result-7", loader=load)["job_id"] == "job-7"
+    assert registry.get("result-7", loader=load) is not None
+    assert registry.get_by_job("job-7", loader=load)["result_id"] == "result-7"
+    assert registry.get("result-8", loader=load) is None
+    assert registry.get("result-8", loader=load) is None  # misses are not cached
+
+    assert calls == ["result-7", "result-8", "result-8"]
+    assert (_lookups("hit") - hits, _lookups("loaded") - loaded, _lookups("miss") - missed) == (2, 1, 2)
+
+
+@pytest.fixture
+def client_and_service():
+    from app.api.v1 import endpoints
+    from app.core.job_service import JobService
+    from app.db import Base, get_db
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    app = FastAPI()
+    app.include_router(endpoints.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = lambda: Session()
+    return TestClient(app), JobService(Session(), result_registry=ResultRegistry())
+
+
+def test_download_result_served_from_registry_or_database(client_and_service, monkeypatch):
+    from app.core import job_service
+
+    client, service = client_and_service
+    job = service.create_job(filename="a.pdf", file_content=b"data", file_size=4, checksum="c")
+    result = service.create_result(job.id, data={"total": 42, "markdown_output": "# Invoice"})
+    assert service.get_result_record_by_job_id(job.id)["result_id"] == result.id
+
+    # The endpoint's JobService starts from an empty registry: the result is loaded from the database
+    monkeypatch.setattr(job_service, "get_result_registry", lambda: ResultRegistry())
+    response = client.get(f"/api/v1/results/{result.id}/download")
+    assert response.status_code == 200 and response.json()["total"] == 42
+    markdown = client.get(f"/api/v1/results/{result.id}/download", params={"format": "markdown"})
+    assert markdown.text == "# Invoice"
+
+    missing = "00000000-0000-0000-0000-000000000000"
+    assert client.get(f"/api/v1/results/{missing}/download").status_code == 404
+    assert client.post(f"/api/v1/results/{missing}/corrections", json={"total": 1}).status_code == 404
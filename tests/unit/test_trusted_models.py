@@ -0,0 +1,102 @@
+"""Tests for the trusted (validate-once) construction path of pydantic schemas."""
+from datetime import datetime
+
+import pytest
+from pydantic import ValidationError
+
+from app.api.v1.schemas import ResultResponse
+from app.core.result_storage import ResultStorage
+from app.core.schemas import ExtractedDocument, ExtractionResult, LineItem
+
+
+def _document(n_items=3):
+    return {
+        "document_type": "invoice",
+        "vendor": {"name": "Acme", "confidence": 0.9},
+        "client": {"invoice_number": "INV-1", "invoice_date": "2024-03-15"},
+        "line_items": [
+            {"description": f"Item {i}", "quantity": 2.0, "unit_price": 5.0, "line_total": 10.0,
+             "confidence": 0.95, "bbox": [0, i, 10, i + 1]}
+            for i in range(n_items)
+        ],
+        "financial_summary": {"subtotal": 10.0 * n_items, "grand_total": 10.0 * n_items},
+    }
+
+
+def test_validation_sets_marker():
+    assert ExtractedDocument.model_validate(_document()).is_validated
+    assert ExtractedDocument(**_document()).is_validated
+    result = ExtractionResult.model_validate_json(
+        ExtractionResult(document_id="d", status="completed", extracted_document=_document()).model_dump_json()
+    )
+    assert result.is_validated and result.extracted_document.is_validated
+
+
+def test_trusted_matches_validated():
+    validated = ExtractedDocument.model_validate(_document(10))
+    trusted = ExtractedDocument.trusted(validated.model_dump())
+
+    assert trusted.is_validated
+    assert isinstance(trusted.line_items[0], LineItem)
+    assert trusted.model_fields_set == ExtractedDocument.model_validate(validated.model_dump()).model_fields_set
+    assert trusted.vendor.name == "Acme"
+    assert trusted == validated
+    assert trusted.model_dump_json() == validated.model_dump_json()
+
+
+def test_trusted_fills_defaults_and_keeps_instances():
+    item = LineItem(description="x", quantity=1, unit_price=1, line_total=1, confidence=1)
+    data = _document(0)
+    data["line_items"] = [item]
+    document = ExtractedDocument.trusted(data)
+    assert document.line_items[0] is item
+    assert document.schema_version == "v1"
+
+
+def test_ensure_skips_marked_instances_only():
+    document = ExtractedDocument.model_validate(_document())
+    assert ExtractedDocument.ensure(document) is document
+
+    document.document_type = "receipt"
+    assert not document.is_validated
+    revalidated = ExtractedDocument.ensure(document)
+    assert revalidated is not document and revalidated.is_validated
+
+    with pytest.raises(ValidationError):
+        ExtractedDocument.ensure(dict(_document(), financial_summary={"subtotal": -1, "grand_total": 1}))
+
+
+def test_result_storage_round_trip(tmp_path):
+    storage = ResultStorage(str(tmp_path))
+    result_id = storage.store_result(
+        "job-1",
+        {"structured_output": {"financial_summary": {"subtotal": 10, "total": 11}, "line_items": [{}]},
+         "validation": {"is_valid": True, "math_ok": True, "dates_ok": True}},
+        {"source_type": "multipart", "filename": "a.pdf", "checksum": "abc", "ingest_time": datetime(2024, 1, 1)},
+    )
+    result = storage.get_result(result_id)
+    assert isinstance(result, ResultResponse)
+    assert result.is_validated
+    assert result.provenance.ingest_time == datetime(2024, 1, 1)
+    assert result.financial_summary.line_items_count == 1
+    assert ResultResponse.ensure(result) is result
+
+
+def test_results_endpoint_sends_the_stored_result_as_is(tmp_path, monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.api.v1 import endpoints_enhanced
+
+    storage = ResultStorage(str(tmp_path))
+    result_id = storage.store_result(
+        "job-1", {"structured_output": {"financial_summary": {"subtotal": 10, "total": 11}}},
+        {"source_type": "multipart", "filename": "a.pdf", "checksum": "abc", "ingest_time": datetime(2024, 1, 1)},
+    )
+    monkeypatch.setattr(endpoints_enhanced, "result_storage", storage)
+    app = FastAPI()
+    app.include_router(endpoints_enhanced.router, prefix="/api/v1")
+
+    response = TestClient(app).get(f"/api/v1/results/{result_id}")
+    assert response.status_code == 200
+    assert response.content == storage.get_result(result_id).model_dump_json().encode()
@@ -0,0 +1,99 @@
+"""Tests for streaming per-vendor statistics."""
+import asyncio
+import random
+
+import numpy as np
+
+from app.core.etl.validator import DocumentValidator
+from app.core.etl.vendor_stats import (
+    RunningStats,
+    VendorStatisticalValidator,
+    VendorStatsStore,
+)
+from finscribe.vendors import normalize_vendor
+
+
+def test_running_stats_match_numpy():
+    rng = random.Random(1)
+    values = [rng.uniform(10, 5000) for _ in range(1000)]
+    stats = RunningStats()
+    for value in values:
+        stats.update(value)
+    assert stats.count == 1000
+    assert np.isclose(stats.mean, np.mean(values))
+    assert np.isclose(stats.variance, np.var(values, ddof=1))
+
+
+def test_normalize_vendor():
+    assert normalize_vendor("ACME Corp.") == normalize_vendor("  acme   corp ") == "acme corp"
+    assert normalize_vendor("") is None
+    assert normalize_vendor("...") is None
+
+
+def test_outlier_is_flagged_after_history():
+    validator = VendorStatisticalValidator(VendorStatsStore(), min_history=5)
+    rng = random.Random(2)
+    for _ in range(50):
+        subtotal = rng.uniform(90, 110)
+        result = validator.score({
+            "vendor": "ACME Corp", "subtotal": subtotal, "tax": subtotal * 0.08,
+            "total": subtotal * 1.08, "line_items": [{}, {}],
+        })
+        assert result["warnings"] == []
+
+    result = validator.score({"vendor": "acme corp.", "subtotal": 5000.0, "tax": 400.0, "total": 5400.0,
+                              "line_items": [{}, {}]})
+    assert result["vendor"] == "acme corp"
+    assert result["scores"]["total"] > 3
+    assert len(result["warnings"]) == 1 and "total" in result["warnings"][0]
+
+    # Other vendors have no history yet
+    assert validator.score({"vendor": "Other", "total": 5400.0})["scores"] == {}
+
+
+def test_updates_are_persisted_in_batches(tmp_path):
+    path = str(tmp_path / "vendor_stats.db")
+    store = VendorStatsStore(path, flush_every=3)
+    store.update("a", {"total": 10.0})
+    store.update("b", {"total": 20.0})
+    assert store.pending == 2
+    assert VendorStatsStore(path).get("a").stats["total"].count == 0
+
+    store.update("c", {"total": 30.0})
+    assert store.pending == 0
+    store.update("a", {"total": 30.0})
+    store.close()
+
+    reopened = VendorStatsStore(path)
+    stats = reopened.get("a").stats["total"]
+    assert (stats.count, stats.mean) == (2, 20.0)
+    assert reopened.get("c").stats["total"].count == 1
+
+    # Repeated updates of one vendor count towards the batch too
+    store = VendorStatsStore(path, flush_every=3)
+    for total in range(7):
+        store.update("a", {"total": float(total)})
+    assert store.pending == 1
+    assert VendorStatsStore(path).get("a").stats["total"].count == 8
+
+
+def test_document_validator_uses_vendor_history(tmp_path):
+    validator = DocumentValidator({
+        "enable_statistical_validation": True,
+        "vendor_stats_path": str(tmp_path / "stats.db"),
+        "statistical_min_history": 3,
+    })
+    record = {"vendor": "Paper Co", "total": 100.0, "subtotal": 100.0, "tax": 0.0,
+              "currency": "USD", "line_items": []}
+    for total in (98.0, 100.0, 102.0, 101.0):
+        asyncio.run(validator.validate({}, dict(record, total=total, subtotal=total)))
+
+    result = asyncio.run(validator.validate({}, dict(record, total=900.0, subtotal=900.0)))
+    assert result["is_valid"] is True
+    assert any("Unusual total" in warning for warning in result["warnings"])
+    assert result["validation_details"]["statistical"]["scores"]["total"] > 3
+
+    # Fewer updates than a batch: closing the validator writes them
+    validator.close()
+    vendor = result["validation_details"]["statistical"]["vendor"]
+    assert VendorStatsStore(str(tmp_path / "stats.db")).get(vendor).stats["total"].count == 5
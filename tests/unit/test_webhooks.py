@@ -0,0 +1,283 @@
+"""Tests for signed job webhooks and the retrying delivery queue."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.webhooks import (
+    DEAD_LETTER_PREFIX, SIGNATURE_HEADER, WebhookDelivery, WebhookDestinationError, WebhookDispatcher,
+    check_destination_url, sign_payload, verify_signature
+)
+from app.db.models import WebhookSubscription
+from app.storage.local_storage import LocalStorage
+
+
+class Receiver:
+    """Local HTTP endpoint standing in for an integrator's webhook handler."""
+
+    def __init__(self, fail_first=0, delay=0.0):
+        self.fail_first = fail_first
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                with receiver._lock:
+                    receiver.in_flight += 1
+                    receiver.peak = max(receiver.peak, receiver.in_flight)
+                    attempt = len(receiver.requests)
+                    receiver.requests.append((dict(self.headers), body))
+                time.sleep(receiver.delay)
+                with receiver._lock:
+                    receiver.in_flight -= 1
+                self.send_response(500 if attempt < receiver.fail_first else 204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/hook"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def receiver():
+    receivers = []
+
+    def make(**kwargs):
+        receivers.append(Receiver(**kwargs))
+        return receivers[-1]
+
+    yield make
+    for r in receivers:
+        r.close()
+
+
+@pytest.fixture
+def dispatcher(tmp_path):
+    # The receivers listen on loopback
+    dispatcher = WebhookDispatcher(max_concurrent=3, max_attempts=3, base_delay=0.01, max_delay=0.05,
+                                   timeout=5, storage=LocalStorage(str(tmp_path)), allow_private=True)
+    yield dispatcher
+    dispatcher.shutdown(timeout=1)
+
+
+def _delivery(url, event="job.completed"):
+    return WebhookDelivery(subscription_id="sub", url=url, secret="s3cret", event=event, payload={"job_id": "j"})
+
+
+def _count(event, outcome):
+    return REGISTRY.get_sample_value("finscribe_webhook_deliveries_total", {"event": event, "outcome": outcome}) or 0
+
+
+def test_signature_round_trip_and_rejections():
+    body = b'{"event": "job.completed"}'
+    header = sign_payload("s3cret", body, timestamp=1000)
+    assert verify_signature("s3cret", body, header, now=1010)
+    assert not verify_signature("other", body, header, now=1010)
+    assert not verify_signature("s3cret", body + b" ", header, now=1010)
+    assert not verify_signature("s3cret", body, header, now=5000)  # replayed too late
+    assert not verify_signature("s3cret", body, None) and not verify_signature("s3cret", body, "garbage")
+
+
+def test_completed_job_notifies_job_and_tenant_subscribers(receiver, dispatcher, monkeypatch):
+    from app.core import job_service as job_service_module
+    from app.core.job_service import JobService
+    from app.db import Base
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    monkeypatch.setattr(job_service_module, "get_webhook_dispatcher", lambda: dispatcher)
+    hook = receiver()
+
+    service = JobService(db)
+    job = service.create_job(filename="a.pdf", file_content=b"data", file_size=4, checksum="c",
+                             metadata={"tenant_id": "tenant-1"})
+    other = service.create_job(filename="b.pdf", file_content=b"data", file_size=4, checksum="c")
+    db.add_all([
+        WebhookSubscription(url=hook.url, secret="job-secret", job_id=job.id),
+        WebhookSubscription(url=hook.url, secret="tenant-secret", tenant_id="tenant-1", events=["job.completed"]),
+        WebhookSubscription(url=hook.url, secret="failures-only", tenant_id="tenant-1", events=["job.failed"]),
+    ])
+    db.commit()
+    delivered = _count("job.completed", "delivered")
+
+    result = service.create_result(job.id, data={"total": 1})
+    service.update_job_status(other.id, status="failed", error="boom")  # nobody subscribed
+    assert dispatcher.wait_idle(5)
+
+    assert len(hook.requests) == 2
+    secrets = set()
+    for headers, body in hook.requests:
+        payload = json.loads(body)
+        assert payload["event"] == "job.completed" and headers["X-FinScribe-Event"] == "job.completed"
+        assert payload["data"]["job_id"] == job.id and payload["data"]["result_id"] == result.id
+        secret = next(s for s in ("job-secret", "tenant-secret") if verify_signature(s, body, headers[SIGNATURE_HEADER]))
+        secrets.add(secret)
+    assert secrets == {"job-secret", "tenant-secret"}
+    assert _count("job.completed", "delivered") - delivered == 2
+
+
+def test_failed_attempts_back_off_then_deliver(receiver, dispatcher):
+    hook = receiver(fail_first=2)
+    retries = _count("job.failed", "retry")
+
+    delivery_id = dispatcher.enqueue(_delivery(hook.url, event="job.failed"))
+    assert dispatcher.pending == 1
+    assert dispatcher.wait_idle(5)
+
+    assert len(hook.requests) == 3
+    assert {headers["X-FinScribe-Delivery"] for headers, _ in hook.requests} == {delivery_id}
+    assert _count("job.failed", "retry") - retries == 2
+    assert dispatcher.dead_letters() == [] and dispatcher.pending == 0
+
+
+def test_exhausted_delivery_is_dead_lettered_and_can_be_redelivered(receiver, dispatcher, tmp_path):
+    hook = receiver(fail_first=3)
+    dead = _count("job.completed", "dead_lettered")
+
+    delivery_id = dispatcher.enqueue(_delivery(hook.url))
+    assert dispatcher.wait_idle(5)
+
+    assert len(hook.requests) == 3
+    [letter] = dispatcher.dead_letters()
+    assert letter.id == delivery_id and letter.attempts == 3 and letter.last_error == "HTTP 500"
+    assert dispatcher.storage.exists(f"{DEAD_LETTER_PREFIX}{delivery_id}.json")
+    assert _count("job.completed", "dead_lettered") - dead == 1
+
+    # The receiver recovered: a fresh dispatcher redelivers from storage alone
+    other = WebhookDispatcher(base_delay=0.01, storage=LocalStorage(str(tmp_path)), allow_private=True)
+    try:
+        assert other.redeliver(delivery_id) and other.wait_idle(5)
+    finally:
+        other.shutdown(timeout=1)
+    assert len(hook.requests) == 4 and json.loads(hook.requests[-1][1])["id"] == delivery_id
+    assert not dispatcher.storage.exists(f"{DEAD_LETTER_PREFIX}{delivery_id}.json")
+    assert not other.redeliver("missing")
+
+
+def test_internal_destinations_are_refused(receiver, tmp_path):
+    hook = receiver()
+    dispatcher = WebhookDispatcher(base_delay=0.01, storage=LocalStorage(str(tmp_path)))
+    try:
+        dispatcher.enqueue(_delivery(hook.url))
+        assert dispatcher.wait_idle(5)
+    finally:
+        dispatcher.shutdown(timeout=1)
+    [letter] = dispatcher.dead_letters()
+    assert letter.attempts == 1 and "not allowed" in letter.last_error
+    assert hook.requests == []
+
+    for url in ("http://169.254.169.254/latest/meta-data", "http://127.0.0.1:8080/hook", "http://localhost/hook",
+                "https://10.0.0.5/hook", "http://[::1]/hook", "http://[::ffff:192.168.0.1]/hook", "ftp://x/hook"):
+        with pytest.raises(WebhookDestinationError):
+            check_destination_url(url)
+    assert check_destination_url("https://hooks.example.com/finscribe") == "hooks.example.com"
+
+
+def test_concurrent_deliveries_are_bounded(receiver, dispatcher):
+    hook = receiver(delay=0.1)
+    for _ in range(9):
+        dispatcher.enqueue(_delivery(hook.url))
+    assert dispatcher.wait_idle(10)
+    assert len(hook.requests) == 9
+    assert hook.peak == 3
+
+
+def test_subscription_endpoints_are_scoped_to_the_callers_tenant():
+    from app.api.v1 import webhooks
+    from app.core.job_service import JobService
+    from app.db import Base, get_db
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def tenant_from_header(request, call_next):
+        # Stands in for the API key check, which sets request.state.tenant_id
+        request.state.tenant_id = request.headers.get("X-Tenant")
+        return await call_next(request)
+
+    app.include_router(webhooks.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = lambda: Session()
+    client = TestClient(app)
+    job = JobService(Session()).create_job(filename="a.pdf", file_content=b"data", file_size=4, checksum="c",
+                                           metadata={"tenant_id": "tenant-1"})
+    one, two = {"X-Tenant": "tenant-1"}, {"X-Tenant": "tenant-2"}
+
+    created = client.post("/api/v1/webhooks", json={"url": "https://example.test/hook", "job_id": job.id}, headers=one)
+    assert created.status_code == 201 and len(created.json()["secret"]) == 64
+    listed = client.get("/api/v1/webhooks", params={"job_id": job.id}, headers=one).json()
+    assert [s["id"] for s in listed] == [created.json()["id"]] and listed[0]["secret"] is None
+
+    # Another tenant can't subscribe to the job, claim tenant-1's jobs, see or delete tenant-1's webhook
+    assert client.post("/api/v1/webhooks", json={"url": "https://example.test/hook", "job_id": job.id},
+                       headers=two).status_code == 404
+    claimed = client.post("/api/v1/webhooks", json={"url": "https://example.test/hook", "tenant_id": "tenant-1"},
+                          headers=two)
+    assert claimed.status_code == 201 and claimed.json()["tenant_id"] == "tenant-2"
+    assert [s["id"] for s in client.get("/api/v1/webhooks", headers=two).json()] == [claimed.json()["id"]]
+    assert client.delete(f"/api/v1/webhooks/{created.json()['id']}", headers=two).status_code == 404
+
+    assert client.post("/api/v1/webhooks", json={"url": "https://example.test/hook"}).status_code == 400
+    assert client.post("/api/v1/webhooks", json={"url": "http://169.254.169.254/latest", "job_id": job.id},
+                       headers=one).status_code == 400
+    assert client.post("/api/v1/webhooks", json={"url": "https://x.test", "job_id": job.id,
+                                                 "events": ["job.exploded"]}, headers=one).status_code == 400
+
+    assert client.delete(f"/api/v1/webhooks/{created.json()['id']}", headers=one).status_code == 200
+    assert client.get("/api/v1/webhooks", headers=one).json() == []
+    assert client.delete("/api/v1/webhooks/missing", headers=one).status_code == 404
+
+
+def test_dead_letter_endpoints_are_scoped_to_the_callers_tenant(receiver, dispatcher, monkeypatch):
+    from app.api.v1 import webhooks
+
+    hook = receiver()
+    letters = {}
+    for tenant in ("tenant-1", "tenant-2"):
+        delivery = _delivery(hook.url)
+        delivery.owner_tenant_id = tenant
+        dispatcher._dead_letter(delivery)
+        letters[tenant] = delivery.id
+    monkeypatch.setattr(webhooks, "get_webhook_dispatcher", lambda: dispatcher)
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def tenant_from_header(request, call_next):
+        request.state.tenant_id = request.headers.get("X-Tenant")
+        return await call_next(request)
+
+    app.include_router(webhooks.router, prefix="/api/v1")
+    client = TestClient(app)
+    one, two = {"X-Tenant": "tenant-1"}, {"X-Tenant": "tenant-2"}
+
+    assert [d["id"] for d in client.get("/api/v1/webhooks/dead-letters", headers=two).json()] == [letters["tenant-2"]]
+    assert client.get("/api/v1/webhooks/dead-letters").json() == []
+    assert client.post(f"/api/v1/webhooks/dead-letters/{letters['tenant-1']}/retry", headers=two).status_code == 404
+    assert hook.requests == []
+
+    assert client.post(f"/api/v1/webhooks/dead-letters/{letters['tenant-1']}/retry", headers=one).status_code == 202
+    assert dispatcher.wait_idle(5) and len(hook.requests) == 1
+    assert [d.id for d in dispatcher.dead_letters()] == [letters["tenant-2"]]
@@ -0,0 +1,144 @@
+"""Tests for the persistent worker event loop runtime."""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.http_session import http_session
+from app.core.worker_runtime import WorkerRuntime, shutdown_worker_runtime
+
+
+@pytest.fixture
+def runtime():
+    runtime = WorkerRuntime(concurrency=2, name="test-runtime").start()
+    yield runtime
+    runtime.shutdown(timeout=1)
+
+
+def test_jobs_share_one_loop_with_bounded_concurrency(runtime):
+    state = {"running": 0, "peak": 0, "loops": set()}
+
+    async def job(n):
+        state["loops"].add(asyncio.get_running_loop())
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.01)
+        state["running"] -= 1
+        return n * 2
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda n: runtime.run(job(n)), range(20)))
+
+    assert results == [n * 2 for n in range(20)]
+    assert len(state["loops"]) == 1
+    assert state["peak"] == 2
+    assert runtime.active_jobs == 0
+
+
+def test_errors_and_timeouts_reach_the_caller(runtime):
+    async def fails():
+        raise ValueError("boom")
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    with pytest.raises(ValueError, match="boom"):
+        runtime.run(fails())
+    with pytest.raises(asyncio.TimeoutError):
+        runtime.run(asyncio.wait_for(slow(), timeout=0.01))
+    # The runtime keeps serving jobs afterwards
+    assert runtime.run(asyncio.sleep(0, result="ok")) == "ok"
+
+
+def test_http_session_is_shared_on_runtime_loop_only(runtime):
+    async def open_session():
+        async with http_session() as session:
+            return session
+
+    first = runtime.run(open_session())
+    second = runtime.run(open_session())
+    assert first is second and not first.closed
+
+    private = asyncio.run(open_session())
+    assert private is not first and private.closed
+
+    runtime.shutdown(timeout=1)
+    assert first.closed
+
+
+def test_shutdown_drains_then_cancels():
+    runtime = WorkerRuntime(concurrency=4, name="drain-runtime").start()
+    finished = threading.Event()
+    cancelled = threading.Event()
+
+    async def quick():
+        await asyncio.sleep(0.05)
+        finished.set()
+
+    async def stuck():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    quick_future = runtime.submit(quick())
+    runtime.submit(stuck())
+    runtime.shutdown(timeout=0.2)
+
+    assert finished.is_set() and quick_future.done()
+    assert cancelled.is_set()
+    assert not runtime.is_running
+    with pytest.raises(RuntimeError):
+        runtime.submit(quick())
+
+
+def test_process_job_runs_on_persistent_loop(monkeypatch):
+    from app.core import worker
+    from app.core.job_service import JobService
+    from app.db import Base
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    loops, loop_threads, status_threads = [], set(), []
+
+    class StandInProcessor:
+        async def process_document(self, file_content, filename, model_type="fine_tuned", on_stage=None,
+                                   fast_lane=False):
+            loops.append(asyncio.get_running_loop())
+            loop_threads.add(threading.get_ident())
+            on_stage("ocr", 1.0)
+            on_stage("vlm_enrichment", 1.0)
+            return {"success": True, "structured_output": {"total": 1}, "metadata": {"models_used": ["x"]}}
+
+    update_job_status = JobService.update_job_status
+
+    def recording_update(self, job_id, **fields):
+        status_threads.append(threading.get_ident())
+        return update_job_status(self, job_id, **fields)
+
+    monkeypatch.setattr(JobService, "update_job_status", recording_update)
+    monkeypatch.setattr(worker, "processor", StandInProcessor())
+    monkeypatch.setattr(worker, "get_db_session", Session)
+    monkeypatch.setattr(worker, "get_content_store", lambda: None)
+
+    job_ids = []
+    for n in range(2):
+        job = JobService(Session()).create_job(filename=f"{n}.pdf", file_content=b"data", file_size=4,
+                                               checksum=f"c{n}")
+        job_ids.append(job.id)
+        worker.process_job(job.id, b"data", f"{n}.pdf", "analyze")
+
+    service = JobService(Session())
+    for job_id in job_ids:
+        assert service.get_job(job_id).status == "completed"
+        assert service.get_result_by_job_id(job_id).data == {"total": 1}
+    assert loops[0] is loops[1]
+    # Status writes made by the job coroutines (3 per job) ran off the shared loop
+    assert len(status_threads) >= 6 and not loop_threads & set(status_threads)
+    shutdown_worker_runtime(timeout=1)
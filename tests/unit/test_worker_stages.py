@@ -0,0 +1,110 @@
+"""Tests for stage-driven progress, stage timings and the small-document fast lane."""
+import asyncio
+import io
+
+from PIL import Image
+
+from app.core import worker
+
+
+def _png(size=(200, 200)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, "white").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _pdf(pages):
+    objects = b"".join(b"%d 0 obj << /Type /Page /Parent 2 0 R >> endobj\n" % (3 + n) for n in range(pages))
+    return b"%PDF-1.4\n2 0 obj << /Type /Pages /Count " + str(pages).encode() + b" >> endobj\n" + objects
+
+
+class RecordingJobService:
+    def __init__(self):
+        self.updates = []
+
+    def update_job_status(self, job_id, **fields):
+        self.updates.append(fields)
+
+
+class StandInProcessor:
+    """Emits stage events like FinancialDocumentProcessor, without running models."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def process_document(self, file_content, filename, model_type="fine_tuned", on_stage=None, fast_lane=False):
+        self.calls.append("process_document")
+        for stage in ("ocr", "vlm_enrichment", "validation"):
+            on_stage(stage, 1.0)
+        return {"success": True, "structured_output": {"total": 5},
+                "metadata": {"stage_timings_ms": {"ocr": 1.0, "vlm_enrichment": 1.0, "validation": 1.0}}}
+
+    async def process_document_with_combined_output(self, file_content, filename, model_type="fine_tuned",
+                                                    on_stage=None):
+        self.calls.append("combined")
+        for stage in ("ocr", "post_processing", "markdown", "vlm_enrichment", "validation", "combined_output"):
+            on_stage(stage, 1.0)
+        return {"success": True, "json": {"total": 5}, "markdown": "# Invoice",
+                "metadata": {"stage_timings_ms": {"ocr": 1.0, "combined_output": 1.0}}}
+
+
+def test_small_document_detection():
+    assert worker._is_small_document(_png())
+    assert worker._is_small_document(_pdf(1))
+    assert not worker._is_small_document(_pdf(3))
+    assert not worker._is_small_document(b"II*\x00" + b"\x00" * 100)
+    assert not worker._is_small_document(_png() + b"\x00" * (600 * 1024))
+
+
+def test_fast_lane_and_cost_estimate_count_pages_alike():
+    from app.core.cost_estimator import job_features
+
+    # An incremental update left a replaced page object behind: the page tree still says one page
+    pdf = _pdf(1) + b"9 0 obj << /Type /Page /Parent 2 0 R >> endobj\n"
+    assert worker._is_small_document(pdf) and job_features(pdf, "a.pdf").pages == 1
+    three = _pdf(3)
+    assert not worker._is_small_document(three) and job_features(three, "a.pdf").pages == 3
+
+
+def test_progress_follows_stage_events(monkeypatch):
+    stand_in = StandInProcessor()
+    monkeypatch.setattr(worker, "processor", stand_in)
+    jobs = RecordingJobService()
+
+    result = asyncio.run(worker._process_analysis("job-1", _pdf(2), "big.pdf", jobs))
+
+    assert stand_in.calls == ["combined"]
+    progress = [update["progress"] for update in jobs.updates]
+    assert progress == sorted(progress) and progress[-1] == 95
+    assert [update["stage"] for update in jobs.updates][:2] == ["ocr", "parse"]
+    assert result["markdown_output"] == "# Invoice"
+    assert result["metadata"]["fast_lane"] is False
+    assert set(result["metadata"]["stage_timings_ms"]) == {"ocr", "combined_output", "total"}
+
+
+def test_fast_lane_skips_combined_output(monkeypatch):
+    stand_in = StandInProcessor()
+    monkeypatch.setattr(worker, "processor", stand_in)
+
+    result = asyncio.run(worker._process_analysis("job-2", _png(), "receipt.png", RecordingJobService()))
+
+    assert stand_in.calls == ["process_document"]
+    assert result["data"] == {"total": 5}
+    assert result["metadata"]["fast_lane"] is True
+    assert result["metadata"]["output_formats"] == ["json"]
+
+
+def test_processor_reports_stage_timings(monkeypatch, tmp_path):
+    processor = worker.processor
+    monkeypatch.setattr(processor, "active_learning_file", str(tmp_path / "al.jsonl"))
+    events = []
+
+    result = asyncio.run(processor.process_document(_png(), "r.png", on_stage=lambda s, ms: events.append(s),
+                                                    fast_lane=True))
+
+    assert result["success"]
+    assert events[0] == "ocr" and "validation" in events and "markdown" not in events
+    timings = result["metadata"]["stage_timings_ms"]
+    assert list(timings) == events
+    assert all(ms >= 0 for ms in timings.values())
+    assert result["markdown_output"] is None